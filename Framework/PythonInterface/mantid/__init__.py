@@ -124,9 +124,10 @@ for directory in plugin_dirs:
 # Mockup the full API first so that any Python algorithm module has something to import
 _simpleapi._mockup(alg_files)
 # Load the plugins.
-plugin_modules = _plugins.load(plugin_files)
-# Create the proper algorithm definitions in the module
-new_attrs = _simpleapi._translate()
+plugin_modules = _plugins.load(plugin_files, **_plugins.get_load_options())
+# Create the proper algorithm definitions in the module. The cached algorithm signatures
+# are only reused if none of the plugin files have changed
+new_attrs = _simpleapi._translate(_plugins.get_plugin_cache().fingerprint(plugin_files))
 # Finally, overwrite the mocked function definitions in the loaded modules with the real ones
 _plugins.sync_attrs(_simpleapi, new_attrs, plugin_modules)
 
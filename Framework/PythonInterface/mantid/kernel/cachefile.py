@@ -0,0 +1,122 @@
+"""
+    Defines functions to read & write small JSON files used to cache
+    information between Python sessions, e.g. algorithm signatures or
+    the contents of plugin files, together with the helpers shared by
+    the other caches of processed data.
+
+    A cache file is replaced in a single step so that concurrent processes
+    never see a partially written file, and any problem reading or writing
+    a JSON file is treated as a cache miss rather than an error.
+"""
+from __future__ import (absolute_import, division,
+                        print_function)
+
+from contextlib import contextmanager as _contextmanager
+import hashlib as _hashlib
+import json as _json
+import os as _os
+
+
+def user_cache_path(filename):
+    """
+        Returns the full path to a cache file stored within the user properties directory
+
+        @param filename :: The name of the file
+    """
+    from . import config
+    return _os.path.join(config.getUserPropertiesDir(), filename)
+
+
+def load_json(filepath):
+    """
+        Returns the content of the given JSON file or None if the file
+        does not exist or cannot be read
+
+        @param filepath :: A path to a JSON file
+    """
+    try:
+        with open(filepath, 'r') as cache_file:
+            return _json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def file_hash(filepath):
+    """
+        Returns a hash which identifies the version of a file or None if the
+        file does not exist. Cached data is typically derived from large data
+        files, hence the hash is built from the path, the size and the
+        modification time of the file rather than from its content.
+
+        @param filepath :: A path to a file
+    """
+    try:
+        file_stat = _os.stat(filepath)
+    except OSError:
+        return None
+    description = "{0}|{1}|{2}".format(_os.path.realpath(filepath), file_stat.st_size, file_stat.st_mtime)
+    return _hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+def temporary_filename(filepath):
+    """
+        Returns a name, unique to this process, under which a file can be written
+        before it replaces the given file with replace_file. The extension is kept.
+
+        @param filepath :: A path to the file to be replaced
+    """
+    root, ext = _os.path.splitext(filepath)
+    return "{0}.{1}.tmp{2}".format(root, _os.getpid(), ext)
+
+
+def replace_file(temporary_filepath, filepath):
+    """
+        Moves a written file into place in a single step, replacing any existing file
+
+        @param temporary_filepath :: The file which has been written
+        @param filepath :: The path to the file to be replaced
+    """
+    if _os.name == 'nt' and _os.path.exists(filepath):
+        # rename does not overwrite on Windows
+        _os.remove(filepath)
+    _os.rename(temporary_filepath, filepath)
+
+
+@_contextmanager
+def atomic_write(filepath):
+    """
+        A context manager yielding a temporary path to write the given file to.
+        The written file replaces the target when the block completes, or is
+        removed if the block raises, so readers never see a partial file.
+
+        @param filepath :: A path to the file to be written
+    """
+    tmp_filepath = temporary_filename(filepath)
+    try:
+        yield tmp_filepath
+        replace_file(tmp_filepath, filepath)
+    except BaseException:
+        try:
+            _os.remove(tmp_filepath)
+        except OSError:
+            pass
+        raise
+
+
+def save_json(filepath, content):
+    """
+        Writes the content to the given file as JSON, see atomic_write
+
+        @param filepath :: A path to the JSON file
+        @param content :: An object that can be serialized with json.dump
+        @returns True if the file was written, False otherwise
+    """
+    try:
+        with atomic_write(filepath) as tmp_filepath:
+            with open(tmp_filepath, 'w') as cache_file:
+                _json.dump(content, cache_file)
+    except (IOError, OSError) as exc:
+        from . import logger
+        logger.debug("Unable to write cache file '{0}': {1}".format(filepath, str(exc)))
+        return False
+    return True
@@ -0,0 +1,253 @@
+"""
+    Defines an index of the processed data files within a cache directory, such
+    as the files written by algorithms with names from CreateCacheFilename.
+
+    The index records the signature, the source files, the size and the time of
+    the last access of every cache file, together with the number of hits and
+    misses. It is kept as a hidden JSON file in the cache directory and is updated
+    under a lock file, such that several processes can share a cache directory.
+    Cache files are written to a temporary file which replaces the target in a
+    single step, hence readers never see a partially written cache file.
+"""
+from __future__ import (absolute_import, division,
+                        print_function)
+
+import errno as _errno
+import os as _os
+import re as _re
+import time as _time
+
+from . import cachefile as _cachefile
+
+INDEX_FILENAME = ".cache_index.json"
+LOCK_FILENAME = ".cache_index.lock"
+INDEX_VERSION = 1
+# The names of the files which are created by CreateCacheFilename
+CACHE_FILENAME_PATTERN = _re.compile(r"^(.*_)?[0-9a-f]{40}\.nxs$")
+# The names of the files which are written before they are committed, see temporary_filename
+TEMPORARY_FILENAME_PATTERN = _re.compile(r"^(.*_)?[0-9a-f]{40}\.[0-9]+\.tmp\.nxs$")
+# The time to wait for the lock of the index and the age at which a lock is
+# assumed to be left over from a process which has died
+LOCK_TIMEOUT = 10.
+LOCK_STALE_AGE = 60.
+# The age at which a temporary file is assumed to be left over from a process which has died
+TEMPORARY_FILE_STALE_AGE = 24. * 60. * 60.
+
+
+def is_cache_filename(filename):
+    """
+        Returns True if the name of the file is the name of a cache file
+
+        @param filename :: A file name or path
+    """
+    return CACHE_FILENAME_PATTERN.match(_os.path.basename(filename)) is not None
+
+
+class DataCacheIndex(object):
+    """
+        The index of the cache files in a cache directory
+    """
+
+    def __init__(self, cache_dir):
+        """
+            @param cache_dir :: The cache directory
+        """
+        self._cache_dir = cache_dir
+        self._index_file = _os.path.join(cache_dir, INDEX_FILENAME)
+        self._lock_file = _os.path.join(cache_dir, LOCK_FILENAME)
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def lookup(self, filename, sources=None):
+        """
+            Checks whether a cache file can be used and counts it as a hit or a miss. A cache file
+            whose source files have changed since it was written is removed. Cache files which are
+            not in the index yet are added to it.
+
+            @param filename :: The path to the cache file
+            @param sources :: A list of the source files of the cache file
+            @returns True if the cache file exists and is up to date
+        """
+        key = _os.path.basename(filename)
+
+        def update(index):
+            entry = index["entries"].pop(key, None)
+            is_hit = _os.path.isfile(filename)
+            if is_hit and entry is not None:
+                is_hit = all(_cachefile.file_hash(source) == source_hash
+                             for source, source_hash in entry["sources"].items())
+                if not is_hit:
+                    _remove_file(filename)
+            elif is_hit:
+                entry = self._create_entry(filename, "", sources)
+            if is_hit:
+                entry["last_access"] = _time.time()
+                index["entries"][key] = entry
+            index["hits" if is_hit else "misses"] += 1
+            return is_hit
+
+        return self._update(update)
+
+    def temporary_filename(self, filename):
+        """
+            Returns a name for writing a cache file before it is added with commit
+
+            @param filename :: The path to the cache file
+        """
+        return _cachefile.temporary_filename(filename)
+
+    def commit(self, temporary_filename, filename, signature="", sources=None):
+        """
+            Moves a written cache file into place and adds it to the index
+
+            @param temporary_filename :: The file which has been written
+            @param filename :: The path to the cache file
+            @param signature :: The signature from which the name of the cache file was created
+            @param sources :: A list of the source files of the cache file
+        """
+        _cachefile.replace_file(temporary_filename, filename)
+        entry = self._create_entry(filename, signature, sources)
+
+        def update(index):
+            index["entries"][_os.path.basename(filename)] = entry
+
+        self._update(update)
+
+    def evict(self, max_size=None, max_age=None):
+        """
+            Removes the cache files whose source files have changed, the cache files which have not
+            been used for longer than the maximal age and then the least recently used cache files
+            until the cache files take up no more than the maximal size.
+
+            @param max_size :: The maximal total size of the cache files in bytes or None
+            @param max_age :: The maximal time since the last use of a cache file in seconds or None
+            @returns The list of the removed cache files
+        """
+        def update(index):
+            entries = index["entries"]
+            for name in _os.listdir(self._cache_dir):
+                path = _os.path.join(self._cache_dir, name)
+                if name not in entries and is_cache_filename(name) and _os.path.isfile(path):
+                    entries[name] = self._create_entry(path, "", None, last_access=_os.path.getmtime(path))
+
+            removed = []
+            now = _time.time()
+            for name, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+                path = _os.path.join(self._cache_dir, name)
+                if not _os.path.isfile(path):
+                    del entries[name]
+                    continue
+                is_stale = any(_cachefile.file_hash(source) != source_hash
+                               for source, source_hash in entry["sources"].items())
+                is_old = max_age is not None and now - entry["last_access"] > max_age
+                if is_stale or is_old:
+                    _remove_file(path)
+                    del entries[name]
+                    removed.append(path)
+
+            if max_size is not None:
+                size = sum(entry["size"] for entry in entries.values())
+                for name, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+                    if size <= max_size:
+                        break
+                    path = _os.path.join(self._cache_dir, name)
+                    _remove_file(path)
+                    del entries[name]
+                    removed.append(path)
+                    size -= entry["size"]
+            index["evictions"] += len(removed)
+            return removed
+
+        return self._update(update)
+
+    def remove_temporary_files(self, max_age=TEMPORARY_FILE_STALE_AGE):
+        """
+            Removes the temporary files which have not been committed, because the process
+            writing them has died, and have not been modified for longer than the maximal age
+
+            @param max_age :: The minimal time since the last modification in seconds
+            @returns The list of the removed files
+        """
+        removed = []
+        now = _time.time()
+        for name in _os.listdir(self._cache_dir):
+            path = _os.path.join(self._cache_dir, name)
+            if TEMPORARY_FILENAME_PATTERN.match(name) is None or not _os.path.isfile(path):
+                continue
+            try:
+                if now - _os.path.getmtime(path) > max_age:
+                    _remove_file(path)
+                    removed.append(path)
+            except OSError:
+                continue
+        return removed
+
+    def statistics(self):
+        """
+            Returns a dict with the number of cache files, their total size in bytes and the number
+            of hits, misses and evictions since the index was created
+        """
+        index = self._load()
+        return {"entries": len(index["entries"]),
+                "size": sum(entry["size"] for entry in index["entries"].values()),
+                "hits": index["hits"],
+                "misses": index["misses"],
+                "evictions": index["evictions"]}
+
+    @staticmethod
+    def _create_entry(filename, signature, sources, last_access=None):
+        sources = sources if sources else []
+        return {"signature": signature,
+                "sources": dict((source, _cachefile.file_hash(source)) for source in sources),
+                "size": _os.path.getsize(filename),
+                "last_access": _time.time() if last_access is None else last_access}
+
+    def _load(self):
+        index = _cachefile.load_json(self._index_file)
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            index = {"version": INDEX_VERSION, "entries": {}, "hits": 0, "misses": 0, "evictions": 0}
+        return index
+
+    def _update(self, update):
+        """
+            Applies a function to the index while the lock is held and saves the result
+
+            @param update :: A function which takes the index dict and alters it
+            @returns The return value of the function
+        """
+        self._acquire_lock()
+        try:
+            index = self._load()
+            result = update(index)
+            _cachefile.save_json(self._index_file, index)
+        finally:
+            _remove_file(self._lock_file)
+        return result
+
+    def _acquire_lock(self):
+        start = _time.time()
+        while True:
+            try:
+                _os.close(_os.open(self._lock_file, _os.O_CREAT | _os.O_EXCL | _os.O_WRONLY))
+                return
+            except OSError as exc:
+                if exc.errno != _errno.EEXIST:
+                    raise
+            try:
+                if _time.time() - _os.path.getmtime(self._lock_file) > LOCK_STALE_AGE:
+                    _remove_file(self._lock_file)
+                    continue
+            except OSError:
+                continue
+            if _time.time() - start > LOCK_TIMEOUT:
+                raise RuntimeError("Timed out waiting for the lock of the cache index in '{0}'".format(self._cache_dir))
+            _time.sleep(0.05)
+
+
+def _remove_file(filename):
+    try:
+        _os.remove(filename)
+    except OSError:
+        pass
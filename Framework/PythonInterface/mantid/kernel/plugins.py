@@ -7,8 +7,11 @@ algorithms, fit functions etc.
 from __future__ import (absolute_import, division,
                         print_function)
 
+import hashlib as _hashlib
 import os as _os
 import sys as _sys
+import time as _time
+import types as _types
 try:
     from importlib.machinery import SourceFileLoader
 except ImportError:
@@ -25,12 +28,21 @@ except ImportError:
 
         def load_module(self):
             return _imp.load_source(self._name, self._pathname)
+
+        def get_code(self, name):
+            # The source is compiled by load_source so there is nothing to do ahead of time
+            return None
     #endclass
 
 from . import logger, Logger, config
+from . import cachefile as _cachefile
 
 # String that separates paths (should be in the ConfigService)
 PATH_SEPARATOR=";"
+# Name of the file, within the user properties directory, caching the result of scanning the plugin files
+CACHE_FILENAME = "python_plugins_cache.json"
+# Version of the layout of the entries in the cache file
+CACHE_FORMAT = 2
 
 class PluginLoader(object):
 
@@ -44,24 +56,204 @@ class PluginLoader(object):
         self._filepath = filepath
         self._logger = Logger("PluginLoader")
 
-    def run(self):
+    def read_code(self):
+        """
+            Read the compiled code of the module, using the bytecode cache
+            where possible. This does not execute the module and may be run on
+            a separate thread. Returns None if the code can only be obtained by
+            load_module.
+        """
+        return SourceFileLoader(self._module_name(), self._filepath).get_code(self._module_name())
+
+    def run(self, code=None):
         """
             Try and load the module we are pointing at and return
             the module object.
 
             Any ImportErrors raised are not caught and are passed
             on to the caller
+
+            @param code :: Optionally, the code object from read_code
         """
         pathname = self._filepath
-        name = _os.path.basename(pathname) # Including extension
-        name = _os.path.splitext(name)[0]
+        name = self._module_name()
         self._logger.debug("Loading python plugin %s" % pathname)
-        return SourceFileLoader(name, pathname).load_module()
+        start = _time.time()
+        if code is None:
+            module = SourceFileLoader(name, pathname).load_module()
+        else:
+            module = _types.ModuleType(name)
+            module.__file__ = pathname
+            _sys.modules[name] = module
+            try:
+                exec(code, module.__dict__)
+            except Exception:
+                del _sys.modules[name]
+                raise
+        _import_times[pathname] = _time.time() - start
+        self._logger.debug("Loaded python plugin %s in %.3f seconds" % (pathname, _import_times[pathname]))
+        return module
+
+    def _module_name(self):
+        name = _os.path.basename(self._filepath) # Including extension
+        return _os.path.splitext(name)[0]
+
+# Time taken, in seconds, to import each plugin file in this session
+_import_times = {}
+
+def get_import_times():
+    """
+        Returns a dictionary of plugin file paths to the time, in seconds,
+        taken to import them in this session
+    """
+    return dict(_import_times)
+
+#======================================================================================================================
+
+class PluginCache(object):
+    """
+        Remembers, between sessions, whether each plugin file registers an algorithm
+        along with the modification time, size and SHA-1 hash of the file. A file
+        is only read again if its modification time or size has changed.
+    """
+
+    def __init__(self, filepath=None):
+        """
+            @param filepath :: The file used to persist the cache. If None the cache is memory only
+        """
+        self._filepath = filepath
+        self._entries = None
+        if filepath is not None:
+            content = _cachefile.load_json(filepath)
+            if isinstance(content, dict) and content.get("format") == CACHE_FORMAT:
+                self._entries = content.get("plugins")
+        if not isinstance(self._entries, dict):
+            self._entries = {}
+        self._changed = False
+
+    def contains_algorithm(self, filename):
+        """
+            Returns True if the file registers an algorithm, see contains_algorithm.
+            The file is only scanned if it has changed since the last scan
+
+            @param filename :: A path to a plugin file
+        """
+        return self._entry(filename)["algorithm"]
+
+    def file_hash(self, filename):
+        """
+            Returns the SHA-1 hash of the file content
+
+            @param filename :: A path to a plugin file
+        """
+        return self._entry(filename)["sha1"]
+
+    def deferrable(self, filename):
+        """
+            Returns True if the only types the file registers are algorithms so that
+            its import can be deferred, see only_registers_algorithms
+
+            @param filename :: A path to a plugin file
+        """
+        entry = self._entry(filename)
+        if "deferrable" not in entry:
+            entry["deferrable"] = only_registers_algorithms(filename)
+            self._changed = True
+        return entry["deferrable"]
+
+    def manifest(self, filename):
+        """
+            Returns a list describing the algorithms registered by the file when it was
+            last imported or None if that is not known or the import cannot be deferred
+
+            @param filename :: A path to a plugin file
+        """
+        if not self.deferrable(filename):
+            return None
+        return self._entry(filename).get("algorithms")
+
+    def set_manifest(self, filename, algorithms):
+        """
+            Records the algorithms registered by importing the file, see manifest
+
+            @param filename :: A path to a plugin file
+            @param algorithms :: A list of dictionaries with the keys name, version, category, summary & alias
+                                 or None to mark the import of the file as not deferrable
+        """
+        entry = self._entry(filename)
+        if algorithms is None:
+            entry["deferrable"] = False
+        else:
+            entry["algorithms"] = algorithms
+        self._changed = True
+
+    def fingerprint(self, filenames):
+        """
+            Returns a key that changes if any of the given files is added, removed or modified
+
+            @param filenames :: A list of paths to plugin files
+        """
+        digest = _hashlib.sha1()
+        for filename in sorted(filenames):
+            digest.update(filename.encode("utf-8"))
+            digest.update(self.file_hash(filename).encode("utf-8"))
+        return digest.hexdigest()
+
+    def save(self):
+        """
+            Writes the cache to disk if anything has changed since it was loaded
+        """
+        if self._changed and self._filepath is not None:
+            if _cachefile.save_json(self._filepath, {"format": CACHE_FORMAT, "plugins": self._entries}):
+                self._changed = False
+
+    def _entry(self, filename):
+        try:
+            stat = _os.stat(filename)
+        except OSError:
+            return {"algorithm": False, "sha1": ""}
+        entry = self._entries.get(filename)
+        if entry is not None and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return entry
+
+        with open(filename, 'rb') as plugin_file:
+            sha1 = _hashlib.sha1(plugin_file.read()).hexdigest()
+        if entry is None or entry["sha1"] != sha1:
+            entry = {"sha1": sha1, "algorithm": contains_algorithm(filename),
+                     "deferrable": only_registers_algorithms(filename)}
+        entry["mtime"] = stat.st_mtime
+        entry["size"] = stat.st_size
+        self._entries[filename] = entry
+        self._changed = True
+        return entry
+
+_plugin_cache = None
+
+def get_plugin_cache():
+    """
+        Returns the plugin cache for this session, stored within the user properties directory
+    """
+    global _plugin_cache
+    if _plugin_cache is None:
+        _plugin_cache = PluginCache(_cachefile.user_cache_path(CACHE_FILENAME))
+    return _plugin_cache
 
 #======================================================================================================================
 # High-level functions to assist with loading
 #======================================================================================================================
 
+def get_load_options():
+    """
+        Returns the keyword arguments for load() defined in the config service
+        by the python.plugins.threads & python.plugins.deferred keys
+    """
+    try:
+        nthreads = int(config['python.plugins.threads'])
+    except ValueError:
+        nthreads = 1
+    deferred = config['python.plugins.deferred'].strip().lower() in ("1", "on", "true")
+    return {"nthreads": nthreads, "deferred": deferred}
+
 def get_plugin_paths_as_set(key):
     """
         Returns the value of the given key in the config service
@@ -99,6 +291,7 @@ def find_plugins(top_dir):
     """
     if not _os.path.isdir(top_dir):
         raise ValueError("Cannot search given path for plugins, path is not a directory: '%s' " % str(top_dir))
+    cache = get_plugin_cache()
     all_plugins = []
     algs = []
     for root, dirs, files in _os.walk(top_dir):
@@ -106,14 +299,15 @@ def find_plugins(top_dir):
             if f.endswith(PluginLoader.extension):
                 filename = _os.path.join(root, f)
                 all_plugins.append(filename)
-                if contains_algorithm(filename):
+                if cache.contains_algorithm(filename):
                     algs.append(filename)
+    cache.save()
 
     return all_plugins, algs
 
 #======================================================================================================================
 
-def load(path):
+def load(path, nthreads=1, deferred=False):
     """
         High-level function to import the module(s) on the given path.
         The module is imported using __import__ so any code not defined
@@ -123,78 +317,228 @@ def load(path):
         path points to a directory load all files in the directory
         recursively; if the path contains a list of directories then
         all files in each are loaded in turn
+        @param nthreads :: The number of threads used to read the compiled
+        code of the modules ahead of importing them
+        @param deferred :: If True, a module whose registered algorithms are
+        known from a previous session is only imported when one of its
+        algorithms is first created
 
         @return A list of the loaded modules. Note this
         will not included modules that will have attempted to be
-        reloaded but had not been changed
+        reloaded but had not been changed or modules whose import was deferred
     """
     if PATH_SEPARATOR in path:
         path = path.split(PATH_SEPARATOR)
 
     loaded = []
     if type(path) == list:
-        loaded += load_from_list(path)
+        loaded += load_from_list(path, nthreads, deferred)
     elif _os.path.isfile(path) and path.endswith(PluginLoader.extension): # Single file
-        loaded += load_from_file(path)
+        loaded += load_from_list([path], nthreads, deferred)
     elif _os.path.isdir(path):
-        loaded += load_from_dir(path)
+        loaded += load_from_dir(path, nthreads, deferred)
     else:
         raise RuntimeError("Unknown type of path found when trying to load plugins: '%s'" % str(path))
+    get_plugin_cache().save()
 
     return loaded
 
 #======================================================================================================================
 
-def load_from_list(paths):
+def load_from_list(paths, nthreads=1, deferred=False):
     """
         Load all modules in the given list
 
         @param paths :: A list of filenames to load
+        @param nthreads :: The number of threads used to read the compiled code, see load
+        @param deferred :: If True defer the import of modules with a known manifest, see load
     """
     loaded = []
+    filepaths = []
     for p in paths:
+        if _os.path.isfile(p) and p.endswith(PluginLoader.extension):
+            filepaths.append(p)
+            continue
         try:
-            loaded += load(p)
+            loaded += load(p, nthreads, deferred)
         except RuntimeError:
             continue
 
+    if deferred:
+        filepaths = [filepath for filepath in filepaths if not subscribe_deferred(filepath)]
+    code_objects = {}
+    if nthreads > 1 and len(filepaths) > 1:
+        code_objects = read_code(filepaths, nthreads)
+    for filepath in filepaths:
+        loaded += load_from_file(filepath, code_objects.get(filepath))
+
     return loaded
 
 #======================================================================================================================
 
-def load_from_dir(directory):
+def load_from_dir(directory, nthreads=1, deferred=False):
     """
         Load all modules in the given directory
 
         @param directory :: A path that must point to a directory
+        @param nthreads :: The number of threads used to read the compiled code, see load
+        @param deferred :: If True defer the import of modules with a known manifest, see load
     """
-    plugins = find_plugins(directory)
-    loaded = []
-    for filepath in plugins:
-        loaded += load(filepath)
-
-    return loaded
+    all_plugins, algs = find_plugins(directory)
+    return load_from_list(all_plugins, nthreads, deferred)
 
 #======================================================================================================================
 
-def load_from_file(filepath):
+def load_from_file(filepath, code=None):
     """
         Loads the plugin file. Any code present at the top-level will
         be executed on loading
         @param filepath :: A path that must point to a file
+        @param code :: Optionally, the compiled code of the module, see read_code
     """
     loaded = []
     try:
-        name, module = load_plugin(filepath)
+        name, module = load_plugin(filepath, code)
         loaded.append(module)
     except Exception as exc:
         logger.warning("Failed to load plugin %s. Error: %s" % (filepath, str(exc)))
+        return loaded
+
+    cache = get_plugin_cache()
+    if cache.deferrable(filepath) and cache.manifest(filepath) is None:
+        cache.set_manifest(filepath, algorithm_manifest(module))
 
     return loaded
 
 #======================================================================================================================
 
-def load_plugin(plugin_path):
+def read_code(filepaths, nthreads):
+    """
+        Reads the compiled code of each plugin using a pool of threads. The modules
+        are not executed, which must happen one at a time on import.
+
+        @param filepaths :: A list of paths to plugin files
+        @param nthreads :: The number of threads in the pool
+        @returns A dictionary of file paths to code objects. Files whose
+        code could not be read ahead of time are not included
+    """
+    from multiprocessing.pool import ThreadPool
+
+    def read_one(filepath):
+        try:
+            return PluginLoader(filepath).read_code()
+        except Exception:
+            # Any errors will be reported again when the module is imported
+            return None
+
+    pool = ThreadPool(nthreads)
+    try:
+        code_objects = pool.map(read_one, filepaths)
+    finally:
+        pool.close()
+    return dict((filepath, code) for filepath, code in zip(filepaths, code_objects) if code is not None)
+
+#======================================================================================================================
+
+def algorithm_manifest(module):
+    """
+        Returns a list describing the algorithms that the module has registered
+        with the AlgorithmFactory, see PluginCache.manifest. None is returned if
+        an algorithm defines its own __init__ as its import cannot be deferred
+
+        @param module :: A loaded plugin module
+    """
+    from mantid.api import AlgorithmFactory, PythonAlgorithm
+    algorithms = []
+    for attr in module.__dict__.values():
+        if not isinstance(attr, type) or not issubclass(attr, PythonAlgorithm) \
+                or attr.__module__ != module.__name__:
+            continue
+        if "__init__" in attr.__dict__:
+            # The stand-in could not run the initialization of the real class, see subscribe_deferred
+            return None
+        try:
+            instance = attr()
+            if AlgorithmFactory.exists(instance.name(), instance.version()):
+                algorithms.append({"name": instance.name(), "version": instance.version(),
+                                   "category": instance.category(), "summary": instance.summary(),
+                                   "alias": instance.alias(), "base": _exported_base(attr).__name__})
+        except Exception:
+            continue
+    return algorithms
+
+#======================================================================================================================
+
+def _exported_base(cls):
+    """
+        Returns the first base class of the algorithm type that is exported from C++,
+        e.g. PythonAlgorithm or DataProcessorAlgorithm
+    """
+    import mantid.api
+    for base in cls.__mro__[1:]:
+        if getattr(mantid.api, base.__name__, None) is base:
+            return base
+    return mantid.api.PythonAlgorithm
+
+#======================================================================================================================
+
+def subscribe_deferred(filepath):
+    """
+        Subscribes a stand-in for each algorithm recorded in the file's manifest. A stand-in
+        answers the queries for its name, version, category, summary & alias from the manifest,
+        so listing the algorithms, e.g. to build the algorithm tree in MantidPlot, does not
+        import the file. The file is imported when a stand-in is first initialized, at which point
+        the stand-in becomes an instance of the real algorithm. The import replaces the stand-ins in
+        the AlgorithmFactory with the real algorithms.
+
+        @param filepath :: A path to a plugin file
+        @returns True if stand-ins were subscribed, False if the file must be imported
+    """
+    import mantid.api
+    from mantid.api import AlgorithmFactory, PythonAlgorithm
+    manifest = get_plugin_cache().manifest(filepath)
+    if not manifest:
+        return False
+
+    real_classes = {}
+
+    def become_real(self):
+        if not real_classes:
+            name, module = load_plugin(filepath)
+            for real_cls in module.__dict__.values():
+                if isinstance(real_cls, type) and issubclass(real_cls, PythonAlgorithm):
+                    real_classes[real_cls.__name__] = real_cls
+        real_cls = real_classes.get(type(self).__name__)
+        if real_cls is None:
+            raise RuntimeError("The plugin '%s' no longer defines %s" % (filepath, type(self).__name__))
+        # The stand-in derives from the same exported class as the real algorithm and both
+        # only add a __dict__ to it, so the instance can change type
+        self.__class__ = real_cls
+
+    def deferred_init(self):
+        become_real(self)
+        self.PyInit()
+
+    def deferred_exec(self):
+        become_real(self)
+        self.PyExec()
+
+    for algorithm in manifest:
+        attrs = {"version": lambda self, version=algorithm["version"]: version,
+                 "category": lambda self, category=algorithm["category"]: category,
+                 "summary": lambda self, summary=algorithm["summary"]: summary,
+                 "alias": lambda self, alias=algorithm.get("alias", ""): alias,
+                 "PyInit": deferred_init, "PyExec": deferred_exec}
+        base = getattr(mantid.api, algorithm.get("base", ""), PythonAlgorithm)
+        # The algorithm name is taken from the name of the Python type
+        deferred_cls = type(str(algorithm["name"]), (base,), attrs)
+        AlgorithmFactory.subscribe(deferred_cls)
+    logger.debug("Deferred import of python plugin %s" % filepath)
+    return True
+
+#======================================================================================================================
+
+def load_plugin(plugin_path, code=None):
     """
         Load a plugin and return the name & module object
 
@@ -202,9 +546,10 @@ def load_plugin(plugin_path):
          to a .py file that will be loaded. A ValueError is raised if
          path is not a valid plugin path. Any exceptions raised by the
          import are passed to the caller
+         @param code :: Optionally, the compiled code of the module
     """
     loader = PluginLoader(plugin_path)
-    module = loader.run()
+    module = loader.run(code)
     return module.__name__, module
 
 #======================================================================================================================
@@ -253,3 +598,17 @@ def contains_algorithm(filename):
         alg_found = False
 
     return alg_found
+
+#======================================================================================================================
+
+def only_registers_algorithms(filename):
+    """
+        Inspects the file to check that the only types it subscribes to a factory
+        are algorithms, i.e. importing it has no other side effects that are known
+    """
+    try:
+        with open(filename, 'r') as plugin_file:
+            content = plugin_file.read()
+    except Exception:
+        return False
+    return content.count('.subscribe(') == content.count('AlgorithmFactory.subscribe(')
@@ -0,0 +1,72 @@
+"""
+    Defines functions to create pools of worker processes for Python
+    algorithms & scripts.
+
+    The workers are not forked from the calling process, which may have
+    running OpenMP threads or a GUI that do not survive a fork. They are
+    started from a new interpreter, or a server process that does no
+    other work, and import mantid.simpleapi before they run a task. A
+    worker therefore shares no workspaces with the caller: the input of
+    a task has to be passed to it, e.g. in NeXus files.
+"""
+from __future__ import (absolute_import, division,
+                        print_function)
+
+import multiprocessing as _multiprocessing
+import sys as _sys
+
+# Attributes of the __main__ module that make a new worker run the main script of the caller
+_MAIN_ATTRIBUTES = ('__file__', '__spec__')
+
+
+def can_create_pool():
+    """
+        Returns True if a pool of worker processes can be created from this process.
+        Python 2 can only fork the workers and within MantidPlot the interpreter
+        is the GUI, which cannot be started as a worker
+    """
+    if not hasattr(_multiprocessing, 'get_context'):
+        return False
+    import mantid
+    return not mantid.__gui__
+
+
+def start_method():
+    """
+        Returns the multiprocessing start method used for the workers
+    """
+    if 'forkserver' in _multiprocessing.get_all_start_methods():
+        return 'forkserver'
+    else:
+        return 'spawn'
+
+
+def create_pool(processes):
+    """
+        Returns a multiprocessing.Pool with the given number of worker processes,
+        see can_create_pool
+
+        @param processes :: The number of worker processes
+    """
+    if not can_create_pool():
+        raise RuntimeError("Worker processes cannot be started from this process")
+    context = _multiprocessing.get_context(start_method())
+    # A script that creates the pool at the top level must not be run again by each worker
+    main_module = _sys.modules.get('__main__')
+    hidden = {}
+    for name in _MAIN_ATTRIBUTES:
+        if getattr(main_module, name, None) is not None:
+            hidden[name] = getattr(main_module, name)
+            setattr(main_module, name, None)
+    try:
+        return context.Pool(processes, initializer=_initialize_worker)
+    finally:
+        for name, value in hidden.items():
+            setattr(main_module, name, value)
+
+
+def _initialize_worker():
+    """
+        Registers the algorithms in a new worker process
+    """
+    import mantid.simpleapi # noqa
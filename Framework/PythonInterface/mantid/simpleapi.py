@@ -28,6 +28,7 @@ import os
 
 from . import api as _api
 from . import kernel as _kernel
+from .kernel import cachefile as _cachefile
 from .kernel.funcinspect import lhs_info as _lhs_info
 from .kernel.funcinspect import replace_signature as _replace_signature
 from .kernel.funcinspect import customise_func as _customise_func
@@ -44,6 +45,13 @@ __SPECIALIZED_FUNCTIONS__ = ["Load", "StartLiveData", "CutMD", "RenameWorkspace"
 __MDCOORD_FUNCTIONS__ = ["PeakIntensityVsRadius", "CentroidPeaksMD", "IntegratePeaksMD"]
 # The "magic" keyword to enable/disable logging
 __LOGGING_KEYWORD__ = "EnableLogging"
+# Config key & environment variable that switch on the lazy creation of the algorithm functions
+__LAZY_CONFIG_KEY__ = "python.simpleapi.lazy"
+__LAZY_ENV_VAR__ = "MANTID_SIMPLEAPI_LAZY"
+# Name of the file, within the user properties directory, caching the algorithm signatures
+__SIGNATURE_INDEX_FILENAME__ = "simpleapi_signatures.json"
+# Version of the layout of the entries in the signature index
+__SIGNATURE_INDEX_FORMAT__ = 2
 
 
 def specialization_exists(name):
@@ -945,7 +953,7 @@ def _create_algorithm_function(name, version, algm_object):
         The help that will be displayed is that of the most recent version.
         :param name: name of the algorithm
         :param version: The version of the algorithm
-        :param algm_object: the created algorithm object.
+        :param algm_object: the created algorithm object or its _AlgorithmSignature
     """
     def algorithm_wrapper(*args, **kwargs):
         """
@@ -997,8 +1005,11 @@ def _create_algorithm_function(name, version, algm_object):
         return _gather_returns(name, lhs, algm)
     # enddef
     # Insert definition in to global dict
-    algm_wrapper = _customise_func(algorithm_wrapper, name,
-                                   _create_generic_signature(algm_object),
+    if isinstance(algm_object, _AlgorithmSignature):
+        signature = algm_object.signature()
+    else:
+        signature = _create_generic_signature(algm_object)
+    algm_wrapper = _customise_func(algorithm_wrapper, name, signature,
                                    algm_object.docString())
     globals()[name] = algm_wrapper
     # Register aliases
@@ -1011,6 +1022,42 @@ def _create_algorithm_function(name, version, algm_object):
 # -------------------------------------------------------------------------------------------------------------
 
 
+def _create_lazy_algorithm_function(name, version, algm_signature):
+    """
+        Create a placeholder function that builds the real algorithm function,
+        see _create_algorithm_function, the first time that it is called. All calls
+        are forwarded to the real function. The placeholder only carries the name and
+        documentation of the algorithm; its signature is replaced by the one of the
+        real function on the first call.
+        :param name: name of the algorithm
+        :param version: The version of the algorithm
+        :param algm_signature: An _AlgorithmSignature describing the algorithm
+    """
+    real_function = []
+
+    def algorithm_wrapper(*args, **kwargs):
+        if not real_function:
+            real_function.append(_create_algorithm_function(name, version, algm_signature))
+        # The variable assignment is in our caller's frame
+        if "__LHS_FRAME_OBJECT__" not in kwargs:
+            import inspect
+            kwargs["__LHS_FRAME_OBJECT__"] = inspect.currentframe().f_back
+        return real_function[0](*args, **kwargs)
+    # enddef
+    # Building the code object with the signature is left to the first call
+    algorithm_wrapper.__name__ = str(name)
+    algorithm_wrapper.__doc__ = algm_signature.docString()
+    globals()[name] = algorithm_wrapper
+    # Register aliases
+    for alias in algm_signature.alias().split(' '):
+        if len(alias) > 0:
+            globals()[alias] = algorithm_wrapper
+    # endfor
+    return algorithm_wrapper
+
+# -------------------------------------------------------------------------------------------------------------
+
+
 def _create_algorithm_object(name, version=-1, startProgress=None, endProgress=None):
     """
     Create and initialize the named algorithm of the given version. This
@@ -1255,14 +1302,166 @@ def _mockup(plugins):
 # ------------------------------------------------------------------------------------------------------------
 
 
-def _translate():
+class _AlgorithmSignature(object):
+    """
+        A light-weight stand-in for an initialized algorithm object that can be
+        stored in the signature index. It answers the part of the algorithm
+        interface that is used to build the functions, dialogs & workspace methods
+        of this module so that the algorithm itself need not be initialized.
+    """
+
+    def __init__(self, name, entry):
+        """
+            :param name: The name of the algorithm
+            :param entry: A dictionary, as produced by to_dict()
+        """
+        self._name = name
+        self._entry = entry
+
+    @classmethod
+    def from_algorithm(cls, algm_object):
+        """
+            Extract the signature of the given initialized algorithm
+            :param algm_object: An initialized algorithm object
+        """
+        entry = {"version": algm_object.version(),
+                 "signature": list(_create_generic_signature(algm_object)),
+                 "summary": algm_object.summary(),
+                 "doc": algm_object.docString(),
+                 "alias": algm_object.alias().strip(),
+                 "properties": list(algm_object.orderedProperties()),
+                 "method_name": algm_object.workspaceMethodName(),
+                 "method_input": algm_object.workspaceMethodInputProperty(),
+                 "method_on": list(algm_object.workspaceMethodOn())}
+        return cls(algm_object.name(), entry)
+
+    def to_dict(self):
+        return self._entry
+
+    def signature(self):
+        return tuple(self._entry["signature"])
+
+    def name(self):
+        return self._name
+
+    def version(self):
+        return self._entry["version"]
+
+    def summary(self):
+        return self._entry["summary"]
+
+    def docString(self):
+        return self._entry["doc"]
+
+    def alias(self):
+        return self._entry["alias"]
+
+    def orderedProperties(self):
+        return self._entry["properties"]
+
+    def workspaceMethodName(self):
+        return self._entry["method_name"]
+
+    def workspaceMethodInputProperty(self):
+        return self._entry["method_input"]
+
+    def workspaceMethodOn(self):
+        return self._entry["method_on"]
+
+    def __contains__(self, prop_name):
+        return prop_name in self._entry["properties"]
+
+# -------------------------------------------------------------------------------------------------------------
+
+
+def _lazy_translation_enabled():
+    """
+        Returns True if the algorithm functions should be created on first use. This is
+        controlled by the MANTID_SIMPLEAPI_LAZY environment variable or, if that is not
+        set, the python.simpleapi.lazy config key.
+    """
+    value = os.environ.get(__LAZY_ENV_VAR__)
+    if value is None:
+        value = _kernel.config[__LAZY_CONFIG_KEY__]
+    return value.strip().lower() in ("1", "on", "true")
+
+
+def _build_fingerprint():
+    """
+        Returns the modification times & sizes of the Python extension modules and the
+        C++ plugin libraries. Development builds keep the same revision while the
+        properties of the algorithms change so the revision alone does not identify a build
+    """
+    import glob
+    filepaths = [_kernel._kernel.__file__, _api._api.__file__]
+    for plugins_dir in _kernel.config["plugins.directory"].split(";"):
+        if plugins_dir:
+            filepaths.extend(glob.glob(os.path.join(plugins_dir.strip(), "*")))
+    fingerprint = []
+    for filepath in sorted(filepaths):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            continue
+        fingerprint.append([os.path.basename(filepath), stat.st_mtime, stat.st_size])
+    return fingerprint
+
+
+def _signature_index_key(algs, plugins_key):
+    """
+        Returns a key that identifies the set of registered algorithms, the Python plugin files
+        that define them & the build of Mantid
+        :param algs: A dictionary of algorithm names to a list of versions
+        :param plugins_key: A string identifying the content of the loaded plugin files
+    """
+    import hashlib
+    import json
+    registered = sorted((name, sorted(versions)) for name, versions in iteritems(algs))
+    content = json.dumps([__SIGNATURE_INDEX_FORMAT__, _kernel.version_str(), _kernel.revision_full(),
+                          _build_fingerprint(), plugins_key, registered])
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _load_signature_index(key):
+    """
+        Returns the cached algorithm signatures, as a dictionary of name to entry,
+        if the index on disk was written for the given key. Otherwise None is returned
+        :param key: The key identifying the set of registered algorithms
+    """
+    index = _cachefile.load_json(_cachefile.user_cache_path(__SIGNATURE_INDEX_FILENAME__))
+    if not isinstance(index, dict) or index.get("key") != key:
+        return None
+    return index.get("algorithms")
+
+
+def _save_signature_index(key, entries):
+    """
+        Write the algorithm signatures to disk
+        :param key: The key identifying the set of registered algorithms
+        :param entries: A dictionary of algorithm names to signature entries
+    """
+    _cachefile.save_json(_cachefile.user_cache_path(__SIGNATURE_INDEX_FILENAME__),
+                         {"key": key, "algorithms": entries})
+
+# -------------------------------------------------------------------------------------------------------------
+
+
+def _translate(plugins_key="", lazy=None):
     """
         Loop through the algorithms and register a function call
-        for each of them
+        for each of them. The signature of each algorithm is cached on disk
+        so that the algorithms only need to be initialized when the set of registered
+        algorithms or plugin files changes. In lazy mode the real function is
+        only created when it is first called.
+        :param plugins_key: A string identifying the content of the loaded plugin files
+        :param lazy: If True create the functions on first use. If None
+                     the mode is taken from the environment/config, see _lazy_translation_enabled
         :returns: a list of new function calls
     """
     from mantid.api import AlgorithmFactory, AlgorithmManager
 
+    if lazy is None:
+        lazy = _lazy_translation_enabled()
     # Names of new functions added to the global namespace
     new_functions = []
     # Method names mapped to their algorithm names. Used to detect multiple copies of same method name
@@ -1270,19 +1469,33 @@ def _translate():
     new_methods = {}
 
     algs = AlgorithmFactory.getRegisteredAlgorithms(True)
+    index_key = _signature_index_key(algs, plugins_key)
+    signature_index = _load_signature_index(index_key)
+    index_changed = signature_index is None
+    if index_changed:
+        signature_index = {}
     algorithm_mgr = AlgorithmManager
     for name, versions in iteritems(algs):
         if specialization_exists(name):
             continue
-        try:
-            # Create the algorithm object
-            algm_object = algorithm_mgr.createUnmanaged(name, max(versions))
-            algm_object.initialize()
-        except Exception as exc:
-            logger.warning("Error initializing {0} on registration: '{1}'".format(name, str(exc)))
-            continue
-
-        algorithm_wrapper = _create_algorithm_function(name, max(versions), algm_object)
+        if name in signature_index:
+            algm_object = _AlgorithmSignature(name, signature_index[name])
+            if lazy:
+                algorithm_wrapper = _create_lazy_algorithm_function(name, max(versions), algm_object)
+            else:
+                algorithm_wrapper = _create_algorithm_function(name, max(versions), algm_object)
+        else:
+            try:
+                # Create the algorithm object
+                algm_object = algorithm_mgr.createUnmanaged(name, max(versions))
+                algm_object.initialize()
+            except Exception as exc:
+                logger.warning("Error initializing {0} on registration: '{1}'".format(name, str(exc)))
+                continue
+
+            algorithm_wrapper = _create_algorithm_function(name, max(versions), algm_object)
+            signature_index[name] = _AlgorithmSignature.from_algorithm(algm_object).to_dict()
+            index_changed = True
         method_name = algm_object.workspaceMethodName()
         if len(method_name) > 0:
             if method_name in new_methods:
@@ -1299,6 +1512,8 @@ def _translate():
         _create_algorithm_dialog(name, max(versions), algm_object)
         new_functions.append(name)
 
+    if index_changed:
+        _save_signature_index(index_key, signature_index)
     return new_functions
 
 # -------------------------------------------------------------------------------------------------------------
@@ -1,10 +1,5 @@
 from __future__ import (absolute_import, division, print_function)
-try:
-    import pathos.multiprocessing as mp
-    PATHOS_FOUND = True
-except ImportError:
-    PATHOS_FOUND = False
-
+import multiprocessing as mp
 import numpy as np
 import six
 import os
@@ -34,6 +29,7 @@ class Abins(PythonAlgorithm):
     _calc_partial = None
     _out_ws_name = None
     _num_quantum_order_events = None
+    _binned_overtones = None
     _extracted_dft_data = None
 
     def category(self):
@@ -106,6 +102,11 @@ class Abins(PythonAlgorithm):
                                  "2nd order combinations, 3-> FUNDAMENTALS + first overtone + second overtone + 2nd "
                                  "order combinations + 3rd order combinations etc...)")
 
+        self.declareProperty(name="BinnedOvertones", defaultValue=False,
+                             doc="Construct the transitions for the third and fourth quantum order events on the grid "
+                                 "of bins, merging transitions which fall into the same bin, instead of one by one. "
+                                 "This bounds the memory and time used by higher quantum order events.")
+
         self.declareProperty(WorkspaceProperty("OutputWorkspace", '', Direction.Output),
                              doc="Name to give the output workspace.")
 
@@ -173,7 +174,8 @@ class Abins(PythonAlgorithm):
         s_calculator = AbinsModules.CalculateS(filename=self._phonon_file, temperature=self._temperature,
                                                sample_form=self._sample_form, abins_data=dft_data,
                                                instrument=self._instrument,
-                                               quantum_order_num=self._num_quantum_order_events)
+                                               quantum_order_num=self._num_quantum_order_events,
+                                               binned_overtones=self._binned_overtones)
         s_data = s_calculator.get_formatted_data()
         prog_reporter.report("Dynamical structure factors have been determined.")
 
@@ -587,17 +589,16 @@ class Abins(PythonAlgorithm):
         Checks number of threads
         :param message_end: closing part of the error message.
         """
-        if PATHOS_FOUND:
-            atoms_threads = AbinsModules.AbinsParameters.atoms_threads
-            if not (isinstance(atoms_threads, six.integer_types) and 1 <= atoms_threads <= mp.cpu_count()):
-                raise RuntimeError("Invalid number of threads for parallelisation over atoms" + message_end)
+        atoms_threads = AbinsModules.AbinsParameters.atoms_threads
+        if not (isinstance(atoms_threads, six.integer_types) and atoms_threads >= 1):
+            raise RuntimeError("Invalid number of threads for parallelisation over atoms" + message_end)
 
-            q_threads = AbinsModules.AbinsParameters.q_threads
-            if not (isinstance(q_threads, six.integer_types) and 1 <= q_threads <= mp.cpu_count()):
-                raise RuntimeError("Invalid number of threads for parallelisation over q" + message_end)
+        q_threads = AbinsModules.AbinsParameters.q_threads
+        if not (isinstance(q_threads, six.integer_types) and q_threads >= 1):
+            raise RuntimeError("Invalid number of threads for parallelisation over q" + message_end)
 
-            if atoms_threads * q_threads > mp.cpu_count():
-                raise RuntimeError("User asked for more threads than available.")
+        if atoms_threads * q_threads > mp.cpu_count():
+            logger.information("User asked for more threads than available, %s processes are used." % mp.cpu_count())
 
     def _validate_crystal_input_file(self, filename_full_path=None):
         """
@@ -720,6 +721,7 @@ class Abins(PythonAlgorithm):
 
         # conversion from str to int
         self._num_quantum_order_events = int(self.getProperty("QuantumOrderEventsNumber").value)
+        self._binned_overtones = self.getProperty("BinnedOvertones").value
 
         self._scale_by_cross_section = self.getPropertyValue('ScaleByCrossSection')
         self._out_ws_name = self.getPropertyValue('OutputWorkspace')
@@ -1,12 +1,15 @@
 from __future__ import (absolute_import, division, print_function)
 
-from mantid.api import mtd, AlgorithmFactory, DataProcessorAlgorithm, ITableWorkspaceProperty, \
-    MatrixWorkspaceProperty, MultipleFileProperty, PropertyMode
-from mantid.kernel import ConfigService, Direction
+from mantid.api import mtd, AlgorithmFactory, DataProcessorAlgorithm, ITableWorkspaceProperty, IWorkspaceProperty, \
+    MatrixWorkspaceProperty, MultipleFileProperty, Progress, PropertyMode
+from mantid.kernel import ConfigService, Direction, IntBoundedValidator, MemoryStats, workerpool
+from mantid.kernel.datacache import DataCacheIndex
 from mantid.simpleapi import AlignAndFocusPowder, CompressEvents, ConvertUnits, CreateCacheFilename, \
     DeleteWorkspace, DetermineChunking, Divide, EditInstrumentGeometry, FilterBadPulses, Load, \
     LoadNexusProcessed, PDDetermineCharacterizations, Plus, RenameWorkspace, SaveNexusProcessed
 import os
+import shutil
+import tempfile
 
 EXTENSIONS_NXS = ["_event.nxs", ".nxs.h5"]
 PROPS_FOR_INSTR = ["PrimaryFlightPath", "SpectrumIDs", "L2", "Polar", "Azimuthal"]
@@ -24,6 +27,11 @@ PROPS_FOR_ALIGN = [CAL_FILE, GROUP_FILE,
 PROPS_FOR_ALIGN.extend(PROPS_FOR_INSTR)
 PROPS_FOR_PD_CHARACTER = ['FrequencyLogNames', 'WaveLengthLogNames']
 
+# properties which are not passed on to the worker processes
+PROPS_NOT_FOR_WORKER = ["Filename", "OutputWorkspace", "NumberOfProcesses"]
+# workspaces which do not keep their type in a NeXus file and cannot be passed to the workers
+WKSP_NOT_FOR_WORKER = [GRP_WKSP, "OffsetsWorkspace", MASK_WKSP]
+
 
 def determineChunking(filename, chunkSize):
     chunks = DetermineChunking(Filename=filename, MaxChunkSize=chunkSize, OutputWorkspace='chunks')
@@ -43,6 +51,23 @@ def determineChunking(filename, chunkSize):
     return strategy
 
 
+def processFileInWorker(task):
+    """
+    Processes a single file in a worker process. The algorithm is set up with the
+    properties of the calling algorithm and its input workspaces are loaded from the
+    files which the caller saved.
+    """
+    properties, inputfiles, filename, wkspname, outputfile, signature = task
+    for (name, inputfile) in inputfiles.items():
+        if not mtd.doesExist(name):
+            LoadNexusProcessed(Filename=inputfile, OutputWorkspace=name)
+    alg = AlignAndFocusPowderFromFiles()
+    alg.initialize()
+    for (name, value) in properties.items():
+        alg.setPropertyValue(name, value)
+    return alg._processFileInWorker(filename, wkspname, outputfile, signature)
+
+
 class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
     def category(self):
         return "Diffraction\\Reduction"
@@ -71,6 +96,9 @@ class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
                              doc='Divide data by this Pixel-by-pixel workspace')
 
         self.copyProperties('CreateCacheFilename', 'CacheDir')
+        self.declareProperty('NumberOfProcesses', 1, validator=IntBoundedValidator(lower=1),
+                             doc='Number of worker processes which process files at the same time. It is reduced '
+                                 'to the number of chunks of MaxChunkSize which fit into the available memory.')
 
         self.declareProperty(MatrixWorkspaceProperty('OutputWorkspace', '',
                                                      Direction.Output),
@@ -115,7 +143,7 @@ class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
         # delete the files from the list of kwargs
         if CAL_FILE in self.kwargs:
             del self.kwargs[CAL_FILE]
-        if CAL_FILE in self.kwargs:
+        if GROUP_FILE in self.kwargs:
             del self.kwargs[GROUP_FILE]
 
         # get the instrument name
@@ -146,7 +174,7 @@ class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
         PDDetermineCharacterizations(**args)
         DeleteWorkspace(Workspace=tempname)
 
-    def __getCacheName(self, wkspname):
+    def __getCacheName(self, wkspname, filename):
         cachedir = self.getProperty('CacheDir').value
         if len(cachedir) <= 0:
             self.log().warning('CacheDir is not specified - functionality disabled')
@@ -160,11 +188,27 @@ class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
                 # TODO need unique identifier for absorption workspace
                 alignandfocusargs.append('%s=%s' % (name, prop.valueAsStr))
 
-        return CreateCacheFilename(Prefix=wkspname,
-                                   PropertyManager=self.getProperty('ReductionProperties').valueAsStr,
-                                   Properties=propman_properties,
-                                   OtherProperties=alignandfocusargs,
-                                   CacheDir=cachedir).OutputFilename
+        # an outdated cache file is removed if the data file has changed
+        cachefile, signature = CreateCacheFilename(Prefix=wkspname,
+                                                   PropertyManager=self.getProperty('ReductionProperties').valueAsStr,
+                                                   Properties=propman_properties,
+                                                   OtherProperties=alignandfocusargs,
+                                                   SourceFiles=[filename],
+                                                   CacheDir=cachedir)
+        self.cacheSignatures[cachefile] = (signature, filename)
+        return cachefile
+
+    def __saveCacheFile(self, wkspname, cachefile):
+        cachedir = os.path.dirname(cachefile)
+        if not os.path.isdir(cachedir):
+            SaveNexusProcessed(InputWorkspace=wkspname, Filename=cachefile)
+            return
+        # other processes only see the cache file once it is complete
+        index = DataCacheIndex(cachedir)
+        tempname = index.temporary_filename(cachefile)
+        SaveNexusProcessed(InputWorkspace=wkspname, Filename=tempname)
+        signature, filename = self.cacheSignatures[cachefile]
+        index.commit(tempname, cachefile, signature=signature, sources=[filename])
 
     def __processFile(self, filename, wkspname, file_prog_start):
         chunks = determineChunking(filename, self.chunkSize)
@@ -212,60 +256,213 @@ class AlignAndFocusPowderFromFiles(DataProcessorAlgorithm):
                     CompressEvents(InputWorkspace=wkspname, OutputWorkspace=wkspname)
         # end of inner loop
 
-    def PyExec(self):
-        filenames = self._getLinearizedFilenames('Filename')
-        self.filterBadPulses = self.getProperty('FilterBadPulses').value
-        self.chunkSize = self.getProperty('MaxChunkSize').value
-        self.absorption = self.getProperty('AbsorptionWorkspace').value
-        self.charac = self.getProperty('Characterizations').value
-        finalname = self.getProperty('OutputWorkspace').valueAsStr
-
-        self.prog_per_file = 1./float(len(filenames)) # for better progress reporting
-
-        # these are also passed into the child-algorithms
-        self.kwargs = self.__getAlignAndFocusArgs()
-
+    def __loadCacheFile(self, cachefile, wkspname):
+        LoadNexusProcessed(Filename=cachefile, OutputWorkspace=wkspname)
+        # TODO LoadNexusProcessed has a bug. When it finds the
+        # instrument name without xml it reads in from an IDF
+        # in the instrument directory.
+        editinstrargs = {}
+        for name in PROPS_FOR_INSTR:
+            prop = self.getProperty(name)
+            if not prop.isDefault:
+                editinstrargs[name] = prop.value
+        if editinstrargs:
+            EditInstrumentGeometry(Workspace=wkspname, **editinstrargs)
+
+    def __getNumberOfProcesses(self, filenames):
+        numProcesses = min(self.getProperty('NumberOfProcesses').value, len(filenames))
+        if numProcesses <= 1:
+            return 1
+        if not workerpool.can_create_pool():
+            self.log().warning('Worker processes cannot be started from this process - processing files in turn')
+            return 1
+        for name in WKSP_NOT_FOR_WORKER:
+            if not self.getProperty(name).isDefault:
+                self.log().warning('%s cannot be passed to worker processes - processing files in turn' % name)
+                return 1
+
+        # every worker holds a chunk of at most MaxChunkSize in memory and
+        # the accumulation of the files in this process takes one more
+        if self.chunkSize > 0.:
+            chunkBytes = self.chunkSize * 1024. * 1024. * 1024.
+        else:
+            chunkBytes = max([os.path.getsize(filename) for filename in filenames] + [1])
+        availBytes = MemoryStats().availMem() * 1024.
+        maxProcesses = max(1, int(availBytes / chunkBytes) - 1)
+        if maxProcesses < numProcesses:
+            self.log().notice('Reducing the number of processes from %d to %d to fit the chunks into memory'
+                              % (numProcesses, maxProcesses))
+            numProcesses = maxProcesses
+        return numProcesses
+
+    def __plus(self, lhsname, rhsname):
+        Plus(LHSWorkspace=lhsname, RHSWorkspace=rhsname, OutputWorkspace=lhsname,
+             ClearRHSWorkspace=self.kwargs['PreserveEvents'])
+        DeleteWorkspace(Workspace=rhsname)
+        if self.kwargs['PreserveEvents']:
+            CompressEvents(InputWorkspace=lhsname, OutputWorkspace=lhsname)
+
+    def __accumulate(self, partialsums, wkspname):
+        """
+        Adds a workspace to the binary tree of partial sums, such that
+        the workspaces which are added together are of similar size.
+        :param partialsums: list of (workspace name, number of levels summed) in file order
+        :param wkspname: name of the workspace of the next file
+        """
+        level = 0
+        while partialsums and partialsums[-1][1] == level:
+            lhsname = partialsums.pop()[0]
+            self.__plus(lhsname, wkspname)
+            wkspname = lhsname
+            level += 1
+        partialsums.append((wkspname, level))
+
+    def __finishAccumulation(self, partialsums, finalname):
+        while len(partialsums) > 1:
+            rhsname = partialsums.pop()[0]
+            self.__plus(partialsums[-1][0], rhsname)
+        wkspname = partialsums[0][0]
+        if wkspname != finalname:
+            RenameWorkspace(InputWorkspace=wkspname, OutputWorkspace=finalname)
+
+    def _processFileInWorker(self, filename, wkspname, outputfile, signature):
+        self.__setUp(1)
+        self.__determineCharacterizations(filename, wkspname)
+        self.__processFile(filename, wkspname, 0.)
+        if signature is not None:
+            self.cacheSignatures[outputfile] = (signature, filename)
+            self.__saveCacheFile(wkspname, outputfile)
+        else:
+            SaveNexusProcessed(InputWorkspace=wkspname, Filename=outputfile)
+        DeleteWorkspace(Workspace=wkspname)
+        return outputfile
+
+    def __getWorkerInput(self, scratchdir):
+        """
+        Returns the property values, which are not default, for the algorithm in the worker
+        processes and the files to which the input workspaces are saved for them.
+        """
+        properties = {}
+        inputfiles = {}
+        for prop in self.getProperties():
+            if prop.isDefault or prop.name in PROPS_NOT_FOR_WORKER:
+                continue
+            value = prop.valueAsStr
+            if isinstance(prop, IWorkspaceProperty) and prop.direction == Direction.Input:
+                # the workspace need not be in the ADS of this process
+                value = '__%s_%s' % (self.name(), prop.name)
+                inputfiles[value] = os.path.join(scratchdir, prop.name + '.nxs')
+                SaveNexusProcessed(InputWorkspace=prop.value, Filename=inputfiles[value])
+            properties[prop.name] = value
+        return properties, inputfiles
+
+    def __processFilesInTurn(self, filenames, finalname):
         # outer loop creates chunks to load
         for (i, filename) in enumerate(filenames):
             # default name is based off of filename
             wkspname = os.path.split(filename)[-1].split('.')[0]
             self.__determineCharacterizations(filename,
                                               wkspname) # updates instance variable
-            cachefile = self.__getCacheName(wkspname)
+            cachefile = self.__getCacheName(wkspname, filename)
             wkspname += '_f%d' % i # add file number to be unique
 
             if cachefile is not None and os.path.exists(cachefile):
-                LoadNexusProcessed(Filename=cachefile, OutputWorkspace=wkspname)
-                # TODO LoadNexusProcessed has a bug. When it finds the
-                # instrument name without xml it reads in from an IDF
-                # in the instrument directory.
-                editinstrargs = {}
-                for name in PROPS_FOR_INSTR:
-                    prop = self.getProperty(name)
-                    if not prop.isDefault:
-                        editinstrargs[name] = prop.value
-                if editinstrargs:
-                    EditInstrumentGeometry(Workspace=wkspname, **editinstrargs)
+                self.__loadCacheFile(cachefile, wkspname)
             else:
                 self.__processFile(filename, wkspname, self.prog_per_file*float(i))
                 if cachefile is not None:
-                    SaveNexusProcessed(InputWorkspace=wkspname, Filename=cachefile)
+                    self.__saveCacheFile(wkspname, cachefile)
 
             # accumulate runs
             if i == 0:
                 if wkspname != finalname:
                     RenameWorkspace(InputWorkspace=wkspname, OutputWorkspace=finalname)
             else:
-                Plus(LHSWorkspace=finalname, RHSWorkspace=wkspname, OutputWorkspace=finalname,
-                     ClearRHSWorkspace=self.kwargs['PreserveEvents'])
-                DeleteWorkspace(Workspace=wkspname)
-                if self.kwargs['PreserveEvents']:
-                    CompressEvents(InputWorkspace=finalname, OutputWorkspace=finalname)
+                self.__plus(finalname, wkspname)
+
+    def __processFilesInParallel(self, filenames, finalname, numProcesses):
+        scratchdir = tempfile.mkdtemp(prefix='AlignAndFocusPowderFromFiles_')
+        # the files which are processed by the workers, which either go
+        # into their cache file or into a scratch file
+        tasks = []
+        # (workspace name, file to load, whether a worker writes the file)
+        loads = []
+        try:
+            properties, inputfiles = self.__getWorkerInput(scratchdir)
+            for (i, filename) in enumerate(filenames):
+                wkspname = os.path.split(filename)[-1].split('.')[0]
+                self.__determineCharacterizations(filename, wkspname)
+                cachefile = self.__getCacheName(wkspname, filename)
+                wkspname += '_f%d' % i
+
+                if cachefile is not None and (os.path.exists(cachefile) or
+                                              cachefile in [task[4] for task in tasks]):
+                    loads.append((wkspname, cachefile, False))
+                else:
+                    if cachefile is None:
+                        outputfile = os.path.join(scratchdir, wkspname + '.nxs')
+                        signature = None
+                    else:
+                        outputfile = cachefile
+                        signature = self.cacheSignatures[cachefile][0]
+                    tasks.append((properties, inputfiles, filename, wkspname, outputfile, signature))
+                    loads.append((wkspname, outputfile, True))
+
+            pool = None
+            if tasks:
+                pool = workerpool.create_pool(min(numProcesses, len(tasks)))
+                results = pool.imap(processFileInWorker, tasks)
+            try:
+                # the files are added up in order while the workers carry on
+                prog = Progress(self, start=0., end=1., nreports=len(loads))
+                partialsums = []
+                for (wkspname, loadfile, fromworker) in loads:
+                    if fromworker:
+                        next(results)
+                    self.__loadCacheFile(loadfile, wkspname)
+                    self.__accumulate(partialsums, wkspname)
+                    prog.report('Added %s' % wkspname)
+                self.__finishAccumulation(partialsums, finalname)
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+        finally:
+            shutil.rmtree(scratchdir, ignore_errors=True)
+
+    def __setUp(self, numFiles):
+        self.filterBadPulses = self.getProperty('FilterBadPulses').value
+        self.chunkSize = self.getProperty('MaxChunkSize').value
+        self.absorption = self.getProperty('AbsorptionWorkspace').value
+        self.charac = self.getProperty('Characterizations').value
+
+        self.prog_per_file = 1./float(numFiles) # for better progress reporting
+
+        # these are also passed into the child-algorithms
+        self.kwargs = self.__getAlignAndFocusArgs()
+        self.cacheSignatures = {}
+
+    def PyExec(self):
+        filenames = self._getLinearizedFilenames('Filename')
+        finalname = self.getProperty('OutputWorkspace').valueAsStr
+        self.__setUp(len(filenames))
+
+        numProcesses = self.__getNumberOfProcesses(filenames)
+        if numProcesses > 1:
+            self.__processFilesInParallel(filenames, finalname, numProcesses)
+        else:
+            self.__processFilesInTurn(filenames, finalname)
 
         # with more than one chunk or file the integrated proton charge is
         # generically wrong
         mtd[finalname].run().integrateProtonCharge()
 
+        cachedir = self.getProperty('CacheDir').value
+        if len(cachedir) > 0 and os.path.isdir(cachedir):
+            stats = DataCacheIndex(cachedir).statistics()
+            self.log().information('Cache %s: %d files, %.3f GB, %d hits, %d misses' % (
+                cachedir, stats['entries'], stats['size'] / 1024.**3, stats['hits'], stats['misses']))
+
         # set the output workspace
         self.setProperty('OutputWorkspace', mtd[finalname])
 
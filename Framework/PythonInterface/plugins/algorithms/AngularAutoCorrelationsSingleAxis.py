@@ -8,6 +8,7 @@ from scipy.io import netcdf
 import numpy as np
 import re
 import time
+import trajectoryhelper
 
 
 class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
@@ -28,6 +29,9 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
         self.declareProperty("SpeciesOne",'',direction=Direction.Input,doc="Specify the first species, e.g. H, He, Li...")
         self.declareProperty("SpeciesTwo",'',direction=Direction.Input,doc="Specify the second species, e.g. H, He, Li...")
 
+        self.declareProperty("ChunkSize",100,validator=IntBoundedValidator(lower=1),direction=Direction.Input,
+                             doc="Number of molecules read from the trajectory and correlated at a time")
+
         self.declareProperty(WorkspaceProperty('OutputWorkspace','',direction=Direction.Output),doc="Output workspace name")
         self.declareProperty(WorkspaceProperty('OutputWorkspaceFT','',direction=Direction.Output),
                              doc="Fourier Transform output workspace name")
@@ -117,106 +121,46 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
         configuration=trajectory.variables["configuration"]
 
         # Extract useful simulation parameters
-        # Number of species present in the simulation
-        # n_species=len(elements)
-        # Number of particles present in the simulation
-        n_particles=len(p_atoms)
         # Number of molecules present in the simulation
         n_molecules=len(molecules)
         # Number of timesteps in the simulation
         n_timesteps=int(configuration.shape[0])
-        # Number of spatial dimensions
-        n_dimensions=int(configuration.shape[2])
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
 
         # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
         box_size=trajectory.variables["box_size"]
 
         # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
         # Shape: (# of timesteps) x (3-vectors) x (# of spatial dimensions)
-        box_size_tensors=10.0*np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Extract box dimensions (assuming orthorhombic simulation cell, diagonal matrix)
-        box_size_x=np.array([box_size_tensors[i,0,0] for i in range(n_timesteps)])
-        box_size_y=np.array([box_size_tensors[i,1,1] for i in range(n_timesteps)])
-        box_size_z=np.array([box_size_tensors[i,2,2] for i in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)
-
-        # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step.
-        cartesian_configuration=np.array([[np.dot(box_size_tensors[j],np.transpose(configuration_copy[i,j]))
-                                           for j in range(n_timesteps)] for i in range(n_particles)])
+        box_size_tensors=trajectoryhelper.box_tensors(box_size,scale=10.0)
 
         logger.information(str(time.time()-start_time) + " s")
 
-        logger.information("Calculating orientation vectors...")
+        logger.information("Calculating orientation vectors and angular auto-correlations...")
         start_time=time.time()
 
-        # Initialise orientation vector array. Shape: (# of molecules) x (# of timesteps) x (# of dimensions)
-        orientation_vectors=np.zeros((n_molecules,n_timesteps,n_dimensions))
-
-        for i in range(n_molecules):
-            # Retrieve constituents of the ith molecule
-            temp=molecules_to_atoms[i]
-            # Find which constituents belong to species one and which belong to species two
-            species_one=[]
-            species_two=[]
-            for j in temp:
-                if atoms_to_species[j]==type1.lower():
-                    species_one.append(j)
-                if atoms_to_species[j]==type2.lower():
-                    species_two.append(j)
-            # Find the average positions and the orientation vector
-            sum_position_species_one=np.zeros((n_timesteps,n_dimensions))
-            sum_position_species_two=np.zeros((n_timesteps,n_dimensions))
-
-            for k in species_one:
-                sum_position_species_one+=cartesian_configuration[k]
-            for l in species_two:
-                sum_position_species_two+=cartesian_configuration[l]
-            avg_position_species_one=1.0*sum_position_species_one/len(species_one)
-            avg_position_species_two=1.0*sum_position_species_two/len(species_two)
-
-            # Find the vectors connecting the two atoms
-            vectors=avg_position_species_two-avg_position_species_one
-
-            # Scaled coordinates
-            diffX=np.divide(vectors[:,0],box_size_x)
-            diffY=np.divide(vectors[:,1],box_size_y)
-            diffZ=np.divide(vectors[:,2],box_size_z)
-
-            # Wrapping the vectors
-            vectorX=np.array([(diffX[k]-round(diffX[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY=np.array([(diffY[k]-round(diffY[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ=np.array([(diffZ[k]-round(diffZ[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            # Normalisation
-            norm=np.sqrt(vectorX*vectorX+vectorY*vectorY+vectorZ*vectorZ)
-            vectorX=np.divide(vectorX,norm)
-            vectorY=np.divide(vectorY,norm)
-            vectorZ=np.divide(vectorZ,norm)
-
-            # Store calculations in the orientation_vectors array
-            orientation_vectors[i]=np.swapaxes(np.array([vectorX,vectorY,vectorZ]),0,1)
+        # Molecules are read from the trajectory in chunks so that only the orientation vectors
+        # of one chunk are held in memory. Their power spectra are summed over all the molecules.
+        nfft=trajectoryhelper.fft_length(n_timesteps)
+        spectrum=np.zeros(nfft//2+1)
+        chunk_size=self.getProperty("ChunkSize").value
+        for start in range(0,n_molecules,chunk_size):
+            chunk=range(start,min(start+chunk_size,n_molecules))
+            # Find which constituents of each molecule belong to species one and which belong to species two
+            species_one=[[j for j in molecules_to_atoms[i] if atoms_to_species[j]==type1.lower()] for i in chunk]
+            species_two=[[j for j in molecules_to_atoms[i] if atoms_to_species[j]==type2.lower()] for i in chunk]
 
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating angular auto-correlations...")
-        start_time=time.time()
+            # Find the average positions and the orientation vector
+            avg_position_species_one=trajectoryhelper.average_positions(configuration,box_size_tensors,species_one)
+            avg_position_species_two=trajectoryhelper.average_positions(configuration,box_size_tensors,species_two)
 
-        R_avg=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg+=self.auto_correlation(orientation_vectors[i])
+            # Wrap the vectors connecting the two species into the box and normalise them
+            orientation_vectors=trajectoryhelper.minimum_image_vectors(avg_position_species_two-avg_position_species_one,
+                                                                       box_size_tensors)
+            orientation_vectors=trajectoryhelper.normalise(orientation_vectors)
+            spectrum+=trajectoryhelper.power_spectrum(orientation_vectors,nfft)
 
-        R_avg=1.0*R_avg/n_molecules
+        norm=trajectoryhelper.correlation_norm(n_timesteps,symmetric=True)
+        R_avg=trajectoryhelper.correlation(spectrum,n_timesteps,nfft,norm)/n_molecules
 
         logger.information(str(time.time()-start_time)+" s")
 
@@ -226,7 +170,7 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
         xvals=np.arange(0,np.ceil((n_timesteps)/2.0))*step/1000.0
         yvals=np.empty(0)
         # Store folded angular auto-correlation function
-        yvals=np.append(yvals,self.fold_correlation(R_avg))
+        yvals=np.append(yvals,trajectoryhelper.fold_correlation(R_avg))
         evals=np.zeros(np.shape(yvals))
 
         output_name=self.getPropertyValue("OutputWorkspace")
@@ -247,28 +191,6 @@ class AngularAutoCorrelationsSingleAxis(PythonAlgorithm):
                                      DataY=yvals,DataE=evals,NSpec=nrows,VerticalAxisUnit="Text",VerticalAxisValues=["FT Axis 1"])
         self.setProperty("OutputWorkspaceFT",FT_output_ws)
 
-    def auto_correlation(self, vector):
-        # Returns angular auto-correlation of a normalised time-dependent 3-vector
-        num=np.shape(vector)[0]
-        norm=np.arange(np.ceil(num/2.0),num+1)
-        norm=np.append(norm,(np.arange(int(num/2)+1,num)[::-1]))
-
-        # x dimension
-        autoCorr=np.divide(np.correlate(vector[:,0],vector[:,0],"same"),norm)
-        # y dimension
-        autoCorr+=np.divide(np.correlate(vector[:,1],vector[:,1],"same"),norm)
-        # z dimension
-        autoCorr+=np.divide(np.correlate(vector[:,2],vector[:,2],"same"),norm)
-
-        return autoCorr
-
-    def fold_correlation(self,omega):
-        # Folds an array with symmetrical values into half by averaging values around the centre
-        right_half=omega[int(len(omega)/2):]
-        left_half=omega[:int(np.ceil(len(omega)/2.0))][::-1]
-
-        return (left_half+right_half)/2.0
-
 
 # Subscribe algorithm to Mantid software
 AlgorithmFactory.subscribe(AngularAutoCorrelationsSingleAxis)
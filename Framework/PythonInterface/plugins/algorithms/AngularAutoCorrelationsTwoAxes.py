@@ -8,6 +8,7 @@ from scipy.io import netcdf
 import numpy as np
 import re
 import time
+import trajectoryhelper
 
 
 class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
@@ -31,6 +32,9 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
         self.declareProperty("SpeciesTwo",'',direction=Direction.Input,doc="Specify the second species, e.g. H, He, Li...")
         self.declareProperty("SpeciesThree",'',direction=Direction.Input,doc="Specify the third species, e.g. H, He, Li...")
 
+        self.declareProperty("ChunkSize",100,validator=IntBoundedValidator(lower=1),direction=Direction.Input,
+                             doc="Number of molecules read from the trajectory and correlated at a time")
+
         self.declareProperty(WorkspaceProperty('OutputWorkspace','',direction=Direction.Output),doc="Output workspace name")
         self.declareProperty(WorkspaceProperty('OutputWorkspaceFT','FT',direction=Direction.Output),doc="FT Output workspace name")
 
@@ -119,149 +123,47 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
         configuration=trajectory.variables["configuration"]
 
         # Extract useful simulation parameters
-        # Number of species present in the simulation
-        # n_species=len(elements)
-        # Number of particles present in the simulation
-        n_particles=len(p_atoms)
         # Number of molecules present in the simulation
         n_molecules=len(molecules)
         # Number of timesteps in the simulation
         n_timesteps=int(configuration.shape[0])
-        # Number of spatial dimensions
-        n_dimensions=int(configuration.shape[2])
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
 
         # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
         box_size=trajectory.variables["box_size"]
 
         # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
         # Shape: (# of timesteps) x (3-vectors) x (# of spatial dimensions)
-        box_size_tensors=10.0*np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Extract box dimensions (assuming orthorhombic simulation cell, diagonal matrix)
-        box_size_x=np.array([box_size_tensors[i,0,0] for i in range(n_timesteps)])
-        box_size_y=np.array([box_size_tensors[i,1,1] for i in range(n_timesteps)])
-        box_size_z=np.array([box_size_tensors[i,2,2] for i in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)
-
-        # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step.
-        cartesian_configuration=np.array([[np.dot(box_size_tensors[j],np.transpose(configuration_copy[i,j]))
-                                           for j in range(n_timesteps)] for i in range(n_particles)])
+        box_size_tensors=trajectoryhelper.box_tensors(box_size,scale=10.0)
 
         logger.information(str(time.time()-start_time) + " s")
 
-        logger.information("Calculating orientation vectors...")
+        logger.information("Calculating orientation vectors and angular auto-correlations...")
         start_time=time.time()
 
-        # Initialise orientation vector array. Shape: (# of molecules) x (# of timesteps) x (# of dimensions)
-        orientation_vectors1=np.zeros((n_molecules,n_timesteps,n_dimensions))
-        orientation_vectors2=np.zeros((n_molecules,n_timesteps,n_dimensions))
-
-        for i in range(n_molecules):
-            # Retrieve constituents of the ith molecule
-            temp=molecules_to_atoms[i]
-            # Find which constituents belong to species one, species two and species three
-            species_one=[]
-            species_two=[]
-            species_three=[]
-            for j in temp:
-                if atoms_to_species[j]==types[0]:
-                    species_one.append(j)
-                if atoms_to_species[j]==types[1]:
-                    species_two.append(j)
-                if atoms_to_species[j]==types[2]:
-                    species_three.append(j)
-            # Find the average positions of species one and two
-            sum_position_species_one=np.zeros((n_timesteps,n_dimensions))
-            sum_position_species_two=np.zeros((n_timesteps,n_dimensions))
-            for k in species_one:
-                sum_position_species_one+=cartesian_configuration[k]
-            for l in species_two:
-                sum_position_species_two+=cartesian_configuration[l]
-            avg_position_species_one=1.0*sum_position_species_one/float(len(species_one))
-            avg_position_species_two=1.0*sum_position_species_two/float(len(species_two))
+        # Molecules are read from the trajectory in chunks so that only the orientation vectors
+        # of one chunk are held in memory. Their power spectra are summed over all the molecules.
+        nfft=trajectoryhelper.fft_length(n_timesteps)
+        spectrum_axis1=np.zeros(nfft//2+1)
+        spectrum_axis2=np.zeros(nfft//2+1)
+        chunk_size=self.getProperty("ChunkSize").value
+        for start in range(0,n_molecules,chunk_size):
+            chunk=range(start,min(start+chunk_size,n_molecules))
+            # Find which constituents of each molecule belong to species one, species two and species three
+            species=[[[j for j in molecules_to_atoms[i] if atoms_to_species[j]==atom_type] for i in chunk]
+                     for atom_type in types]
             # Choose the 1st element of species_three to build the 2nd vector
-            position_species_three=1.0*cartesian_configuration[species_three[0]]
-
-            # Find the vectors connecting average positions of species one and species two
-            vectors1=avg_position_species_two-avg_position_species_one
-
-            # Find the vector to the third atom
-            vectors2=position_species_three-avg_position_species_two
-
-            diffX1=np.divide(vectors1[:,0],box_size_x)
-            diffY1=np.divide(vectors1[:,1],box_size_y)
-            diffZ1=np.divide(vectors1[:,2],box_size_z)
-
-            diffX2=np.divide(vectors2[:,0],box_size_x)
-            diffY2=np.divide(vectors2[:,1],box_size_y)
-            diffZ2=np.divide(vectors2[:,2],box_size_z)
-
-            # Wrapping the vectors
-            vectorX1=np.array([(diffX1[k]-round(diffX1[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY1=np.array([(diffY1[k]-round(diffY1[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ1=np.array([(diffZ1[k]-round(diffZ1[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            vectorX2=np.array([(diffX2[k]-round(diffX2[k]))*box_size_x[k] for k in range(n_timesteps)])
-            vectorY2=np.array([(diffY2[k]-round(diffY2[k]))*box_size_y[k] for k in range(n_timesteps)])
-            vectorZ2=np.array([(diffZ2[k]-round(diffZ2[k]))*box_size_z[k] for k in range(n_timesteps)])
-
-            # Normalisation
-            norm1=np.sqrt(vectorX1*vectorX1+vectorY1*vectorY1+vectorZ1*vectorZ1)
-            vectorX1=np.divide(vectorX1,norm1)
-            vectorY1=np.divide(vectorY1,norm1)
-            vectorZ1=np.divide(vectorZ1,norm1)
+            species_three=[atoms[:1] for atoms in species[2]]
+            if not all(species_three):
+                raise RuntimeError('Species three not found in every molecule. Please try again...')
 
-            norm2=np.sqrt(vectorX2*vectorX2+vectorY2*vectorY2+vectorZ2*vectorZ2)
-            vectorX2=np.divide(vectorX2,norm2)
-            vectorY2=np.divide(vectorY2,norm2)
-            vectorZ2=np.divide(vectorZ2,norm2)
+            orientation_vectors1,orientation_vectors2=self._orientation_vectors(configuration,box_size_tensors,
+                                                                                species[0],species[1],species_three)
+            spectrum_axis1+=trajectoryhelper.power_spectrum(orientation_vectors1,nfft)
+            spectrum_axis2+=trajectoryhelper.power_spectrum(orientation_vectors2,nfft)
 
-            # Dot product
-            cosine=np.multiply(vectorX1,vectorX2)+np.multiply(vectorY1,vectorY2)+np.multiply(vectorZ1,vectorZ2)
-
-            # Gram-Schmidt orthogonalisation process
-            vectorX2=vectorX2-np.divide(vectorX1,cosine)
-            vectorY2=vectorY2-np.divide(vectorY1,cosine)
-            vectorZ2=vectorZ2-np.divide(vectorZ1,cosine)
-
-            # Renormalisation of the 2nd vector
-            norm2=np.sqrt(vectorX2*vectorX2+vectorY2*vectorY2+vectorZ2*vectorZ2)
-            vectorX2=np.divide(vectorX2,norm2)
-            vectorY2=np.divide(vectorY2,norm2)
-            vectorZ2=np.divide(vectorZ2,norm2)
-
-            # Store calculations in the orientation_vectors1 and orientation_vectors2 arrays
-            orientation_vectors1[i]=np.swapaxes(np.array([vectorX1,vectorY1,vectorZ1]),0,1)
-            orientation_vectors2[i]=np.swapaxes(np.array([vectorX2,vectorY2,vectorZ2]),0,1)
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating angular auto-correlations...")
-        start_time=time.time()
-
-        # First axis
-        R_avg_axis1=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg_axis1+=self.auto_correlation(orientation_vectors1[i])
-
-        R_avg_axis1=1.0*R_avg_axis1/n_molecules
-
-        # Second axis
-        R_avg_axis2=np.zeros(n_timesteps)
-        for i in range(n_molecules):
-            R_avg_axis2+=self.auto_correlation(orientation_vectors2[i])
-
-        R_avg_axis2=1.0*R_avg_axis2/n_molecules
+        norm=trajectoryhelper.correlation_norm(n_timesteps,symmetric=True)
+        R_avg_axis1=trajectoryhelper.correlation(spectrum_axis1,n_timesteps,nfft,norm)/n_molecules
+        R_avg_axis2=trajectoryhelper.correlation(spectrum_axis2,n_timesteps,nfft,norm)/n_molecules
 
         logger.information(str(time.time()-start_time)+" s")
 
@@ -270,8 +172,8 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
         step=float(self.getPropertyValue("Timestep"))
         xvals=np.arange(0,np.ceil((n_timesteps)/2.0))*step/1000.0
         yvals=np.empty(0)
-        yvals=np.append(yvals,self.fold_correlation(R_avg_axis1))
-        yvals=np.append(yvals,self.fold_correlation(R_avg_axis2))
+        yvals=np.append(yvals,trajectoryhelper.fold_correlation(R_avg_axis1))
+        yvals=np.append(yvals,trajectoryhelper.fold_correlation(R_avg_axis2))
         evals=np.zeros(np.shape(yvals))
 
         output_name=self.getPropertyValue("OutputWorkspace")
@@ -293,27 +195,29 @@ class AngularAutoCorrelationsTwoAxes(PythonAlgorithm):
                                      DataE=evals,NSpec=nrows,VerticalAxisUnit="Text",VerticalAxisValues=["FT Axis 1","FT Axis 2"])
         self.setProperty("OutputWorkspaceFT",FT_output_ws)
 
-    def auto_correlation(self, vector):
-        # Returns angular auto-correlation of a normalised time-dependent 3-vector
-        num=np.shape(vector)[0]
-        norm=np.arange(np.ceil(num/2.0),num+1)
-        norm=np.append(norm,(np.arange(int(num/2)+1,num)[::-1]))
-
-        # x dimension
-        autoCorr=np.divide(np.correlate(vector[:,0],vector[:,0],"same"),norm)
-        # y dimension
-        autoCorr+=np.divide(np.correlate(vector[:,1],vector[:,1],"same"),norm)
-        # z dimension
-        autoCorr+=np.divide(np.correlate(vector[:,2],vector[:,2],"same"),norm)
-
-        return autoCorr
-
-    def fold_correlation(self,omega):
-        # Folds an array with symmetrical values into half by averaging values around the centre
-        right_half=omega[int(len(omega))//2:]
-        left_half=omega[:int(np.ceil(len(omega)/2.0))][::-1]
-
-        return (left_half+right_half)/2.0
+    def _orientation_vectors(self,configuration,box_size_tensors,species_one,species_two,species_three):
+        # Returns the two orthonormal axes of each molecule at each timestep.
+        # Shape: (# of timesteps) x (# of molecules) x (# of dimensions)
+        avg_position_species_one=trajectoryhelper.average_positions(configuration,box_size_tensors,species_one)
+        avg_position_species_two=trajectoryhelper.average_positions(configuration,box_size_tensors,species_two)
+        position_species_three=trajectoryhelper.average_positions(configuration,box_size_tensors,species_three)
+
+        # Find the vectors connecting average positions of species one and species two, and the vector to the
+        # third atom, wrap them into the box and normalise them
+        vectors1=trajectoryhelper.minimum_image_vectors(avg_position_species_two-avg_position_species_one,
+                                                        box_size_tensors)
+        vectors1=trajectoryhelper.normalise(vectors1)
+        vectors2=trajectoryhelper.minimum_image_vectors(position_species_three-avg_position_species_two,
+                                                        box_size_tensors)
+        vectors2=trajectoryhelper.normalise(vectors2)
+
+        # Dot product
+        cosine=np.sum(vectors1*vectors2,axis=-1)[...,np.newaxis]
+
+        # Gram-Schmidt orthogonalisation process and renormalisation of the 2nd vector
+        vectors2=trajectoryhelper.normalise(vectors2-vectors1/cosine)
+
+        return vectors1,vectors2
 
 # Subscribe algorithm to Mantid software
 AlgorithmFactory.subscribe(AngularAutoCorrelationsTwoAxes)
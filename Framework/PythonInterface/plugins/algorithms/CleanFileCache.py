@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function)
 
 from mantid.api import *
 from mantid.kernel import *
+from mantid.kernel.datacache import DataCacheIndex
 import os
 
 
@@ -44,7 +45,12 @@ class CleanFileCache(PythonAlgorithm):
 
         self.declareProperty(
             "AgeInDays", 14,
-            "If any file is more than this many days old, it will be deleted. 0 means remove everything",
+            "If any file has not been used for more than this many days, it will be deleted. 0 means remove everything",
+            Direction.Input)
+
+        self.declareProperty(
+            "MaxSizeInGB", 0.,
+            "If the cache files take up more than this, the least recently used files will be deleted. 0 means no limit",
             Direction.Input)
         return
 
@@ -59,36 +65,30 @@ class CleanFileCache(PythonAlgorithm):
                 "cache"
                 )
         age = int(self.getPropertyValue("AgeInDays"))
+        max_size = self.getProperty("MaxSizeInGB").value
         #
-        _run(cache_dir, age)
+        if not os.path.isdir(cache_dir):
+            return
+        index = _run(cache_dir, age, max_size)
+        stats = index.statistics()
+        self.log().notice("Cache %s: %d files, %.3f GB, %d hits, %d misses, %d evictions" % (
+            cache_dir, stats["entries"], stats["size"] / 1024.**3,
+            stats["hits"], stats["misses"], stats["evictions"]))
         return
 
 
-def _run(cache_dir, days):
-    import glob
-    import re
+def _run(cache_dir, days, max_size_in_gb):
     import time
     from datetime import timedelta, date
     rm_date = date.today() - timedelta(days = days)
     rm_date = time.mktime(rm_date.timetuple()) + 24*60*60
-    for f in glob.glob(os.path.join(cache_dir, "*.nxs")):
-        # skip over non-files
-        if not os.path.isfile(f):
-            continue
-        # skip over new files
-        # print os.stat(f).st_mtime, rm_date
-        if os.stat(f).st_mtime > rm_date:
-            continue
-        # check filename pattern
-        base = os.path.basename(f)
-        if re.match(".*_[0-9a-f]{40}.nxs", base):
-            os.remove(f)
-            continue
-        if re.match("[0-9a-f]{40}.nxs", base):
-            os.remove(f)
-            continue
-        continue
-    return
+    max_size = max_size_in_gb * 1024.**3 if max_size_in_gb > 0 else None
+    # cache files whose source files have changed are removed as well
+    index = DataCacheIndex(cache_dir)
+    index.evict(max_size=max_size, max_age=time.time() - rm_date)
+    # and the files left over by processes which died while writing a cache file
+    index.remove_temporary_files()
+    return index
 
 
 # Register algorithm with Mantid
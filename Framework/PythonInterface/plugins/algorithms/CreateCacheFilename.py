@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function)
 
 from mantid.api import *
 from mantid.kernel import *
+from mantid.kernel.datacache import DataCacheIndex
 import mantid
 import os
 
@@ -55,6 +56,11 @@ class CreateCacheFilename(PythonAlgorithm):
             "CacheDir", "",
             "the directory in which the cache file will be created")
 
+        self.declareProperty(
+            StringArrayProperty("SourceFiles", Direction.Input),
+            "A list of files from which the cached data is created. "
+            "An existing cache file is removed if any of them has changed since it was written")
+
         self.declareProperty("OutputFilename", "", "Full path of output file name", Direction.Output)
 
         self.declareProperty("OutputSignature", "", "Calculated sha1 hash", Direction.Output)
@@ -103,6 +109,14 @@ class CreateCacheFilename(PythonAlgorithm):
         # calculate
         fn = self._calculate(
             prop_manager, props, other_props, prefix, cache_dir)
+        # count the hit or miss and remove an outdated cache file
+        if os.path.isdir(cache_dir):
+            sources = self.getProperty("SourceFiles").value
+            try:
+                DataCacheIndex(cache_dir).lookup(fn, sources=list(sources))
+            except (IOError, OSError, RuntimeError) as e:
+                # e.g. a read-only cache directory or a lock held by another process
+                self.log().warning("Unable to update the cache index in %s: %s" % (cache_dir, str(e)))
         self.setProperty("OutputFilename", fn)
         return
 
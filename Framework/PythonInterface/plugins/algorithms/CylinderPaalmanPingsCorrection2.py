@@ -8,6 +8,148 @@ from mantid.api import (PythonAlgorithm, AlgorithmFactory, PropertyMode, MatrixW
                         WorkspaceGroupProperty, InstrumentValidator, Progress)
 from mantid.kernel import (StringListValidator, StringMandatoryValidator, IntBoundedValidator,
                            FloatBoundedValidator, Direction, logger, MaterialBuilder)
+from mantid.kernel import workerpool
+
+
+#------------------------------------------------------------------------------
+# Vectorised integration
+#
+# The points sampled within an annulus depend only on its radii, the number of
+# radial steps and the beam width. They are found once and the absorption for
+# every point, detector angle & wavelength is then evaluated in array operations.
+#------------------------------------------------------------------------------
+
+def _annulus_sample_points(r1, r2, ms, a):
+    """
+    Returns the points sampled when integrating over the annulus. The walk over
+    the omega steps matches CylinderPaalmanPingsCorrection._sum_rom, including
+    any point that is visited more than once. _sum_rom resets its sums for every
+    radial step and only adds those of the last step to the integral, so only the
+    points of the last radial step are returned to give the same corrections.
+
+    @param r1 :: Inner radius of the annulus
+    @param r2 :: Outer radius of the annulus
+    @param ms :: Number of radial steps
+    @param a  :: Half-width of the beam. A negative value samples the other half of the annulus
+    @return (radius, omega, weight) arrays where the weight is the area element of the point
+    """
+    omega_add = math.pi if a < 0. else 0.
+    r_step = (r2 - r1)/ms
+    r_add = -0.5*r_step + r1
+    radius, omega, weight = [], [], []
+    r = ms*r_step + r_add
+    number_omega = int(math.pi*r/r_step)
+    omega_ster = math.pi/number_omega
+    omega_deg = -0.5*omega_ster + omega_add
+    I = 1
+    for _ in range(1, number_omega+1):
+        point_omega = I*omega_ster + omega_deg
+        if abs(r*math.sin(point_omega)) <= a:
+            radius.append(r)
+            omega.append(point_omega)
+            weight.append(r*r_step*omega_ster)
+            I += 1
+        else:
+            I = number_omega - I + 2
+    return np.array(radius), np.array(omega), np.array(weight)
+
+
+def _path_distances(r, radius, omega):
+    """
+    Vectorised form of CylinderPaalmanPingsCorrection._distance. The arguments are broadcast together.
+    """
+    b = r*np.sin(omega)
+    t = r*np.cos(omega)
+    inside = np.abs(b) < radius
+    d = np.sqrt(np.where(inside, radius*radius - b*b, 0.))
+    distance = np.where(r <= radius, t + d, d*(1.0 + np.copysign(1.0, t)))
+    return np.where(inside, distance, 0.)
+
+
+def _integrate_annulus(points, n_scat, n_abs, radii, thetas, amu_scat, amu_tot_i, amu_tot_s):
+    """
+    Integrate the absorption over the sample points of one annulus for all angles & wavelengths
+
+    @param points    :: (radius, omega, weight) from _annulus_sample_points
+    @param n_scat    :: Index of the annulus in which the scattering occurs
+    @param n_abs     :: Index of the first path, see _sum_rom, used for the absorption
+    @param radii     :: Radii of the annuli boundaries
+    @param thetas    :: Scattering angles, in radians, shape (T,)
+    @param amu_scat  :: Scattering coefficient of each annulus
+    @param amu_tot_i :: Total attenuation of the incident neutrons, shape (W, number of annuli)
+    @param amu_tot_s :: Total attenuation of the scattered neutrons, shape (W, number of annuli)
+    @return (AAA, BBB) with shape (T, W) and the area of the annulus
+    """
+    r, omega, weight = points
+    n_angles, n_waves = len(thetas), amu_tot_i.shape[0]
+    if r.size == 0:
+        return np.zeros((n_angles, n_waves)), np.zeros((n_angles, n_waves)), 0.
+    nan = len(radii) - 1
+    scattered = omega[np.newaxis, :] + (math.pi - thetas)[:, np.newaxis]
+
+    # path[k] has shape (T, W, P)
+    path = np.zeros((3, n_angles, n_waves, r.size))
+    for j in range(min(nan, 2)):
+        lis = _path_distances(r, radii[j+1], omega) - _path_distances(r, radii[j], omega)
+        lss = _path_distances(r, radii[j+1], scattered) - _path_distances(r, radii[j], scattered)
+        path[2*j] = (amu_tot_i[np.newaxis, :, j, np.newaxis]*lis[np.newaxis, np.newaxis, :] +
+                     amu_tot_s[np.newaxis, :, j, np.newaxis]*lss[:, np.newaxis, :])
+    if nan == 2:
+        path[1] = path[0] + path[2]
+
+    area_y = weight*amu_scat[n_scat]
+    AAA = np.dot(np.exp(-path[n_abs]), area_y)
+    BBB = np.dot(np.exp(-path[n_abs+1]), area_y)
+    return AAA, BBB, np.sum(area_y)
+
+
+def _cylinder_corrections(angles, radii, ms, half_width, amu_scat, amu_tot_i, amu_tot_s):
+    """
+    Calculates the Paalman & Pings factors for the given detector angles and
+    all wavelengths at once, see CylinderPaalmanPingsCorrection._acyl
+
+    @param angles     :: Detector angles in degrees
+    @param radii      :: Radii of the annuli boundaries
+    @param ms         :: Number of radial steps in the sample
+    @param half_width :: Half-width of the beam
+    @param amu_scat   :: Scattering coefficient of each annulus
+    @param amu_tot_i  :: Total attenuation of the incident neutrons, shape (W, number of annuli)
+    @param amu_tot_s  :: Total attenuation of the scattered neutrons, shape (W, number of annuli)
+    @return Ass, Assc, Acsc, Acc each with shape (angles, wavelengths)
+    """
+    thetas = np.asarray(angles)*math.pi/180.
+    nan = len(radii) - 1
+    zeros = np.zeros((len(thetas), amu_tot_i.shape[0]))
+
+    def integrate(n_scat, n_abs, steps):
+        totals = [zeros, zeros, 0.]
+        for a in (half_width, -half_width):
+            points = _annulus_sample_points(radii[n_scat], radii[n_scat+1], steps, a)
+            result = _integrate_annulus(points, n_scat, n_abs, radii, thetas, amu_scat, amu_tot_i, amu_tot_s)
+            totals = [total + value for total, value in zip(totals, result)]
+        return totals
+
+    if nan < 2:
+        AAA, _, area = integrate(0, 0, ms)
+        return AAA/area, zeros, zeros, zeros
+
+    # Number of steps chosen so that the step width is the same for all annuli
+    def steps(index):
+        return max(int(ms*(radii[index+1] - radii[index])/(radii[1] - radii[0])), 1)
+
+    AAA, BBB, area_s = zeros, zeros, 0.
+    for i in range(0, nan-1):
+        region_AAA, region_BBB, region_area = integrate(i, 0, steps(i))
+        AAA, BBB, area_s = AAA + region_AAA, BBB + region_BBB, area_s + region_area
+    AAA_c, BBB_c, area_c = integrate(nan-1, 1, steps(nan-1))
+    return AAA/area_s, BBB/area_s, AAA_c/area_c, BBB_c/area_c
+
+
+def _cylinder_corrections_for_chunk(args):
+    """
+    Unpacks the arguments for _cylinder_corrections so that it can be used with Pool.map
+    """
+    return _cylinder_corrections(*args)
 
 
 class CylinderPaalmanPingsCorrection(PythonAlgorithm):
@@ -44,6 +186,8 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
     _density = None
     _radii = None
     _interpolate = False
+    _vectorised = True
+    _number_processes = 1
 
 #------------------------------------------------------------------------------
 
@@ -132,6 +276,16 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
                              doc='Analyser energy (mev). By default will be read from the instrument parameters. '
                                  'Specify manually to override. This is used in energy transfer modes other than Elastic.')
 
+        self.declareProperty(name='Vectorised', defaultValue=True,
+                             doc='Integrate over all sample points and wavelengths in array operations. '
+                                 'If false each point, wavelength and angle is evaluated in turn.')
+
+        self.declareProperty(name='NumberOfProcesses', defaultValue=1,
+                             validator=IntBoundedValidator(1),
+                             doc='Number of processes the detector angles are split over '
+                                 'when the integration is vectorised. The angles are calculated in turn '
+                                 'where worker processes cannot be started, e.g. within MantidPlot.')
+
         self.declareProperty(WorkspaceGroupProperty('OutputWorkspace', '',
                                                     direction=Direction.Output),
                              doc='The output corrections workspace group')
@@ -187,20 +341,23 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
         self._get_angles()
         self._transmission()
 
-        dataA1 = []
-        dataA2 = []
-        dataA3 = []
-        dataA4 = []
-
-        data_prog = Progress(self, start=0.1, end=0.85, nreports=len(self._angles))
-        for angle in self._angles:
-            (A1, A2, A3, A4) = self._cyl_abs(angle)
-            logger.information('Angle : %f * successful' % angle)
-            data_prog.report('Appending data for angle %f' % angle)
-            dataA1 = np.append(dataA1, A1)
-            dataA2 = np.append(dataA2, A2)
-            dataA3 = np.append(dataA3, A3)
-            dataA4 = np.append(dataA4, A4)
+        if self._vectorised:
+            dataA1, dataA2, dataA3, dataA4 = self._cyl_abs_vectorised()
+        else:
+            dataA1 = []
+            dataA2 = []
+            dataA3 = []
+            dataA4 = []
+
+            data_prog = Progress(self, start=0.1, end=0.85, nreports=len(self._angles))
+            for angle in self._angles:
+                (A1, A2, A3, A4) = self._cyl_abs(angle)
+                logger.information('Angle : %f * successful' % angle)
+                data_prog.report('Appending data for angle %f' % angle)
+                dataA1 = np.append(dataA1, A1)
+                dataA2 = np.append(dataA2, A2)
+                dataA3 = np.append(dataA3, A3)
+                dataA4 = np.append(dataA4, A4)
 
         dataX = self._waves * len(self._angles)
 
@@ -324,6 +481,8 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
 
         self._interpolate = self.getProperty('Interpolate').value
         self._number_wavelengths = self.getProperty('NumberWavelengths').value
+        self._vectorised = self.getProperty('Vectorised').value
+        self._number_processes = self.getProperty('NumberOfProcesses').value
 
         self._emode = self.getPropertyValue('Emode')
         self._efixed = self.getProperty('Efixed').value
@@ -506,6 +665,47 @@ class CylinderPaalmanPingsCorrection(PythonAlgorithm):
                                 OutputWorkspace=ws,
                                 OutputWorkspaceDeriv='')
 
+#------------------------------------------------------------------------------
+
+    def _cyl_abs_vectorised(self):
+        """
+        Calculates the correction factors for all angles and wavelengths
+        @return Ass, Assc, Acsc, Acc flattened in angle-major order
+        """
+        amu_scat = self._density*self._sig_s
+        sig_abs = self._density*self._sig_a
+        waves = np.asarray(self._waves)
+        if self._emode == 'Elastic':
+            waves_i = waves_s = np.full(waves.shape, self._elastic)
+        elif self._emode == 'Direct':
+            waves_i, waves_s = np.full(waves.shape, self._fixed), waves
+        elif self._emode == 'Indirect':
+            waves_i, waves_s = waves, np.full(waves.shape, self._fixed)
+        else:
+            waves_i = waves_s = np.full(waves.shape, self._fixed)
+        amu_tot_i = amu_scat[np.newaxis, :] + sig_abs[np.newaxis, :]*waves_i[:, np.newaxis]/1.7979
+        amu_tot_s = amu_scat[np.newaxis, :] + sig_abs[np.newaxis, :]*waves_s[:, np.newaxis]/1.7979
+
+        number_processes = min(self._number_processes, len(self._angles))
+        data_prog = Progress(self, start=0.1, end=0.85, nreports=number_processes)
+        chunks = [(angles, self._radii, self._ms, self._beam[1], amu_scat, amu_tot_i, amu_tot_s)
+                  for angles in np.array_split(np.asarray(self._angles), number_processes)]
+        if number_processes > 1 and workerpool.can_create_pool():
+            pool = workerpool.create_pool(number_processes)
+            try:
+                results = pool.map(_cylinder_corrections_for_chunk, chunks)
+            finally:
+                pool.close()
+                pool.join()
+            data_prog.report(number_processes, 'Calculated corrections for all angles')
+        else:
+            results = []
+            for chunk in chunks:
+                results.append(_cylinder_corrections_for_chunk(chunk))
+                data_prog.report('Calculated corrections for %i angles' % len(chunk[0]))
+
+        return tuple(np.concatenate([result[index] for result in results]).ravel() for index in range(4))
+
 #------------------------------------------------------------------------------
 
     def _cyl_abs(self, angle):
@@ -7,6 +7,72 @@ from mantid import logger
 import numpy as np
 
 
+def allowedReflections(space_group, h, k, l):
+    """
+    Checks all reflections of a grid at once, as SpaceGroup.isAllowedReflection does for a single reflection
+    :param space_group: the space group
+    :param h, k, l: the integer h, k and l values of the grid
+    :return: boolean array of shape (len(h), len(k), len(l)) which is True for the allowed reflections
+    """
+    hkl = np.stack(np.meshgrid(h, k, l, indexing='ij'), axis=-1).astype(float)
+    allowed = np.ones(hkl.shape[:-1], dtype=bool)
+    for operation in space_group.getSymmetryOperations():
+        # A reflection which is left invariant by the operation is extinct if the phase shift of the
+        # translation is not integer. For these reflections the phase shift of the vector of the operation
+        # equals the phase shift of its intrinsic translation.
+        vector = operation.transformCoordinates([0, 0, 0])
+        phase = hkl.dot([vector[0], vector[1], vector[2]])
+        shifted = np.abs(phase - np.round(phase)) > 1e-9
+        if not shifted.any():
+            continue
+        matrix = np.array([list(operation.transformHKL(row)) for row in np.identity(3)])
+        invariant = np.all(np.abs(hkl.dot(matrix) - hkl) < 1e-9, axis=-1)
+        allowed &= ~(shifted & invariant)
+    return allowed
+
+
+def boxIndices(centres, halfwidth, minimum, width, nbins):
+    """
+    Finds the bins within half a width of each centre along one dimension, with the same slice
+    arithmetic as the original reflection-by-reflection removal
+    :return: list of arrays, the n-th array holds for each bin the index of its n-th centre or -1
+    """
+    layers = []
+    for index, centre in enumerate(centres):
+        start, stop, _ = slice(int((centre-halfwidth-minimum)/width+1), int((centre+halfwidth-minimum)/width)).indices(nbins)
+        for layer in layers:
+            if not np.any(layer[start:stop] >= 0):
+                break
+        else:
+            layer = np.full(nbins, -1, dtype=int)
+            layers.append(layer)
+        layer[start:stop] = index
+    return layers or [np.full(nbins, -1, dtype=int)]
+
+
+def reflectionMask(selected, centres, halfwidths, minimums, widths, shape):
+    """
+    Builds the mask of the boxes around the selected reflections of a grid
+    :param selected: boolean array over the h, k, l grid of the reflections to mask
+    :param centres: the h, k and l values of the grid
+    :param halfwidths: the half widths of the boxes along each dimension
+    :param minimums: the minimums of the dimensions
+    :param widths: the bin widths of the dimensions
+    :param shape: the shape of the signal
+    :return: boolean array of the signal shape which is True within the boxes
+    """
+    # boxes which overlap along a dimension go into separate layers of bin to reflection indices,
+    # the extra False at the end is picked by the index -1 of the bins outside all boxes
+    layers = [boxIndices(*args) for args in zip(centres, halfwidths, minimums, widths, shape)]
+    padded = np.pad(selected, ((0, 1), (0, 1), (0, 1)), mode='constant', constant_values=False)
+    mask = np.zeros(shape, dtype=bool)
+    for xlayer in layers[0]:
+        for ylayer in layers[1]:
+            for zlayer in layers[2]:
+                mask |= padded[xlayer[:, None, None], ylayer[None, :, None], zlayer[None, None, :]]
+    return mask
+
+
 class DeltaPDF3D(PythonAlgorithm):
 
     def category(self):
@@ -65,6 +131,9 @@ class DeltaPDF3D(PythonAlgorithm):
         self.declareProperty("Deconvolution", False, "Apply deconvolution after fourier transform")
         self.setPropertySettings("Deconvolution", condition)
 
+        self.declareProperty("SinglePrecision", False,
+                             "Process the signal in single precision, which halves the memory of the signal and its FFT")
+
         # Reflections
         self.setPropertyGroup("RemoveReflections","Reflection Removal")
         self.setPropertyGroup("Shape","Reflection Removal")
@@ -130,7 +199,8 @@ class DeltaPDF3D(PythonAlgorithm):
     def PyExec(self): # noqa
         progress = Progress(self, 0.0, 1.0, 5)
         inWS = self.getProperty("InputWorkspace").value
-        signal = inWS.getSignalArray().copy()
+        dtype = np.float32 if self.getProperty("SinglePrecision").value else np.float64
+        signal = inWS.getSignalArray().astype(dtype)
 
         dimX=inWS.getXDimension()
         dimY=inWS.getYDimension()
@@ -176,28 +246,27 @@ class DeltaPDF3D(PythonAlgorithm):
             else:
                 check_space_group = False
 
+            # all reflections of the grid are checked at once
+            hkl = (np.arange(int(np.ceil(Xmin)), int(Xmax)+1),
+                   np.arange(int(np.ceil(Ymin)), int(Ymax)+1),
+                   np.arange(int(np.ceil(Zmin)), int(Zmax)+1))
+            if check_space_group:
+                allowed = allowedReflections(sg, *hkl)
+            else:
+                allowed = np.ones([len(values) for values in hkl], dtype=bool)
+            minimums = (Xmin, Ymin, Zmin)
+            widths = (Xwidth, Ywidth, Zwidth)
+
             if cut_shape == 'cube':
-                for h in range(int(np.ceil(Xmin)), int(Xmax)+1):
-                    for k in range(int(np.ceil(Ymin)), int(Ymax)+1):
-                        for l in range(int(np.ceil(Zmin)), int(Zmax)+1):
-                            if not check_space_group or sg.isAllowedReflection([h,k,l]):
-                                signal[int((h-size[0]-Xmin)/Xwidth+1):int((h+size[0]-Xmin)/Xwidth),
-                                       int((k-size[1]-Ymin)/Ywidth+1):int((k+size[1]-Ymin)/Ywidth),
-                                       int((l-size[2]-Zmin)/Zwidth+1):int((l+size[2]-Zmin)/Zwidth)]=np.nan
+                mask = reflectionMask(allowed, hkl, size, minimums, widths, signal.shape)
             else:  # sphere
                 mask=((X-np.round(X))**2/size[0]**2 + (Y-np.round(Y))**2/size[1]**2 + (Z-np.round(Z))**2/size[2]**2 < 1)
 
                 # Unmask invalid reflections
                 if check_space_group:
-                    for h in range(int(np.ceil(Xmin)), int(Xmax)+1):
-                        for k in range(int(np.ceil(Ymin)), int(Ymax)+1):
-                            for l in range(int(np.ceil(Zmin)), int(Zmax)+1):
-                                if not sg.isAllowedReflection([h,k,l]):
-                                    mask[int((h-0.5-Xmin)/Xwidth+1):int((h+0.5-Xmin)/Xwidth),
-                                         int((k-0.5-Ymin)/Ywidth+1):int((k+0.5-Ymin)/Ywidth),
-                                         int((l-0.5-Zmin)/Zwidth+1):int((l+0.5-Zmin)/Zwidth)]=False
+                    mask &= ~reflectionMask(~allowed, hkl, (0.5, 0.5, 0.5), minimums, widths, signal.shape)
 
-                signal[mask]=np.nan
+            signal[mask]=np.nan
 
         if self.getProperty("CropSphere").value:
             progress.report("Cropping to sphere")
@@ -221,24 +290,23 @@ class DeltaPDF3D(PythonAlgorithm):
 
         if self.getProperty("Convolution").value:
             progress.report("Convoluting signal")
-            signal = self._convolution(signal)
+            signal = self._convolution(signal).astype(dtype, copy=False)
 
         if self.getPropertyValue("IntermediateWorkspace"):
             cloneWS_alg = self.createChildAlgorithm("CloneMDWorkspace", enableLogging=False)
             cloneWS_alg.setProperty("InputWorkspace",inWS)
             cloneWS_alg.execute()
             signalOutWS = cloneWS_alg.getProperty("OutputWorkspace").value
-            signalOutWS.setSignalArray(signal)
+            signalOutWS.setSignalArray(signal.astype(np.float64, copy=False))
             self.setProperty("IntermediateWorkspace", signalOutWS)
 
         # Do FFT
         progress.report("Running FFT")
         # Replace any remaining nan's or inf's with 0
         # Otherwise you end up with a lot of nan's
-        signal[np.isnan(signal)]=0
-        signal[np.isinf(signal)]=0
+        signal[~np.isfinite(signal)]=0
 
-        signal=np.fft.fftshift(np.fft.fftn(np.fft.ifftshift(signal)))
+        signal=self._fft(signal)
         number_of_bins = signal.shape
 
         # Do deconvolution
@@ -246,7 +314,7 @@ class DeltaPDF3D(PythonAlgorithm):
             signal /= self._deconvolution(np.array(signal.shape))
 
         # CreateMDHistoWorkspace expects Fortan `column-major` ordering
-        signal = signal.real.flatten('F')
+        signal = signal.real.flatten('F').astype(np.float64, copy=False)
 
         createWS_alg = self.createChildAlgorithm("CreateMDHistoWorkspace", enableLogging=False)
         createWS_alg.setProperty("SignalInput", signal)
@@ -267,6 +335,17 @@ class DeltaPDF3D(PythonAlgorithm):
 
         self.setProperty("OutputWorkspace", outWS)
 
+    def _fft(self, signal):
+        if signal.dtype == np.float32:
+            try:
+                from scipy import fftpack
+            except ImportError:
+                logger.debug('scipy is not available, the FFT is calculated in double precision')
+            else:
+                # numpy always transforms in double precision, scipy keeps single precision
+                return np.fft.fftshift(fftpack.fftn(np.fft.ifftshift(signal), overwrite_x=True))
+        return np.fft.fftshift(np.fft.fftn(np.fft.ifftshift(signal)))
+
     def _convolution(self, signal):
         from astropy.convolution import convolve, convolve_fft, Gaussian1DKernel
         G1D = Gaussian1DKernel(self.getProperty("ConvolutionWidth").value).array
@@ -1,14 +1,146 @@
 #pylint: disable=no-init,invalid-name
 from __future__ import (absolute_import, division, print_function)
 import time
-import datetime
+import calendar
 import numbers
 import bisect
+import os
+import re
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 import numpy
 from mantid.api import * # PythonAlgorithm, AlgorithmFactory, WorkspaceProperty
 from mantid.kernel import * # StringArrayProperty
 from mantid.simpleapi import * # needed for Load
 
+try:
+    import h5py  # http://www.h5py.org/
+except ImportError:
+    h5py = None
+
+# The groups of the NeXus entries which hold the logs as NXlog groups
+NEXUS_LOG_GROUPS = {'entry': ['DASlogs'], 'raw_data_1': ['selog', 'runlog']}
+ISO8601_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$')
+
+# The log values of the files which have been read, keyed by the path of the file. An entry is only used
+# if the modification time and the size of the file are unchanged. The entries are ordered from the least
+# to the most recently used entry.
+_log_value_cache = OrderedDict()
+LOG_VALUE_CACHE_SIZE = 10000
+
+
+def clear_log_value_cache():
+    _log_value_cache.clear()
+
+
+def getFileStamp(filename):
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def getCachedLogValues(filename, stamp):
+    entry = _log_value_cache.pop(filename, None)
+    if entry is None or entry[0] != stamp:
+        return {}
+    _log_value_cache[filename] = entry
+    return entry[1]
+
+
+def addCachedLogValues(filename, stamp, logvalues):
+    entry = _log_value_cache.pop(filename, None)
+    cached = entry[1] if entry is not None and entry[0] == stamp else {}
+    cached.update(logvalues)
+    _log_value_cache[filename] = (stamp, cached)
+    while len(_log_value_cache) > LOG_VALUE_CACHE_SIZE:
+        _log_value_cache.popitem(last=False)
+
+
+def parseIso8601(text):
+    """ Return the seconds since the epoch of an ISO8601 time, or None if the format is not recognised
+    """
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    match = ISO8601_PATTERN.match(text.strip())
+    if match is None:
+        return None
+    seconds = calendar.timegm(time.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S"))
+    if match.group(2):
+        seconds += float(match.group(2))
+    offset = match.group(3)
+    if offset and offset != 'Z':
+        offset = offset.replace(':', '')
+        sign = -1 if offset[0] == '-' else 1
+        seconds -= sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+    return seconds
+
+
+def getLogValue(name, times, values):
+    """ Return the value of a time series as getGeneralLogValue does, for times relative to the start of the run
+    """
+    if name[0:8]=="Beamlog_" and (name.find("Counts")>0 or name.find("Frames")>0):
+        i=bisect.bisect_right(times,2) # allowance for "slow" clearing of DAE
+        return (numpy.amax(values[i:]),True,numpy.amax(values[:i]))
+    # all of the values are averaged, as the algorithm always has since the times of the loaded logs
+    # could not be read
+    return (numpy.average(values),False,0)
+
+
+def readNexusLogValues(filename, lognames):
+    """
+    Read the values of floating point logs directly from a NeXus HDF5 file
+    :param filename: path to the file
+    :param lognames: the names of the logs
+    :return: dict of the log name to the log value, leftover flag and leftover value,
+             or None if the file or any of the logs cannot be read this way
+    """
+    try:
+        if not h5py.is_hdf5(filename):
+            return None
+        with h5py.File(filename, 'r') as nexusfile:
+            for entryname, loggroups in NEXUS_LOG_GROUPS.items():
+                if entryname in nexusfile:
+                    entry = nexusfile[entryname]
+                    break
+            else:
+                return None
+            if 'start_time' not in entry:
+                return None
+            begin = parseIso8601(entry['start_time'][0])
+            if begin is None:
+                return None
+
+            logvalues = {}
+            for name in lognames:
+                log = None
+                for group in loggroups:
+                    if group in entry and name in entry[group]:
+                        log = entry[group][name]
+                        if 'value_log' in log: # ISIS selog blocks
+                            log = log['value_log']
+                        break
+                if log is None or 'time' not in log or 'value' not in log:
+                    return None
+                logtimes, logvalue = log['time'], log['value']
+                # only float time series are read here, other logs are converted by the loaders
+                if logvalue.dtype.kind != 'f' or logvalue.ndim != 1 or logvalue.shape != logtimes.shape \
+                        or logvalue.shape[0] == 0:
+                    return None
+                if logtimes.attrs.get('units', b'second') not in (b'second', 'second', b's', 's'):
+                    return None
+                start = parseIso8601(logtimes.attrs['start']) if 'start' in logtimes.attrs else begin
+                if start is None:
+                    return None
+                times = logtimes[...].astype(numpy.float64) + (start - begin)
+                order = numpy.argsort(times, kind='mergesort')
+                logvalues[name] = getLogValue(name, list(times[order]), logvalue[...][order])
+            return logvalues
+    except (IOError, OSError, KeyError, ValueError, TypeError, AttributeError):
+        # anything unexpected in the file is left to the loaders
+        return None
+
 
 class LoadLogPropertyTable(PythonAlgorithm):
 
@@ -32,6 +164,11 @@ class LoadLogPropertyTable(PythonAlgorithm):
         self.declareProperty(StringArrayProperty("LogNames",direction=Direction.Input),
                              "The comma seperated list of properties to include. \n"+
                              "The full list will be printed if an invalid value is used.")
+        self.declareProperty("BulkMode", False,
+                             "Read the logs of NeXus HDF5 files directly, using several threads, instead of loading each file. "
+                             "Files and logs which cannot be read this way are loaded as before.")
+        self.declareProperty("NumberOfThreads", 8, IntBoundedValidator(lower=1),
+                             "The number of threads which read files in bulk mode")
         self.declareProperty(WorkspaceProperty("OutputWorkspace","",Direction.Output),"Table of results")
 
     def category(self):
@@ -55,18 +192,16 @@ class LoadLogPropertyTable(PythonAlgorithm):
             times2=[]
             if hasattr(v,"unfiltered"):
                 v=v.unfiltered()
+            # str(DateAndTime) is the ISO8601 time followed by a space, parsed as the times read in bulk mode
             for tt in v.times:
-                times2.append((datetime.datetime(*(time.strptime(str(tt),"%Y-%m-%dT%H:%M:%S")[0:6]))-begin).total_seconds())
+                times2.append(parseIso8601(str(tt))-begin)
         except: #pylint: disable=bare-except
             # print "probably not a time series"
             pass
         if name[0:8]=="Beamlog_" and (name.find("Counts")>0 or name.find("Frames")>0):
-            i=bisect.bisect_right(times2,2) # allowance for "slow" clearing of DAE
-            #print "returning max beam log, list cut 0:",i,":",len(times2)
-            return (numpy.amax(v.value[i:]),True,numpy.amax(v.value[:i]))
+            return getLogValue(name, times2, v.value)
         if v.__class__.__name__ =="TimeSeriesProperty_dbl" or v.__class__.__name__ =="FloatTimeSeriesProperty":
-            i=bisect.bisect_left(times2,0)
-            return (numpy.average(v.value[i:]),False,0)
+            return getLogValue(name, times2, v.value)
         return (v.value,False,0)
 
     #pylint: disable=too-many-branches
@@ -92,30 +227,46 @@ class LoadLogPropertyTable(PythonAlgorithm):
         wsOutput=WorkspaceFactory.createTable()
         wsOutput.addColumn("int","RunNumber")
 
-        # loop and load files. Absolute numbers for now.
+        # create a file path for intervening files, based from the 1st filename
+        runs = []
         for loopRunNum in range(firstRunNum,lastRunNum+1):
-            # create a file path for intervening files, based from the 1st filename
             thispath=firstFileName[:firstFileFirstDigit] + \
                      str(loopRunNum).zfill(firstFileLastDigit-firstFileFirstDigit) + \
                      firstFileName[firstFileLastDigit:]
+            runs.append((loopRunNum, thispath))
+
+        # in bulk mode the logs which have been read before are taken from the cache
+        bulkMode = self.getProperty("BulkMode").value
+        stamps = dict((thispath, getFileStamp(thispath) if bulkMode else None) for _, thispath in runs)
+        logvalues = {}
+        for _, thispath in runs:
+            if stamps[thispath] is not None:
+                cached = getCachedLogValues(thispath, stamps[thispath])
+                if all(col in cached for col in collist):
+                    logvalues[thispath] = cached
+        if bulkMode:
+            logvalues.update(self.readNexusFiles([thispath for _, thispath in runs
+                                                  if thispath not in logvalues and stamps[thispath] is not None],
+                                                 collist))
 
-            loadedWs = self.loadMetaData(thispath)
-            if loadedWs is None:
-                continue
+        # loop and load files. Absolute numbers for now.
+        for loopRunNum, thispath in runs:
+            if thispath not in logvalues:
+                loadedWs = self.loadMetaData(thispath)
+                if loadedWs is None:
+                    continue
 
-            #check if the ws is a group
-            ws = loadedWs
-            if ws.id() == 'WorkspaceGroup':
-                ws=ws[0]
+                #check if the ws is a group
+                ws = loadedWs
+                if ws.id() == 'WorkspaceGroup':
+                    ws=ws[0]
+                logvalues[thispath] = self.getLogValues(ws, collist)
+            if stamps[thispath] is not None:
+                addCachedLogValues(thispath, stamps[thispath], logvalues[thispath])
 
-            begin=datetime.datetime(*(time.strptime(ws.getRun().getProperty("run_start").value,"%Y-%m-%dT%H:%M:%S")[0:6])) # start of day
             vallist=[loopRunNum]
             for col in collist:
-                try:
-                    (colValue, leftover, lval)=self.getGeneralLogValue(ws, col, begin)
-                except ValueError:
-                    # this is a failure to find the named log
-                    raise
+                (colValue, leftover, lval)=logvalues[thispath][col]
                 vallist.append(colValue)
                 if loopRunNum==firstRunNum:
                     if isinstance(colValue, numbers.Number):
@@ -129,6 +280,36 @@ class LoadLogPropertyTable(PythonAlgorithm):
 
         self.setProperty("OutputWorkspace",wsOutput)
 
+    def getLogValues(self, ws, collist):
+        begin=parseIso8601(ws.getRun().getProperty("run_start").value) # seconds since the epoch
+        logvalues = {}
+        for col in collist:
+            try:
+                logvalues[col]=self.getGeneralLogValue(ws, col, begin)
+            except ValueError:
+                # this is a failure to find the named log
+                raise
+        return logvalues
+
+    def readNexusFiles(self, filenames, collist):
+        if h5py is None:
+            self.log().warning("BulkMode requires h5py, loading every file instead")
+            return {}
+        if not filenames:
+            return {}
+
+        def readOne(filename):
+            return readNexusLogValues(filename, collist)
+
+        pool = ThreadPool(min(self.getProperty("NumberOfThreads").value, len(filenames)))
+        try:
+            results = pool.map(readOne, filenames)
+        finally:
+            pool.close()
+        logvalues = dict((filename, result) for filename, result in zip(filenames, results) if result is not None)
+        self.log().information("Read the logs of %d of %d files directly" % (len(logvalues), len(filenames)))
+        return logvalues
+
     def loadMetaData(self, thispath):
         loadedWs = None
         try:
@@ -3,8 +3,101 @@ from __future__ import (absolute_import, division, print_function)
 
 from mantid.simpleapi import *
 from mantid.kernel import *
+from mantid.kernel import cachefile
 from mantid.api import *
+from multiprocessing.pool import ThreadPool
 from six import PY3
+import os
+
+METADATA_INDEX_FILE = 'nexus_metadata_index.json'
+METADATA_INDEX_VERSION = 1
+# the states of a nexus entry in a file
+ENTRY_VALUE, ENTRY_MISSING, ENTRY_NOT_SINGLE = 'value', 'missing', 'not_single'
+
+
+def getFileStamp(run):
+    stat = os.stat(run)
+    return [stat.st_mtime, stat.st_size]
+
+
+def readEntries(nexusfile, names):
+    """
+    Reads the nexus entries which are used in the criteria from a file
+    :param nexusfile: the open h5py file
+    :param names: the names of the nexus entries
+    :return: a dict of the entry name to a list of the state of the entry and the
+             text which replaces the entry name in the criteria
+    """
+    entries = dict()
+    for name in names:
+        try:
+            # try to get the entry from the file
+            entry = nexusfile.get(name)
+
+            if len(entry.shape) > 1 or len(entry) > 1:
+                entries[name] = [ENTRY_NOT_SINGLE]
+                continue
+
+            value = entry[0]
+
+            if str(value.dtype).startswith('|S'):
+                # string value, need to quote for eval
+                if PY3:
+                    value = value.decode()
+                entries[name] = [ENTRY_VALUE, '\"' + value + '\"']
+            else:
+                entries[name] = [ENTRY_VALUE, str(value)]
+
+        except (TypeError, AttributeError):
+            entries[name] = [ENTRY_MISSING]
+    return entries
+
+
+class NexusMetadataIndex(object):
+    """
+    Stores the values of the nexus entries which have been read from each file, keyed by the full path.
+    The values of a file are only used as long as its modification time and size do not change.
+    The index is saved to a JSON file, merging the files which have been added by other processes.
+    """
+
+    def __init__(self, index_file):
+        self._index_file = index_file
+        self._files = self._load().get('files', dict())
+        self._changed = False
+
+    def get(self, run, stamp, names):
+        record = self._files.get(run)
+        if record is None or record['stamp'] != stamp or not all(name in record['entries'] for name in names):
+            return None
+        entries = record['entries']
+        if not PY3:
+            # json gives unicode strings
+            entries = dict((name.encode('utf-8'), [item.encode('utf-8') for item in entry])
+                           for name, entry in entries.items())
+        return entries
+
+    def add(self, run, stamp, entries):
+        record = self._files.get(run)
+        if record is None or record['stamp'] != stamp:
+            record = {'stamp': stamp, 'entries': dict()}
+            self._files[run] = record
+        record['entries'].update(entries)
+        self._changed = True
+
+    def save(self):
+        if not self._changed:
+            return
+        files = self._load().get('files', dict())
+        files.update(self._files)
+        self._files = files
+        cachefile.save_json(self._index_file, {'version': METADATA_INDEX_VERSION, 'files': self._files})
+        self._changed = False
+
+    def _load(self):
+        content = cachefile.load_json(self._index_file)
+        if not isinstance(content, dict) or content.get('version') != METADATA_INDEX_VERSION:
+            return dict()
+        return content
 
 
 class SelectNexusFilesByMetadata(PythonAlgorithm):
@@ -47,6 +140,15 @@ class SelectNexusFilesByMetadata(PythonAlgorithm):
         self.declareProperty(name='NexusCriteria',defaultValue='',
                              doc='Logical expresion for metadata criteria using python syntax. '
                                  'Provide full absolute names for nexus entries enclosed with $ symbol from both sides.')
+        self.declareProperty(name='NumberOfThreads', defaultValue=4, validator=IntBoundedValidator(lower=1),
+                             doc='Number of threads which read the nexus entries of the files at the same time.')
+        self.declareProperty(name='UseMetadataIndex', defaultValue=False,
+                             doc='Keep the nexus entries which have been read in an index file, '
+                                 'such that unchanged files are not opened again.')
+        self.declareProperty(FileProperty(name='MetadataIndexFile', defaultValue='',
+                                          action=FileAction.OptionalSave, extensions=['.json']),
+                             doc='The index file. The default is %s in the user properties directory.'
+                                 % METADATA_INDEX_FILE)
         self.declareProperty(name='Result', defaultValue='', direction=Direction.Output,
                              doc='Comma separated list of the fully resolved file names satisfying the given criteria.')
 
@@ -58,17 +160,49 @@ class SelectNexusFilesByMetadata(PythonAlgorithm):
         except ImportError:
             raise RuntimeError('This algorithm requires h5py package. See https://pypi.python.org/pypi/h5py')
 
+        filelist = [runs.split('+') for runs in self.getPropertyValue('FileList').split(',')]
+        names = set(self._criteria_splitted[1::2])  # at odd indices will always be the nexus entry names
+
+        index = None
+        if self.getProperty('UseMetadataIndex').value:
+            indexfile = self.getPropertyValue('MetadataIndexFile')
+            if not indexfile:
+                indexfile = cachefile.user_cache_path(METADATA_INDEX_FILE)
+            index = NexusMetadataIndex(indexfile)
+
+        def readRun(run):
+            stamp = getFileStamp(run)
+            entries = index.get(run, stamp, names) if index is not None else None
+            if entries is None:
+                with h5py.File(run, 'r') as nexusfile:
+                    entries = readEntries(nexusfile, names)
+            return run, stamp, entries
+
+        # the files are read concurrently and the criteria are evaluated in turn
+        allruns = [run for runs in filelist for run in runs]
+        pool = ThreadPool(min(self.getProperty('NumberOfThreads').value, len(allruns)))
+        try:
+            results = pool.map(readRun, allruns)
+        finally:
+            pool.close()
+        runentries = dict()
+        for run, stamp, entries in results:
+            runentries[run] = entries
+            if index is not None:
+                index.add(run, stamp, entries)
+        if index is not None:
+            index.save()
+
         outputfiles = ''
         # first split by ,
-        for runs in self.getPropertyValue('FileList').split(','):
+        for runs in filelist:
 
             filestosum = ''
             # then split each by +
-            for run in runs.split('+'):
+            for run in runs:
 
-                with h5py.File(run, 'r') as nexusfile:
-                    if self.checkCriteria(run, nexusfile):
-                        filestosum += run + '+'
+                if self.checkCriteria(run, runentries[run]):
+                    filestosum += run + '+'
 
             if filestosum:
                 # trim the last +
@@ -83,34 +217,21 @@ class SelectNexusFilesByMetadata(PythonAlgorithm):
 
         self.setPropertyValue('Result',outputfiles)
 
-    def checkCriteria(self, run, nexusfile):
+    def checkCriteria(self, run, entries):
         toeval = ''
         item = None  # for pylint
         for i, item in enumerate(self._criteria_splitted):
             if i % 2 == 1:  # at odd indices will always be the nexus entry names
-                try:
-                    # try to get the entry from the file
-                    entry = nexusfile.get(item)
-
-                    if len(entry.shape) > 1 or len(entry) > 1:
-                        self.log().warning('Nexus entry %s has more than one dimension or more than one element'
-                                           'in file %s. Skipping the file.' % (item, run))
-                        return False
-
-                    # replace entry name by it's value
-                    value = entry[0]
-
-                    if str(value.dtype).startswith('|S'):
-                        # string value, need to quote for eval
-                        if PY3:
-                            value = value.decode()
-                        toeval += '\"' + value + '\"'
-                    else:
-                        toeval += str(value)
-
-                except (TypeError, AttributeError):
+                entry = entries[item]
+                if entry[0] == ENTRY_NOT_SINGLE:
+                    self.log().warning('Nexus entry %s has more than one dimension or more than one element'
+                                       'in file %s. Skipping the file.' % (item, run))
+                    return False
+                if entry[0] == ENTRY_MISSING:
                     self.log().warning('Nexus entry %s does not exist in file %s. Skipping the file.' % (item, run))
                     return False
+                # replace entry name by it's value
+                toeval += entry[1]
             else:
                 # keep other portions intact
                 toeval += item
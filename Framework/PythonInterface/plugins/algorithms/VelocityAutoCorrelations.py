@@ -8,6 +8,7 @@ from scipy.io import netcdf
 import numpy as np
 import re
 import time
+import trajectoryhelper
 
 
 class VelocityAutoCorrelations(PythonAlgorithm):
@@ -25,6 +26,10 @@ class VelocityAutoCorrelations(PythonAlgorithm):
         self.declareProperty("Timestep", "1.0", direction=Direction.Input,
                              doc="Specify the timestep between trajectory points in the simulation in fs")
 
+        self.declareProperty("MaxMemoryMB", 0, validator=IntBoundedValidator(lower=0), direction=Direction.Input,
+                             doc="If greater than zero the trajectory is read in blocks of timesteps whose velocities "
+                                 "and transforms take about this much memory, in MB. Zero loads the whole trajectory.")
+
         self.declareProperty(WorkspaceProperty('OutputWorkspace','',direction=Direction.Output),doc="Output workspace name")
 
     def PyExec(self):
@@ -80,80 +85,21 @@ class VelocityAutoCorrelations(PythonAlgorithm):
         # Extract useful simulation parameters
         # Number of species present in the simulation
         n_species=len(elements)
-        # Number of particles present in the simulation
-        n_particles=len(atoms_to_species)
         # Number of timesteps in the simulation
         n_timesteps=int(configuration.shape[0])
-        # Number of spatial dimensions
-        n_dimensions=int(configuration.shape[2])
 
         logger.information(str(time.time()-start_time) + " s")
 
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
-
         # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
         box_size=trajectory.variables["box_size"]
 
-        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
-        # Shape: timesteps x 3 vectors x (# of spatial dimensions)
-        box_size_tensors=np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)#/1.12484770
-
-        # Get scaled coordinates (assumes orthogonal simulation box)
-        scaled_coords=np.zeros(np.shape(configuration_copy))
-        for i in range(n_particles):
-            for j in range(n_timesteps):
-                for k in range(n_dimensions):
-                    scaled_coords[i,j,k]=configuration_copy[i,j,k]/box_size_tensors[j,k,k]
-
-        # # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating velocities...")
-        start_time=time.time()
-
-        # Initialise velocity arrray. Note that the first dimension is 2 elements shorter than the coordinate array.
-        # Use finite difference methods to evaluate the time-derivative to 1st order
-        # Shape: (# of particles) x (timesteps-2) x (# of spatial dimensions)
-        velocities=np.zeros((n_particles,n_timesteps-1,n_dimensions))
-
-        for i in range(n_particles):
-            for j in range(n_timesteps-2):
-                # Unwrapping coordinates
-                v_temp1=scaled_coords[i,j+1]-scaled_coords[i,j]-np.round(scaled_coords[i,j+1]-scaled_coords[i,j])
-                v_temp2=scaled_coords[i,j+2]-scaled_coords[i,j+1]-np.round(scaled_coords[i,j+2]-scaled_coords[i,j+1])
-                velocities[i,j]=(v_temp1+v_temp2)/(2.0)
-
-        # Transform velocities (configuration array) back to Cartesian coordinates at each time step
-        velocities=np.array([[np.dot(box_size_tensors[j+1],np.transpose(velocities[i,j]))
-                              for j in range(n_timesteps-1)] for i in range(n_particles)])
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating velocity auto-correlations (resource intensive calculation)...")
-        start_time=time.time()
-
-        correlation_length=n_timesteps-1
-        correlations=np.zeros((n_species,n_species,correlation_length))
-        # Array for counting particle pairings
-        correlation_count=np.zeros((n_species,n_species))
-
-        # Compute cross-correlations for each pair of particles in each spatial coordinate
-        for i in range(n_particles):
-            # Retrieve particle indices from the 'particles' dictionary and determine the relevant position in the 'correlations' matrices
-            k=elements.index(atoms_to_species[i])
-            # Check for the order of elements (ensures upper triangular matrix form & consistent order of operations)
-            correlation_temp=self.auto_correlation(velocities[i])
-            correlations[k,k]+=correlation_temp
-            correlation_count[k,k]+=1
-
-        logger.information(str(time.time()-start_time) + " s")
+        max_memory=self.getProperty("MaxMemoryMB").value
+        if max_memory>0:
+            correlations,correlation_count=self._streamed_correlations(configuration,box_size,atoms_to_species,
+                                                                       elements,max_memory)
+        else:
+            correlations,correlation_count=self._in_memory_correlations(configuration,box_size,atoms_to_species,
+                                                                        elements)
 
         # Neutron incoherent scattering lengths (fm) weighted by isotope abundancies
         # Sources:
@@ -292,6 +238,108 @@ class VelocityAutoCorrelations(PythonAlgorithm):
         # Set output workspace to output_ws
         self.setProperty('OutputWorkspace',output_ws)
 
+    def _in_memory_correlations(self,configuration,box_size,atoms_to_species,elements):
+        # Loads the whole trajectory and correlates each particle in turn
+        n_species=len(elements)
+        n_particles=len(atoms_to_species)
+        n_timesteps=int(configuration.shape[0])
+        n_dimensions=int(configuration.shape[2])
+
+        logger.information("Transforming coordinates...")
+        start_time=time.time()
+
+        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
+        # Shape: timesteps x 3 vectors x (# of spatial dimensions)
+        box_size_tensors=np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
+
+        # Copy the configuration object into a numpy array
+        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
+
+        # Swap the time and particle axes
+        configuration_copy=np.swapaxes(configuration_copy,0,1)#/1.12484770
+
+        # Get scaled coordinates (assumes orthogonal simulation box)
+        scaled_coords=np.zeros(np.shape(configuration_copy))
+        for i in range(n_particles):
+            for j in range(n_timesteps):
+                for k in range(n_dimensions):
+                    scaled_coords[i,j,k]=configuration_copy[i,j,k]/box_size_tensors[j,k,k]
+
+        # # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step
+
+        logger.information(str(time.time()-start_time) + " s")
+
+        logger.information("Calculating velocities...")
+        start_time=time.time()
+
+        # Initialise velocity arrray. Note that the first dimension is 2 elements shorter than the coordinate array.
+        # Use finite difference methods to evaluate the time-derivative to 1st order
+        # Shape: (# of particles) x (timesteps-2) x (# of spatial dimensions)
+        velocities=np.zeros((n_particles,n_timesteps-1,n_dimensions))
+
+        for i in range(n_particles):
+            for j in range(n_timesteps-2):
+                # Unwrapping coordinates
+                v_temp1=scaled_coords[i,j+1]-scaled_coords[i,j]-np.round(scaled_coords[i,j+1]-scaled_coords[i,j])
+                v_temp2=scaled_coords[i,j+2]-scaled_coords[i,j+1]-np.round(scaled_coords[i,j+2]-scaled_coords[i,j+1])
+                velocities[i,j]=(v_temp1+v_temp2)/(2.0)
+
+        # Transform velocities (configuration array) back to Cartesian coordinates at each time step
+        velocities=np.array([[np.dot(box_size_tensors[j+1],np.transpose(velocities[i,j]))
+                              for j in range(n_timesteps-1)] for i in range(n_particles)])
+        logger.information(str(time.time()-start_time) + " s")
+
+        logger.information("Calculating velocity auto-correlations (resource intensive calculation)...")
+        start_time=time.time()
+
+        correlation_length=n_timesteps-1
+        correlations=np.zeros((n_species,n_species,correlation_length))
+        # Array for counting particle pairings
+        correlation_count=np.zeros((n_species,n_species))
+
+        # Compute cross-correlations for each pair of particles in each spatial coordinate
+        for i in range(n_particles):
+            # Retrieve particle indices from the 'particles' dictionary and determine the relevant position in the 'correlations' matrices
+            k=elements.index(atoms_to_species[i])
+            # Check for the order of elements (ensures upper triangular matrix form & consistent order of operations)
+            correlation_temp=self.auto_correlation(velocities[i])
+            correlations[k,k]+=correlation_temp
+            correlation_count[k,k]+=1
+
+        logger.information(str(time.time()-start_time) + " s")
+
+        return correlations,correlation_count
+
+    def _streamed_correlations(self,configuration,box_size,atoms_to_species,elements,max_memory):
+        # Reads the trajectory in blocks of timesteps and accumulates the auto-correlations of each species
+        n_species=len(elements)
+        n_particles=len(atoms_to_species)
+        n_dimensions=int(configuration.shape[2])
+        correlation_length=int(configuration.shape[0])-1
+
+        # Two blocks of velocities are held with their transforms, which have up to two complex values per
+        # timestep, as well as the product of the transforms
+        bytes_per_timestep=n_particles*(n_dimensions*(2*(8+2*16)+2*16)+2*16)
+        block_size=max(1,max_memory*1024*1024//bytes_per_timestep)
+        logger.information("Calculating velocity auto-correlations in blocks of {0} timesteps...".format(block_size))
+        start_time=time.time()
+
+        species=[elements.index(atoms_to_species[i]) for i in range(n_particles)]
+
+        def read_block(start,stop):
+            return trajectoryhelper.velocity_block(configuration,box_size,start,stop)
+
+        lag_correlations=trajectoryhelper.blocked_autocorrelations(read_block,correlation_length,species,
+                                                                   n_species,block_size)
+        correlations=np.zeros((n_species,n_species,correlation_length))
+        correlation_count=np.zeros((n_species,n_species))
+        for k in range(n_species):
+            correlations[k,k]=trajectoryhelper.symmetric_correlation(lag_correlations[k],correlation_length)
+            correlation_count[k,k]=species.count(k)
+        logger.information(str(time.time()-start_time) + " s")
+
+        return correlations,correlation_count
+
     def auto_correlation(self,u):
         # Returns auto-correlation of a 3-vectors
         n=np.shape(u)[0]
@@ -8,6 +8,7 @@ from scipy.io import netcdf
 import numpy as np
 import re
 import time
+import trajectoryhelper
 
 
 class VelocityCrossCorrelations(PythonAlgorithm):
@@ -28,6 +29,14 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         self.declareProperty("Timestep", "1.0", direction = Direction.Input,
                              doc="Specify the timestep between trajectory points in the simulation, fs")
 
+        self.declareProperty("Vectorised", True, direction=Direction.Input,
+                             doc="Correlate the summed velocities of each species with FFTs. If false every pair of "
+                                 "particles is correlated in turn.")
+
+        self.declareProperty("ChunkSize", 1000, validator=IntBoundedValidator(lower=1), direction=Direction.Input,
+                             doc="Number of timesteps transformed at a time when calculating the velocities. The "
+                                 "particles are then transformed in blocks of a similar size.")
+
         self.declareProperty(WorkspaceProperty('OutputWorkspace','',direction=Direction.Output),doc="Output workspace name")
 
     def PyExec(self):
@@ -83,84 +92,18 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         # Extract useful simulation parameters
         # Number of species present in the simulation
         n_species=len(elements)
-        # Number of particles present in the simulation
-        n_particles=len(atoms_to_species)
         # Number of timesteps in the simulation
         n_timesteps=int(configuration.shape[0])
-        # Number of spatial dimensions
-        n_dimensions=int(configuration.shape[2])
 
         logger.information(str(time.time()-start_time) + " s")
 
-        logger.information("Transforming coordinates...")
-        start_time=time.time()
-
         # Box size for each timestep. Shape: timesteps x (3 consecutive 3-vectors)
         box_size=trajectory.variables["box_size"]
 
-        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
-        # Shape: timesteps x 3 vectors x (# of spatial dimensions)
-        box_size_tensors=np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
-
-        # Copy the configuration object into a numpy array
-        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
-
-        # Swap the time and particle axes
-        configuration_copy=np.swapaxes(configuration_copy,0,1)#/1.12484770
-
-        # Get scaled coordinates (assumes orthogonal simulation box)
-        scaled_coords=np.zeros(np.shape(configuration_copy))
-        for i in range(n_particles):
-            for j in range(n_timesteps):
-                for k in range(n_dimensions):
-                    scaled_coords[i,j,k]=configuration_copy[i,j,k]/box_size_tensors[j,k,k]
-
-        # # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step
-
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating velocities...")
-        start_time=time.time()
-
-        # Initialise velocity arrray. Note that the first dimension is 2 elements shorter than the coordinate array.
-        # Use finite difference methods to evaluate the time-derivative to 1st order
-        # Shape: (# of particles) x (timesteps-2) x (# of spatial dimensions)
-
-        velocities=np.zeros((n_particles,n_timesteps-1,n_dimensions))
-        v1=scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:]-np.round(scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:])
-        v2=scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:]-np.round(scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:])
-        velocities[:,:-1,:]=(v1+v2)/2.
-
-        # Transform velocities (configuration array) back to Cartesian coordinates at each time step
-        velocities=np.array([[np.dot(box_size_tensors[j+1],np.transpose(velocities[i,j]))
-                              for j in range(n_timesteps-1)] for i in range(n_particles)])
-        logger.information(str(time.time()-start_time) + " s")
-
-        logger.information("Calculating velocity cross-correlations (resource intensive calculation)...")
-        start_time=time.time()
-        correlation_length=n_timesteps-1
-        correlations=np.zeros((n_species,n_species,correlation_length))
-        # Array for counting particle pairings
-        correlation_count=np.zeros((n_species,n_species))
-
-        # Compute cross-correlations for each pair of particles in each spatial coordinate
-        for i in range(n_particles):
-            for j in range(i+1,n_particles):
-                # Retrieve particle indices from the 'particles' dictionary and
-                # determine the relevant position in the 'correlations' matrices
-                k=elements.index(atoms_to_species[i])
-                l=elements.index(atoms_to_species[j])
-                # Check for the order of elements (ensures upper triangular matrix form & consistent order of operations)
-                if k<=l:
-                    correlation_temp=self.cross_correlation(velocities[i],velocities[j])
-                    correlations[k,l]+=correlation_temp
-                    correlation_count[k,l]+=1
-                else:
-                    correlation_temp=self.cross_correlation(velocities[j],velocities[i])
-                    correlations[l,k]+=correlation_temp
-                    correlation_count[l,k]+=1
-
-        logger.information(str(time.time()-start_time) + " s")
+        if self.getProperty("Vectorised").value:
+            correlations,correlation_count=self._species_correlations(configuration,box_size,atoms_to_species,elements)
+        else:
+            correlations,correlation_count=self._pair_correlations(configuration,box_size,atoms_to_species,elements)
 
         # Neutron coherent scattering lengths (femtometres)
         # Sources:
@@ -302,6 +245,110 @@ class VelocityCrossCorrelations(PythonAlgorithm):
         # Set output workspace to output_ws
         self.setProperty('OutputWorkspace',output_ws)
 
+    def _pair_correlations(self,configuration,box_size,atoms_to_species,elements):
+        # Correlates every pair of particles in turn
+        n_species=len(elements)
+        n_particles=len(atoms_to_species)
+        n_timesteps=int(configuration.shape[0])
+        n_dimensions=int(configuration.shape[2])
+
+        logger.information("Transforming coordinates...")
+        start_time=time.time()
+
+        # Reshape the paralellepipeds into 3x3 tensors for coordinate transformations.
+        # Shape: timesteps x 3 vectors x (# of spatial dimensions)
+        box_size_tensors=np.array([box_size[j].reshape((3,3)) for j in range(n_timesteps)])
+
+        # Copy the configuration object into a numpy array
+        configuration_copy=np.array([configuration[i] for i in range(n_timesteps)])
+
+        # Swap the time and particle axes
+        configuration_copy=np.swapaxes(configuration_copy,0,1)#/1.12484770
+
+        # Get scaled coordinates (assumes orthogonal simulation box)
+        scaled_coords=np.zeros(np.shape(configuration_copy))
+        for i in range(n_particles):
+            for j in range(n_timesteps):
+                for k in range(n_dimensions):
+                    scaled_coords[i,j,k]=configuration_copy[i,j,k]/box_size_tensors[j,k,k]
+
+        # # Transform particle trajectories (configuration array) to Cartesian coordinates at each time step
+
+        logger.information(str(time.time()-start_time) + " s")
+
+        logger.information("Calculating velocities...")
+        start_time=time.time()
+
+        # Initialise velocity arrray. Note that the first dimension is 2 elements shorter than the coordinate array.
+        # Use finite difference methods to evaluate the time-derivative to 1st order
+        # Shape: (# of particles) x (timesteps-2) x (# of spatial dimensions)
+
+        velocities=np.zeros((n_particles,n_timesteps-1,n_dimensions))
+        v1=scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:]-np.round(scaled_coords[:,1:-1,:]-scaled_coords[:,:-2,:])
+        v2=scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:]-np.round(scaled_coords[:,2:,:]-scaled_coords[:,1:-1,:])
+        velocities[:,:-1,:]=(v1+v2)/2.
+
+        # Transform velocities (configuration array) back to Cartesian coordinates at each time step
+        velocities=np.array([[np.dot(box_size_tensors[j+1],np.transpose(velocities[i,j]))
+                              for j in range(n_timesteps-1)] for i in range(n_particles)])
+        logger.information(str(time.time()-start_time) + " s")
+
+        logger.information("Calculating velocity cross-correlations (resource intensive calculation)...")
+        start_time=time.time()
+        correlation_length=n_timesteps-1
+        correlations=np.zeros((n_species,n_species,correlation_length))
+        # Array for counting particle pairings
+        correlation_count=np.zeros((n_species,n_species))
+
+        # Compute cross-correlations for each pair of particles in each spatial coordinate
+        for i in range(n_particles):
+            for j in range(i+1,n_particles):
+                # Retrieve particle indices from the 'particles' dictionary and
+                # determine the relevant position in the 'correlations' matrices
+                k=elements.index(atoms_to_species[i])
+                l=elements.index(atoms_to_species[j])
+                # Check for the order of elements (ensures upper triangular matrix form & consistent order of operations)
+                if k<=l:
+                    correlation_temp=self.cross_correlation(velocities[i],velocities[j])
+                    correlations[k,l]+=correlation_temp
+                    correlation_count[k,l]+=1
+                else:
+                    correlation_temp=self.cross_correlation(velocities[j],velocities[i])
+                    correlations[l,k]+=correlation_temp
+                    correlation_count[l,k]+=1
+
+        logger.information(str(time.time()-start_time) + " s")
+
+        return correlations,correlation_count
+
+    def _species_correlations(self,configuration,box_size,atoms_to_species,elements):
+        # Correlates the summed velocities of each species, which gives the sum of the pair correlations
+        n_species=len(elements)
+        n_particles=len(atoms_to_species)
+        n_timesteps=int(configuration.shape[0])
+        chunk_size=self.getProperty("ChunkSize").value
+
+        logger.information("Calculating velocities...")
+        start_time=time.time()
+        velocities=trajectoryhelper.velocities(configuration,box_size,chunk_size)
+        logger.information(str(time.time()-start_time) + " s")
+
+        logger.information("Calculating velocity cross-correlations...")
+        start_time=time.time()
+        correlation_length=n_timesteps-1
+        nfft=trajectoryhelper.fft_length(correlation_length)
+        species=[elements.index(atoms_to_species[i]) for i in range(n_particles)]
+        # Transform blocks of particles taking about as much memory as a block of velocities
+        particle_chunk=max(1,chunk_size*n_particles//nfft)
+        spectra,correlation_count=trajectoryhelper.species_cross_spectra(velocities,species,n_species,nfft,particle_chunk)
+        correlations=np.zeros((n_species,n_species,correlation_length))
+        for i in range(n_species):
+            for j in range(i,n_species):
+                correlations[i,j]=trajectoryhelper.correlation(spectra[i,j],correlation_length,nfft)
+        logger.information(str(time.time()-start_time) + " s")
+
+        return correlations,correlation_count
+
     def cross_correlation(self,u,v):
         # Returns cross-correlation of two 3-vectors
         n=np.shape(v)[0]
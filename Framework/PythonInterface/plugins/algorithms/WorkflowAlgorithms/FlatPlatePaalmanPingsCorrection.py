@@ -38,6 +38,7 @@ class FlatPlatePaalmanPingsCorrection(PythonAlgorithm):
     _angles = list()
     _waves = list()
     _interpolate = None
+    _vectorised = True
 
     # ------------------------------------------------------------------------------
 
@@ -115,6 +116,10 @@ class FlatPlatePaalmanPingsCorrection(PythonAlgorithm):
                              doc='Analyser energy (mev). By default will be read from the instrument parameters. '
                                  'Specify manually to override. This is used only in Efixed energy transfer mode.')
 
+        self.declareProperty(name='Vectorised', defaultValue=True,
+                             doc='Calculate the corrections for all angles and wavelengths in one array operation. '
+                                 'If false each angle is calculated in turn.')
+
         self.declareProperty(WorkspaceGroupProperty('OutputWorkspace', '',
                                                     direction=Direction.Output),
                              doc='The output corrections workspace group')
@@ -169,26 +174,32 @@ class FlatPlatePaalmanPingsCorrection(PythonAlgorithm):
                                                    self._can_density_type,
                                                    self._can_density)
 
-        # Holders for the corrected data
-        data_ass = []
-        data_assc = []
-        data_acsc = []
-        data_acc = []
-
         self._get_angles()
         num_angles = len(self._angles)
-        workflow_prog = Progress(self, start=0.2, end=0.8, nreports=num_angles * 2)
-        for angle_idx in range(num_angles):
-            workflow_prog.report('Running flat correction for angle %s' % angle_idx)
-            angle = self._angles[angle_idx]
-            (ass, assc, acsc, acc) = self._flat_abs(angle)
-
-            logger.information('Angle %d: %f successful' % (angle_idx + 1, self._angles[angle_idx]))
-            workflow_prog.report('Appending data for angle %s' % angle_idx)
-            data_ass = np.append(data_ass, ass)
-            data_assc = np.append(data_assc, assc)
-            data_acsc = np.append(data_acsc, acsc)
-            data_acc = np.append(data_acc, acc)
+        if self._vectorised:
+            workflow_prog = Progress(self, start=0.2, end=0.8, nreports=1)
+            workflow_prog.report('Running flat correction for all angles')
+            data_ass, data_assc, data_acsc, data_acc = \
+                [factor.ravel() for factor in self._flat_abs_all_angles()]
+        else:
+            # Holders for the corrected data
+            data_ass = []
+            data_assc = []
+            data_acsc = []
+            data_acc = []
+
+            workflow_prog = Progress(self, start=0.2, end=0.8, nreports=num_angles * 2)
+            for angle_idx in range(num_angles):
+                workflow_prog.report('Running flat correction for angle %s' % angle_idx)
+                angle = self._angles[angle_idx]
+                (ass, assc, acsc, acc) = self._flat_abs(angle)
+
+                logger.information('Angle %d: %f successful' % (angle_idx + 1, self._angles[angle_idx]))
+                workflow_prog.report('Appending data for angle %s' % angle_idx)
+                data_ass = np.append(data_ass, ass)
+                data_assc = np.append(data_assc, assc)
+                data_acsc = np.append(data_acsc, acsc)
+                data_acc = np.append(data_acc, acc)
 
         log_prog = Progress(self, start=0.8, end=1.0, nreports=8)
 
@@ -289,6 +300,7 @@ class FlatPlatePaalmanPingsCorrection(PythonAlgorithm):
 
         self._number_wavelengths = self.getProperty('NumberWavelengths').value
         self._interpolate = self.getProperty('Interpolate').value
+        self._vectorised = self.getProperty('Vectorised').value
 
         self._emode = self.getPropertyValue('Emode')
         self._efixed = self.getProperty('Efixed').value
@@ -497,6 +509,79 @@ class FlatPlatePaalmanPingsCorrection(PythonAlgorithm):
 
     # ------------------------------------------------------------------------------
 
+    def _flat_abs_all_angles(self):
+        """
+        Calculates the flat plate absorption factors, see _flat_abs, for every detector
+        angle and wavelength at once.
+
+        @return ass, assc, acsc, acc each with shape (angles, wavelengths)
+        """
+        PICONV = math.pi / 180.0
+
+        # tsec is the angle the scattered beam makes with the normal to the sample surface.
+        tsec = np.array(self._angles)[:, np.newaxis] - self._sample_angle
+        # Calculation is unreliable when tsec is close to 90 degrees so default to 1
+        unreliable = np.abs(np.abs(tsec) - 90.0) < 0.1
+
+        sec1 = 1.0 / math.cos(self._sample_angle * PICONV)
+        waves = np.array(self._waves)[np.newaxis, :]
+        ones = np.ones((tsec.shape[0], waves.shape[1]))
+
+        sam_material = mtd[self._sample_ws_name].sample().getMaterial()
+        sample_x_section = (sam_material.totalScatterXSection() +
+                            sam_material.absorbXSection() * waves / 1.8) * self._sample_density
+
+        with np.errstate(all='ignore'):
+            sec2 = 1.0 / np.cos(tsec * PICONV)
+            backscatter = sec2 < 0.0
+
+            fs = self._fact_array(sample_x_section, self._sample_thickness, sec1, sec2)
+            sample_sect_1, sample_sect_2 = self._calc_thickness_at_x_sect(sample_x_section,
+                                                                          self._sample_thickness, [sec1, sec2])
+            ass = np.where(backscatter, fs, np.exp(-sample_sect_2) * fs) / self._sample_thickness
+
+            assc, acsc, acc = ones, ones, ones
+            if self._use_can:
+                can_material = mtd[self._can_ws_name].sample().getMaterial()
+                can_x_section = (can_material.totalScatterXSection() +
+                                 can_material.absorbXSection() * waves / 1.8) * self._can_density
+
+                f1 = self._fact_array(can_x_section, self._can_front_thickness, sec1, sec2)
+                f2 = self._fact_array(can_x_section, self._can_back_thickness, sec1, sec2)
+                can_thick_1_sect_1, can_thick_1_sect_2 = \
+                    self._calc_thickness_at_x_sect(can_x_section, self._can_front_thickness, [sec1, sec2])
+                _, can_thick_2_sect_2 = self._calc_thickness_at_x_sect(can_x_section, self._can_back_thickness,
+                                                                       [sec1, sec2])
+
+                val = np.where(backscatter, np.exp(-(can_thick_1_sect_1 - can_thick_1_sect_2)),
+                               np.exp(-(can_thick_1_sect_1 + can_thick_2_sect_2)))
+                assc = ass * val
+
+                acc1 = np.where(backscatter, f1, f1 * np.exp(-(can_thick_1_sect_2 + can_thick_2_sect_2)))
+                acc2 = f2 * val
+                acsc1 = np.where(backscatter, acc1, acc1 * np.exp(-sample_sect_2))
+                acsc2 = np.where(backscatter, acc2 * np.exp(-(sample_sect_1 - sample_sect_2)),
+                                 acc2 * np.exp(-sample_sect_1))
+
+                can_thickness = self._can_front_thickness + self._can_back_thickness
+                if can_thickness > 0.0:
+                    acc = (acc1 + acc2) / can_thickness
+                    acsc = (acsc1 + acsc2) / can_thickness
+
+        return tuple(np.where(unreliable, 1.0, factor * ones) for factor in (ass, assc, acsc, acc))
+
+    # ------------------------------------------------------------------------------
+
+    def _fact_array(self, x_section, thickness, sec1, sec2):
+        """
+        Array form of _fact where the arguments are broadcast together
+        """
+        S = x_section * thickness * (sec1 - sec2)
+        with np.errstate(all='ignore'):
+            return np.where(S == 0.0, thickness, thickness * (1 - np.exp(-S)) / S)
+
+    # ------------------------------------------------------------------------------
+
     def _fact(self, x_section, thickness, sec1, sec2):
         S = x_section * thickness * (sec1 - sec2)
         F = 1.0
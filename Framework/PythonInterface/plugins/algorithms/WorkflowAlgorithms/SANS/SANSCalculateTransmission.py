@@ -334,7 +334,6 @@ class SANSCalculateTransmission(DataProcessorAlgorithm):
         state_property_manager = self.getProperty("SANSState").value
         try:
             state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-            state.property_manager = state_property_manager
             state.validate()
         except ValueError as err:
             errors.update({"SANSCalculateTransmission": str(err)})
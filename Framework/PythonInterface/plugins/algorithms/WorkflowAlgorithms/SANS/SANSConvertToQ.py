@@ -236,7 +236,6 @@ class SANSConvertToQ(DataProcessorAlgorithm):
         state_property_manager = self.getProperty("SANSState").value
         try:
             state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-            state.property_manager = state_property_manager
             state.validate()
         except ValueError as err:
             errors.update({"SANSSConvertToQ": str(err)})
@@ -62,7 +62,6 @@ class SANSConvertToWavelength(DataProcessorAlgorithm):
         state_property_manager = self.getProperty("SANSState").value
         try:
             state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-            state.property_manager = state_property_manager
             state.validate()
         except ValueError as err:
             errors.update({"SANSSMove": str(err)})
@@ -12,7 +12,7 @@ from mantid.api import (DataProcessorAlgorithm, MatrixWorkspaceProperty, Algorit
 from sans.common.constants import EMPTY_NAME
 from sans.common.enums import (DataType, DetectorType)
 from sans.common.general_functions import create_unmanaged_algorithm
-from sans.state.state_base import create_deserialized_sans_state_from_property_manager
+from sans.state.state_base import (create_deserialized_sans_state_from_property_manager, convert_state_to_compact_dict)
 
 
 class SANSCreateAdjustmentWorkspaces(DataProcessorAlgorithm):
@@ -132,7 +132,7 @@ class SANSCreateAdjustmentWorkspaces(DataProcessorAlgorithm):
         component = self.getProperty("Component").value
 
         wave_pixel_adjustment_name = "SANSCreateWavelengthAndPixelAdjustment"
-        serialized_state = state.property_manager
+        serialized_state = convert_state_to_compact_dict(state)
         wave_pixel_adjustment_options = {"SANSState": serialized_state,
                                          "NormalizeToMonitorWorkspace": monitor_normalization_workspace,
                                          "OutputWorkspaceWavelengthAdjustment": EMPTY_NAME,
@@ -159,7 +159,7 @@ class SANSCreateAdjustmentWorkspaces(DataProcessorAlgorithm):
         scale_factor = self.getProperty("SliceEventFactor").value
 
         normalize_name = "SANSNormalizeToMonitor"
-        serialized_state = state.property_manager
+        serialized_state = convert_state_to_compact_dict(state)
         normalize_option = {"InputWorkspace": monitor_workspace,
                             "OutputWorkspace": EMPTY_NAME,
                             "SANSState": serialized_state,
@@ -183,7 +183,7 @@ class SANSCreateAdjustmentWorkspaces(DataProcessorAlgorithm):
         if transmission_workspace and direct_workspace:
             data_type = self.getProperty("DataType").value
             transmission_name = "SANSCalculateTransmission"
-            serialized_state = state.property_manager
+            serialized_state = convert_state_to_compact_dict(state)
             transmission_options = {"TransmissionWorkspace": transmission_workspace,
                                     "DirectWorkspace": direct_workspace,
                                     "SANSState": serialized_state,
@@ -219,7 +219,6 @@ class SANSCreateAdjustmentWorkspaces(DataProcessorAlgorithm):
         state_property_manager = self.getProperty("SANSState").value
         try:
             state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-            state.property_manager = state_property_manager
             state.validate()
         except ValueError as err:
             errors.update({"SANSCreateAdjustmentWorkspaces": str(err)})
@@ -8,7 +8,7 @@ from mantid.kernel import (Direction, PropertyManagerProperty, FloatArrayPropert
 from mantid.api import (DataProcessorAlgorithm, MatrixWorkspaceProperty, AlgorithmFactory, PropertyMode, Progress,
                         WorkspaceProperty)
 
-from sans.state.state_base import create_deserialized_sans_state_from_property_manager
+from sans.state.state_base import (create_deserialized_sans_state_from_property_manager, convert_state_to_compact_dict)
 from sans.common.enums import SANSDataType
 from sans.common.general_functions import create_child_algorithm
 from sans.algorithm_detail.load_data import SANSLoadDataFactory
@@ -35,6 +35,11 @@ class SANSLoad(DataProcessorAlgorithm):
         self.declareProperty("UseCached", True, direction=Direction.Input,
                              doc="Checks if there are loaded files available. If they are, those files are used.")
 
+        self.declareProperty("UseLoadCache", False, direction=Direction.Input,
+                             doc="Uses the load cache of the current batch reduction. Files which are in the load "
+                                 "cache are not loaded again and loaded files are added to it. The load cache is not "
+                                 "used if the workspaces are moved.")
+
         self.declareProperty("MoveWorkspace", defaultValue=False, direction=Direction.Input,
                              doc="Move the workspace according to the SANSState setting. This might be useful"
                              "for manual inspection.")
@@ -125,6 +130,9 @@ class SANSLoad(DataProcessorAlgorithm):
         # return property and it is also something which is most likely not to change between different reductions.
         use_cached = self.getProperty("UseCached").value
         publish_to_ads = self.getProperty("PublishToCache").value
+        # The data in the load cache is shared by several reductions, hence it must not be moved
+        move_workspaces = self.getProperty("MoveWorkspace").value
+        use_load_cache = self.getProperty("UseLoadCache").value and not move_workspaces
 
         data = state.data
         progress = self._get_progress_for_file_loading(data)
@@ -135,12 +143,11 @@ class SANSLoad(DataProcessorAlgorithm):
 
         workspaces, workspace_monitors = loader.execute(data_info=data, use_cached=use_cached,
                                                         publish_to_ads=publish_to_ads, progress=progress,
-                                                        parent_alg=self)
+                                                        parent_alg=self, use_load_cache=use_load_cache)
         progress.report("Loaded the data.")
 
         # Check if a move has been requested and perform it. This can be useful if scientists want to load the data and
         # have it moved in order to inspect it with other tools
-        move_workspaces = self.getProperty("MoveWorkspace").value
         if move_workspaces:
             progress_move = Progress(self, start=0.8, end=1.0, nreports=2)
             progress_move.report("Starting to move the workspaces.")
@@ -161,7 +168,6 @@ class SANSLoad(DataProcessorAlgorithm):
         state_property_manager = self.getProperty("SANSState").value
         try:
             state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-            state.property_manager = state_property_manager
             state.validate()
         except ValueError as err:
             errors.update({"SANSState": str(err)})
@@ -329,7 +335,7 @@ class SANSLoad(DataProcessorAlgorithm):
 
     def _perform_initial_move(self, workspaces, state):
         move_name = "SANSMove"
-        state_dict = state.property_manager
+        state_dict = convert_state_to_compact_dict(state)
         move_options = {"SANSState": state_dict,
                         "MoveType": "InitialMove"}
 
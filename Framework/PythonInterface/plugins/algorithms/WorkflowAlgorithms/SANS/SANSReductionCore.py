@@ -7,7 +7,7 @@ from mantid.kernel import (Direction, PropertyManagerProperty, StringListValidat
 from mantid.api import (DataProcessorAlgorithm, MatrixWorkspaceProperty, AlgorithmFactory, PropertyMode,
                         IEventWorkspace, Progress)
 
-from sans.state.state_base import create_deserialized_sans_state_from_property_manager
+from sans.state.state_base import (create_deserialized_sans_state_from_property_manager, convert_state_to_compact_dict)
 from sans.common.constants import EMPTY_NAME
 from sans.common.general_functions import (create_child_algorithm, append_to_sans_file_tag)
 from sans.common.enums import (DetectorType, DataType)
@@ -82,7 +82,7 @@ class SANSReductionCore(DataProcessorAlgorithm):
     def PyExec(self):
         # Get the input
         state = self._get_state()
-        state_serialized = state.property_manager
+        state_serialized = convert_state_to_compact_dict(state)
         component_as_string = self.getProperty("Component").value
         progress = self._get_progress()
 
@@ -385,7 +385,6 @@ class SANSReductionCore(DataProcessorAlgorithm):
     def _get_state(self):
         state_property_manager = self.getProperty("SANSState").value
         state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-        state.property_manager = state_property_manager
         return state
 
     def _get_transmission_workspace(self):
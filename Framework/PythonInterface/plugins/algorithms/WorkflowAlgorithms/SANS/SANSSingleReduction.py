@@ -223,7 +223,6 @@ class SANSSingleReduction(DataProcessorAlgorithm):
     def _get_state(self):
         state_property_manager = self.getProperty("SANSState").value
         state = create_deserialized_sans_state_from_property_manager(state_property_manager)
-        state.property_manager = state_property_manager
         return state
 
     def _get_reduction_mode(self, state):
@@ -0,0 +1,298 @@
+from __future__ import (absolute_import, division, print_function)
+import numpy as np
+
+'''
+This file contains functions which work on whole nMOLDYN trajectories at once
+for algorithms such as VelocityCrossCorrelations and the angular
+auto-correlations. Arrays are kept in the layout of the netCDF file, i.e.
+timesteps x particles x spatial dimensions, so that blocks of timesteps or
+particles can be read straight from the file.
+
+'''
+
+
+def box_tensors(box_size, start=0, stop=None, scale=1.0):
+    '''
+    Returns the simulation box at each timestep as an array of 3x3 tensors,
+    multiplied by scale to change the units. The type of the file is kept.
+    Shape: timesteps x 3 vectors x (# of spatial dimensions)
+    '''
+    return scale*np.asarray(box_size[start:stop]).reshape((-1, 3, 3))
+
+
+def box_lengths(tensors):
+    '''
+    Returns the lengths of the sides of the box at each timestep, arranged to
+    broadcast against arrays of timesteps x particles x spatial dimensions
+    (assumes an orthogonal simulation box).
+    '''
+    return np.diagonal(tensors, axis1=1, axis2=2)[:, np.newaxis, :]
+
+
+def scaled_coordinates(coordinates, tensors):
+    '''
+    Scales the coordinates by the box lengths at each timestep.
+    '''
+    return (np.asarray(coordinates) / box_lengths(tensors)).astype(np.float64)
+
+
+def cartesian(vectors, tensors):
+    '''
+    Transforms vectors in scaled coordinates to Cartesian coordinates
+    using the box at each timestep.
+    '''
+    return np.einsum('tab,tnb->tna', tensors, vectors)
+
+
+def minimum_image(differences):
+    '''
+    Returns the minimum image of differences in scaled coordinates.
+    '''
+    return differences - np.round(differences)
+
+
+def minimum_image_vectors(vectors, tensors):
+    '''
+    Returns the minimum image of vectors in Cartesian coordinates.
+    '''
+    lengths = box_lengths(tensors)
+    return minimum_image(vectors / lengths) * lengths
+
+
+def normalise(vectors):
+    '''
+    Returns the vectors, along the last axis, divided by their lengths.
+    '''
+    return vectors / np.sqrt(np.sum(vectors * vectors, axis=-1))[..., np.newaxis]
+
+
+def average_positions(configuration, tensors, groups):
+    '''
+    Returns the average Cartesian position of each group of particles at each
+    timestep. Only the particles in the groups are read from the configuration.
+    Shape: timesteps x (# of groups) x (# of spatial dimensions)
+
+    @param configuration :: the coordinate array of the trajectory
+    @param tensors :: the box at each timestep, see box_tensors
+    @param groups :: a list with the indices of the particles in each group
+    '''
+    counts = np.array([len(group) for group in groups])
+    particles = [index for group in groups for index in group]
+    positions = cartesian(configuration[:, particles], tensors).astype(np.float64)
+    # Groups without any particles are left as NaN
+    sums = np.full((positions.shape[0], len(groups), positions.shape[2]), np.nan)
+    occupied = counts > 0
+    if occupied.any():
+        starts = np.cumsum(counts) - counts
+        sums[:, occupied] = np.add.reduceat(positions, starts[occupied], axis=1)
+    return sums / counts[:, np.newaxis]
+
+
+def velocity_block(configuration, box_size, start, stop):
+    '''
+    Calculates the velocity of every particle with a centred finite difference
+    that unwraps the periodic boundaries, for the timesteps start to stop-1.
+    The velocities are returned in Cartesian coordinates and, like the original
+    nMOLDYN analysis, the velocity in the last of the timesteps-1 entries is zero.
+    Shape: (stop-start) x (# of particles) x (# of spatial dimensions)
+
+    @param configuration :: the coordinate array of the trajectory
+    @param box_size :: the box size array of the trajectory
+    @param start :: the first timestep
+    @param stop :: one past the last timestep, at most timesteps-1
+    '''
+    n_timesteps = configuration.shape[0]
+    result = np.zeros((stop - start,) + configuration.shape[1:])
+    last = min(stop, n_timesteps - 2)
+    if last > start:
+        # Two extra timesteps are needed for the differences at the end of the block
+        tensors = box_tensors(box_size, start, last + 2)
+        scaled = scaled_coordinates(configuration[start:last + 2], tensors)
+        steps = minimum_image(np.diff(scaled, axis=0))
+        result[:last - start] = cartesian((steps[:-1] + steps[1:]) / 2.0, tensors[1:-1])
+    return result
+
+
+def velocities(configuration, box_size, chunk_size):
+    '''
+    Calculates the velocities of every particle for the whole trajectory, see
+    velocity_block. Shape: (timesteps-1) x (# of particles) x (# of spatial dimensions)
+
+    @param configuration :: the coordinate array of the trajectory
+    @param box_size :: the box size array of the trajectory
+    @param chunk_size :: the number of timesteps transformed at a time
+    '''
+    n_velocities = configuration.shape[0] - 1
+    result = np.zeros((n_velocities,) + configuration.shape[1:])
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, n_velocities, chunk_size):
+        stop = min(start + chunk_size, n_velocities)
+        result[start:stop] = velocity_block(configuration, box_size, start, stop)
+    return result
+
+
+def fft_length(n):
+    '''
+    Returns the length of the transforms used to correlate signals of length n,
+    long enough that the circular correlation does not wrap around.
+    '''
+    return 1 << int(2 * n - 2).bit_length()
+
+
+def correlation_norm(n, symmetric=False):
+    '''
+    Returns the number of overlapping terms used to normalise a correlation
+    of length n. Unless symmetric the negative lags of odd lengths are offset by
+    a half, as in the original nMOLDYN analyses of velocities.
+    '''
+    norm = np.arange(np.ceil(n / 2.0), n + 1)
+    centre = n // 2 if symmetric else n / 2
+    return np.append(norm, (np.arange(centre + 1, n)[::-1]))
+
+
+def spectra(signals, nfft):
+    '''
+    Returns the Fourier transforms of signals along the time (first) axis,
+    zero padded to nfft points.
+    '''
+    return np.fft.rfft(signals, n=nfft, axis=0)
+
+
+def power_spectrum(signals, nfft):
+    '''
+    Returns the sum of the power spectra of the signals, i.e. the spectrum of
+    the sum of their auto-correlations.
+
+    @param signals :: the signals. Shape: timesteps x signals x dimensions
+    @param nfft :: the length of the transforms, see fft_length
+    '''
+    transforms = spectra(signals, nfft)
+    return np.sum((transforms.real ** 2 + transforms.imag ** 2).reshape((transforms.shape[0], -1)), axis=1)
+
+
+def correlation(spectrum, n, nfft, norm=None):
+    '''
+    Transforms the cross spectrum of two signals of length n back to the
+    normalised correlation with the same lags as numpy.correlate(u, v, "same").
+    The default norm is correlation_norm(n).
+    '''
+    if norm is None:
+        norm = correlation_norm(n)
+    circular = np.fft.irfft(spectrum, n=nfft)
+    lags = np.arange(n) - n // 2
+    return circular[lags % nfft] / norm
+
+
+def species_cross_spectra(signals, species, n_species, nfft, chunk_size):
+    '''
+    Accumulates the cross spectra of every pair of particles, summed over the
+    spatial dimensions and grouped by the particles' species. Each pair of
+    particles i<j contributes the spectrum of correlate(v_i, v_j) to the entry
+    of their species, ordered so that the first index is not larger than the second.
+    As a correlation is linear in each signal the sum over pairs of different
+    species is the correlation of the summed signals and the sum over pairs of
+    the same species uses a running sum, so the cost is linear in the number of
+    particles rather than quadratic.
+
+    @param signals :: the signals of each particle. Shape: timesteps x particles x dimensions
+    @param species :: the index of the species of each particle
+    @param n_species :: the number of species
+    @param nfft :: the length of the transforms, see fft_length
+    @param chunk_size :: the number of particles transformed at a time
+    @returns the spectra (n_species x n_species x frequencies) and the number
+    of pairs contributing to each entry
+    '''
+    species = np.asarray(species)
+    n_particles, n_dimensions = signals.shape[1:]
+    n_frequencies = nfft // 2 + 1
+    totals = np.zeros((n_species, n_frequencies, n_dimensions), dtype=np.complex128)
+    same_species = np.zeros((n_species, n_frequencies), dtype=np.complex128)
+
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, n_particles, chunk_size):
+        chunk = spectra(signals[:, start:start + chunk_size], nfft)
+        chunk_species = species[start:start + chunk_size]
+        for k in np.unique(chunk_species):
+            members = chunk[:, chunk_species == k]
+            # Sum of the spectra of the particles of this species with a lower index
+            preceding = np.cumsum(members, axis=1) - members + totals[k, :, np.newaxis, :]
+            same_species[k] += np.einsum('fpd,fpd->f', preceding, members.conj())
+            totals[k] += members.sum(axis=1)
+
+    cross_spectra = np.zeros((n_species, n_species, n_frequencies), dtype=np.complex128)
+    counts = np.zeros((n_species, n_species))
+    n_members = np.bincount(species, minlength=n_species)
+    for k in range(n_species):
+        cross_spectra[k, k] = same_species[k]
+        counts[k, k] = n_members[k] * (n_members[k] - 1) / 2
+        for l in range(k + 1, n_species):
+            cross_spectra[k, l] = np.einsum('fd,fd->f', totals[k], totals[l].conj())
+            counts[k, l] = n_members[k] * n_members[l]
+    return cross_spectra, counts
+
+
+def blocked_autocorrelations(read_block, n, species, n_species, block_size):
+    '''
+    Accumulates the auto-correlation of each signal of length n, summed over the
+    spatial dimensions and over the signals of each species, for the lags 0 to n//2.
+    Only two blocks of block_size timesteps are held in memory at a time: the
+    correlation is split into the cross-correlations of every pair of blocks
+    within n//2 timesteps of each other, which are added to the lags they
+    overlap. Blocks are read again for each earlier block they are paired with.
+
+    @param read_block :: a function returning the signals for the timesteps start
+    to stop-1, called as read_block(start, stop). Shape: timesteps x signals x dimensions
+    @param n :: the length of the signals
+    @param species :: the index of the species of each signal
+    @param n_species :: the number of species
+    @param block_size :: the number of timesteps in each block
+    @returns the summed correlations. Shape: n_species x (n//2+1)
+    '''
+    max_lag = n // 2
+    block_size = max(1, min(int(block_size), n))
+    nfft = fft_length(block_size)
+    membership = np.zeros((len(species), n_species))
+    membership[np.arange(len(species)), species] = 1.0
+    # Offsets within a pair of blocks and the indices of the circular correlation they are stored at
+    offsets = np.arange(-(block_size - 1), block_size)
+    circular_indices = offsets % nfft
+
+    correlations = np.zeros((n_species, max_lag + 1))
+    starts = range(0, n, block_size)
+    for first_index, first_start in enumerate(starts):
+        first = spectra(read_block(first_start, min(first_start + block_size, n)), nfft)
+        for second_start in starts[first_index:]:
+            separation = second_start - first_start
+            if separation - (block_size - 1) > max_lag:
+                break
+            if separation == 0:
+                second = first
+            else:
+                second = spectra(read_block(second_start, min(second_start + block_size, n)), nfft)
+            cross = np.dot(np.sum(second * first.conj(), axis=2), membership)
+            circular = np.fft.irfft(cross, n=nfft, axis=0)
+            lags = separation + offsets
+            overlap = (lags >= 0) & (lags <= max_lag)
+            correlations[:, lags[overlap]] += circular[circular_indices[overlap]].T
+    return correlations
+
+
+def symmetric_correlation(lag_correlations, n, norm=None):
+    '''
+    Returns the normalised auto-correlation of signals of length n, with the same
+    lags as numpy.correlate(u, u, "same"), from its values for the lags 0 to n//2.
+    The default norm is correlation_norm(n).
+    '''
+    if norm is None:
+        norm = correlation_norm(n)
+    lags = np.abs(np.arange(n) - n // 2)
+    return lag_correlations[..., lags] / norm
+
+
+def fold_correlation(w):
+    '''
+    Folds an array with symmetrical values into half by averaging values around the centre
+    '''
+    right_half = w[len(w) // 2:]
+    left_half = w[:int(np.ceil(len(w) / 2.0))][::-1]
+    return (left_half + right_half) / 2.0
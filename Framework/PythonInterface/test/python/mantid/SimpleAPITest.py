@@ -1,9 +1,10 @@
 from __future__ import (absolute_import, division, print_function)
 
 import unittest
-from mantid.api import (AlgorithmFactory, AlgorithmProxy, IAlgorithm, IEventWorkspace, ITableWorkspace,
-                        PythonAlgorithm, MatrixWorkspace, mtd, WorkspaceGroup)
+from mantid.api import (AlgorithmFactory, AlgorithmManager, AlgorithmProxy, IAlgorithm, IEventWorkspace,
+                        ITableWorkspace, PythonAlgorithm, MatrixWorkspace, mtd, WorkspaceGroup)
 import mantid.simpleapi as simpleapi
+import json
 import numpy
 import six
 
@@ -373,5 +374,45 @@ IgnoreBinErrors(Input) *boolean*       Ignore errors related to zero/negative bi
         # call
         self.assertRaises(RuntimeError, simpleapi_func, Prop1=2.5, Prop2=3.5)
 
+    def test_algorithm_signature_survives_round_trip_through_json(self):
+        alg = AlgorithmManager.createUnmanaged("Rebin")
+        alg.initialize()
+        signature = simpleapi._AlgorithmSignature.from_algorithm(alg)
+        restored = simpleapi._AlgorithmSignature("Rebin", json.loads(json.dumps(signature.to_dict())))
+
+        self.assertEqual(simpleapi._create_generic_signature(alg), restored.signature())
+        self.assertEqual(alg.version(), restored.version())
+        self.assertEqual(list(alg.orderedProperties()), restored.orderedProperties())
+        self.assertEqual("rebin", restored.workspaceMethodName())
+        self.assertEqual(alg.workspaceMethodInputProperty(), restored.workspaceMethodInputProperty())
+        self.assertTrue("Params" in restored)
+
+    def test_signature_index_key_includes_build_libraries(self):
+        import os
+        fingerprint = simpleapi._build_fingerprint()
+        self.assertTrue(os.path.basename(simpleapi._kernel._kernel.__file__) in [entry[0] for entry in fingerprint])
+        algs = {"Rebin": [1]}
+        self.assertEqual(simpleapi._signature_index_key(algs, ""), simpleapi._signature_index_key(algs, ""))
+        self.assertNotEqual(simpleapi._signature_index_key(algs, ""), simpleapi._signature_index_key(algs, "plugins"))
+
+    def test_lazy_function_has_documentation_before_first_call_and_runs_algorithm(self):
+        alg = AlgorithmManager.createUnmanaged("CreateWorkspace")
+        alg.initialize()
+        eager_func = simpleapi._create_algorithm_function("CreateWorkspace", alg.version(), alg)
+        signature = simpleapi._AlgorithmSignature.from_algorithm(alg)
+        lazy_func = simpleapi._create_lazy_algorithm_function("CreateWorkspace", alg.version(), signature)
+        self.assertEqual(eager_func.__name__, lazy_func.__name__)
+        self.assertEqual(eager_func.__doc__, lazy_func.__doc__)
+
+        data = [1.0, 2.0, 3.0]
+        lazy_ws = lazy_func(data, data, NSpec=1, UnitX='Wavelength')
+        self.assertTrue('lazy_ws' in mtd)
+        # The real function has replaced the placeholder
+        self.assertTrue(simpleapi.CreateWorkspace is not lazy_func)
+        self.assertEqual(six.get_function_code(eager_func).co_varnames,
+                         six.get_function_code(simpleapi.CreateWorkspace).co_varnames)
+        self.assertEqual(eager_func.__doc__, simpleapi.CreateWorkspace.__doc__)
+        simpleapi.DeleteWorkspace('lazy_ws')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,55 @@
+from __future__ import (absolute_import, division, print_function)
+
+import unittest
+import os
+import shutil
+import tempfile
+
+from mantid.kernel import cachefile
+
+
+class CacheFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._file = os.path.join(self._dir, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def test_save_json_replaces_existing_file(self):
+        self.assertTrue(cachefile.save_json(self._file, {"a": 1}))
+        self.assertTrue(cachefile.save_json(self._file, {"a": 2}))
+        self.assertEqual(cachefile.load_json(self._file), {"a": 2})
+        self.assertEqual(os.listdir(self._dir), ["cache.json"])
+
+    def test_atomic_write_keeps_existing_file_when_writing_fails(self):
+        cachefile.save_json(self._file, {"a": 1})
+        with self.assertRaises(RuntimeError):
+            with cachefile.atomic_write(self._file) as tmp_file:
+                _write_file(tmp_file, "partial")
+                raise RuntimeError("write failed")
+        self.assertEqual(cachefile.load_json(self._file), {"a": 1})
+        self.assertEqual(os.listdir(self._dir), ["cache.json"])
+
+    def test_temporary_filename_keeps_extension(self):
+        tmp_file = cachefile.temporary_filename(os.path.join(self._dir, "sum.nxs"))
+        self.assertEqual(os.path.splitext(tmp_file)[1], ".nxs")
+        self.assertTrue(str(os.getpid()) in tmp_file)
+
+    def test_file_hash_changes_with_file(self):
+        self.assertTrue(cachefile.file_hash(self._file) is None)
+        _write_file(self._file, "events")
+        first_hash = cachefile.file_hash(self._file)
+        self.assertEqual(first_hash, cachefile.file_hash(self._file))
+        _write_file(self._file, "more events")
+        self.assertNotEqual(first_hash, cachefile.file_hash(self._file))
+
+
+def _write_file(filename, content):
+    with open(filename, "w") as handle:
+        handle.write(content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+from __future__ import (absolute_import, division, print_function)
+
+import unittest
+import os
+import shutil
+import tempfile
+import time
+
+from mantid.kernel.datacache import DataCacheIndex, INDEX_FILENAME, LOCK_FILENAME
+
+CACHE_NAME = "PG3_4844_" + "0" * 40 + ".nxs"
+
+
+class DataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cache_dir = tempfile.mkdtemp()
+        self._source = os.path.join(self._cache_dir, "PG3_4844_event.nxs")
+        _write_file(self._source, "events")
+        self._index = DataCacheIndex(self._cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+
+    def _write_cache_file(self, name=CACHE_NAME, size=10, last_access=None):
+        cache_file = os.path.join(self._cache_dir, name)
+        temporary_file = self._index.temporary_filename(cache_file)
+        _write_file(temporary_file, "x" * size)
+        self._index.commit(temporary_file, cache_file, signature="a=1", sources=[self._source])
+        if last_access is not None:
+            os.utime(cache_file, (last_access, last_access))
+            self._index._update(lambda index: index["entries"][name].update(last_access=last_access))
+        return cache_file
+
+    def test_lookup_counts_hits_and_misses(self):
+        cache_file = os.path.join(self._cache_dir, CACHE_NAME)
+        self.assertFalse(self._index.lookup(cache_file, sources=[self._source]))
+        self._write_cache_file()
+        self.assertTrue(self._index.lookup(cache_file, sources=[self._source]))
+
+        stats = self._index.statistics()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], 10)
+        self.assertFalse(os.path.exists(self._index.temporary_filename(cache_file)))
+        self.assertFalse(os.path.exists(os.path.join(self._cache_dir, LOCK_FILENAME)))
+
+    def test_lookup_removes_cache_file_when_source_has_changed(self):
+        cache_file = self._write_cache_file()
+        _write_file(self._source, "more events")
+
+        self.assertFalse(self._index.lookup(cache_file, sources=[self._source]))
+        self.assertFalse(os.path.exists(cache_file))
+        self.assertEqual(self._index.statistics()["entries"], 0)
+
+    def test_lookup_adds_existing_cache_file_to_index(self):
+        cache_file = os.path.join(self._cache_dir, CACHE_NAME)
+        _write_file(cache_file, "x" * 5)
+
+        self.assertTrue(self._index.lookup(cache_file))
+        self.assertEqual(self._index.statistics()["size"], 5)
+
+    def test_evict_removes_least_recently_used_files_above_size(self):
+        now = time.time()
+        oldest = self._write_cache_file("a" * 40 + ".nxs", last_access=now - 30)
+        older = self._write_cache_file("b" * 40 + ".nxs", last_access=now - 20)
+        newest = self._write_cache_file("c" * 40 + ".nxs", last_access=now - 10)
+
+        removed = self._index.evict(max_size=15)
+
+        self.assertEqual(removed, [oldest, older])
+        self.assertTrue(os.path.exists(newest))
+        self.assertTrue(os.path.exists(self._source))
+        stats = self._index.statistics()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["evictions"], 2)
+
+    def test_evict_removes_old_and_stale_files(self):
+        now = time.time()
+        old = self._write_cache_file("a" * 40 + ".nxs", last_access=now - 100)
+        new = self._write_cache_file("b" * 40 + ".nxs")
+        unindexed = os.path.join(self._cache_dir, "c" * 40 + ".nxs")
+        _write_file(unindexed, "x")
+        os.utime(unindexed, (now - 100, now - 100))
+
+        self.assertEqual(sorted(self._index.evict(max_age=50)), sorted([old, unindexed]))
+        self.assertTrue(os.path.exists(new))
+
+        _write_file(self._source, "more events")
+        self.assertEqual(self._index.evict(), [new])
+
+    def test_remove_temporary_files_removes_stale_files_only(self):
+        cache_file = os.path.join(self._cache_dir, CACHE_NAME)
+        stale = self._index.temporary_filename(cache_file).replace(str(os.getpid()), "1")
+        current = self._index.temporary_filename(cache_file)
+        _write_file(stale, "x")
+        _write_file(current, "x")
+        os.utime(stale, (time.time() - 100, time.time() - 100))
+
+        self.assertEqual(self._index.remove_temporary_files(max_age=50), [stale])
+        self.assertTrue(os.path.exists(current))
+        self.assertTrue(os.path.exists(self._source))
+
+    def test_corrupt_index_is_replaced(self):
+        _write_file(os.path.join(self._cache_dir, INDEX_FILENAME), "{not json")
+        self.assertEqual(self._index.statistics()["entries"], 0)
+        self._write_cache_file()
+        self.assertEqual(self._index.statistics()["entries"], 1)
+
+
+def _write_file(filename, content):
+    with open(filename, "w") as handle:
+        handle.write(content)
+
+
+if __name__ == '__main__':
+    unittest.main()
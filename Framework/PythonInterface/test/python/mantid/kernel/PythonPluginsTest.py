@@ -36,8 +36,12 @@ class PythonPluginsTest(unittest.TestCase):
             plugin = open(filename, 'w')
             plugin.write(__TESTALG__)
             plugin.close()
+        # Keep the cache of the plugin files away from the user's properties directory
+        self._user_plugin_cache = plugins._plugin_cache
+        plugins._plugin_cache = plugins.PluginCache(os.path.join(self._testdir, 'python_plugins_cache.json'))
 
     def tearDown(self):
+        plugins._plugin_cache = self._user_plugin_cache
         try:
             shutil.rmtree(self._testdir)
         except shutil.Error:
@@ -60,6 +64,59 @@ class PythonPluginsTest(unittest.TestCase):
         except RuntimeError as exc:
             self.fail("Failed to create plugin algorithm from the manager: '%s' " %s)
 
+    def test_loading_with_threads_records_import_time(self):
+        loaded = plugins.load(self._testdir, nthreads=2)
+        self.assertTrue(len(loaded) > 0)
+        filename = os.path.join(self._testdir, 'TestPyAlg.py')
+        self.assertTrue(filename in plugins.get_import_times())
+
+    def test_deferred_plugin_is_imported_when_algorithm_is_created(self):
+        filename = os.path.join(self._testdir, 'TestPyAlg.py')
+        # The first import records the manifest
+        plugins.load(filename)
+        manifest = plugins.get_plugin_cache().manifest(filename)
+        self.assertEquals(1, len(manifest))
+        self.assertEquals("TestPyAlg", manifest[0]["name"])
+        self.assertEquals(1, manifest[0]["version"])
+
+        del sys.modules['TestPyAlg']
+        self.assertTrue(plugins.subscribe_deferred(filename))
+        # Descriptor queries are answered by the stand-in without importing the file
+        test_alg = AlgorithmManager.createUnmanaged('TestPyAlg')
+        self.assertEquals('TestPyAlg', test_alg.name())
+        self.assertEquals(manifest[0]["category"], test_alg.category())
+        self.assertEquals(manifest[0]["alias"], test_alg.alias())
+        self.assertFalse('TestPyAlg' in sys.modules)
+
+        test_alg.initialize()
+        self.assertTrue('TestPyAlg' in sys.modules)
+        self.assertEquals('TestPyAlg', test_alg.name())
+        self.assertTrue(test_alg.isInitialized())
+        self.assertEquals(sys.modules['TestPyAlg'].TestPyAlg, type(test_alg))
+
+    def test_plugin_cache_reports_algorithm_and_fingerprint_changes_with_content(self):
+        filename = os.path.join(self._testdir, 'TestPyAlg.py')
+        cache = plugins.PluginCache()
+        self.assertTrue(cache.contains_algorithm(filename))
+        fingerprint = cache.fingerprint([filename])
+        self.assertEquals(fingerprint, cache.fingerprint([filename]))
+
+        with open(filename, 'a') as plugin:
+            plugin.write("# a change to the plugin that alters its size\n")
+        self.assertNotEqual(fingerprint, cache.fingerprint([filename]))
+
+    def test_plugin_cache_is_restored_from_file(self):
+        filename = os.path.join(self._testdir, 'TestPyAlg.py')
+        cache_file = os.path.join(self._testdir, 'plugins_cache.json')
+        cache = plugins.PluginCache(cache_file)
+        fingerprint = cache.fingerprint([filename])
+        cache.save()
+        self.assertTrue(os.path.exists(cache_file))
+
+        restored = plugins.PluginCache(cache_file)
+        self.assertEquals(fingerprint, restored.fingerprint([filename]))
+        self.assertTrue(restored.contains_algorithm(filename))
+
 
 if __name__ == '__main__':
     unittest.main()
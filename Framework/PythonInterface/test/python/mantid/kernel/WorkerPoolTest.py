@@ -0,0 +1,28 @@
+from __future__ import (absolute_import, division, print_function)
+
+import unittest
+import sys
+
+from mantid.kernel import workerpool
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def test_workers_are_not_forked(self):
+        self.assertTrue(workerpool.start_method() in ('forkserver', 'spawn'))
+
+    @unittest.skipIf(not workerpool.can_create_pool(), "Worker processes cannot be started from this process")
+    def test_pool_runs_tasks_and_restores_main_module(self):
+        main_module = sys.modules['__main__']
+        main_file = getattr(main_module, '__file__', None)
+        pool = workerpool.create_pool(2)
+        try:
+            self.assertEqual([1, 2, 3], pool.map(abs, [-1, 2, -3]))
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(main_file, getattr(main_module, '__file__', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 from __future__ import (absolute_import, division, print_function)
 import unittest
+import multiprocessing
 import os
 from mantid.simpleapi import mtd, logger
 import numpy as np
@@ -8,12 +9,6 @@ from mantid.simpleapi import Abins, DeleteWorkspace
 
 from AbinsModules import AbinsParameters, AbinsTestHelpers
 
-try:
-    from pathos.multiprocessing import ProcessingPool
-    PATHOS_FOUND = True
-except ImportError:
-    PATHOS_FOUND = False
-
 def old_modules():
     """" Check if there are proper versions of  Python and numpy."""
     is_python_old = AbinsTestHelpers.old_python()
@@ -71,6 +66,7 @@ class AbinsAdvancedParametersTest(unittest.TestCase):
         AbinsParameters.s_absolute_threshold = 10e-8
         AbinsParameters.optimal_size = 5000000
         AbinsParameters.atoms_threads = 1
+        AbinsParameters.q_threads = 1
 
     def tearDown(self):
         # remove all created files
@@ -281,15 +277,19 @@ class AbinsAdvancedParametersTest(unittest.TestCase):
         self.assertRaises(RuntimeError, Abins, PhononFile=self._Si2 + ".phonon", OutputWorkspace=self._wrk_name)
 
     def test_wrong_atom_threads(self):
-        if PATHOS_FOUND:
-            AbinsParameters.atoms_threads = -1
-            self.assertRaises(RuntimeError, Abins, PhononFile=self._Si2 + ".phonon", OutputWorkspace=self._wrk_name)
+        AbinsParameters.atoms_threads = -1
+        self.assertRaises(RuntimeError, Abins, PhononFile=self._Si2 + ".phonon", OutputWorkspace=self._wrk_name)
 
     def test_wrong_q_threads(self):
-        if PATHOS_FOUND:
-            AbinsParameters.q_threads = -1
-            self.assertRaises(RuntimeError, Abins, PhononFile=self._Si2 + ".phonon",
-                              OutputWorkspace=self._wrk_name)
+        AbinsParameters.q_threads = -1
+        self.assertRaises(RuntimeError, Abins, PhononFile=self._Si2 + ".phonon",
+                          OutputWorkspace=self._wrk_name)
+
+    def test_more_atom_threads_than_cpus(self):
+        # the number of processes is limited to the number of CPUs
+        AbinsParameters.atoms_threads = multiprocessing.cpu_count() + 1
+        Abins(PhononFile=self._Si2 + ".phonon", OutputWorkspace=self._wrk_name)
+        self.assertTrue(mtd.doesExist(self._wrk_name))
 
     def test_good_case(self):
 
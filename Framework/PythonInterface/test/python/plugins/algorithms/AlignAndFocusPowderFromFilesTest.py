@@ -0,0 +1,28 @@
+from __future__ import (absolute_import, division, print_function)
+
+import unittest
+from mantid.kernel import workerpool
+from mantid.simpleapi import mtd, AlignAndFocusPowderFromFiles, CompareWorkspaces, DeleteWorkspace
+
+
+class AlignAndFocusPowderFromFilesTest(unittest.TestCase):
+
+    def tearDown(self):
+        for name in ('in_turn', 'parallel'):
+            if mtd.doesExist(name):
+                DeleteWorkspace(name)
+
+    @unittest.skipIf(not workerpool.can_create_pool(), "Worker processes cannot be started from this process")
+    def test_worker_processes_match_processing_in_turn(self):
+        kwargs = dict(Filename='CNCS_7860_event.nxs,CNCS_7860_event.nxs', Params='40000,1000,60000',
+                      Dspacing=False, PreserveEvents=False)
+        AlignAndFocusPowderFromFiles(OutputWorkspace='in_turn', NumberOfProcesses=1, **kwargs)
+        AlignAndFocusPowderFromFiles(OutputWorkspace='parallel', NumberOfProcesses=2, **kwargs)
+
+        (result, messages) = CompareWorkspaces(Workspace1='parallel', Workspace2='in_turn',
+                                               CheckInstrument=False)
+        self.assertTrue(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
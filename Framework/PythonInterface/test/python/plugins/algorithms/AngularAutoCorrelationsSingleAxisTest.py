@@ -21,5 +21,19 @@ class AngularAutoCorrelationsSingleAxisTest(unittest.TestCase):
         self.assertAlmostEqual(data_y_ft[1], -114.495857198002)
         self.assertAlmostEqual(output_ws.blocksize(), 501)
 
+    def test_chunk_size_does_not_change_result(self):
+        output_ws, output_ws_ft = AngularAutoCorrelationsSingleAxis(InputFile = 'trajectory_methyliodide.nc',
+                                 Timestep = '10.0',
+                                 SpeciesOne = 'C',
+                                 SpeciesTwo = 'I',
+                                 ChunkSize = 3,
+                                 OutputWorkspace = 'output_ws',
+                                 OutputWorkspaceFT = 'output_ws_ft')
+
+        data_y = output_ws.readY(0)
+        self.assertAlmostEqual(data_y[1], 0.998192889883855)
+        data_y_ft = output_ws_ft.readY(0)
+        self.assertAlmostEqual(data_y_ft[1], -114.495857198002)
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
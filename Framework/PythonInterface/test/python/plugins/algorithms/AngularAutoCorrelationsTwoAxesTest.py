@@ -21,5 +21,20 @@ class AngularAutoCorrelationsTwoAxesTest(unittest.TestCase):
         self.assertAlmostEqual(data_y[1],  0.993160180815704)
         self.assertAlmostEqual(output_ws.blocksize(), 501)
 
+    def test_chunk_size_does_not_change_result(self):
+        output_ws, output_ws_ft = AngularAutoCorrelationsTwoAxes(InputFile = 'trajectory_methyliodide.nc',
+                                 Timestep = '10.0',
+                                 SpeciesOne = 'C',
+                                 SpeciesTwo = 'I',
+                                 SpeciesThree = 'H',
+                                 ChunkSize = 3,
+                                 OutputWorkspace = 'output_ws',
+                                 OutputWorkspaceFT = 'output_ws_ft')
+
+        data_y = output_ws.readY(0)
+        self.assertAlmostEqual(data_y[1], 0.998192889883855)
+        data_y = output_ws.readY(1)
+        self.assertAlmostEqual(data_y[1],  0.993160180815704)
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
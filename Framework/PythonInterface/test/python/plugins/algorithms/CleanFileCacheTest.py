@@ -146,6 +146,38 @@ class CleanFileCache(unittest.TestCase):
         return
 
 
+    def test_max_size(self):
+        """CleanFileCache: "max size" parameter removes the least recently used files
+        """
+        cache_root = tempfile.mkdtemp()
+        cache1, _ = CreateCacheFilename(
+            CacheDir = cache_root,
+            OtherProperties = ["A=used"]
+        )
+        cache2, _ = CreateCacheFilename(
+            CacheDir = cache_root,
+            OtherProperties = ["B=unused"],
+        )
+        createFile(cache1, 1)
+        createFile(cache2, 2)
+        non_cache = [os.path.join(cache_root, f) for f in ["normal1.txt", "normal2.dat"]]
+        for p in non_cache: touch(p)
+        # Execute: room for one of the cache files, which are one byte each
+        code = "CleanFileCache(CacheDir = %r, AgeInDays = 10, MaxSizeInGB = %r)" % (cache_root, 1.5/1024**3)
+        code = "from mantid.simpleapi import CleanFileCache; %s" % code
+        cmd = '%s -c "%s"' % (sys.executable, code)
+        if os.system(cmd):
+            raise RuntimeError("Failed to excute %s" % cmd)
+        # Verify ....
+        files_remained = glob.glob(os.path.join(cache_root, '*'))
+        try:
+            self.assertEqual(set(files_remained), set(non_cache+[cache1]))
+        finally:
+            # remove the temporary directory
+            shutil.rmtree(cache_root)
+        return
+
+
 def createFile(f, daysbefore):
     "create a file and set modify time at n=daysbefore days before today"
     touch(f)
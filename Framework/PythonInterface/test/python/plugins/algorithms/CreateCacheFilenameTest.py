@@ -6,7 +6,8 @@ from mantid.kernel import *
 from mantid.api import *
 from testhelpers import run_algorithm
 
-import os, mantid, hashlib
+import os, mantid, hashlib, shutil, tempfile
+from mantid.kernel import datacache
 
 class CreateCacheFilename(unittest.TestCase):
 
@@ -191,6 +192,28 @@ class CreateCacheFilename(unittest.TestCase):
             expected)
         return
 
+    def test_index_lock_held_elsewhere(self):
+        """CreateCacheFilename: a lock of the cache index held by another process is not an error
+        """
+        cache_dir = tempfile.mkdtemp()
+        lock_timeout = datacache.LOCK_TIMEOUT
+        datacache.LOCK_TIMEOUT = 0.1
+        try:
+            open(os.path.join(cache_dir, datacache.LOCK_FILENAME), 'w').close()
+            alg_test = run_algorithm(
+                "CreateCacheFilename",
+                OtherProperties = ["a=1", "b=2"],
+                CacheDir = cache_dir,
+                )
+            self.assertTrue(alg_test.isExecuted())
+            self.assertEqual(
+                alg_test.getPropertyValue("OutputFilename"),
+                os.path.join(cache_dir, "%s.nxs" % hashlib.sha1("a=1,b=2").hexdigest()))
+        finally:
+            datacache.LOCK_TIMEOUT = lock_timeout
+            shutil.rmtree(cache_dir)
+        return
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -267,6 +267,29 @@ class CylinderPaalmanPingsCorrection2Test(unittest.TestCase):
             self.assertEqual(run.getLogData('emode').value,'Efixed')
             self.assertAlmostEqual(run.getLogData('efixed').value, 7.5)
 
+    def test_vectorised_matches_point_by_point(self):
+        """
+        Tests that the vectorised integration, optionally split over processes, gives the
+        same corrections as evaluating each point in turn
+        """
+        kwargs = dict(SampleWorkspace=self._sample_ws,
+                      SampleChemicalFormula='H2-O',
+                      CanWorkspace=self._can_ws,
+                      CanChemicalFormula='V',
+                      Emode='Indirect',
+                      Efixed=1.845,
+                      Interpolate=False)
+        CylinderPaalmanPingsCorrection(OutputWorkspace='__point_by_point', Vectorised=False, **kwargs)
+        CylinderPaalmanPingsCorrection(OutputWorkspace=self._corrections_ws_name, Vectorised=True,
+                                       NumberOfProcesses=2, **kwargs)
+
+        for suffix in ['_ass', '_assc', '_acsc', '_acc']:
+            expected = mtd['__point_by_point' + suffix].readY(0)
+            actual = mtd[self._corrections_ws_name + suffix].readY(0)
+            for expected_value, actual_value in zip(expected, actual):
+                self.assertAlmostEqual(expected_value, actual_value, places=10)
+        DeleteWorkspace('__point_by_point')
+
 
 if __name__ == "__main__":
     unittest.main()
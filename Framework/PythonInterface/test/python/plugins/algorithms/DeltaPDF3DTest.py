@@ -2,6 +2,8 @@ from __future__ import (absolute_import, division, print_function)
 
 import unittest
 from mantid.simpleapi import DeltaPDF3D, CreateMDWorkspace, FakeMDEventData, BinMD, mtd
+from mantid.geometry import SpaceGroupFactory
+from DeltaPDF3D import allowedReflections
 import numpy as np
 
 
@@ -124,6 +126,22 @@ class DeltaPDF3DTest(unittest.TestCase):
         self.assertAlmostEqual(fft.signalAt(1866), -562.30106845) # [1,0,0]
         self.assertAlmostEqual(fft.signalAt(2232), 577.15758916) # [1,1,0]
 
+    def test_3D_SinglePrecision(self):
+        DeltaPDF3D(InputWorkspace='DeltaPDF3DTest_MDH',OutputWorkspace='fft',IntermediateWorkspace='int',
+                   RemoveReflections=True,Size=0.4,CropSphere=True,SphereMax=3,Convolution=False,SinglePrecision=True)
+        fft=mtd['fft']
+        self.assertAlmostEqual(fft.signalAt(113490), 2510.0, delta=0.05) # [0,0,0]
+        self.assertAlmostEqual(fft.signalAt(113496), -2274.141590160, delta=0.05) # [1,0,0]
+        self.assertAlmostEqual(fft.signalAt(113862), 2341.378453873, delta=0.05) # [1,1,0]
+
+    def test_allowedReflections(self):
+        h = np.arange(-4, 5)
+        for symbol in ['P 21 21 21', 'F d -3 m', 'I 41/a m d', 'P 63/m m c', 'R -3 c']:
+            sg = SpaceGroupFactory.createSpaceGroup(symbol)
+            allowed = allowedReflections(sg, h, h, h)
+            for i, j, k in np.ndindex(*allowed.shape):
+                self.assertEqual(allowed[i, j, k], sg.isAllowedReflection([h[i], h[j], h[k]]))
+
 
 if __name__ == '__main__':
     unittest.main()
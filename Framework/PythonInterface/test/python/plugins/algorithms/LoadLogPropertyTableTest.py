@@ -6,6 +6,7 @@ from mantid.kernel import *
 from mantid.api import *
 from testhelpers import run_algorithm
 from mantid.api import AnalysisDataService
+from LoadLogPropertyTable import clear_log_value_cache, h5py, readNexusLogValues
 
 import os
 
@@ -129,6 +130,39 @@ class LoadLogPropertyTableTest(unittest.TestCase):
 
         return
 
+    def test_BulkModeMatchesLoad(self):
+        outputWorskapceName = "LoadLogPropertyTableTest_Test6"
+        bulkWorskapceName = "LoadLogPropertyTableTest_Test6_Bulk"
+        if h5py is None:
+            self.skipTest("BulkMode requires h5py")
+        # proton_charge is a floating point NXlog, which is read from the NeXus file in bulk mode
+        filename = FileFinder.getFullPath("BSS_11841_event.nxs")
+        self.assertTrue(readNexusLogValues(filename, ["proton_charge"]) is not None)
+
+        clear_log_value_cache()
+        run_algorithm("LoadLogPropertyTable", FirstFile = "BSS_11841_event.nxs",
+                LastFile = "BSS_11841_event.nxs", LogNames="proton_charge", OutputWorkspace = outputWorskapceName)
+        clear_log_value_cache()
+        alg_test = run_algorithm("LoadLogPropertyTable", FirstFile = "BSS_11841_event.nxs",
+                LastFile = "BSS_11841_event.nxs", LogNames="proton_charge", BulkMode = True,
+                OutputWorkspace = bulkWorskapceName)
+        clear_log_value_cache()
+
+        self.assertTrue(alg_test.isExecuted())
+
+        #Verify some values
+        tablews = AnalysisDataService.retrieve(outputWorskapceName)
+        bulkws = AnalysisDataService.retrieve(bulkWorskapceName)
+        self.assertEqual(1, bulkws.rowCount())
+        self.assertEqual(2, bulkws.columnCount())
+        self.assertEqual(11841, bulkws.cell(0,0))
+        self.assertEqual(tablews.cell(0,1), bulkws.cell(0,1))
+
+        run_algorithm("DeleteWorkspace", Workspace = outputWorskapceName)
+        run_algorithm("DeleteWorkspace", Workspace = bulkWorskapceName)
+
+        return
+
 
 
 if __name__ == '__main__':
@@ -1,6 +1,9 @@
 #pylint: disable=unused-import
 from __future__ import (absolute_import, division, print_function)
 
+import os
+import shutil
+import tempfile
 import unittest
 from mantid.simpleapi import *
 
@@ -65,6 +68,23 @@ class SelectNexusFilesByMetadataTest(unittest.TestCase):
         outfiles = res.split(',')
         self.assertTrue(outfiles[0].endswith('ILLD33_001030.nxs'),'Should be the file name')
 
+    def test_metadata_index(self):
+
+        indexdir = tempfile.mkdtemp()
+        indexfile = os.path.join(indexdir, 'index.json')
+        criteria = '$raw_data_1/duration$ > 1000 or $raw_data_1/good_frames$ > 10000'
+        try:
+            for _ in range(2):
+                res = SelectNexusFilesByMetadata(FileList=self._fileslist, NexusCriteria=criteria, NumberOfThreads=2,
+                                                 UseMetadataIndex=True, MetadataIndexFile=indexfile)
+                outfiles = res.split(',')
+                self.assertEqual(len(outfiles), 2, "Only 1st and 3rd files satisfy.")
+                self.assertTrue(outfiles[0].endswith('INTER00013460.nxs'),'Should be first file name')
+                self.assertTrue(outfiles[1].endswith('INTER00013464.nxs'),'Should be second file name')
+                self.assertTrue(os.path.exists(indexfile), "The index should have been saved")
+        finally:
+            shutil.rmtree(indexdir)
+
 if __name__=="__main__":
     # run the test if only if the required package is present
     try:
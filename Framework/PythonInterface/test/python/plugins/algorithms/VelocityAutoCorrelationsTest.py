@@ -17,5 +17,18 @@ class VelocityAutoCorrelationsTest(unittest.TestCase):
         data_y = output_ws.readY(1)
         self.assertAlmostEqual(data_y[0], 0.000247266521347895)
 
+    def test_streamed_matches_in_memory(self):
+        in_memory = VelocityAutoCorrelations(InputFile = 'trajectories.nc',
+                                             Timestep = '2.0')
+        streamed = VelocityAutoCorrelations(InputFile = 'trajectories.nc',
+                                            Timestep = '2.0',
+                                            MaxMemoryMB = 1)
+
+        self.assertEqual(streamed.getNumberHistograms(), 2)
+        self.assertEqual(streamed.blocksize(), in_memory.blocksize())
+        for index in range(2):
+            for expected, actual in zip(in_memory.readY(index), streamed.readY(index)):
+                self.assertAlmostEqual(expected, actual, places=12)
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
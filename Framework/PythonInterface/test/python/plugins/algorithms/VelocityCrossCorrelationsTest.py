@@ -19,5 +19,18 @@ class VelocityCrossCorrelationsTest(unittest.TestCase):
         data_y = output_ws.readY(2)
         self.assertAlmostEqual(data_y[0], -8.76322385197998e-05)
 
+    def test_vectorised_matches_pair_by_pair(self):
+        pair_by_pair = VelocityCrossCorrelations(InputFile = 'trajectories.nc',
+                                                 Timestep = '2.0',
+                                                 Vectorised = False)
+        vectorised = VelocityCrossCorrelations(InputFile = 'trajectories.nc',
+                                               Timestep = '2.0',
+                                               ChunkSize = 100)
+
+        self.assertEqual(vectorised.getNumberHistograms(), pair_by_pair.getNumberHistograms())
+        for index in range(pair_by_pair.getNumberHistograms()):
+            for expected, actual in zip(pair_by_pair.readY(index), vectorised.readY(index)):
+                self.assertAlmostEqual(expected, actual, places=12)
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from __future__ import (absolute_import, division, print_function)
 
 import unittest
+import numpy as np
 from mantid import mtd, config
 from mantid.simpleapi import CreateSampleWorkspace, Scale, DeleteWorkspace, ConvertToPointData, \
                              SetInstrumentParameter, FlatPlatePaalmanPingsCorrection
@@ -218,6 +219,33 @@ class FlatPlatePaalmanPingsCorrectionTest(unittest.TestCase):
         for workspace in corrections_ws:
             self.assertEqual(workspace.blocksize(), 20)
 
+    def test_vectorised_matches_angle_by_angle(self):
+        """
+        Tests that calculating all angles in one array operation gives the same
+        corrections as calculating each angle in turn.
+        """
+        kwargs = dict(SampleWorkspace=self._sample_ws,
+                      SampleChemicalFormula='H2-O',
+                      SampleThickness=0.1,
+                      SampleAngle=45,
+                      CanWorkspace=self._can_ws,
+                      CanChemicalFormula='V',
+                      CanFrontThickness=0.01,
+                      CanBackThickness=0.01,
+                      NumberWavelengths=10,
+                      Emode='Indirect',
+                      Efixed=1.845,
+                      Interpolate=False)
+        FlatPlatePaalmanPingsCorrection(OutputWorkspace='__angle_by_angle', Vectorised=False, **kwargs)
+        FlatPlatePaalmanPingsCorrection(OutputWorkspace=self._corrections_ws_name, Vectorised=True, **kwargs)
+
+        for suffix in ['_ass', '_assc', '_acsc', '_acc']:
+            expected = mtd['__angle_by_angle' + suffix]
+            actual = mtd[self._corrections_ws_name + suffix]
+            for index in range(expected.getNumberHistograms()):
+                np.testing.assert_allclose(actual.readY(index), expected.readY(index), rtol=0, atol=1e-10)
+        DeleteWorkspace('__angle_by_angle')
+
     def test_validationNoCanFormula(self):
         """
         Tests validation for no chemical formula for can when a can WS is provided.
@@ -0,0 +1,134 @@
+#pylint: disable=no-init
+"""
+Compares the run time of Abins with the transitions for higher quantum order
+events constructed on the grid of bins with the calculation of every
+transition, and checks the spectra of the binned calculation.
+
+The first two quantum order events are calculated transition by transition in
+both cases, so they are compared with the full calculation. The full
+calculation takes the coefficients of the third and fourth quantum order
+events from construct_freq_combinations, which combines the wrong
+fundamentals for these orders, so they are compared with a reference which
+enumerates all combinations of fundamentals instead.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import time
+
+import numpy as np
+import stresstesting
+from mantid.simpleapi import Abins, mtd
+import AbinsModules
+from AbinsModules import AbinsConstants, AbinsParameters, AbinsTestHelpers
+
+
+class AllTransitionsCalculateS(AbinsModules.CalculateS):
+    """
+    Calculates S with the transitions for each quantum order event built directly as all ordered combinations of
+    fundamentals, without FrequencyPowderGenerator and without discarding small S.
+    """
+
+    def _calculate_s_powder_one_atom(self, atom=None, q_indx=None):
+        s = {}
+        fundamentals_size = self._fundamentals_freq.size
+
+        for order in range(AbinsConstants.FUNDAMENTALS, self._quantum_order_num + AbinsConstants.S_LAST_INDEX):
+
+            indices = np.indices((fundamentals_size,) * order).reshape(order, -1).T
+            freq = np.sum(np.take(self._fundamentals_freq, indices), axis=1)
+            valid_indices = freq < AbinsParameters.max_wavenumber
+            freq = freq[valid_indices]
+            indices = indices[valid_indices]
+
+            value_dft = self._calculate_order[order](
+                q2=self._instrument.calculate_q_powder(input_data=freq), frequencies=freq, indices=indices,
+                a_tensor=self._a_tensors[atom], a_trace=self._a_traces[atom], b_tensor=self._b_tensors[atom],
+                b_trace=self._b_traces[atom])
+            s["order_%s" % order] = self._broaden_spectrum(frequencies=freq, s_dft=value_dft)
+
+        return s
+
+
+class AbinsBinnedOvertonesBenchmark(stresstesting.MantidStressTest):
+
+    system_name = "BenzeneScratchAbins"
+    atoms = ["C", "H"]
+
+    def runTest(self):
+        kwargs = dict(DFTprogram="CASTEP", PhononFile=self.system_name + ".phonon", SumContributions=True)
+
+        # The phonon data is read and stored in the hdf file before either calculation is timed
+        Abins(QuantumOrderEventsNumber="1", OutputWorkspace="fundamentals", **kwargs)
+
+        start = time.time()
+        Abins(QuantumOrderEventsNumber="4", BinnedOvertones=False, OutputWorkspace="full", **kwargs)
+        full_time = time.time() - start
+
+        start = time.time()
+        Abins(QuantumOrderEventsNumber="4", BinnedOvertones=True, OutputWorkspace="binned", **kwargs)
+        binned_time = time.time() - start
+
+        self.reportResult("FullTime", full_time)
+        self.reportResult("BinnedTime", binned_time)
+        self.assertLessThan(binned_time, full_time)
+
+        for order in [AbinsConstants.QUANTUM_ORDER_ONE, AbinsConstants.QUANTUM_ORDER_TWO]:
+            for atom in self.atoms:
+                name = "%s_quantum_event_%s" % (atom, order)
+                self._check_spectra(spectrum=mtd["binned_" + name].readY(0), reference=mtd["full_" + name].readY(0),
+                                    name=name, tolerance=1e-8)
+
+        self._check_higher_orders()
+
+    def _check_higher_orders(self):
+        """
+        Compares S for the third and fourth quantum order events with the reference. Small S is not discarded in
+        either calculation, so that the spectra differ only by the merging of transitions.
+        """
+        phonon_file = AbinsTestHelpers.find_file(filename=self.system_name + ".phonon")
+        dft_data = AbinsModules.LoadCASTEP(input_dft_filename=phonon_file).get_formatted_data()
+        kwargs = dict(filename=phonon_file, temperature=10.0, sample_form="Powder", abins_data=dft_data,
+                      instrument=AbinsModules.InstrumentProducer().produce_instrument("TOSCA"),
+                      quantum_order_num=AbinsConstants.QUANTUM_ORDER_FOUR)
+
+        parameters = (AbinsParameters.s_relative_threshold, AbinsParameters.s_absolute_threshold,
+                      AbinsParameters.atoms_threads)
+        AbinsParameters.s_relative_threshold = 0.0
+        AbinsParameters.s_absolute_threshold = 0.0
+        # the reference calculator is defined in this module, so it is not passed to worker processes
+        AbinsParameters.atoms_threads = 1
+        try:
+            binned = AbinsModules.CalculateS(binned_overtones=True, **kwargs)._calculate_s().extract()
+            reference = AllTransitionsCalculateS(**kwargs)._calculate_s().extract()
+        finally:
+            (AbinsParameters.s_relative_threshold, AbinsParameters.s_absolute_threshold,
+             AbinsParameters.atoms_threads) = parameters
+
+        atoms = [key for key in reference if key.startswith("atom_")]
+        for order in [AbinsConstants.QUANTUM_ORDER_THREE, AbinsConstants.QUANTUM_ORDER_FOUR]:
+            key = "order_%s" % order
+            # Merged transitions move by at most one bin for each quantum order event
+            self._check_spectra(spectrum=sum(binned[atom]["s"][key] for atom in atoms),
+                                reference=sum(reference[atom]["s"][key] for atom in atoms),
+                                name="quantum_event_%s" % order, tolerance=5e-2, width=50)
+
+    def _check_spectra(self, spectrum=None, reference=None, name=None, tolerance=None, width=1):
+        """
+        Checks that a spectrum agrees with the reference within the tolerance relative to each bin and to the
+        maximum of the reference.
+        @param spectrum: spectrum to check
+        @param reference: reference spectrum
+        @param name: name of the spectrum used in the error message
+        @param tolerance: relative tolerance
+        @param width: number of bins summed before the spectra are compared
+        """
+        size = spectrum.size // width * width
+        spectrum = np.asarray(spectrum)[:size].reshape(-1, width).sum(axis=1)
+        reference = np.asarray(reference)[:size].reshape(-1, width).sum(axis=1)
+
+        if not np.allclose(spectrum, reference, rtol=tolerance, atol=tolerance * np.max(np.abs(reference))):
+            raise Exception("Binned spectrum %s differs from the reference by up to %g (maximum of the reference "
+                            "%g)." % (name, np.max(np.abs(spectrum - reference)), np.max(np.abs(reference))))
+
+    def cleanup(self):
+        AbinsTestHelpers.remove_output_files(list_of_names=[self.system_name])
@@ -0,0 +1,40 @@
+#pylint: disable=no-init
+"""
+Compares the run time of AlignAndFocusPowderFromFiles when the files are
+processed in turn with processing them in worker processes and checks that
+both give the same summed workspace.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import time
+
+import stresstesting
+from mantid.simpleapi import AlignAndFocusPowderFromFiles
+
+
+class AlignAndFocusPowderFromFilesBenchmark(stresstesting.MantidStressTest):
+
+    cal_file = "PG3_FERNS_d4832_2011_08_24.cal"
+    data_files = ["PG3_4844_event.nxs", "PG3_4866_event.nxs", "PG3_5226_event.nxs"]
+
+    def requiredFiles(self):
+        return [self.cal_file] + self.data_files
+
+    def runTest(self):
+        kwargs = dict(Filename=",".join(self.data_files), CalFileName=self.cal_file,
+                      Params=-0.0004, PreserveEvents=False)
+
+        start = time.time()
+        AlignAndFocusPowderFromFiles(OutputWorkspace="in_turn", NumberOfProcesses=1, **kwargs)
+        in_turn_time = time.time() - start
+
+        start = time.time()
+        AlignAndFocusPowderFromFiles(OutputWorkspace="parallel", NumberOfProcesses=3, **kwargs)
+        parallel_time = time.time() - start
+
+        self.reportResult("InTurnTime", in_turn_time)
+        self.reportResult("ParallelTime", parallel_time)
+
+    def validate(self):
+        self.tolerance = 1e-10
+        return "parallel", "in_turn"
@@ -0,0 +1,69 @@
+#pylint: disable=no-init
+"""
+Compares the run time of the vectorised Paalman & Pings corrections with
+the point-by-point (cylinder) and angle-by-angle (flat plate) calculations
+and checks that both give the same factors.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import time
+
+import stresstesting
+from mantid.simpleapi import CreateSampleWorkspace, CylinderPaalmanPingsCorrection, \
+    FlatPlatePaalmanPingsCorrection, Scale
+
+
+class CylinderPaalmanPingsCorrectionBenchmark(stresstesting.MantidStressTest):
+
+    def runTest(self):
+        CreateSampleWorkspace(OutputWorkspace='sample', NumBanks=1, BankPixelWidth=7,
+                              XUnit='Wavelength', XMin=6.8, XMax=7.9, BinWidth=0.1)
+        Scale(InputWorkspace='sample', OutputWorkspace='can', Factor=1.2)
+        kwargs = dict(SampleWorkspace='sample', SampleChemicalFormula='H2-O',
+                      CanWorkspace='can', CanChemicalFormula='V',
+                      Emode='Indirect', Efixed=1.845, Interpolate=False)
+
+        start = time.time()
+        CylinderPaalmanPingsCorrection(OutputWorkspace='point_by_point', Vectorised=False, **kwargs)
+        point_by_point_time = time.time() - start
+
+        start = time.time()
+        CylinderPaalmanPingsCorrection(OutputWorkspace='vectorised', Vectorised=True, **kwargs)
+        vectorised_time = time.time() - start
+
+        self.reportResult('PointByPointTime', point_by_point_time)
+        self.reportResult('VectorisedTime', vectorised_time)
+        self.assertLessThan(vectorised_time, point_by_point_time)
+
+    def validate(self):
+        self.tolerance = 1e-10
+        return 'vectorised', 'point_by_point'
+
+
+class FlatPlatePaalmanPingsCorrectionBenchmark(stresstesting.MantidStressTest):
+
+    def runTest(self):
+        CreateSampleWorkspace(OutputWorkspace='sample', NumBanks=1, BankPixelWidth=40,
+                              XUnit='Wavelength', XMin=6.8, XMax=7.9, BinWidth=0.01)
+        Scale(InputWorkspace='sample', OutputWorkspace='can', Factor=1.2)
+        kwargs = dict(SampleWorkspace='sample', SampleChemicalFormula='H2-O',
+                      SampleThickness=0.1, SampleAngle=45,
+                      CanWorkspace='can', CanChemicalFormula='V',
+                      CanFrontThickness=0.01, CanBackThickness=0.01,
+                      NumberWavelengths=100, Emode='Indirect', Efixed=1.845, Interpolate=False)
+
+        start = time.time()
+        FlatPlatePaalmanPingsCorrection(OutputWorkspace='angle_by_angle', Vectorised=False, **kwargs)
+        angle_by_angle_time = time.time() - start
+
+        start = time.time()
+        FlatPlatePaalmanPingsCorrection(OutputWorkspace='vectorised', Vectorised=True, **kwargs)
+        vectorised_time = time.time() - start
+
+        self.reportResult('AngleByAngleTime', angle_by_angle_time)
+        self.reportResult('VectorisedTime', vectorised_time)
+        self.assertLessThan(vectorised_time, angle_by_angle_time)
+
+    def validate(self):
+        self.tolerance = 1e-10
+        return 'vectorised', 'angle_by_angle'
@@ -17,10 +17,10 @@ from sans.common.general_functions import create_unmanaged_algorithm
 # -----------------------------------------------
 class SANSBatchReductionTest(unittest.TestCase):
 
-    def _run_batch_reduction(self, states, use_optimizations=False):
+    def _run_batch_reduction(self, states, use_optimizations=False, number_of_processes=1):
         batch_reduction_alg = SANSBatchReduction()
         try:
-            batch_reduction_alg(states, use_optimizations, OutputMode.PublishToADS)
+            batch_reduction_alg(states, use_optimizations, OutputMode.PublishToADS, number_of_processes)
             did_raise = False
         except:  # noqa
             did_raise = True
@@ -36,6 +36,9 @@ class SANSBatchReductionTest(unittest.TestCase):
         reference_workspace = load_alg.getProperty("OutputWorkspace").value
 
         # Compare reference file with the output_workspace
+        self._assert_workspaces_equal(workspace, reference_workspace)
+
+    def _assert_workspaces_equal(self, workspace, reference_workspace):
         # We need to disable the instrument comparison, it takes way too long
         # We need to disable the sample -- Not clear why yet
         # operation how many entries can be found in the sample logs
@@ -136,6 +139,47 @@ class SANSBatchReductionTest(unittest.TestCase):
         for element in expected_workspaces:
             AnalysisDataService.remove(element)
 
+    def test_batch_reduction_on_multiperiod_file_in_worker_pool(self):
+        # Arrange
+        # Build the data information
+        data_builder = get_data_builder(SANSFacility.ISIS)
+        data_builder.set_sample_scatter("SANS2D0005512")
+
+        data_info = data_builder.build()
+
+        # Get the rest of the state from the user file
+        user_file_director = UserFileStateDirectorISIS(data_info)
+        user_file_director.set_user_file("MASKSANS2Doptions.091A")
+        # Set the reduction mode to LAB
+        user_file_director.set_reduction_builder_reduction_mode(ISISReductionMode.LAB)
+        state = user_file_director.construct()
+
+        # Act
+        # The serial reduction is the reference for the reduction in the worker pool
+        states = [state]
+        self._run_batch_reduction(states, use_optimizations=False)
+        expected_workspaces = ["5512p{0}rear_1D_2.0_14.0Phi-45.0_45.0".format(period) for period in range(1, 14)]
+        reference_workspaces = [element + "_serial" for element in expected_workspaces]
+        rename_alg = create_unmanaged_algorithm("RenameWorkspace")
+        rename_alg.setChild(False)
+        for element, reference in zip(expected_workspaces, reference_workspaces):
+            rename_alg.setProperty("InputWorkspace", element)
+            rename_alg.setProperty("OutputWorkspace", reference)
+            rename_alg.execute()
+
+        self._run_batch_reduction(states, use_optimizations=False, number_of_processes=4)
+
+        # Assert
+        # The workspaces which were reduced by the worker processes have to match the serial reduction
+        for element, reference in zip(expected_workspaces, reference_workspaces):
+            self.assertTrue(AnalysisDataService.doesExist(element))
+            self._assert_workspaces_equal(AnalysisDataService.retrieve(element),
+                                          AnalysisDataService.retrieve(reference))
+
+        # Clean up
+        for element in expected_workspaces + reference_workspaces:
+            AnalysisDataService.remove(element)
+
 
 class SANSBatchReductionRunnerTest(stresstesting.MantidStressTest):
     def __init__(self):
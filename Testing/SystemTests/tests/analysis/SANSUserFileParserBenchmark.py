@@ -0,0 +1,61 @@
+#pylint: disable=no-init
+"""
+Times the parsing of the SANS user files which are used by the system tests.
+A batch reads the user file once for every row, hence the time taken to
+read a user file for many rows is compared with and without the cache of
+parsed user files, and both are checked to give the same result.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import time
+
+import stresstesting
+import mantid  # noqa
+from mantid.api import FileFinder
+from sans.user_file.user_file_parser import UserFileParser
+from sans.user_file.user_file_reader import (UserFileReader, clear_user_file_cache)
+
+USER_FILES = ["USER_SANS2D_143ZC_2p4_4m_M4_Knowles_12mm.txt",
+              "USER_SANS2D_154E_2p4_4m_M3_Xpress_8mm_SampleChanger.txt",
+              "USER_LARMOR_151B_LarmorTeam_80tubes_BenchRot1p4_M4_r3699.txt",
+              "USER_Larmor_163F_HePATest_r13038.txt"]
+NUMBER_OF_ROWS = 100
+
+
+class SANSUserFileParserBenchmark(stresstesting.MantidStressTest):
+
+    def runTest(self):
+        user_files = [FileFinder.getFullPath(user_file) for user_file in USER_FILES]
+
+        # Parse every line of the user files
+        lines = []
+        for user_file in user_files:
+            with open(user_file) as f:
+                lines.extend(f.readlines())
+        parser = UserFileParser()
+        start = time.time()
+        for _ in range(NUMBER_OF_ROWS):
+            for line in lines:
+                parser.parse_line(line)
+        line_time = (time.time() - start) / (NUMBER_OF_ROWS * len(lines))
+
+        # Read the user files once per row of a batch
+        start = time.time()
+        for _ in range(NUMBER_OF_ROWS):
+            for user_file in user_files:
+                clear_user_file_cache()
+                uncached_output = UserFileReader(user_file).read_user_file()
+        uncached_time = time.time() - start
+
+        start = time.time()
+        for _ in range(NUMBER_OF_ROWS):
+            for user_file in user_files:
+                cached_output = UserFileReader(user_file).read_user_file()
+        cached_time = time.time() - start
+
+        self.reportResult("LineParseTime", line_time)
+        self.reportResult("UncachedReadTime", uncached_time)
+        self.reportResult("CachedReadTime", cached_time)
+        if cached_output != uncached_output:
+            raise RuntimeError("The cached user file differs from the parsed user file.")
+        self.assertLessThan(cached_time, uncached_time)
@@ -0,0 +1,48 @@
+#pylint: disable=no-init
+"""
+Compares the time taken to import mantid.simpleapi without the cached
+algorithm signatures with the time taken when the functions are built from
+the cache, either eagerly or on first use.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import os
+import subprocess
+import sys
+import time
+
+import stresstesting
+from mantid.kernel import cachefile
+
+IMPORT_SCRIPT = "import mantid.simpleapi; mantid.simpleapi.CreateSampleWorkspace()"
+
+
+def time_import(lazy):
+    """
+    Time a fresh interpreter importing the simple API and running one algorithm
+    :param lazy: If True the algorithm functions are created on first use
+    :returns: The wall-clock time in seconds
+    """
+    env = dict(os.environ)
+    env["MANTID_SIMPLEAPI_LAZY"] = "1" if lazy else "0"
+    start = time.time()
+    subprocess.check_call([sys.executable, "-c", IMPORT_SCRIPT], env=env)
+    return time.time() - start
+
+
+class SimpleAPIStartupBenchmark(stresstesting.MantidStressTest):
+
+    def runTest(self):
+        index_path = cachefile.user_cache_path("simpleapi_signatures.json")
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        # The first import initializes every algorithm and writes the signature index
+        uncached_time = time_import(lazy=False)
+        eager_time = time_import(lazy=False)
+        lazy_time = time_import(lazy=True)
+
+        self.reportResult("UncachedImportTime", uncached_time)
+        self.reportResult("EagerImportTime", eager_time)
+        self.reportResult("LazyImportTime", lazy_time)
+        self.assertLessThan(eager_time, uncached_time)
+        self.assertLessThan(lazy_time, uncached_time)
@@ -0,0 +1,77 @@
+#pylint: disable=no-init
+"""
+Times the calibration of the tubes of a WISH panel when the tubes are
+calibrated in turn and when they are calibrated by worker processes, and
+checks that both give the same peaks and calibrated positions. The peaks
+fitted by the NumPy fit engine are checked against the peaks from Fit.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import time
+
+import numpy as np
+import stresstesting
+import mantid.simpleapi as mantid
+from mantid.kernel import workerpool
+
+from tube_calib_fit_params import TubeCalibFitParams
+import tube
+
+NUMBER_OF_PROCESSES = 4
+# the difference in pixels above which the peaks from the fit engines do not agree
+PEAK_TOLERANCE = 0.05
+
+
+class TubeCalibrationBenchmark(stresstesting.MantidStressTest):
+
+    def requiredFiles(self):
+        return ["WISH30541_integrated.nxs"]
+
+    def cleanup(self):
+        mantid.mtd.clear()
+
+    def runTest(self):
+        ws = mantid.LoadNexusProcessed(Filename="WISH30541_integrated.nxs")
+        peak_positions = np.array([-0.413, -0.206, 0, 0.206, 0.413])
+        funcForm = 5 * [1]
+        fitPar = TubeCalibFitParams([59, 161, 258, 353, 448])
+        fitPar.setAutomatic(True)
+
+        start = time.time()
+        in_turn_table, in_turn_peaks = tube.calibrate(ws, 'WISH/panel03', peak_positions, funcForm, margin=15,
+                                                      outputPeak=True, fitPar=fitPar)
+        in_turn_time = time.time() - start
+        in_turn_table = mantid.RenameWorkspace(in_turn_table, OutputWorkspace='in_turn_table')
+        in_turn_peaks = mantid.RenameWorkspace(in_turn_peaks, OutputWorkspace='in_turn_peaks')
+
+        start = time.time()
+        parallel_table, parallel_peaks = tube.calibrate(ws, 'WISH/panel03', peak_positions, funcForm, margin=15,
+                                                        outputPeak=True, fitPar=fitPar,
+                                                        nProcesses=NUMBER_OF_PROCESSES)
+        parallel_time = time.time() - start
+
+        self.reportResult("InTurnTime", in_turn_time)
+        self.reportResult("ParallelTime", parallel_time)
+        for in_turn, parallel in ((in_turn_table, parallel_table), (in_turn_peaks, parallel_peaks)):
+            if in_turn.rowCount() != parallel.rowCount():
+                raise RuntimeError("The number of rows of {0} differs between the calibrations.".format(parallel.name()))
+            for row in range(in_turn.rowCount()):
+                if str(in_turn.row(row)) != str(parallel.row(row)):
+                    raise RuntimeError("Row {0} of {1} differs between the calibrations.".format(row, parallel.name()))
+        if workerpool.can_create_pool():
+            # otherwise the tubes were calibrated in turn again
+            self.assertLessThan(parallel_time, in_turn_time)
+
+        start = time.time()
+        _, numpy_peaks = tube.calibrate(ws, 'WISH/panel03', peak_positions, funcForm, margin=15,
+                                        outputPeak=True, fitPar=fitPar, fitEngine='NumPy')
+        numpy_time = time.time() - start
+        self.reportResult("NumPyFitTime", numpy_time)
+
+        columns = ['Peak%d' % (i + 1) for i in range(len(peak_positions))]
+        fit_centres = np.array([[row[name] for name in columns] for row in in_turn_peaks])
+        numpy_centres = np.array([[row[name] for name in columns] for row in numpy_peaks])
+        difference = np.abs(fit_centres - numpy_centres)
+        self.reportResult("MaxPeakDifference", np.max(difference))
+        self.assertLessThan(np.mean(difference > PEAK_TOLERANCE), 0.01)
+        self.assertLessThan(numpy_time, in_turn_time)
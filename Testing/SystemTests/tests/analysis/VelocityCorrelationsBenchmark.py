@@ -0,0 +1,81 @@
+#pylint: disable=no-init
+"""
+Compares the run time of the vectorised velocity correlations with the
+particle-by-particle calculation on a synthetic nMOLDYN trajectory of water
+molecules and checks that both give the same correlations.
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy.io import netcdf
+
+import stresstesting
+from mantid.simpleapi import VelocityCrossCorrelations
+
+
+def write_trajectory(filename, n_molecules, n_timesteps, box=2.0, seed=0):
+    """
+    Writes a trajectory of water molecules diffusing in a periodic box in the nMOLDYN netCDF format
+    :param filename: The path of the output file
+    :param n_molecules: The number of molecules
+    :param n_timesteps: The number of timesteps
+    :param box: The length of each side of the box, nm
+    :param seed: The seed for the random displacements
+    """
+    random = np.random.RandomState(seed)
+    description = ''.join("AC('water{0}',[A('o1',{1}),A('h1',{2}),A('h2',{3})])".format(i, 3 * i, 3 * i + 1, 3 * i + 2)
+                          for i in range(n_molecules))
+    centres = random.uniform(0.0, box, (1, n_molecules, 3)) + \
+        np.cumsum(random.normal(scale=0.05, size=(n_timesteps, n_molecules, 3)), axis=0)
+    bonds = random.normal(scale=0.1, size=(n_timesteps, n_molecules, 3, 3))
+    configuration = (centres[:, :, np.newaxis, :] + bonds).reshape((n_timesteps, 3 * n_molecules, 3)) % box
+
+    trajectory = netcdf.netcdf_file(filename, mode='w')
+    try:
+        trajectory.createDimension('description_length', len(description))
+        trajectory.createDimension('step_number', n_timesteps)
+        trajectory.createDimension('atom_number', 3 * n_molecules)
+        trajectory.createDimension('xyz', 3)
+        trajectory.createDimension('box_size_length', 9)
+        trajectory.createVariable('description', 'c', ('description_length',))[:] = \
+            np.array(list(description), dtype='S1')
+        trajectory.createVariable('configuration', 'f', ('step_number', 'atom_number', 'xyz'))[:] = configuration
+        trajectory.createVariable('box_size', 'f', ('step_number', 'box_size_length'))[:] = \
+            np.tile(np.diag([box, box, box]).ravel(), (n_timesteps, 1))
+    finally:
+        trajectory.close()
+
+
+class VelocityCrossCorrelationsBenchmark(stresstesting.MantidStressTest):
+
+    trajectory_file = None
+
+    def runTest(self):
+        self.trajectory_file = os.path.join(tempfile.gettempdir(), 'VelocityCrossCorrelationsBenchmark.nc')
+        write_trajectory(self.trajectory_file, n_molecules=60, n_timesteps=1001)
+
+        start = time.time()
+        VelocityCrossCorrelations(InputFile=self.trajectory_file, Timestep='1.0',
+                                  Vectorised=False, OutputWorkspace='pair_by_pair')
+        pair_by_pair_time = time.time() - start
+
+        start = time.time()
+        VelocityCrossCorrelations(InputFile=self.trajectory_file, Timestep='1.0',
+                                  Vectorised=True, ChunkSize=100, OutputWorkspace='vectorised')
+        vectorised_time = time.time() - start
+
+        self.reportResult('PairByPairTime', pair_by_pair_time)
+        self.reportResult('VectorisedTime', vectorised_time)
+        self.assertLessThan(vectorised_time, pair_by_pair_time)
+
+    def validate(self):
+        self.tolerance = 1e-10
+        return 'vectorised', 'pair_by_pair'
+
+    def cleanup(self):
+        if self.trajectory_file is not None and os.path.exists(self.trajectory_file):
+            os.remove(self.trajectory_file)
@@ -1,14 +1,22 @@
 from __future__ import (absolute_import, division, print_function)
+import multiprocessing
 import AbinsModules
-try:
-    # noinspection PyUnresolvedReferences
-    from pathos.multiprocessing import ProcessingPool
-    PATHOS_FOUND = True
-except ImportError:
-    PATHOS_FOUND = False
 import numpy as np
 
 
+def _calculate_s_powder_one_atom_task(calculator=None, arrays=None, task=None):
+    """
+    Calculates S for one atom and Q index. Called by ParallelExecutor, possibly in another process.
+    @param calculator: object of type CalculateS
+    @param arrays: dictionary with the arrays shared by all atoms
+    @param task: number of atom, index of Q (None for 1D instruments)
+    @return: s for all quantum events taken into account
+    """
+    calculator.set_shared_arrays(arrays=arrays)
+    atom, q_indx = task
+    return calculator._calculate_s_powder_one_atom(atom=atom, q_indx=q_indx)
+
+
 # noinspection PyMethodMayBeStatic
 class CalculateS(object):
     """
@@ -16,7 +24,7 @@ class CalculateS(object):
     """
 
     def __init__(self, filename=None, temperature=None, sample_form=None, abins_data=None, instrument=None,
-                 quantum_order_num=None):
+                 quantum_order_num=None, binned_overtones=False):
         """
         @param filename: name of input DFT file (CASTEP: foo.phonon)
         @param temperature: temperature in K for which calculation of S should be done
@@ -24,6 +32,8 @@ class CalculateS(object):
         @param abins_data: object of type AbinsData with data from phonon file
         @param instrument: name of instrument (str)
         @param quantum_order_num: number of quantum order events taken into account during the simulation
+        @param binned_overtones: if True transitions for the third and higher quantum order events are constructed on
+                                 the grid of bins instead of individually
         """
         if not isinstance(temperature, (int, float)):
             raise ValueError("Invalid value of the temperature. Number was expected.")
@@ -48,6 +58,11 @@ class CalculateS(object):
         else:
             raise ValueError("Invalid number of quantum order events.")
 
+        if isinstance(binned_overtones, bool):
+            self._binned_overtones = binned_overtones
+        else:
+            raise ValueError("Invalid value of binned_overtones. Boolean was expected.")
+
         if isinstance(instrument, AbinsModules.Instruments.Instrument):
             self._instrument = instrument
         else:
@@ -72,10 +87,8 @@ class CalculateS(object):
         else:
             raise ValueError("Only powder case is implemented at the moment.")
 
-        self._calculate_order = {AbinsModules.AbinsConstants.QUANTUM_ORDER_ONE: self._calculate_order_one,
-                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_TWO: self._calculate_order_two,
-                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_THREE: self._calculate_order_three,
-                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_FOUR: self._calculate_order_four}
+        self._calculate_order = None
+        self._set_calculate_order()
 
         step = AbinsModules.AbinsParameters.bin_width
         start = AbinsModules.AbinsParameters.min_wavenumber + step
@@ -85,11 +98,55 @@ class CalculateS(object):
         self._frequencies = self._bins[:-1]
 
         self._powder_atoms_data = None
+        self._a_tensors = None
+        self._b_tensors = None
         self._a_traces = None
         self._b_traces = None
         self._atoms_data = None
         self._fundamentals_freq = None
 
+    def __getstate__(self):
+        """
+        Leaves out the input data, the IO module and the bound methods when the object is pickled. Processes which
+        calculate S for a subset of atoms get the arrays shared by all atoms from set_shared_arrays instead.
+        """
+        state = self.__dict__.copy()
+        for name in ["_abins_data", "_clerk", "_calculate_order", "_powder_atoms_data", "_atoms_data"] + \
+                list(self._shared_arrays_names()):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._set_calculate_order()
+
+    def _set_calculate_order(self):
+        self._calculate_order = {AbinsModules.AbinsConstants.QUANTUM_ORDER_ONE: self._calculate_order_one,
+                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_TWO: self._calculate_order_two,
+                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_THREE: self._calculate_order_three,
+                                 AbinsModules.AbinsConstants.QUANTUM_ORDER_FOUR: self._calculate_order_four}
+
+    # noinspection PyMethodMayBeStatic
+    def _shared_arrays_names(self):
+        """
+        :return: names of the attributes with arrays which are needed to calculate S for any atom
+        """
+        return ("_a_tensors", "_b_tensors", "_a_traces", "_b_traces", "_fundamentals_freq")
+
+    def get_shared_arrays(self):
+        """
+        :return: dictionary with the arrays which are needed to calculate S for any atom
+        """
+        return dict((name, getattr(self, name)) for name in self._shared_arrays_names())
+
+    def set_shared_arrays(self, arrays=None):
+        """
+        Sets the arrays which are needed to calculate S for any atom.
+        :param arrays: dictionary with arrays as returned by get_shared_arrays
+        """
+        for name in self._shared_arrays_names():
+            setattr(self, name, arrays[name])
+
     def _calculate_s(self):
 
         # Powder case: calculate A and B tensors
@@ -176,26 +233,55 @@ class CalculateS(object):
 
         return s_data
 
-    def _calculate_s_powder_core(self, q_indx=None):
+    def _calculate_s_powder_2d(self, powder_data=None):
+        """
+        Calculates 2D S for the powder case.
+
+        @param powder_data: object of type PowderData with mean square displacements and Debye-Waller factors for
+                            the case of powder
+        @return: object of type SData with 2D dynamical structure factors for the powder case; S for each quantum
+                 order event is an array with the dimensions: number of Q values, number of frequencies
+        """
+        s_data = AbinsModules.SData(temperature=self._temperature, sample_form=self._sample_form)
+        self._powder_atoms_data = powder_data.extract()
+        data = self._calculate_s_powder_core(q_indices=list(range(self._instrument.get_q_powder_size())))
+        data.update({"frequencies": self._frequencies})
+        s_data.set(items=data)
+
+        return s_data
+
+    def _calculate_s_powder_core(self, q_indices=None):
         """
-        Helper function for _calculate_s_powder_1d.
+        Helper function for _calculate_s_powder_1d and _calculate_s_powder_2d. S for each atom (and each Q index) is
+        calculated in a pool of AbinsParameters.atoms_threads (times AbinsParameters.q_threads) processes, at most as
+        many as there are CPUs.
+        :param q_indices: indices of Q for 2D instruments, None for 1D instruments
         :return: Python dictionary with S data
         """
         atoms_items = dict()
         num_atoms, atoms = self._prepare_data()
 
-        q_multiplied = [q_indx] * num_atoms
-
-        if PATHOS_FOUND:
-            p_local = ProcessingPool(nodes=AbinsModules.AbinsParameters.atoms_threads)
-            result = p_local.map(self._calculate_s_powder_one_atom, atoms, q_multiplied)
+        processes = AbinsModules.AbinsParameters.atoms_threads
+        if q_indices is None:
+            tasks = [(atom, None) for atom in atoms]
         else:
-            result = []
-            for atom in atoms:
-                result.append(self._calculate_s_powder_one_atom(atom=atom, q_indx=q_indx))
+            tasks = [(atom, q_indx) for q_indx in q_indices for atom in atoms]
+            processes *= AbinsModules.AbinsParameters.q_threads
+        processes = min(processes, multiprocessing.cpu_count())
+
+        executor = AbinsModules.ParallelExecutor(processes=processes, context=self, arrays=self.get_shared_arrays())
+        result = executor.map(function=_calculate_s_powder_one_atom_task, tasks=tasks)
 
         for atom in range(num_atoms):
-            atoms_items["atom_%s" % atom] = {"s": result[atoms.index(atom)]}
+            position = atoms.index(atom)
+            if q_indices is None:
+                s = result[position]
+            else:
+                # results are ordered by Q index and then by atom
+                s_q = result[position::num_atoms]
+                s = dict((order, np.asarray([s_one_q[order] for s_one_q in s_q])) for order in s_q[0])
+
+            atoms_items["atom_%s" % atom] = {"s": s}
             self._report_progress(msg="S for atom %s" % atom + " has been calculated.")
         return atoms_items
 
@@ -205,9 +291,11 @@ class CalculateS(object):
         :return: number of atoms, sorted atom indices
         """
 
-        num_atoms = self._powder_atoms_data["a_tensors"].shape[0]
-        self._a_traces = np.trace(a=self._powder_atoms_data["a_tensors"], axis1=1, axis2=2)
-        self._b_traces = np.trace(a=self._powder_atoms_data["b_tensors"], axis1=2, axis2=3)
+        self._a_tensors = self._powder_atoms_data["a_tensors"]
+        self._b_tensors = self._powder_atoms_data["b_tensors"]
+        num_atoms = self._a_tensors.shape[0]
+        self._a_traces = np.trace(a=self._a_tensors, axis1=1, axis2=2)
+        self._b_traces = np.trace(a=self._b_tensors, axis1=2, axis2=3)
         abins_data_extracted = self._abins_data.extract()
         self._atoms_data = abins_data_extracted["atoms_data"]
         k_points_data = self._get_gamma_data(abins_data_extracted["k_points_data"])
@@ -246,6 +334,9 @@ class CalculateS(object):
         @param atom: number of atom
         @return: s, and corresponding frequencies for all quantum events taken into account
         """
+        if self._binned_overtones:
+            return self._calculate_s_powder_one_atom_binned(atom=atom, q_indx=q_indx)
+
         s = {}
 
         local_freq = np.copy(self._fundamentals_freq)
@@ -287,6 +378,88 @@ class CalculateS(object):
 
         return s
 
+    def _calculate_s_powder_one_atom_binned(self, atom=None, q_indx=None):
+        """
+        Calculates S for one atom with the transitions for the third and higher quantum order events constructed on
+        the grid of bins. Transitions for the first two quantum order events are calculated individually, as in
+        _calculate_s_powder_one_atom; for higher orders the transitions which fall into the same bin are merged and
+        the ones with too small S are discarded before the next order is constructed, so their number is bounded by
+        the number of bins.
+        @param atom: number of atom
+        @param q_indx: index of Q for 2D instruments
+        @return: s for all quantum events taken into account
+        """
+        s = {}
+
+        local_freq = np.copy(self._fundamentals_freq)
+        local_coeff = np.arange(start=0.0, step=1.0, stop=self._fundamentals_freq.size,
+                                dtype=AbinsModules.AbinsConstants.INT_TYPE)
+        fund_coeff = np.copy(local_coeff)
+        max_order = self._quantum_order_num + AbinsModules.AbinsConstants.S_LAST_INDEX
+
+        order = AbinsModules.AbinsConstants.FUNDAMENTALS
+        local_freq, local_coeff, s["order_%s" % order] = self._helper_atom(
+            atom=atom, local_freq=local_freq, local_coeff=local_coeff,
+            fundamentals_freq=self._fundamentals_freq, fund_coeff=fund_coeff, order=order, q_indx=q_indx)
+
+        if max_order > AbinsModules.AbinsConstants.QUANTUM_ORDER_TWO:
+
+            # combine transitions with chunks of fundamentals so that the number of transitions in one chunk is not
+            # larger than optimal_size
+            order = AbinsModules.AbinsConstants.QUANTUM_ORDER_TWO
+            chunk_size = max(1, AbinsModules.AbinsParameters.optimal_size // max(local_freq.size, 1))
+            s["order_%s" % order] = self._fix_empty_array()
+            binned_freq = []
+            binned_weights = []
+            for start in range(0, self._fundamentals_freq.size, chunk_size):
+
+                chunk_freq, chunk_coeff, chunk_spectrum = self._helper_atom(
+                    atom=atom, local_freq=local_freq, local_coeff=local_coeff,
+                    fundamentals_freq=self._fundamentals_freq[start:start + chunk_size],
+                    fund_coeff=fund_coeff[start:start + chunk_size], order=order, q_indx=q_indx)
+                s["order_%s" % order] += chunk_spectrum
+
+                # transitions for higher orders are represented by their frequencies and products of traces of
+                # b tensors
+                chunk_weights = np.prod(np.take(self._b_traces[atom], indices=chunk_coeff), axis=1)
+                chunk_freq, chunk_weights = self._freq_generator.merge_freq_in_bins(
+                    array=chunk_freq, weights=chunk_weights, bins=self._bins)
+                binned_freq.append(chunk_freq)
+                binned_weights.append(chunk_weights)
+
+            local_freq, local_weights = self._freq_generator.merge_freq_in_bins(
+                array=np.concatenate(binned_freq), weights=np.concatenate(binned_weights), bins=self._bins)
+
+        for order in range(AbinsModules.AbinsConstants.QUANTUM_ORDER_THREE, max_order):
+
+            local_freq, local_weights = self._freq_generator.construct_binned_freq_combinations(
+                previous_array=local_freq, previous_weights=local_weights,
+                fundamentals_array=self._fundamentals_freq, fundamentals_weights=self._b_traces[atom], bins=self._bins)
+
+            if local_freq.any():
+
+                if self._instrument.get_name() in AbinsModules.AbinsConstants.ONE_DIMENSIONAL_INSTRUMENTS:
+                    q2 = self._instrument.calculate_q_powder(input_data=local_freq)
+                else:
+                    q2 = self._instrument.calculate_q_powder(input_data=q_indx)
+
+                # For these orders S depends on the fundamentals only through the product of traces of b tensors, so
+                # the merged weights are passed as the traces of transitions which consist of themselves.
+                value_dft = self._calculate_order[order](
+                    q2=q2, frequencies=local_freq,
+                    indices=np.arange(local_freq.size, dtype=AbinsModules.AbinsConstants.INT_TYPE)[:, np.newaxis],
+                    a_tensor=self._a_tensors[atom], a_trace=self._a_traces[atom], b_tensor=None,
+                    b_trace=local_weights)
+
+                value_dft, local_freq, local_weights = self._calculate_s_over_threshold(s=value_dft,
+                                                                                        freq=local_freq,
+                                                                                        coeff=local_weights)
+                s["order_%s" % order] = self._broaden_spectrum(frequencies=local_freq, s_dft=value_dft)
+            else:
+                s["order_%s" % order] = self._fix_empty_array()
+
+        return s
+
     def _prepare_chunks(self, local_freq=None, order=None, s=None):
         """
         Helper function for _calculate_s_powder_1d_one_atom in case transitions energies have to be created from
@@ -348,27 +521,36 @@ class CalculateS(object):
             value_dft = self._calculate_order[order](q2=q2,
                                                      frequencies=local_freq,
                                                      indices=local_coeff,
-                                                     a_tensor=self._powder_atoms_data["a_tensors"][atom],
+                                                     a_tensor=self._a_tensors[atom],
                                                      a_trace=self._a_traces[atom],
-                                                     b_tensor=self._powder_atoms_data["b_tensors"][atom],
+                                                     b_tensor=self._b_tensors[atom],
                                                      b_trace=self._b_traces[atom])
 
             value_dft, local_freq, local_coeff = self._calculate_s_over_threshold(s=value_dft,
                                                                                   freq=local_freq,
                                                                                   coeff=local_coeff)
 
-            rebined_freq, rebined_spectrum = self._rebin_data_opt(array_x=local_freq, array_y=value_dft)
-
-            freq, broad_spectrum = self._instrument.convolve_with_resolution_function(frequencies=rebined_freq,
-                                                                                      s_dft=rebined_spectrum)
-
-            rebined_broad_spectrum = self._rebin_data_full(array_x=freq, array_y=broad_spectrum)
-            rebined_broad_spectrum = self._fix_empty_array(array_y=rebined_broad_spectrum)
+            rebined_broad_spectrum = self._broaden_spectrum(frequencies=local_freq, s_dft=value_dft)
         else:
             rebined_broad_spectrum = self._fix_empty_array()
 
         return local_freq, local_coeff, rebined_broad_spectrum
 
+    def _broaden_spectrum(self, frequencies=None, s_dft=None):
+        """
+        Convolves S for the given transitions with the resolution function of the instrument and rebins the result.
+        :param frequencies: frequencies of transitions
+        :param s_dft: S for the transitions
+        :return: rebined broadened spectrum
+        """
+        rebined_freq, rebined_spectrum = self._rebin_data_opt(array_x=frequencies, array_y=s_dft)
+
+        freq, broad_spectrum = self._instrument.convolve_with_resolution_function(frequencies=rebined_freq,
+                                                                                  s_dft=rebined_spectrum)
+
+        rebined_broad_spectrum = self._rebin_data_full(array_x=freq, array_y=broad_spectrum)
+        return self._fix_empty_array(array_y=rebined_broad_spectrum)
+
     # noinspection PyUnusedLocal
     def _calculate_order_one(self, q2=None, frequencies=None, indices=None, a_tensor=None, a_trace=None,
                              b_tensor=None, b_trace=None):
@@ -556,6 +738,7 @@ class CalculateS(object):
 
         self._clerk.add_file_attributes()
         self._clerk.add_attribute(name="order_of_quantum_events", value=self._quantum_order_num)
+        self._clerk.add_attribute(name="binned_overtones", value=int(self._binned_overtones))
         self._clerk.add_data("data", data.extract())
         self._clerk.save()
 
@@ -566,7 +749,11 @@ class CalculateS(object):
         Loads S from an hdf file.
         @return: object of type SData.
         """
-        data = self._clerk.load(list_of_datasets=["data"], list_of_attributes=["filename", "order_of_quantum_events"])
+        data = self._clerk.load(list_of_datasets=["data"], list_of_attributes=["filename", "order_of_quantum_events",
+                                                                              "binned_overtones"])
+        if bool(data["attributes"]["binned_overtones"]) != self._binned_overtones:
+            raise ValueError("Transitions for higher quantum order events were constructed differently in the "
+                             "previous calculations. S cannot be loaded from the hdf file.")
         if self._quantum_order_num > data["attributes"]["order_of_quantum_events"]:
             raise ValueError("User requested a larger number of quantum events to be included in the simulation "
                              "then in the previous calculations. S cannot be loaded from the hdf file.")
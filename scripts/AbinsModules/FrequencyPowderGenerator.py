@@ -104,3 +104,79 @@ class FrequencyPowderGenerator(object):
             valid_indices = energies < AbinsModules.AbinsParameters.max_wavenumber
 
             return energies[valid_indices], coeff[valid_indices]
+
+    def construct_binned_freq_combinations(self, previous_array=None, previous_weights=None,
+                                           fundamentals_array=None, fundamentals_weights=None, bins=None):
+        """
+        Generates frequencies for the next order of quantum event on the grid of bins. In contrast to
+        construct_freq_combinations the individual transitions are not kept: all combinations of a previous
+        transition with a fundamental which fall into the same bin are merged, so that the number of transitions is
+        bounded by the number of bins rather than growing as fundamentals^order.
+
+        @param previous_array: array with frequencies for the previous quantum event
+        @param previous_weights: weights of the transitions for the previous quantum event
+        @param fundamentals_array: array with frequencies for fundamentals
+        @param fundamentals_weights: weights of fundamentals; the weight of a combination is the product of the
+                                     weights of the previous transition and the fundamental
+        @param bins: edges of the bins
+        @return: array with the mean frequency of the transitions in each occupied bin, array with their total weights
+        """
+        self._check_binned_array(array=previous_array, weights=previous_weights, name="previous transitions")
+        self._check_binned_array(array=fundamentals_array, weights=fundamentals_weights, name="fundamentals")
+
+        energies = []
+        weights = []
+        # combine the previous transitions chunk by chunk so that the array of combinations is never too big
+        fundamentals_size = max(fundamentals_array.size, 1)
+        chunk_size = max(1, AbinsModules.AbinsParameters.optimal_size // fundamentals_size)
+        for start in range(0, previous_array.size, chunk_size):
+            chunk_energies = previous_array[start:start + chunk_size, np.newaxis] + fundamentals_array
+            chunk_weights = previous_weights[start:start + chunk_size, np.newaxis] * fundamentals_weights
+            chunk_energies, chunk_weights = self.merge_freq_in_bins(array=chunk_energies.ravel(),
+                                                                    weights=chunk_weights.ravel(), bins=bins)
+            energies.append(chunk_energies)
+            weights.append(chunk_weights)
+
+        if len(energies) == 1:
+            return energies[0], weights[0]
+        else:
+            return self.merge_freq_in_bins(array=np.concatenate(energies), weights=np.concatenate(weights), bins=bins)
+
+    def merge_freq_in_bins(self, array=None, weights=None, bins=None):
+        """
+        Merges transitions which fall into the same bin into one transition with their total weight and their mean
+        frequency (weighted). Transitions outside the bins are discarded.
+
+        @param array: array with frequencies of transitions
+        @param weights: weights of the transitions
+        @param bins: edges of the bins
+        @return: array with the mean frequency of the transitions in each occupied bin, array with their total weights
+        """
+        self._check_binned_array(array=array, weights=weights, name="transitions")
+
+        bins_size = bins.size - 1
+        indices = np.digitize(x=array, bins=bins) - AbinsModules.AbinsConstants.PYTHON_INDEX_SHIFT
+        valid_indices = (indices >= 0) & (indices < bins_size)
+        indices = indices[valid_indices]
+        weights = weights[valid_indices]
+
+        total_weights = np.bincount(indices, weights=weights, minlength=bins_size)
+        moments = np.bincount(indices, weights=weights * array[valid_indices], minlength=bins_size)
+
+        occupied = total_weights > 0.0
+        return moments[occupied] / total_weights[occupied], total_weights[occupied]
+
+    def _check_binned_array(self, array=None, weights=None, name=None):
+        """
+        Checks frequencies and weights of transitions.
+        @param array: array with frequencies
+        @param weights: weights of transitions
+        @param name: name of the transitions used in error messages
+        """
+        if not (isinstance(array, np.ndarray) and
+                len(array.shape) == 1 and
+                array.dtype.num == AbinsModules.AbinsConstants.FLOAT_ID):
+            raise ValueError("Frequencies of %s in the form of one dimentional array are expected." % name)
+
+        if not (isinstance(weights, np.ndarray) and weights.shape == array.shape):
+            raise ValueError("Weights of %s in the form of an array of the size of frequencies are expected." % name)
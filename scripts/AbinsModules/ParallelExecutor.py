@@ -0,0 +1,105 @@
+from __future__ import (absolute_import, division, print_function)
+import os
+import pickle
+import shutil
+import tempfile
+import six
+import numpy as np
+from mantid.kernel import workerpool
+
+CONTEXT_FILENAME = "context.pickle"
+ARRAY_EXTENSION = ".npy"
+
+# context and arrays of the last executor whose tasks were run by this process
+_process_data = {}
+
+
+def _load_shared_data(directory=None):
+    """
+    Loads the context and opens the memory-mapped arrays which were written to directory by a ParallelExecutor.
+    The data is kept for the following tasks of the same executor which are run by this process.
+    :param directory: directory with the shared data
+    :return: context, dictionary with the arrays
+    """
+    if directory not in _process_data:
+        with open(os.path.join(directory, CONTEXT_FILENAME), "rb") as context_file:
+            context = pickle.load(context_file)
+        arrays = {}
+        for filename in os.listdir(directory):
+            if filename.endswith(ARRAY_EXTENSION):
+                arrays[filename[:-len(ARRAY_EXTENSION)]] = np.load(os.path.join(directory, filename), mmap_mode="r")
+        _process_data.clear()
+        _process_data[directory] = (context, arrays)
+
+    return _process_data[directory]
+
+
+def _run_task(args):
+    """
+    Runs one task in a process of the pool.
+    :param args: function to call, directory with the shared data, task
+    :return: result of the function for the task
+    """
+    function, directory, task = args
+    context, arrays = _load_shared_data(directory=directory)
+    return function(context, arrays, task)
+
+
+class ParallelExecutor(object):
+    """
+    Class for running many tasks which use the same large arrays in a pool of processes, which is created by
+    mantid.kernel.workerpool. The arrays are written once to memory-mapped files which the processes open read-only,
+    and the context is loaded once by each process, so that only the (small) description of each task has to be
+    pickled.
+    """
+
+    def __init__(self, processes=None, context=None, arrays=None):
+        """
+        @param processes: number of processes used to run the tasks
+        @param context: picklable object passed to every task, e.g. the settings of a calculation
+        @param arrays: dictionary with numpy arrays which are shared by all tasks
+        """
+        if not (isinstance(processes, six.integer_types) and processes >= 1):
+            raise ValueError("Invalid number of processes. Positive integer was expected.")
+        self._processes = processes
+
+        self._context = context
+
+        if not isinstance(arrays, dict):
+            raise ValueError("Dictionary with shared arrays was expected.")
+        self._arrays = arrays
+
+    def map(self, function=None, tasks=None):
+        """
+        Calls function(context, arrays, task) for each task. Tasks are run in the calling process if only one process
+        was requested or worker processes cannot be created from this process, see workerpool.can_create_pool.
+        @param function: function to call; it has to be defined at the top level of a module so it can be pickled
+        @param tasks: list with the tasks
+        @return: list with the results in the order of tasks
+        """
+        tasks = list(tasks)
+        processes = min(self._processes, len(tasks))
+        if processes <= 1 or not workerpool.can_create_pool():
+            return [function(self._context, self._arrays, task) for task in tasks]
+
+        directory = tempfile.mkdtemp(prefix="abins_")
+        try:
+            self._write_shared_data(directory=directory)
+            pool = workerpool.create_pool(processes)
+            try:
+                return pool.map(_run_task, [(function, directory, task) for task in tasks])
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _write_shared_data(self, directory=None):
+        """
+        Writes the context and the arrays to directory.
+        @param directory: directory for the shared data
+        """
+        with open(os.path.join(directory, CONTEXT_FILENAME), "wb") as context_file:
+            pickle.dump(self._context, context_file, protocol=pickle.HIGHEST_PROTOCOL)
+        for name in self._arrays:
+            np.save(os.path.join(directory, name + ARRAY_EXTENSION), np.ascontiguousarray(self._arrays[name]))
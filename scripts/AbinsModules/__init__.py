@@ -24,6 +24,7 @@ from .LoadCASTEP import LoadCASTEP
 from .LoadCRYSTAL import LoadCRYSTAL
 
 # Calculating modules
+from .ParallelExecutor import ParallelExecutor
 from .CalculatePowder import CalculatePowder
 from .CalculateSingleCrystal import CalculateSingleCrystal
 from .CalculateDWSingleCrystal import CalculateDWSingleCrystal
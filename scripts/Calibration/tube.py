@@ -14,7 +14,7 @@ from tube_calib import getCalibration, getCalibratedPixelPositions, getPoints
 
 # Need to avoid flake8 warning but we can't do that with this
 # buried directly in the string
-CALIBRATE_SIGNATURE = "ws, tubeSet, knownPositions, funcForm, [fitPar, margin, rangeList, calibTable, plotTube, excludeShorTubes, overridePeaks, fitPolyn, outputPeak]" # noqa
+CALIBRATE_SIGNATURE = "ws, tubeSet, knownPositions, funcForm, [fitPar, margin, rangeList, calibTable, plotTube, excludeShorTubes, overridePeaks, fitPolyn, outputPeak, nProcesses, fitEngine]" # noqa
 
 __doc__ = _MODULE_DOC="""
 =========================
@@ -366,6 +366,25 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
                outputPeak=peakTable)
       # now, peakTable has information for tube[1] and tube[2]
 
+    :param nProcesses: Number of worker processes which calibrate the tubes at the same time. Every worker is given \
+    the integrated counts of a tube and fits its peaks and polinomial with child algorithms, which leave the Analysis \
+    Data Service untouched, and the results are added to the tables in the same order as when the tubes are \
+    calibrated in turn. Tubes in **plotTube** are fitted by the main process. The workers are started afresh, see \
+    :mod:`mantid.kernel.workerpool`, hence the tubes are calibrated in turn within MantidPlot and with Python 2. \
+    Default = 1, the tubes are calibrated in turn.
+
+    .. code-block:: python
+
+      calibTable = calibrate(ws, 'WISH/panel03', known_pos, peaks_form, nProcesses=8)
+
+    :param fitEngine: 'Fit' to fit the peaks and edges of every tube with the Fit algorithm or 'NumPy' to fit the \
+    peaks and edges of all tubes together with the least-squares minimizer of :mod:`tube_fit`, which fits the same \
+    functions from the same starting values without running an algorithm for every peak. Default = 'Fit'.
+
+    .. code-block:: python
+
+      calibTable = calibrate(ws, 'WISH/panel03', known_pos, peaks_form, fitEngine='NumPy')
+
     :rtype: calibrationTable, a TableWorkspace with two columns DetectorID(int) and DetectorPositions(V3D).
 
     """
@@ -378,12 +397,14 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
     OVERRIDEPEAKS = 'overridePeaks'
     FITPOLIN = 'fitPolyn'
     OUTPUTPEAK = 'outputPeak'
+    NPROCESSES = 'nProcesses'
+    FITENGINE = 'fitEngine'
 
     # check that only valid arguments were passed through kwargs
     for key in kwargs.keys():
         if key not in [FITPAR, MARGIN, RANGELIST, CALIBTABLE, PLOTTUBE,
                        EXCLUDESHORT, OVERRIDEPEAKS, FITPOLIN,
-                       OUTPUTPEAK]:
+                       OUTPUTPEAK, NPROCESSES, FITENGINE]:
             msg = "Wrong argument: '%s'! This argument is not defined in the signature of this function. Hint: remember" \
                   "that arguments are case sensitive" % key
             raise RuntimeError(msg)
@@ -601,8 +622,25 @@ def calibrate(ws, tubeSet, knownPositions, funcForm, **kwargs):
         for i in range(len(idealTube.getArray())):
             outputPeak.addColumn(type='float', name='Peak%d' % (i + 1))
 
+    # deal with NPROCESSES parameter
+    if NPROCESSES in kwargs:
+        nProcesses = kwargs[NPROCESSES]
+        if not isinstance(nProcesses, int) or nProcesses < 1:
+            raise RuntimeError("Wrong argument %s. It expects a positive number of worker processes" % NPROCESSES)
+    else:
+        nProcesses = 1
+
+    # deal with FITENGINE parameter
+    if FITENGINE in kwargs:
+        fitEngine = kwargs[FITENGINE]
+        if fitEngine not in ['Fit', 'NumPy']:
+            raise RuntimeError("Wrong argument %s. It expects 'Fit' or 'NumPy'" % FITENGINE)
+    else:
+        fitEngine = 'Fit'
+
     getCalibration(ws, tubeSet, calibTable, fitPar, idealTube, outputPeak,
-                   overridePeaks, excludeShortTubes, plotTube, rangeList, polinFit)
+                   overridePeaks, excludeShortTubes, plotTube, rangeList, polinFit,
+                   nProcesses=nProcesses, fitEngine=fitEngine)
 
     if deletePeakTableAfter:
         DeleteWorkspace(str(outputPeak))
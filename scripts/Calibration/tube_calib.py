@@ -15,8 +15,11 @@ Users should not need to directly call any other function other than :func:`getC
 import numpy
 from mantid.simpleapi import *
 from mantid.kernel import *
+from mantid.api import AlgorithmManager
+from mantid.kernel import workerpool
 from tube_spec import TubeSpec
 from ideal_tube import IdealTube
+import tube_fit
 import re
 import os
 import copy
@@ -93,13 +96,17 @@ def fitEndErfcParams ( B, C ): # Compose string argument for fit
 #
 
 
-def fitEdges(fitPar, index, ws, outputWs):
+def getEdgeFitDefinition(fitPar, index, all_values):
+    """
+       Works out the fit of an edge to the counts of a tube
+
+       Return Value: initial B and C of the EndErfc function, start and end of the fit
+    """
     # find the edge position
     centre = fitPar.getPeaks()[index]
     outedge, inedge, endGrad = fitPar.getEdgeParameters()
     margin = fitPar.getMargin()
     #get values around the expected center
-    all_values = ws.dataY(0)
     RIGHTLIMIT = len(all_values)
     values = all_values[max(centre-margin,0):min(centre+margin,len(all_values))]
 
@@ -113,18 +120,27 @@ def fitEdges(fitPar, index, ws, outputWs):
         start = max(centre - inedge,0)
         end = min(centre + outedge, RIGHTLIMIT)
         edgeMode = 1
-    Fit(InputWorkspace=ws,Function=fitEndErfcParams(centre,endGrad*edgeMode),StartX=str(start),EndX=str(end),Output=outputWs)
+    return centre, endGrad*edgeMode, start, end
+
+
+def fitEdges(fitPar, index, ws, outputWs):
+    # find the edge position
+    B, C, start, end = getEdgeFitDefinition(fitPar, index, ws.dataY(0))
+    Fit(InputWorkspace=ws,Function=fitEndErfcParams(B, C),StartX=str(start),EndX=str(end),Output=outputWs)
     return 1 # peakIndex (center) -> parameter B of EndERFC
 
 
-def fitGaussian(fitPar, index, ws, outputWs):
+def getGaussianFitDefinition(fitPar, index, all_values):
+    """
+       Works out the fit of a peak to the counts of a tube
+
+       Return Value: initial background, height, centre and width of the peak, start and end of the fit
+    """
     #find the peak position
     centre = fitPar.getPeaks()[index]
     margin = fitPar.getMargin()
 
     # get values around the expected center
-    all_values = ws.dataY(0)
-
     RIGHTLIMIT = len(all_values)
 
     min_index = max(centre-int(margin),0)
@@ -155,13 +171,6 @@ def fitGaussian(fitPar, index, ws, outputWs):
         start = max(centre - margin, 0)
         end = min(centre + margin, RIGHTLIMIT)
 
-        fit_msg = 'name=LinearBackground,A0=%f;name=Gaussian,Height=%f,PeakCentre=%f,Sigma=%f'%(background, height, centre, width)
-
-        Fit(InputWorkspace=ws, Function=fit_msg,
-            StartX = str(start), EndX=str(end), Output=outputWs)
-
-        peakIndex = 3
-
     else:
         # get the parameters from fitParams
         background = 1000
@@ -169,12 +178,41 @@ def fitGaussian(fitPar, index, ws, outputWs):
         start = max(centre-margin, 0)
         end = min(centre+margin, RIGHTLIMIT)
 
+    return background, height, centre, width, start, end
+
+
+def getGaussianFitFunctions(fitPar, index, all_values):
+    """
+       Composes the fit of a peak to the counts of a tube
+
+       Return Value: list of function strings, start and end of the fit. If there are two functions, the
+       background is fitted first and the peak is fitted to the counts after subtracting the background.
+    """
+    background, height, centre, width, start, end = getGaussianFitDefinition(fitPar, index, all_values)
+    if fitPar.getAutomatic():
+        fit_msg = 'name=LinearBackground,A0=%f;name=Gaussian,Height=%f,PeakCentre=%f,Sigma=%f'%(background, height, centre, width)
+        return [fit_msg], start, end
+    else:
         # fit the input data as a linear background + gaussian fit
         # it was seen that the best result for static general fitParamters,
         # is to divide the values in two fitting steps
-        Fit(InputWorkspace=ws, Function='name=LinearBackground,A0=%f'%(background),
+        return ['name=LinearBackground,A0=%f'%(background),
+                'name=Gaussian,Height=%f,PeakCentre=%f,Sigma=%f' %(height, centre, width)], start, end
+
+
+def fitGaussian(fitPar, index, ws, outputWs):
+    functions, start, end = getGaussianFitFunctions(fitPar, index, ws.dataY(0))
+
+    if len(functions) == 1:
+        Fit(InputWorkspace=ws, Function=functions[0],
+            StartX = str(start), EndX=str(end), Output=outputWs)
+
+        peakIndex = 3
+
+    else:
+        Fit(InputWorkspace=ws, Function=functions[0],
             StartX=str(start), EndX=str(end), Output='Z1')
-        Fit(InputWorkspace='Z1_Workspace',Function='name=Gaussian,Height=%f,PeakCentre=%f,Sigma=%f' %(height, centre, width),
+        Fit(InputWorkspace='Z1_Workspace',Function=functions[1],
             WorkspaceIndex=2, StartX=str(start), EndX=str(end), Output=outputWs)
         CloneWorkspace(outputWs+'_Workspace',OutputWorkspace='gauss_'+str(index))
         peakIndex = 1
@@ -182,6 +220,133 @@ def fitGaussian(fitPar, index, ws, outputWs):
     return peakIndex
 
 
+def runPrivateFit(ws, function, start, end, workspaceIndex=0):
+    """
+       Fits a function with a child algorithm, whose output is not put into the Analysis Data Service,
+       such that several fits can run at the same time
+
+       Return Value: table of the fitted parameters and the workspace of the fitted curves
+    """
+    alg = AlgorithmManager.createUnmanaged('Fit')
+    alg.initialize()
+    alg.setChild(True)
+    alg.setProperty('Function', function)
+    alg.setProperty('InputWorkspace', ws)
+    alg.setProperty('WorkspaceIndex', workspaceIndex)
+    alg.setPropertyValue('StartX', str(start))
+    alg.setPropertyValue('EndX', str(end))
+    alg.setProperty('Output', 'CalibPoint')
+    alg.execute()
+    return alg.getProperty('OutputParameters').value, alg.getProperty('OutputWorkspace').value
+
+
+def createPrivateWorkspace(dataX, dataY):
+    """
+       Creates a workspace with a child algorithm, which is not put into the Analysis Data Service
+
+       Return Value: the workspace
+    """
+    alg = AlgorithmManager.createUnmanaged('CreateWorkspace')
+    alg.initialize()
+    alg.setChild(True)
+    alg.setProperty('DataX', dataX)
+    alg.setProperty('DataY', dataY)
+    alg.setProperty('OutputWorkspace', 'TubePlot')
+    alg.execute()
+    return alg.getProperty('OutputWorkspace').value
+
+
+def getPointsFromCounts(countsY, funcForms, fitParams):
+    """
+    Get the centres of N slits or edges for calibration from the integrated counts of one tube
+
+    It fits the peaks and edges in the same way as :func:`getPoints`, but with child algorithms that
+    leave the Analysis Data Service untouched, such that several tubes can be fitted at the same time.
+
+    :param countsY: array of the integrated counts of the pixels of the tube
+    :param funcForms: array of function form 1=slit/bar, 2=edge
+    :param fitParams: a TubeCalibFitParams object contain the fit parameters
+
+    :rtype: array of the slit/edge positions
+
+    """
+    ws = createPrivateWorkspace(list(range(len(countsY))), countsY)
+
+    results = []
+    for i in range(len(funcForms)):
+        if funcForms[i] == 2:
+            B, C, start, end = getEdgeFitDefinition(fitParams, i, countsY)
+            parameters, _ = runPrivateFit(ws, fitEndErfcParams(B, C), start, end)
+            peakIndex = 1
+        else:
+            functions, start, end = getGaussianFitFunctions(fitParams, i, countsY)
+            if len(functions) == 1:
+                parameters, _ = runPrivateFit(ws, functions[0], start, end)
+                peakIndex = 3
+            else:
+                _, background = runPrivateFit(ws, functions[0], start, end)
+                parameters, _ = runPrivateFit(background, functions[1], start, end, workspaceIndex=2)
+                peakIndex = 1
+        results.append(parameters.row(peakIndex)['Value'])
+    return results
+
+
+def getPointsWithNumPy(tubeCounts, funcForms, fitParams):
+    """
+    Get the centres of N slits or edges for calibration of several tubes at once
+
+    The peaks and edges are fitted to the same functions as in :func:`getPoints`, starting from the same
+    parameters, but all peaks of all tubes are fitted together by the least-squares minimizer of :mod:`tube_fit`
+    instead of the Fit algorithm.
+
+    :param tubeCounts: list of arrays of the integrated counts of the pixels of the tubes
+    :param funcForms: array of function form 1=slit/bar, 2=edge
+    :param fitParams: a TubeCalibFitParams object contain the fit parameters
+
+    :rtype: list of the arrays of the slit/edge positions of the tubes
+
+    """
+    results = [[None] * len(funcForms) for _ in tubeCounts]
+    # (tube, point) of the fits with the windows and initial parameters of each model
+    peaks, peakWindows, peakParameters = [], [], []
+    edges, edgeWindows, edgeParameters = [], [], []
+    for tube, countsY in enumerate(tubeCounts):
+        countsY = numpy.asarray(countsY, dtype=float)
+        for i in range(len(funcForms)):
+            if funcForms[i] == 2:
+                B, C, start, end = getEdgeFitDefinition(fitParams, i, countsY)
+                edges.append((tube, i))
+                edgeWindows.append(tube_fit.getWindow(countsY, start, end))
+                edgeParameters.append([2000.0, B, C, 0.0])
+            else:
+                background, height, centre, width, start, end = getGaussianFitDefinition(fitParams, i, countsY)
+                peaks.append((tube, i))
+                peakWindows.append(tube_fit.getWindow(countsY, start, end))
+                peakParameters.append([background, 0.0, height, centre, width])
+
+    if edges:
+        x, y, mask = tube_fit.stackWindows(edgeWindows)
+        fitted = tube_fit.fitWindows(tube_fit.endErfc, x, y, mask, edgeParameters)
+        for (tube, i), B in zip(edges, fitted[:, 1]):
+            results[tube][i] = B
+
+    if peaks:
+        x, y, mask = tube_fit.stackWindows(peakWindows)
+        parameters = numpy.array(peakParameters)
+        if fitParams.getAutomatic():
+            fitted = tube_fit.fitWindows(tube_fit.gaussianWithBackground, x, y, mask, parameters)
+            centres = fitted[:, 3]
+        else:
+            # the background is fitted first and the peak is fitted to the counts without the background
+            background = tube_fit.fitWindows(tube_fit.linearBackground, x, y, mask, parameters[:, 0:2])
+            y = y - tube_fit.linearBackground(x, background)[0]
+            fitted = tube_fit.fitWindows(tube_fit.gaussian, x, y, mask, parameters[:, 2:5])
+            centres = fitted[:, 1]
+        for (tube, i), centre in zip(peaks, centres):
+            results[tube][i] = centre
+    return results
+
+
 def getPoints ( IntegratedWorkspace, funcForms, fitParams, whichTube, showPlot=False ):
     """
     Get the centres of N slits or edges for calibration
@@ -291,7 +456,7 @@ def correctTube( AP, BP, CP, nDets ):
     return xBinNew
 
 
-def correctTubeToIdealTube( tubePoints, idealTubePoints, nDets, TestMode=False, polinFit=2 ):
+def correctTubeToIdealTube( tubePoints, idealTubePoints, nDets, TestMode=False, polinFit=2, privateFit=False ):
     """
        Corrects position errors in a tube given an array of points and their ideal positions.
 
@@ -301,6 +466,8 @@ def correctTubeToIdealTube( tubePoints, idealTubePoints, nDets, TestMode=False,
        :param Testmode: If true, detectors at the position of a slit will be moved out of the way
                          to show the reckoned slit positions when the instrument is displayed.
        :param polinFit: Order of the polinomial to fit for the ideal positions
+       :param privateFit: If true, the polinomial is fitted with child algorithms that leave the
+                          Analysis Data Service untouched, see :func:`runPrivateFit`
 
        Return Value: Array of corrected Xs  (in same units as ideal tube points)
 
@@ -335,15 +502,20 @@ def correctTubeToIdealTube( tubePoints, idealTubePoints, nDets, TestMode=False,
         return []
 
     # Fit quadratic to ideal tube points
-    CreateWorkspace(dataX=usedTubePoints,dataY=usedIdealTubePoints, OutputWorkspace="PolyFittingWorkspace")
+    if privateFit:
+        polyFittingWs = createPrivateWorkspace(usedTubePoints, usedIdealTubePoints)
+    else:
+        CreateWorkspace(dataX=usedTubePoints,dataY=usedIdealTubePoints, OutputWorkspace="PolyFittingWorkspace")
     try:
-        Fit(InputWorkspace="PolyFittingWorkspace",Function='name=Polynomial,n=%d'%(polinFit),StartX=str(0.0),EndX=str(nDets),Output="QF")
+        if privateFit:
+            paramQF, _ = runPrivateFit(polyFittingWs, 'name=Polynomial,n=%d'%(polinFit), 0.0, nDets)
+        else:
+            Fit(InputWorkspace="PolyFittingWorkspace",Function='name=Polynomial,n=%d'%(polinFit),StartX=str(0.0),EndX=str(nDets),Output="QF")
+            paramQF = mtd['QF_Parameters']
     except:
         print "Fit failed"
         return []
 
-    paramQF = mtd['QF_Parameters']
-
     # get the coeficients, get the Value from every row, and exclude the last one because it is the error
     # rowErr is the last one, it could be used to check accuracy of fit
     c = [r['Value'] for r in paramQF][:-1]
@@ -393,6 +565,25 @@ def getCalibratedPixelPositions( ws, tubePts, idealTubePts, whichTube, peakTestM
     if  len(pixels) != nDets:
         print "Tube correction failed."
         return detIDs, detPositions
+    return getPixelPositions(ws, pixels, whichTube)
+
+
+def getPixelPositions( ws, pixels, whichTube ):
+    """
+       Get the detector positions for one tube from the corrected positions of its pixels
+       Calibration is assumed to be done parallel to the Y-axis
+
+       :param ws: Workspace with tubes to be calibrated - may be integrated or raw
+       :param pixels: Array of the corrected positions of the pixels, see :func:`correctTubeToIdealTube`
+       :param whichtube:  a list of workspace indices for the tube
+
+       Return  Array of pixel detector IDs and array of their calibrated positions
+    """
+
+    # Arrays to be returned
+    detIDs = []
+    detPositions = []
+    nDets = len(whichTube)
     baseInstrument = ws.getInstrument().getBaseInstrument()
     # Get tube unit vector
     # get the detector from the baseInstrument, in order to get the positions
@@ -468,11 +659,32 @@ def readPeakFile(file_name):
     return loaded_file
 
 
+def calibrateTubeInWorker(task):
+    """
+       Finds the peaks and the corrected pixel positions of one tube in a worker process
+
+       The fits are child algorithms, which leave the Analysis Data Service untouched, as the worker
+       shares no workspaces with the process that calibrates the tubes.
+
+       @param task: tuple of the tube index, the integrated counts of its pixels, the peaks to use or None to fit
+       them, the functional forms and the positions of the ideal tube, the fit parameters, the order of the
+       polinomial and the peak test mode
+
+       Return Value: the tube index, the peaks and the corrected pixel positions
+    """
+    i, counts, actualTube, funcForms, idealTube, fitPar, polinFit, peaksTestMode = task
+    if actualTube is None:
+        actualTube = getPointsFromCounts(counts, funcForms, fitPar)
+    pixels = correctTubeToIdealTube(actualTube, idealTube, len(counts), TestMode=peaksTestMode, polinFit=polinFit,
+                                    privateFit=True)
+    return i, list(actualTube), numpy.asarray(pixels)
+
+
 ### THESE FUNCTIONS NEXT SHOULD BE THE ONLY FUNCTIONS THE USER CALLS FROM THIS FILE
 
 def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
                     overridePeaks=dict(), excludeShortTubes=0.0, plotTube=[],
-                    rangeList = None, polinFit=2, peaksTestMode=False):
+                    rangeList = None, polinFit=2, peaksTestMode=False, nProcesses=1, fitEngine='Fit'):
     """
     Get the results the calibration and put them in the calibration table provided.
 
@@ -491,6 +703,10 @@ def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
     :param rangelist: list of the tube indexes that will be calibrated. Default None, means all the tubes in tubeSet
     :param polinFit: Order of the polinomial to fit against the known positions. Acceptable: 2, 3
     :param peakTestMode: true if shoving detectors that are reckoned to be at peak away (for test purposes)
+    :param nProcesses: Number of worker processes which calibrate the tubes at the same time. Default 1, which
+        calibrates the tubes in turn.
+    :param fitEngine: 'Fit' to fit the peaks of every tube with the Fit algorithm or 'NumPy' to fit the peaks of all
+        tubes together with :func:`getPointsWithNumPy`. Default 'Fit'.
 
 
     This is the main method called from :func:`~tube.calibrate` to perform the calibration.
@@ -498,10 +714,17 @@ def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
     nTubes = tubeSet.getNumTubes()
     print "Number of tubes =",nTubes
 
+    if nProcesses > 1 and not workerpool.can_create_pool():
+        logger.notice("Worker processes cannot be started from this process, the tubes are calibrated in turn")
+        nProcesses = 1
+
     if rangeList is None:
         rangeList = range(nTubes)
 
     all_skipped = set()
+    # the tubes which are calibrated after the loop with the peaks to use or None to fit them
+    tasks = []
+    deferTubes = nProcesses > 1 or fitEngine == 'NumPy'
 
     for i in rangeList:
 
@@ -527,6 +750,9 @@ def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
         # if this tube is to be override, get the peaks positions for this tube.
         if i in overridePeaks:
             actualTube = overridePeaks[i]
+        elif deferTubes and i not in plotTube:
+            # the peaks are fitted together or by a worker process
+            actualTube = None
         else:
             #find the peaks positions
             plotThisTube = i in plotTube
@@ -535,19 +761,21 @@ def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
                 RenameWorkspace('FittedData',OutputWorkspace='FittedTube%d'%(i))
                 RenameWorkspace('TubePlot', OutputWorkspace='TubePlot%d'%(i))
 
-        # Set the peak positions at the peakTable
-        peaksTable.addRow([tubeSet.getTubeName(i)] + list(actualTube))
+        if deferTubes:
+            tasks.append((i, wht, actualTube))
+            continue
 
-        ##########################################
-        # Define the correct position of detectors
-        ##########################################
+        addTubeCalibration(ws, tubeSet, calibTable, iTube, peaksTable, i, wht, actualTube, polinFit, peaksTestMode)
 
-        detIDList, detPosList = getCalibratedPixelPositions( ws, actualTube, iTube.getArray(), wht, peaksTestMode, polinFit)
-        #save the detector positions to calibTable
-        if  len(detIDList) == len(wht): # We have corrected positions
-            for j in range(len(wht)):
-                nextRow = {'Detector ID': detIDList[j], 'Detector Position': detPosList[j] }
-                calibTable.addRow ( nextRow )
+    if fitEngine == 'NumPy':
+        tasks = fitTubesWithNumPy(ws, fitPar, iTube, tasks)
+
+    if nProcesses > 1 and len(tasks) > 0:
+        calibrateTubesInParallel(ws, tubeSet, calibTable, fitPar, iTube, peaksTable, tasks, polinFit, peaksTestMode,
+                                 nProcesses)
+    else:
+        for i, wht, actualTube in tasks:
+            addTubeCalibration(ws, tubeSet, calibTable, iTube, peaksTable, i, wht, actualTube, polinFit, peaksTestMode)
 
     if len(all_skipped) > 0:
         print "%i histogram(s) were excluded from the calibration since they did not have an assigned detector." % len(all_skipped)
@@ -564,6 +792,76 @@ def getCalibration( ws, tubeSet, calibTable, fitPar, iTube, peaksTable,
             pass
 
 
+def addTubeCalibration(ws, tubeSet, calibTable, iTube, peaksTable, i, wht, actualTube, polinFit, peaksTestMode):
+    """
+       Adds the peaks and the calibrated pixel positions of a tube to the tables. See :func:`getCalibration`
+       for the parameters.
+    """
+    # Set the peak positions at the peakTable
+    peaksTable.addRow([tubeSet.getTubeName(i)] + list(actualTube))
+
+    ##########################################
+    # Define the correct position of detectors
+    ##########################################
+
+    detIDList, detPosList = getCalibratedPixelPositions( ws, actualTube, iTube.getArray(), wht, peaksTestMode, polinFit)
+    #save the detector positions to calibTable
+    if  len(detIDList) == len(wht): # We have corrected positions
+        for j in range(len(wht)):
+            nextRow = {'Detector ID': detIDList[j], 'Detector Position': detPosList[j] }
+            calibTable.addRow ( nextRow )
+
+
+def fitTubesWithNumPy(ws, fitPar, iTube, tasks):
+    """
+       Fits the peaks of the tubes which have no peaks yet all at once with :func:`getPointsWithNumPy`
+
+       @param tasks: list of tuples of the tube index, its workspace indices and the peaks or None
+
+       Return Value: the tasks with the fitted peaks
+    """
+    toFit = [task for task in tasks if task[2] is None]
+    if len(toFit) == 0:
+        return tasks
+    counts = ws.extractY()[:, 0]
+    fitted = getPointsWithNumPy([counts[wht] for _, wht, _ in toFit], iTube.getFunctionalForms(), fitPar)
+    fittedPeaks = dict((i, peaks) for (i, _, _), peaks in zip(toFit, fitted))
+    return [(i, wht, fittedPeaks[i] if actualTube is None else actualTube) for i, wht, actualTube in tasks]
+
+
+def calibrateTubesInParallel(ws, tubeSet, calibTable, fitPar, iTube, peaksTable, tasks, polinFit, peaksTestMode,
+                             nProcesses):
+    """
+       Calibrates tubes in worker processes and adds the results to the tables in the order of the tubes
+
+       The integrated counts of all spectra are extracted once and every worker is given the counts of a tube.
+       It fits the peaks and the polinomial of the tube, see :func:`calibrateTubeInWorker`, and the calibrated
+       positions of the pixels are then worked out from the workspace. See :func:`getCalibration` for the parameters.
+    """
+    counts = ws.extractY()[:, 0]
+    funcForms, idealTube = iTube.getFunctionalForms(), iTube.getArray()
+    whichTubes = dict((i, wht) for i, wht, _ in tasks)
+    workerTasks = [(i, counts[wht], actualTube, funcForms, idealTube, fitPar, polinFit, peaksTestMode)
+                   for i, wht, actualTube in tasks]
+    pool = workerpool.create_pool(min(nProcesses, len(tasks)))
+    try:
+        for i, actualTube, pixels in pool.imap(calibrateTubeInWorker, workerTasks):
+            logger.information("Calibrated tube %d %s" % (i+1, tubeSet.getTubeName(i)))
+            peaksTable.addRow([tubeSet.getTubeName(i)] + actualTube)
+            wht = whichTubes[i]
+            if len(pixels) != len(wht):
+                print "Tube correction failed."
+                continue
+            detIDList, detPosList = getPixelPositions(ws, pixels, wht)
+            #save the detector positions to calibTable
+            if  len(detIDList) == len(wht): # We have corrected positions
+                for detID, pos in zip(detIDList, detPosList):
+                    calibTable.addRow({'Detector ID': detID, 'Detector Position': pos})
+    finally:
+        pool.close()
+        pool.join()
+
+
 def getCalibrationFromPeakFile ( ws, calibTable, iTube,  PeakFile ):
     """
        Get the results the calibration and put them in the calibration table provided.
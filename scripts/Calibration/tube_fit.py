@@ -0,0 +1,174 @@
+#pylint: disable=invalid-name
+"""
+Least-squares fitting of many peaks or edges at once for the tube calibration
+
+The peaks and edges of all tubes are fitted as one stacked problem with a Levenberg-Marquardt
+minimizer in NumPy. Every fit has its own window of points, damping and convergence, but the
+normal equations of all fits are built and solved together from the analytic Jacobians of the
+models, so no Fit algorithm is run for a peak.
+
+The models are the functions which :mod:`tube_calib` passes to the Fit algorithm. A model takes
+the points as an array of shape (nFits, nPoints) and the parameters as an array of shape
+(nFits, nParameters) and returns the values of shape (nFits, nPoints) and the Jacobian of shape
+(nFits, nPoints, nParameters).
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import math
+import numpy
+
+try:
+    from scipy.special import erfc
+except ImportError:
+    erfc = numpy.vectorize(math.erfc, otypes=[float])
+
+# the derivative of erfc(u) is ERFC_SLOPE * exp(-u**2)
+ERFC_SLOPE = -2.0 / math.sqrt(math.pi)
+
+
+def linearBackground(x, p):
+    """
+    LinearBackground with the parameters A0, A1
+    """
+    values = p[:, 0:1] + p[:, 1:2] * x
+    jacobian = numpy.stack([numpy.ones_like(x), x], axis=-1)
+    return values, jacobian
+
+
+def gaussian(x, p):
+    """
+    Gaussian with the parameters Height, PeakCentre, Sigma
+    """
+    height, centre, sigma = p[:, 0:1], p[:, 1:2], p[:, 2:3]
+    shift = x - centre
+    exponential = numpy.exp(-0.5 * (shift / sigma)**2)
+    values = height * exponential
+    jacobian = numpy.stack([exponential,
+                            values * shift / sigma**2,
+                            values * shift**2 / sigma**3], axis=-1)
+    return values, jacobian
+
+
+def gaussianWithBackground(x, p):
+    """
+    LinearBackground and Gaussian with the parameters A0, A1, Height, PeakCentre, Sigma
+    """
+    background, backgroundJacobian = linearBackground(x, p[:, 0:2])
+    peak, peakJacobian = gaussian(x, p[:, 2:5])
+    return background + peak, numpy.concatenate([backgroundJacobian, peakJacobian], axis=-1)
+
+
+def endErfc(x, p):
+    """
+    EndErfc with the parameters A, B, C, D
+    """
+    a, b, c, d = p[:, 0:1], p[:, 1:2], p[:, 2:3], p[:, 3:4]
+    u = (b - x) / c
+    complement = erfc(u)
+    slope = a * ERFC_SLOPE * numpy.exp(-u**2) / c
+    values = a * complement + d
+    jacobian = numpy.stack([complement, slope, -slope * u, numpy.ones_like(x)], axis=-1)
+    return values, jacobian
+
+
+# the lower bounds of the parameters, EndErfc does not let D become negative
+LOWER_BOUNDS = {endErfc: [-numpy.inf, -numpy.inf, -numpy.inf, 0.0]}
+
+
+def fitWindows(model, x, y, mask, parameters, maxIterations=500, tolerance=1e-10):
+    """
+    Fits a model to many windows of data at once
+
+    :param model: one of the models of this module
+    :param x: array (nFits, nPoints) of the points of the windows
+    :param y: array (nFits, nPoints) of the data of the windows
+    :param mask: boolean array (nFits, nPoints) which is False for the padding of shorter windows
+    :param parameters: array (nFits, nParameters) of the initial parameters
+    :param maxIterations: maximal number of iterations of a fit
+    :param tolerance: relative decrease of the sum of squares, and the square of the relative change of the
+                      parameters, below which a fit has converged
+
+    :rtype: array (nFits, nParameters) of the fitted parameters
+    """
+    weights = numpy.asarray(mask, dtype=float)
+    p = numpy.array(parameters, dtype=float)
+    lower = numpy.asarray(LOWER_BOUNDS.get(model, -numpy.inf), dtype=float)
+    p = numpy.maximum(p, lower)
+    nFits, nParameters = p.shape
+    if nFits == 0:
+        return p
+
+    values, jacobian = model(x, p)
+    residuals = (y - values) * weights
+    cost = numpy.sum(residuals**2, axis=1)
+    damping = numpy.full(nFits, 1e-3)
+    active = numpy.ones(nFits, dtype=bool)
+    identity = numpy.identity(nParameters)
+
+    for _ in range(maxIterations):
+        fits = numpy.flatnonzero(active)
+        if len(fits) == 0:
+            break
+        weightedJacobian = jacobian[fits] * weights[fits, :, None]
+        normal = numpy.einsum('nmp,nmq->npq', weightedJacobian, weightedJacobian)
+        gradient = numpy.einsum('nmp,nm->np', weightedJacobian, residuals[fits])
+        # Marquardt's scaling of the damping by the diagonal of the normal matrix
+        diagonal = numpy.maximum(numpy.diagonal(normal, axis1=1, axis2=2), 1e-30)
+        damped = normal + damping[fits, None, None] * diagonal[:, :, None] * identity
+        try:
+            step = numpy.linalg.solve(damped, gradient[:, :, None])[:, :, 0]
+        except numpy.linalg.LinAlgError:
+            step = numpy.array([numpy.linalg.lstsq(matrix, vector, rcond=None)[0]
+                                for matrix, vector in zip(damped, gradient)])
+
+        trial = numpy.maximum(p[fits] + step, lower)
+        trialValues, trialJacobian = model(x[fits], trial)
+        trialResiduals = (y[fits] - trialValues) * weights[fits]
+        trialCost = numpy.sum(trialResiduals**2, axis=1)
+
+        better = numpy.isfinite(trialCost) & (trialCost <= cost[fits])
+        accepted = fits[better]
+        decrease = cost[accepted] - trialCost[better]
+        p[accepted] = trial[better]
+        jacobian[accepted] = trialJacobian[better]
+        residuals[accepted] = trialResiduals[better]
+        cost[accepted] = trialCost[better]
+        damping[accepted] /= 10.0
+        damping[fits[~better]] *= 10.0
+
+        # a fit has converged when an accepted step hardly reduces the sum of squares and moves the parameters
+        smallStep = numpy.all(numpy.abs(step) <= numpy.sqrt(tolerance) * (numpy.abs(p[fits]) + tolerance), axis=1)
+        converged = numpy.zeros(len(fits), dtype=bool)
+        converged[better] = decrease <= tolerance * cost[accepted]
+        active[fits[(converged & smallStep) | (damping[fits] > 1e10)]] = False
+    return p
+
+
+def stackWindows(windows):
+    """
+    Pads windows of different lengths to the arrays of :func:`fitWindows`
+
+    :param windows: list of (x, y) arrays
+
+    :rtype: arrays x, y and mask of shape (len(windows), length of the longest window)
+    """
+    length = max([len(x) for x, _ in windows] + [1])
+    x = numpy.zeros((len(windows), length))
+    y = numpy.zeros((len(windows), length))
+    mask = numpy.zeros((len(windows), length), dtype=bool)
+    for i, (windowX, windowY) in enumerate(windows):
+        x[i, :len(windowX)] = windowX
+        y[i, :len(windowY)] = windowY
+        mask[i, :len(windowX)] = True
+    return x, y, mask
+
+
+def getWindow(counts, start, end):
+    """
+    Gets the pixels in [start, end] and their counts, which are the points the Fit algorithm uses for
+    StartX=start and EndX=end on a workspace with the pixel numbers 0, 1, ... as X
+    """
+    first = max(int(math.ceil(start)), 0)
+    last = min(int(math.floor(end)), len(counts) - 1)
+    pixels = numpy.arange(first, last + 1, dtype=float)
+    return pixels, numpy.asarray(counts[first:last + 1], dtype=float)
@@ -188,6 +188,24 @@ class AbstractInst(object):
         """
         return common_enums.INPUT_BATCHING.Summed
 
+    def _get_number_of_load_workers(self):
+        """
+        Returns the number of threads which load runs whilst other runs are processed. This is taken from the
+        optional 'load_workers' parameter if the instrument settings know it, otherwise runs are loaded in turn
+        :return: The number of load workers, 1 to load runs one at a time
+        """
+        load_workers = getattr(getattr(self, "_inst_settings", None), "load_workers", None)
+        return int(load_workers) if load_workers else 1
+
+    def _get_number_of_sum_workers(self):
+        """
+        Returns the number of threads which add pairs of runs at the same time when runs are summed. This is taken
+        from the optional 'sum_workers' parameter if the instrument settings know it, otherwise runs are summed at once
+        :return: The number of sum workers, 1 to sum the runs with a single MergeRuns
+        """
+        sum_workers = getattr(getattr(self, "_inst_settings", None), "sum_workers", None)
+        return int(sum_workers) if sum_workers else 1
+
     def _get_monitor_spectra_index(self, run_number):
         """
         Returns the spectra number a monitor is located at
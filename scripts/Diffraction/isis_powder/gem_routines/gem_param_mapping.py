@@ -16,6 +16,7 @@ attr_mapping = \
      ParamMapEntry(ext_name="focused_cropping_values",   int_name="focused_cropping_values"),
      ParamMapEntry(ext_name="grouping_file_name",        int_name="grouping_file_name"),
      ParamMapEntry(ext_name="input_mode",                int_name="input_batching", enum_class=INPUT_BATCHING),
+     ParamMapEntry(ext_name="load_workers",              int_name="load_workers",   optional=True),
      ParamMapEntry(ext_name="mode",                      int_name="mode",           enum_class=GEM_CHOPPER_MODES),
      ParamMapEntry(ext_name="multiple_scattering",       int_name="multiple_scattering"),
      ParamMapEntry(ext_name="raw_tof_cropping_values",   int_name="raw_tof_cropping_values"),
@@ -23,6 +24,7 @@ attr_mapping = \
      ParamMapEntry(ext_name="sample_empty",              int_name="sample_empty",   optional=True),
      ParamMapEntry(ext_name="sample_empty_scale",        int_name="sample_empty_scale"),
      ParamMapEntry(ext_name="spline_coefficient",        int_name="spline_coeff"),
+     ParamMapEntry(ext_name="sum_workers",               int_name="sum_workers",    optional=True),
      ParamMapEntry(ext_name="output_directory",          int_name="output_dir"),
      ParamMapEntry(ext_name="unit_to_keep",              int_name="unit_to_keep",
                    enum_class=WORKSPACE_UNITS,           optional=True),
@@ -23,7 +23,8 @@ def attenuate_workspace(attenuation_file_path, ws_to_correct):
 
 
 def apply_vanadium_absorb_corrections(van_ws, run_details):
-    absorb_ws = mantid.Load(Filename=run_details.vanadium_absorption_path)
+    with common.nexus_file_lock:
+        absorb_ws = mantid.Load(Filename=run_details.vanadium_absorption_path)
 
     van_original_units = van_ws.getAxis(0).getUnit().unitID()
     absorb_units = absorb_ws.getAxis(0).getUnit().unitID()
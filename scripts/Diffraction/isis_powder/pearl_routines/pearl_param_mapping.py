@@ -14,6 +14,7 @@ attr_mapping = \
         ParamMapEntry(ext_name="file_ext",                   int_name="file_extension", optional=True),
         ParamMapEntry(ext_name="focused_cropping_values",    int_name="tof_cropping_values"),
         ParamMapEntry(ext_name="focus_mode",                 int_name="focus_mode", enum_class=PEARL_FOCUS_MODES),
+        ParamMapEntry(ext_name="load_workers",               int_name="load_workers", optional=True),
         ParamMapEntry(ext_name="long_mode",                  int_name="long_mode"),
         ParamMapEntry(ext_name="monitor_lambda_crop_range",  int_name="monitor_lambda"),
         ParamMapEntry(ext_name="monitor_integration_range",  int_name="monitor_integration_range"),
@@ -25,6 +26,7 @@ attr_mapping = \
         ParamMapEntry(ext_name="run_in_cycle",               int_name="run_in_range"),
         ParamMapEntry(ext_name="run_number",                 int_name="run_number"),
         ParamMapEntry(ext_name="spline_coefficient",         int_name="spline_coefficient"),
+        ParamMapEntry(ext_name="sum_workers",                int_name="sum_workers", optional=True),
         ParamMapEntry(ext_name="tt88_grouping_filename",     int_name="tt88_grouping"),
         ParamMapEntry(ext_name="tt70_grouping_filename",     int_name="tt70_grouping"),
         ParamMapEntry(ext_name="tt35_grouping_filename",     int_name="tt35_grouping"),
@@ -19,6 +19,7 @@ attr_mapping = \
      ParamMapEntry(ext_name="focused_bin_widths",       int_name="focused_bin_widths"),
      ParamMapEntry(ext_name="grouping_file_name",       int_name="grouping_file_name"),
      ParamMapEntry(ext_name="input_mode",               int_name="input_mode", enum_class=INPUT_BATCHING),
+     ParamMapEntry(ext_name="load_workers",             int_name="load_workers", optional=True),
      ParamMapEntry(ext_name="masking_file_name",        int_name="masking_file_name"),
      ParamMapEntry(ext_name="mode",                     int_name="mode", enum_class=POLARIS_CHOPPER_MODES),
      ParamMapEntry(ext_name="multiple_scattering",      int_name="multiple_scattering"),
@@ -27,6 +28,7 @@ attr_mapping = \
      ParamMapEntry(ext_name="sample_empty",             int_name="sample_empty",   optional=True),
      ParamMapEntry(ext_name="sample_empty_scale",       int_name="sample_empty_scale"),
      ParamMapEntry(ext_name="spline_coefficient",       int_name="spline_coeff"),
+     ParamMapEntry(ext_name="sum_workers",              int_name="sum_workers", optional=True),
      ParamMapEntry(ext_name="output_directory",         int_name="output_dir"),
      ParamMapEntry(ext_name="user_name",                int_name="user_name"),
      ParamMapEntry(ext_name="vanadium_cropping_values", int_name="van_crop_values")
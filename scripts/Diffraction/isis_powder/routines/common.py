@@ -1,10 +1,19 @@
 from __future__ import (absolute_import, division, print_function)
 from six import iterkeys
 
+import collections
+import threading
+from multiprocessing.pool import ThreadPool
+
 import mantid.kernel as kernel
 import mantid.simpleapi as mantid
 from isis_powder.routines.common_enums import INPUT_BATCHING, WORKSPACE_UNITS
 
+# The NeXus and HDF5 libraries cannot access files from several threads at once. Every load worker and
+# the thread which focuses the runs hold this lock whilst they read or write a NeXus file, so loading
+# a file overlaps with the processing of the focusing thread but not with its file access.
+nexus_file_lock = threading.Lock()
+
 
 def cal_map_dictionary_key_helper(dictionary, key, append_to_error_message=None):
     """
@@ -248,7 +257,7 @@ def load_current_normalised_ws_list(run_number_string, instrument, input_batchin
     raw_ws_list = _load_raw_files(run_number_string=run_number_string, instrument=instrument, file_ext=file_ext)
 
     if input_batching == INPUT_BATCHING.Summed and len(raw_ws_list) > 1:
-        summed_ws = _sum_ws_range(ws_list=raw_ws_list)
+        summed_ws = _sum_ws_range(ws_list=raw_ws_list, number_of_workers=instrument._get_number_of_sum_workers())
         remove_intermediate_workspace(raw_ws_list)
         raw_ws_list = [summed_ws]
 
@@ -258,6 +267,43 @@ def load_current_normalised_ws_list(run_number_string, instrument, input_batchin
     return normalised_ws_list
 
 
+def load_current_normalised_ws_generator(run_number_string, instrument):
+    """
+    Loads and current normalises every run of the run number string individually, yielding each run in turn.
+    If the instrument has more than one load worker the following runs are loaded by worker threads whilst
+    the caller processes the current run. The workers read one file at a time, see nexus_file_lock. At most as
+    many runs as there are workers are loaded ahead of the caller, which bounds the memory taken by loaded
+    runs waiting to be processed.
+    :param run_number_string: The run number string to turn into a list of runs to load
+    :param instrument: The instrument to query for the file names and the number of load workers
+    :return: A generator of tuples of the run number and its normalised workspace
+    """
+    run_number_list = generate_run_numbers(run_number_string=run_number_string)
+    _check_load_range(list_of_runs_to_load=run_number_list)
+    number_of_workers = min(instrument._get_number_of_load_workers(), len(run_number_list))
+
+    if number_of_workers <= 1:
+        for run_number in run_number_list:
+            yield run_number, load_current_normalised_ws_list(run_number_string=run_number, instrument=instrument,
+                                                              input_batching=INPUT_BATCHING.Individual)[0]
+        return
+
+    pool = ThreadPool(number_of_workers)
+    pending_runs = collections.deque()
+    try:
+        for run_number in run_number_list:
+            file_ext = instrument._get_run_details(run_number_string=run_number).file_extension
+            file_name = _generate_file_name(run_number=run_number, instrument=instrument, file_ext=file_ext)
+            pending_runs.append((run_number, pool.apply_async(_load_file, (file_name,))))
+            if len(pending_runs) > number_of_workers:
+                yield _normalise_loaded_run(pending_runs.popleft(), instrument=instrument)
+        while pending_runs:
+            yield _normalise_loaded_run(pending_runs.popleft(), instrument=instrument)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def rebin_workspace(workspace, new_bin_width, start_x=None, end_x=None):
     """
     Rebins the specified workspace with the specified new bin width. Allows the user
@@ -462,25 +508,70 @@ def _load_raw_files(run_number_string, instrument, file_ext=None):
     return load_raw_ws
 
 
+def _generate_file_name(run_number, instrument, file_ext=None):
+    """
+    Generates the name which Load uses to find the file of a run
+    :param run_number: The run number to generate the file name of
+    :param instrument: The instrument to generate the prefix for
+    :param file_ext: (Optional) The file extension to append to the file name
+    :return: The file name of the run
+    """
+    file_name = instrument._generate_input_file_name(run_number=run_number)
+    return file_name + str(file_ext) if file_ext else file_name
+
+
+def _load_file(file_name):
+    """
+    Loads a file into a workspace named after the file. The output workspace is named explicitly
+    so that workspaces loaded by worker threads do not overwrite each other. The file is read
+    whilst holding the nexus_file_lock, as the file libraries are not thread safe
+    :param file_name: The file name to load
+    :return: The loaded workspace
+    """
+    with nexus_file_lock:
+        return mantid.Load(Filename=file_name, OutputWorkspace=file_name)
+
+
 def _load_list_of_files(run_numbers_list, instrument, file_ext=None):
     """
     Loads files based on the list passed to it. If the list is
     greater than the maximum range it will raise an exception
-    see _check_load_range for more details
+    see _check_load_range for more details. The files are loaded
+    in turn as only one file can be read at a time, see nexus_file_lock
     :param run_numbers_list: The list of runs to load
     :param instrument: The instrument to generate the prefix for
     :return: The loaded workspaces as a list
     """
-    read_ws_list = []
     _check_load_range(list_of_runs_to_load=run_numbers_list)
 
-    for run_number in run_numbers_list:
-        file_name = instrument._generate_input_file_name(run_number=run_number)
-        file_name = file_name + str(file_ext) if file_ext else file_name
-        read_ws = mantid.Load(Filename=file_name)
-        read_ws_list.append(mantid.RenameWorkspace(InputWorkspace=read_ws, OutputWorkspace=file_name))
+    return [_load_file(_generate_file_name(run_number=run_number, instrument=instrument, file_ext=file_ext))
+            for run_number in run_numbers_list]
+
+
+def _merge_workspaces(names):
+    """
+    Sums workspaces with MergeRuns
+    :param names: A tuple of the list of workspace names to sum and the name of the output workspace
+    :return: The summed workspace
+    """
+    input_names, output_name = names
+    return mantid.MergeRuns(InputWorkspaces=input_names, OutputWorkspace=output_name)
 
-    return read_ws_list
+
+def _normalise_loaded_run(pending_run, instrument):
+    """
+    Waits for a run loaded by a worker thread and normalises it by current. Normalising is
+    left to the calling thread as the instrument implementations use the names of their
+    variables for intermediate workspaces
+    :param pending_run: A tuple of the run number and the asynchronous result of loading it
+    :param instrument: The instrument these runs belong to
+    :return: A tuple of the run number and its normalised workspace
+    """
+    run_number, loaded_run = pending_run
+    run_details = instrument._get_run_details(run_number_string=run_number)
+    normalised_ws_list = _normalise_workspaces(ws_list=[loaded_run.get()], instrument=instrument,
+                                               run_details=run_details)
+    return run_number, normalised_ws_list[0]
 
 
 def _strip_vanadium_peaks(workspaces_to_strip):
@@ -491,17 +582,43 @@ def _strip_vanadium_peaks(workspaces_to_strip):
     return out_list
 
 
-def _sum_ws_range(ws_list):
+def _sum_ws_range(ws_list, number_of_workers=1):
     """
     Sums a list of workspaces into a single workspace. This will take the name
-    of the first and last workspaces in the list and take the form: "summed_<first>_<last>"
+    of the first and last workspaces in the list and take the form: "summed_<first>_<last>".
+    With more than one worker the workspaces are summed as a binary tree of partial sums,
+    where the pairs of each level of the tree are summed by worker threads at the same time.
     :param ws_list: The workspaces as a list to sum into a single workspace
+    :param number_of_workers: (Optional) The number of threads summing pairs of workspaces
     :return: A single summed workspace
     """
     # Sum all workspaces
     out_ws_name = "summed_" + ws_list[0].name() + '_' + ws_list[-1].name()
-    summed_ws = mantid.MergeRuns(InputWorkspaces=ws_list, OutputWorkspace=out_ws_name)
-    return summed_ws
+    number_of_workers = min(number_of_workers, len(ws_list) // 2)
+    if number_of_workers <= 1:
+        summed_ws = mantid.MergeRuns(InputWorkspaces=ws_list, OutputWorkspace=out_ws_name)
+        return summed_ws
+
+    input_names = [ws.name() for ws in ws_list]
+    partial_sum_names = list(input_names)
+    level = 0
+    pool = ThreadPool(number_of_workers)
+    try:
+        while len(partial_sum_names) > 1:
+            level += 1
+            pairs = list(zip(partial_sum_names[0::2], partial_sum_names[1::2]))
+            output_names = [out_ws_name if len(partial_sum_names) == 2 else
+                            out_ws_name + "_partial_" + str(level) + '_' + str(i) for i in range(len(pairs))]
+            pool.map(_merge_workspaces, [(list(pair), output_name) for pair, output_name in zip(pairs, output_names)])
+
+            # Remove the partial sums of the previous level, but not the input workspaces
+            remove_intermediate_workspace([name for pair in pairs for name in pair if name not in input_names])
+            partial_sum_names = output_names + partial_sum_names[2 * len(pairs):]
+    finally:
+        pool.close()
+        pool.join()
+
+    return mantid.mtd[out_ws_name]
 
 
 def _run_number_generator(processed_string):
@@ -3,6 +3,8 @@ from __future__ import (absolute_import, division, print_function)
 import mantid.simpleapi as mantid
 import os
 
+from isis_powder.routines.common import nexus_file_lock
+
 
 def split_into_tof_d_spacing_groups(run_details, processed_spectra):
     """
@@ -49,7 +51,8 @@ def save_focused_data(d_spacing_group, tof_group, output_paths, run_number_strin
     :return: None
     """
     mantid.SaveGSS(InputWorkspace=tof_group, Filename=output_paths["gss_filename"], SplitFiles=False, Append=False)
-    mantid.SaveNexusProcessed(InputWorkspace=tof_group, Filename=output_paths["nxs_filename"], Append=False)
+    with nexus_file_lock:
+        mantid.SaveNexusProcessed(InputWorkspace=tof_group, Filename=output_paths["nxs_filename"], Append=False)
 
     dat_folder_name = "dat_files"
     dat_file_destination = os.path.join(output_paths["output_folder"], dat_folder_name)
@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function)
 import mantid.simpleapi as mantid
 
 import isis_powder.routines.common as common
+import isis_powder.routines.vanadium_spline_cache as vanadium_spline_cache
 from isis_powder.routines.common_enums import INPUT_BATCHING
 import os
 import warnings
@@ -100,23 +101,21 @@ def _batched_run_focusing(instrument, perform_vanadium_norm, run_number_string,
 
 
 def _divide_by_vanadium_splines(spectra_list, spline_file_path):
-    vanadium_ws_list = mantid.LoadNexus(Filename=spline_file_path)
+    # The splines are loaded and rebinned once and then reused for every run with the same binning
+    vanadium_ws_list = vanadium_spline_cache.get_rebinned_splines(spline_file_path=spline_file_path,
+                                                                  spectra_list=spectra_list)
     output_list = []
-    for data_ws, van_ws in zip(spectra_list, vanadium_ws_list[1:]):
-        vanadium_ws = mantid.RebinToWorkspace(WorkspaceToRebin=van_ws, WorkspaceToMatch=data_ws)
+    for data_ws, vanadium_ws in zip(spectra_list, vanadium_ws_list):
         output_ws = mantid.Divide(LHSWorkspace=data_ws, RHSWorkspace=vanadium_ws, OutputWorkspace=data_ws)
         output_list.append(output_ws)
-        common.remove_intermediate_workspace(vanadium_ws)
     return output_list
 
 
 def _individual_run_focusing(instrument, perform_vanadium_norm, run_number, absorb):
-    # Load and process one by one
-    run_numbers = common.generate_run_numbers(run_number_string=run_number)
+    # Load and process one by one, the next runs are loaded whilst a run is focused if the instrument has load workers
     output = None
-    for run in run_numbers:
-        ws = common.load_current_normalised_ws_list(run_number_string=run, instrument=instrument)
-        output = _focus_one_ws(ws=ws[0], run_number=run, instrument=instrument, absorb=absorb,
+    for run, ws in common.load_current_normalised_ws_generator(run_number_string=run_number, instrument=instrument):
+        output = _focus_one_ws(ws=ws, run_number=run, instrument=instrument, absorb=absorb,
                                perform_vanadium_norm=perform_vanadium_norm)
     return output
 
@@ -0,0 +1,184 @@
+from __future__ import (absolute_import, division, print_function)
+
+import collections
+import hashlib
+import itertools
+import os
+
+import numpy
+import mantid.simpleapi as mantid
+from mantid.api import WorkspaceGroup
+from isis_powder.routines.common import nexus_file_lock
+
+# The memory which the cached vanadium splines may take up before the least recently used are removed
+DEFAULT_MAX_MEMORY_MB = 512
+# Cached workspaces are hidden in the ADS so they do not clutter the workspace list
+_WS_NAME_PREFIX = "__isis_powder_van_spline_"
+# Shared by all caches so their workspace names never clash
+_ws_name_counter = itertools.count(1)
+
+
+class VanadiumSplineCache(object):
+    """
+    Holds the splined vanadium banks loaded from the spline files and the banks rebinned to the binning of the
+    focused data. The loaded banks are keyed by the path, modification time and size of the spline file, so a
+    spline file which has been recreated is loaded again. The rebinned banks are additionally keyed by the bank and the
+    bin boundaries of the data they were rebinned to. The least recently used entries are removed once the
+    cached workspaces take up more than the memory bound.
+    """
+    def __init__(self, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        self._max_memory = max_memory_mb * 1024 * 1024
+        # Maps a key to the list of cached workspace names and the memory they take up, least recently used first
+        self._entries = collections.OrderedDict()
+        self._memory = 0
+
+    @property
+    def memory_size(self):
+        return self._memory
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Removes all cached workspaces from the ADS and empties the cache
+        :return: None
+        """
+        for key in list(self._entries):
+            self._remove_entry(key)
+
+    def get_rebinned_splines(self, spline_file_path, spectra_list):
+        """
+        Returns the splined vanadium bank for each bank in the spectra list rebinned to match it. The spline
+        file is only loaded and the banks are only rebinned if they are not held by the cache already.
+        :param spline_file_path: The path to the file containing the splined vanadium banks
+        :param spectra_list: The list of workspaces, one per bank, the splines will be divided into
+        :return: A list of the names of the rebinned splines, one per bank
+        """
+        file_stat = os.stat(spline_file_path)
+        file_key = (spline_file_path, file_stat.st_mtime, file_stat.st_size)
+        self._remove_outdated_entries(file_key)
+
+        rebinned_keys = [file_key + (bank_index, _get_binning_fingerprint(data_ws))
+                         for bank_index, data_ws in enumerate(spectra_list)]
+        rebinned_names = [self._lookup(key) for key in rebinned_keys]
+
+        missing_banks = [i for i, names in enumerate(rebinned_names) if names is None]
+        if missing_banks:
+            spline_names = self._lookup(file_key)
+            if spline_names is None:
+                spline_names = self._load_splines(spline_file_path)
+                self._add_entry(file_key, spline_names)
+            spline_bank_names = _get_bank_names(spline_names[0])
+            new_entries = []
+            # As with zip any banks without a spline are left out
+            for bank_index in (i for i in missing_banks if i < len(spline_bank_names)):
+                out_name = self._generate_ws_name()
+                mantid.RebinToWorkspace(WorkspaceToRebin=spline_bank_names[bank_index],
+                                        WorkspaceToMatch=spectra_list[bank_index], OutputWorkspace=out_name)
+                rebinned_names[bank_index] = [out_name]
+                new_entries.append((rebinned_keys[bank_index], [out_name]))
+            for key, names in new_entries:
+                self._add_entry(key, names)
+
+        # Only remove entries once all banks have been rebinned, as the loaded splines are used until then
+        self._remove_least_recently_used(keep=rebinned_keys)
+        return [names[0] for names in rebinned_names if names is not None]
+
+    def _add_entry(self, key, ws_names):
+        self._entries[key] = (ws_names, _get_memory_size(ws_names))
+        self._memory += self._entries[key][1]
+
+    @staticmethod
+    def _generate_ws_name():
+        return _WS_NAME_PREFIX + str(next(_ws_name_counter))
+
+    def _load_splines(self, spline_file_path):
+        out_name = self._generate_ws_name()
+        with nexus_file_lock:
+            mantid.LoadNexus(Filename=spline_file_path, OutputWorkspace=out_name)
+        return [out_name]
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not all(mantid.mtd.doesExist(name) for name in entry[0]):
+            # The workspaces have been removed from the ADS by the user
+            self._remove_entry(key)
+            return None
+        # Mark the entry as the most recently used
+        del self._entries[key]
+        self._entries[key] = entry
+        return entry[0]
+
+    def _remove_entry(self, key):
+        ws_names, memory_size = self._entries.pop(key)
+        self._memory -= memory_size
+        for name in ws_names:
+            if mantid.mtd.doesExist(name):
+                mantid.DeleteWorkspace(name)
+
+    def _remove_least_recently_used(self, keep):
+        # The entries which are about to be used are kept even if they exceed the bound on their own
+        removable_keys = [key for key in self._entries if key not in keep]
+        for key in removable_keys:
+            if self._memory <= self._max_memory:
+                break
+            self._remove_entry(key)
+
+    def _remove_outdated_entries(self, file_key):
+        spline_file_path = file_key[0]
+        outdated_keys = [key for key in self._entries if key[0] == spline_file_path and key[:len(file_key)] != file_key]
+        for key in outdated_keys:
+            self._remove_entry(key)
+
+
+def _get_binning_fingerprint(ws):
+    """
+    Returns a string which identifies the bin boundaries of a workspace
+    :param ws: The workspace to identify the binning of
+    :return: A hash of the units and bin boundaries of the workspace
+    """
+    bin_boundaries = numpy.ascontiguousarray(ws.extractX())
+    fingerprint = hashlib.sha1(bin_boundaries.tobytes())
+    fingerprint.update(str(bin_boundaries.shape).encode("utf-8"))
+    fingerprint.update(ws.getAxis(0).getUnit().unitID().encode("utf-8"))
+    return fingerprint.hexdigest()
+
+
+def _get_bank_names(ws_name):
+    """
+    Returns the names of the banks of a loaded spline file, which are the members of the group
+    loaded from a spline file with several banks
+    :param ws_name: The name of the loaded workspace
+    :return: The list of the names of the banks
+    """
+    ws = mantid.mtd[ws_name]
+    return list(ws.getNames()) if isinstance(ws, WorkspaceGroup) else [ws_name]
+
+
+def _get_memory_size(ws_names):
+    return sum(mantid.mtd[bank_name].getMemorySize() for name in ws_names for bank_name in _get_bank_names(name))
+
+
+_spline_cache = VanadiumSplineCache()
+
+
+def get_rebinned_splines(spline_file_path, spectra_list):
+    """
+    Returns the splined vanadium bank for each bank in the spectra list rebinned to match it, using the
+    vanadium splines cached by this process. See VanadiumSplineCache.get_rebinned_splines
+    :param spline_file_path: The path to the file containing the splined vanadium banks
+    :param spectra_list: The list of workspaces, one per bank, the splines will be divided into
+    :return: A list of the names of the rebinned splines, one per bank
+    """
+    return _spline_cache.get_rebinned_splines(spline_file_path=spline_file_path, spectra_list=spectra_list)
+
+
+def clear_vanadium_spline_cache():
+    """
+    Removes the vanadium splines cached by this process
+    :return: None
+    """
+    _spline_cache.clear()
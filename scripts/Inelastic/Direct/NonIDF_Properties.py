@@ -57,6 +57,7 @@ class NonIDF_Properties(object):
         super(NonIDF_Properties,self).__setattr__('second_white',None)
         super(NonIDF_Properties,self).__setattr__('_tmp_run',None)
         super(NonIDF_Properties,self).__setattr__('_cashe_sum_ws',False)
+        super(NonIDF_Properties,self).__setattr__('_sum_runs_cache_dir',None)
         super(NonIDF_Properties,self).__setattr__('_mapmask_ref_ws',None)
 
     #end
@@ -150,6 +151,22 @@ class NonIDF_Properties(object):
         self._cashe_sum_ws = bool(val)
     # -----------------------------------------------------------------------------
 
+    @property
+    def sum_runs_cache_dir(self):
+        """Used together with sum_runs property. If set to a folder, the partial sums
+           of runs are stored in this folder and kept in ADS. When the runs are summed
+           again, e.g. after more runs have been added to the list, only the runs, which
+           are not in a stored sum made with the same monitor and normalisation
+           settings, are loaded and added to it. None disables storing the sums.
+        """
+        return self._sum_runs_cache_dir
+
+    @sum_runs_cache_dir.setter
+    def sum_runs_cache_dir(self,val):
+#pylint: disable=attribute-defined-outside-init
+        self._sum_runs_cache_dir = str(val) if val else None
+    # -----------------------------------------------------------------------------
+
     @property
     def log_to_mantid(self):
         """Property specify if high level log should be printed to stdout or added to common Mantid log"""
@@ -5,10 +5,13 @@
 
 from __future__ import (absolute_import, division, print_function)
 from mantid.simpleapi import *
-from mantid.kernel import funcinspect
+from mantid.kernel import funcinspect, cachefile
 from Direct.PropertiesDescriptors import *
 import re
 import collections
+import hashlib
+import json
+import os
 
 
 class RunList(object):
@@ -26,6 +29,10 @@ class RunList(object):
         self._fext = None
         self.set_list2add(run_list,file_names,fext)
         self._partial_sum_ws_name = None
+        # settings the cached sum has been made with
+        self._partial_sum_key = None
+        # runs of the last sum, which were taken from the cached sum
+        self._reused_runs = []
    #
 
     def set_list2add(self,runs_to_add,fnames=None,fext=None):
@@ -64,20 +71,97 @@ class RunList(object):
         self._set_fnames(local_fnames,local_fext)
 #--------------------------------------------------------------------------------------------------
 
-    def set_cashed_sum_ws(self,ws,new_ws_name=None):
+    def set_cashed_sum_ws(self,ws,new_ws_name=None,sum_key=None):
         """Store the name of a workspace in the class
            as reference
+
+           sum_key -- the settings the sum has been made with or None if unknown
         """
         if new_ws_name:
             old_name = ws.name()
             if old_name != new_ws_name:
                 old_mon_name = old_name + '_monitors'
                 RenameWorkspace(ws,OutputWorkspace=new_ws_name)
-            if old_mon_name in mtd:
-                RenameWorkspace(old_mon_name,OutputWorkspace=new_ws_name + '_monitors')
+                if old_mon_name in mtd:
+                    RenameWorkspace(old_mon_name,OutputWorkspace=new_ws_name + '_monitors')
         else:
             new_ws_name = ws.name()
         self._partial_sum_ws_name = new_ws_name
+        self._partial_sum_key = sum_key
+    #
+
+    def is_cashed_sum_valid(self,sum_key,runs_to_sum):
+        """Check if the cached sum has been made with the settings provided
+           and contains only runs, which are in the list of runs to sum.
+           A sum containing other runs can not be used, as runs can only
+           be added to it.
+        """
+        ws = self.get_cashed_sum_ws()
+        if not ws:
+            return False
+        if self._partial_sum_key is not None and self._partial_sum_key != sum_key:
+            return False
+        summed_runs = RunDescriptor.get_sum_run_list(ws)
+        return _is_sub_list(summed_runs,runs_to_sum)
+    #
+
+    def get_reused_runs(self):
+        """Return the runs of the last sum, which were taken from the cached sum"""
+        return self._reused_runs
+    #
+
+    def set_reused_runs(self,runs):
+        self._reused_runs = list(runs)
+    #
+
+    def load_persisted_sum(self,cache_dir,sum_key,ws_name,runs_to_sum):
+        """Load the partial sum stored in the cache folder and use it as the cached sum
+
+           The partial sum is used only if it has been made with the settings provided
+           and contains only runs from the list of runs to sum.
+           Returns the list of runs in the partial sum or empty list if no suitable
+           partial sum is found.
+        """
+        base_name = _sum_cache_file_base(cache_dir,sum_key)
+        entry = cachefile.load_json(base_name + '.json')
+        if not isinstance(entry,dict) or entry.get('key') != sum_key:
+            return []
+        summed_runs = entry.get('runs',[])
+        if not _is_sub_list(summed_runs,runs_to_sum):
+            return []
+        if not os.path.isfile(base_name + '.nxs'):
+            return []
+        if entry.get('monitors') and not os.path.isfile(base_name + '_monitors.nxs'):
+            return []
+        try:
+            LoadNexusProcessed(Filename=base_name + '.nxs',OutputWorkspace=ws_name)
+            if entry.get('monitors'):
+                LoadNexusProcessed(Filename=base_name + '_monitors.nxs',OutputWorkspace=ws_name + '_monitors')
+        except (RuntimeError,ValueError):
+            return []
+        self.set_cashed_sum_ws(mtd[ws_name],None,sum_key)
+        return summed_runs
+    #
+
+    def persist_sum(self,cache_dir,sum_key,ws_name):
+        """Save the sum workspace and its monitors to the cache folder to be reused by
+           later reductions, which sum the same runs and may be more.
+        """
+        base_name = _sum_cache_file_base(cache_dir,sum_key)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        mon_ws_name = ws_name + '_monitors'
+        has_monitors = mon_ws_name in mtd
+        files_to_save = [(ws_name,base_name + '.nxs')]
+        if has_monitors:
+            files_to_save.append((mon_ws_name,base_name + '_monitors.nxs'))
+        # each file replaces the cached one in a single step, so that a partially
+        # written sum is never picked up
+        for name,file_name in files_to_save:
+            with cachefile.atomic_write(file_name) as tmp_file:
+                SaveNexusProcessed(InputWorkspace=name,Filename=tmp_file)
+        summed_runs = RunDescriptor.get_sum_run_list(mtd[ws_name])
+        cachefile.save_json(base_name + '.json',{'key':sum_key,'runs':summed_runs,'monitors':has_monitors})
     #
 
     def get_cashed_sum_ws(self):
@@ -1394,12 +1478,25 @@ class RunDescriptor(PropDescriptor):
 
         RunDescriptor._logger("*** Summing multiple runs            ****")
 
+        cache_dir = RunDescriptor._holder.sum_runs_cache_dir
+        sum_key = self._get_sum_key(inst_name,monitors_with_ws)
+        cashed_sum_name = self._prop_name + 'Sum_ws'
+        all_runs_to_sum = self._run_list.get_run_list2sum()
+        # a sum made with other settings or of other runs can not be added to
+        if self._run_list.get_cashed_sum_ws() and not self._run_list.is_cashed_sum_valid(sum_key,all_runs_to_sum):
+            self._run_list.del_cashed_sum()
+        if cache_dir and not self._run_list.get_cashed_sum_ws():
+            self._run_list.load_persisted_sum(cache_dir,sum_key,cashed_sum_name,all_runs_to_sum)
+
         runs_to_sum,sum_ws,n_already_summed = self.get_runs_to_sum()
         num_to_sum = len(runs_to_sum)
 
         if sum_ws:
+            reused_runs = RunDescriptor.get_sum_run_list(sum_ws)
             RunDescriptor._logger("*** Use cached sum of {0} workspaces and adding {1} remaining".
                                   format(n_already_summed,num_to_sum))
+            RunDescriptor._logger("*** Reused runs: {0}, runs to add: {1}".format(reused_runs,runs_to_sum))
+            self._run_list.set_reused_runs(reused_runs)
             sum_ws_name = sum_ws.name()
             sum_mon_name = sum_ws_name + '_monitors'
             AddedRunNumbers = sum_ws.getRun().getLogData(RunDescriptor._sum_log_name).value
@@ -1412,6 +1509,7 @@ class RunDescriptor(PropDescriptor):
             ws = self.load_file(inst_name,'Sum_ws',False,monitors_with_ws,
                                 False,file_hint=f_guess)
 
+            self._run_list.set_reused_runs([])
             sum_ws_name = ws.name()
             sum_mon_name = sum_ws_name + '_monitors'
             #AddedRunNumbers = [ws.getRunNumber()]
@@ -1452,14 +1550,35 @@ class RunDescriptor(PropDescriptor):
         AddSampleLog(Workspace=sum_ws_name,LogName = RunDescriptor._sum_log_name,
                      LogText=AddedRunNumbers,LogType='String')
 
-        if RunDescriptor._holder.cashe_sum_ws:
+        if cache_dir and num_to_sum > 0:
+            # store the sum on disk to add the runs arriving later to it in this or another session
+            self._run_list.persist_sum(cache_dir,sum_key,sum_ws_name)
+        if RunDescriptor._holder.cashe_sum_ws or cache_dir:
             # store workspace in cash for further usage
-            self._run_list.set_cashed_sum_ws(mtd[sum_ws_name],self._prop_name + 'Sum_ws')
+            self._run_list.set_cashed_sum_ws(mtd[sum_ws_name],cashed_sum_name,sum_key)
             ws = self._run_list.get_cashed_sum_clone()
         else:
             ws = mtd[sum_ws_name]
         return ws
 
+
+    def _get_sum_key(self,inst_name,monitors_with_ws):
+        """Return the settings, which identify a sum of runs for this property"""
+        holder = RunDescriptor._holder
+        first_run = self._run_list.get_all_run_list()[0]
+        return {'property':self._prop_name,'instrument':str(inst_name),'first_run':str(first_run),
+                'data_file_ext':str(holder.data_file_ext),'load_monitors_with_workspace':str(bool(monitors_with_ws)),
+                'normalise_method':str(holder.normalise_method),'mon1_norm_spec':str(holder.mon1_norm_spec),
+                'spectra_to_monitors_list':str(holder.spectra_to_monitors_list)}
+
+    def get_reused_sum_runs(self):
+        """Returns the list of runs, which were taken from the cached or stored partial sum
+           when the runs were last summed
+        """
+        if not self._run_list:
+            return []
+        return self._run_list.get_reused_runs()
+
 #-------------------------------------------------------------------------------------------------------------------------------
 #-------------------------------------------------------------------------------------------------------------------------------
 #-------------------------------------------------------------------------------------------------------------------------------
@@ -1530,6 +1649,12 @@ class RunDescriptorDependent(RunDescriptor):
         else:
             return self._host.get_run_list()
 
+    def get_reused_sum_runs(self):
+        if self._has_own_value:
+            return super(RunDescriptorDependent,self).get_reused_sum_runs()
+        else:
+            return self._host.get_reused_sum_runs()
+
     def set_action_suffix(self,suffix=None):
         if self._has_own_value:
             return super(RunDescriptorDependent,self).set_action_suffix(suffix)
@@ -1651,6 +1776,18 @@ class RunDescriptorDependent(RunDescriptor):
 #--------------------------------------------------------------------------------------------------------------------
 
 
+def _is_sub_list(sub_list,full_list):
+    """Check if every item of the sub list is in the full list, counting repeated items"""
+    full_count = collections.Counter(full_list)
+    return all(full_count[item] >= count for item,count in collections.Counter(sub_list).items())
+
+
+def _sum_cache_file_base(cache_dir,sum_key):
+    """Return the path to the files of a partial sum without extension"""
+    key_hash = hashlib.sha1(json.dumps(sum_key,sort_keys=True).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir,'{0}_SumCache_{1}'.format(sum_key['instrument'],key_hash[:20]))
+
+
 def build_run_file_name(run_num,inst,file_path='',fext=''):
     """Build the full name of a runfile from all possible components"""
     if fext is None:
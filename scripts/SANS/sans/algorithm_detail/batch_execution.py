@@ -1,6 +1,10 @@
 from __future__ import (absolute_import, division, print_function)
 from copy import deepcopy
+import os
+import shutil
+import tempfile
 from mantid.api import AnalysisDataService
+from mantid.kernel import workerpool
 
 from sans.common.general_functions import (create_managed_non_child_algorithm, create_unmanaged_algorithm,
                                            get_output_name, get_base_name_from_multi_period_name)
@@ -11,13 +15,26 @@ from sans.common.constants import (TRANS_SUFFIX, SANS_SUFFIX, ALL_PERIODS,
                                    REDUCED_HAB_AND_LAB_WORKSPACE_FOR_MERGED_REDUCTION,
                                    REDUCED_CAN_AND_PARTIAL_CAN_FOR_OPTIMIZATION)
 from sans.common.file_information import (get_extension_for_file_type, SANSFileInformationFactory)
+from sans.algorithm_detail.load_cache import (get_load_cache, get_load_cache_keys_for_state)
 from sans.state.data import StateData
+from sans.state.state_base import (convert_state_to_compact_dict, create_state_from_compact_state, COMPACT_STATE)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Functions for the execution of a single batch iteration
 # ----------------------------------------------------------------------------------------------------------------------
-def single_reduction_for_batch(state, use_optimizations, output_mode):
+workspace_to_name = {SANSDataType.SampleScatter: "SampleScatterWorkspace",
+                     SANSDataType.SampleTransmission: "SampleTransmissionWorkspace",
+                     SANSDataType.SampleDirect: "SampleDirectWorkspace",
+                     SANSDataType.CanScatter: "CanScatterWorkspace",
+                     SANSDataType.CanTransmission: "CanTransmissionWorkspace",
+                     SANSDataType.CanDirect: "CanDirectWorkspace"}
+
+workspace_to_monitor = {SANSDataType.SampleScatter: "SampleScatterMonitorWorkspace",
+                        SANSDataType.CanScatter: "CanScatterMonitorWorkspace"}
+
+
+def single_reduction_for_batch(state, use_optimizations, output_mode, load_cache_keys=None):
     """
     Runs a single reduction.
 
@@ -28,21 +45,31 @@ def single_reduction_for_batch(state, use_optimizations, output_mode):
     :param state: a SANSState object
     :param use_optimizations: if true then the optimizations of child algorithms are enabled.
     :param output_mode: the output mode
+    :param load_cache_keys: the keys of the load cache which were reserved for the state (see plan_load_cache) or
+                            None if the load cache is not used.
+    """
+    reduction_packages = provide_reduction_packages(state, use_optimizations, load_cache_keys)
+    run_reductions(reduction_packages, use_optimizations)
+    publish_reductions(reduction_packages, use_optimizations, output_mode)
+    release_load_cache(reduction_packages)
+
+
+def provide_reduction_packages(state, use_optimizations, load_cache_keys=None):
+    """
+    Loads the data of a state and splits it into reduction packages.
+
+    :param state: a SANSState object
+    :param use_optimizations: if true then the optimizations of child algorithms are enabled.
+    :param load_cache_keys: the keys of the load cache which were reserved for the state or None if the load cache
+                            is not used.
+    :return: a list of reduction packages
     """
     # ------------------------------------------------------------------------------------------------------------------
     # Load the data
     # ------------------------------------------------------------------------------------------------------------------
-    workspace_to_name = {SANSDataType.SampleScatter: "SampleScatterWorkspace",
-                         SANSDataType.SampleTransmission: "SampleTransmissionWorkspace",
-                         SANSDataType.SampleDirect: "SampleDirectWorkspace",
-                         SANSDataType.CanScatter: "CanScatterWorkspace",
-                         SANSDataType.CanTransmission: "CanTransmissionWorkspace",
-                         SANSDataType.CanDirect: "CanDirectWorkspace"}
-
-    workspace_to_monitor = {SANSDataType.SampleScatter: "SampleScatterMonitorWorkspace",
-                            SANSDataType.CanScatter: "CanScatterMonitorWorkspace"}
-
-    workspaces, monitors = provide_loaded_data(state, use_optimizations, workspace_to_name, workspace_to_monitor)
+    use_load_cache = load_cache_keys is not None
+    workspaces, monitors = provide_loaded_data(state, use_optimizations, workspace_to_name, workspace_to_monitor,
+                                               use_load_cache)
 
     # ------------------------------------------------------------------------------------------------------------------
     # Get reduction settings
@@ -50,10 +77,19 @@ def single_reduction_for_batch(state, use_optimizations, output_mode):
     # sliced times for example.
     # ------------------------------------------------------------------------------------------------------------------
     reduction_packages = get_reduction_packages(state, workspaces, monitors)
+    if use_load_cache:
+        for reduction_package in reduction_packages:
+            reduction_package.load_cache_keys = load_cache_keys
+    return reduction_packages
 
-    # ------------------------------------------------------------------------------------------------------------------
-    # Run reductions (one at a time)
-    # ------------------------------------------------------------------------------------------------------------------
+
+def run_reductions(reduction_packages, use_optimizations):
+    """
+    Runs the reduction of each reduction package (one at a time) and sets the reduced workspaces on the package.
+
+    :param reduction_packages: a list of reduction packages
+    :param use_optimizations: if true then the optimizations of child algorithms are enabled.
+    """
     single_reduction_name = "SANSSingleReduction"
     single_reduction_options = {"UseOptimizations": use_optimizations}
     reduction_alg = create_managed_non_child_algorithm(single_reduction_name, **single_reduction_options)
@@ -89,9 +125,19 @@ def single_reduction_for_batch(state, use_optimizations, output_mode):
         reduction_package.reduced_hab_can_norm = get_workspace_from_algorithm(reduction_alg,
                                                                               "OutputWorkspaceHABCanNorm")
 
-        # -----------------------------------
-        # The workspaces are already on the ADS, but should potentially be grouped
-        # -----------------------------------
+
+def publish_reductions(reduction_packages, use_optimizations, output_mode):
+    """
+    Groups, saves and cleans up the reduced workspaces of the reduction packages of a single state.
+
+    :param reduction_packages: a list of reduction packages which have been reduced
+    :param use_optimizations: if true then the optimizations of child algorithms are enabled.
+    :param output_mode: the output mode
+    """
+    # -----------------------------------
+    # The workspaces are already on the ADS, but should potentially be grouped
+    # -----------------------------------
+    for reduction_package in reduction_packages:
         group_workspaces_if_required(reduction_package)
 
     # --------------------------------
@@ -120,6 +166,276 @@ def single_reduction_for_batch(state, use_optimizations, output_mode):
         delete_optimization_workspaces(reduction_packages)
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Functions for the load cache of a batch
+# ----------------------------------------------------------------------------------------------------------------------
+def plan_load_cache(states):
+    """
+    Reserves the entries of the load cache for the files of each state, such that each file is loaded only once per
+    batch. The entries are released when the reductions of a state have been published.
+
+    :param states: a list of SANSState objects
+    :return: a list with the keys of the load cache for each state
+    """
+    load_cache = get_load_cache()
+    load_cache_keys_for_states = []
+    for state in states:
+        load_cache_keys = set(get_load_cache_keys_for_state(state))
+        for load_cache_key in load_cache_keys:
+            load_cache.reserve(load_cache_key)
+        load_cache_keys_for_states.append(load_cache_keys)
+    return load_cache_keys_for_states
+
+
+def release_load_cache(reduction_packages):
+    """
+    Releases the entries of the load cache which were reserved for the state of the reduction packages. All packages
+    of a state share the reservations of the state.
+
+    :param reduction_packages: the reduction packages of a single state
+    """
+    load_cache = get_load_cache()
+    if load_cache is None or not reduction_packages:
+        return
+    load_cache_keys = reduction_packages[0].load_cache_keys
+    if load_cache_keys is not None:
+        for load_cache_key in load_cache_keys:
+            load_cache.release(load_cache_key)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Functions for the execution of a batch in a pool of worker processes
+# ----------------------------------------------------------------------------------------------------------------------
+# The reduced workspaces of a reduction package which are sent back from the worker processes. The names of the
+# workspaces are stored on the package as <attribute>_name and <attribute>_base_name.
+REDUCED_WORKSPACE_ATTRIBUTES = ["reduced_lab", "reduced_hab", "reduced_merged",
+                                "reduced_lab_can", "reduced_lab_can_count", "reduced_lab_can_norm",
+                                "reduced_hab_can", "reduced_hab_can_count", "reduced_hab_can_norm"]
+
+REDUCED_CAN_WORKSPACE_ATTRIBUTES = REDUCED_WORKSPACE_ATTRIBUTES[3:]
+
+
+def can_use_worker_pool():
+    """
+    The worker processes are started afresh rather than forked from the current process, which is not possible with
+    Python 2 or within the GUI.
+
+    :return: true if worker processes can be started from this process
+    """
+    return workerpool.can_create_pool()
+
+
+def reduction_for_batch_in_worker_pool(states, use_optimizations, output_mode, number_of_processes,
+                                       load_cache_keys_for_states=None):
+    """
+    Runs the reductions of several states in a pool of worker processes.
+
+    The data of the states is loaded in this process until there are at least as many reduction packages as worker
+    processes. The loaded workspaces are then passed to the worker processes via files in a scratch directory and
+    each worker reduces one reduction package at a time in its own ADS. The reduced workspaces are sent back the same
+    way and then grouped, saved and cleaned up for each state as for a single reduction.
+    :param states: a list of SANSState objects
+    :param use_optimizations: if true then the optimizations of child algorithms are enabled.
+    :param output_mode: the output mode
+    :param number_of_processes: the number of worker processes
+    :param load_cache_keys_for_states: the keys of the load cache which were reserved for each state or None if the
+                                       load cache is not used.
+    """
+    if load_cache_keys_for_states is None:
+        load_cache_keys_for_states = [None] * len(states)
+
+    reduction_packages_for_states = []
+    number_of_reduction_packages = 0
+    for state, load_cache_keys in zip(states, load_cache_keys_for_states):
+        reduction_packages = provide_reduction_packages(state, use_optimizations, load_cache_keys)
+        reduction_packages_for_states.append(reduction_packages)
+        number_of_reduction_packages += len(reduction_packages)
+
+        if number_of_reduction_packages >= number_of_processes:
+            _reduce_and_publish_in_worker_pool(reduction_packages_for_states, use_optimizations, output_mode,
+                                               number_of_processes)
+            reduction_packages_for_states = []
+            number_of_reduction_packages = 0
+
+    if reduction_packages_for_states:
+        _reduce_and_publish_in_worker_pool(reduction_packages_for_states, use_optimizations, output_mode,
+                                           number_of_processes)
+
+
+def _reduce_and_publish_in_worker_pool(reduction_packages_for_states, use_optimizations, output_mode,
+                                       number_of_processes):
+    reduction_packages = [reduction_package for reduction_packages in reduction_packages_for_states
+                          for reduction_package in reduction_packages]
+    run_reductions_in_worker_pool(reduction_packages, use_optimizations, number_of_processes)
+    for reduction_packages in reduction_packages_for_states:
+        publish_reductions(reduction_packages, use_optimizations, output_mode)
+        release_load_cache(reduction_packages)
+
+
+def run_reductions_in_worker_pool(reduction_packages, use_optimizations, number_of_processes):
+    """
+    Runs the reduction of each reduction package in a pool of worker processes and sets the reduced workspaces,
+    which are loaded into the ADS of this process, on the package.
+
+    :param reduction_packages: a list of reduction packages
+    :param use_optimizations: if true then the optimizations of child algorithms are enabled.
+    :param number_of_processes: the number of worker processes
+    """
+    number_of_processes = min(number_of_processes, len(reduction_packages))
+    if number_of_processes <= 1 or not can_use_worker_pool():
+        run_reductions(reduction_packages, use_optimizations)
+        return
+
+    directory = tempfile.mkdtemp(prefix="sans_batch_")
+    try:
+        input_files = {}
+        tasks = [(index, get_worker_input(reduction_package, directory, input_files), use_optimizations, directory)
+                 for index, reduction_package in enumerate(reduction_packages)]
+        pool = workerpool.create_pool(number_of_processes)
+        try:
+            results = pool.map(_reduce_in_worker, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+        for reduction_package, (names, files) in zip(reduction_packages, results):
+            gather_reduced_workspaces(reduction_package, names, files)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def get_worker_input(reduction_package, directory, input_files):
+    """
+    Saves the input workspaces of a reduction package to the scratch directory, such that a worker process can
+    rebuild the package. A workspace which is shared by several packages is only saved once.
+
+    :param reduction_package: a reduction package
+    :param directory: the scratch directory
+    :param input_files: a dict with the file name for the id of each workspace which has been saved already
+    :return: the compact state, the flags of the package and a dict with the file name for the property name of each
+             input workspace and each monitor workspace
+    """
+    save_name = "SaveNexusProcessed"
+    save_alg = create_unmanaged_algorithm(save_name)
+
+    def _save_workspaces(_workspaces, _workspace_to_property_name):
+        _files = {}
+        for _workspace_type, _workspace in list(_workspaces.items()):
+            if _workspace is None:
+                continue
+            _file_name = input_files.get(id(_workspace))
+            if _file_name is None:
+                _file_name = os.path.join(directory, "input_{0}.nxs".format(len(input_files)))
+                save_alg.setProperty("InputWorkspace", _workspace)
+                save_alg.setProperty("Filename", _file_name)
+                save_alg.execute()
+                input_files.update({id(_workspace): _file_name})
+            _files.update({_workspace_to_property_name[_workspace_type]: _file_name})
+        return _files
+
+    compact_state = convert_state_to_compact_dict(reduction_package.state)[COMPACT_STATE]
+    workspace_files = _save_workspaces(reduction_package.workspaces, workspace_to_name)
+    monitor_files = _save_workspaces(reduction_package.monitors, workspace_to_monitor)
+    return (compact_state, reduction_package.is_part_of_multi_period_reduction,
+            reduction_package.is_part_of_event_slice_reduction, workspace_files, monitor_files)
+
+
+def create_reduction_package_from_worker_input(worker_input):
+    """
+    Rebuilds a reduction package in a worker process from the input which was created by get_worker_input. The input
+    workspaces are loaded into the ADS of the worker process.
+
+    :param worker_input: the input of the worker process
+    :return: a reduction package
+    """
+    compact_state, is_part_of_multi_period_reduction, is_part_of_event_slice_reduction, workspace_files, \
+        monitor_files = worker_input
+    # The state is shared with other users of the compact state, but the reduction package may alter it
+    state = deepcopy(create_state_from_compact_state(compact_state))
+
+    load_name = "LoadNexusProcessed"
+
+    def _load_workspaces(_files, _workspace_to_property_name):
+        _workspaces = {}
+        for _workspace_type, _property_name in list(_workspace_to_property_name.items()):
+            _file_name = _files.get(_property_name)
+            if _file_name is None:
+                continue
+            _workspace_name = os.path.splitext(os.path.basename(_file_name))[0]
+            if not AnalysisDataService.doesExist(_workspace_name):
+                _load_options = {"Filename": _file_name,
+                                 "OutputWorkspace": _workspace_name}
+                _load_alg = create_unmanaged_algorithm(load_name, **_load_options)
+                _load_alg.setChild(False)
+                _load_alg.execute()
+            _workspaces.update({_workspace_type: AnalysisDataService.retrieve(_workspace_name)})
+        return _workspaces
+
+    workspaces = _load_workspaces(workspace_files, workspace_to_name)
+    monitors = _load_workspaces(monitor_files, workspace_to_monitor)
+    return ReductionPackage(state, workspaces, monitors, is_part_of_multi_period_reduction,
+                            is_part_of_event_slice_reduction)
+
+
+def _reduce_in_worker(task):
+    """
+    Reduces a single reduction package in a worker process and saves the reduced workspaces to the scratch directory.
+
+    :param task: the index of the reduction package, its worker input, the optimization flag and the scratch directory
+    :return: a dict with the output names of the package and a dict with the saved file for each reduced workspace
+    """
+    index, worker_input, use_optimizations, directory = task
+    reduction_package = create_reduction_package_from_worker_input(worker_input)
+    run_reductions([reduction_package], use_optimizations)
+
+    save_name = "SaveNexusProcessed"
+    save_alg = create_unmanaged_algorithm(save_name)
+    delete_name = "DeleteWorkspace"
+    delete_alg = create_unmanaged_algorithm(delete_name)
+
+    names = {}
+    files = {}
+    for attribute in REDUCED_WORKSPACE_ATTRIBUTES:
+        names.update({attribute + "_name": getattr(reduction_package, attribute + "_name"),
+                      attribute + "_base_name": getattr(reduction_package, attribute + "_base_name")})
+        workspace = getattr(reduction_package, attribute)
+        if workspace is None:
+            continue
+        workspace_name = workspace.name()
+        file_name = os.path.join(directory, "{0}_{1}.nxs".format(index, attribute))
+        save_alg.setProperty("InputWorkspace", workspace)
+        save_alg.setProperty("Filename", file_name)
+        save_alg.execute()
+        files.update({attribute: (workspace_name, file_name)})
+
+        # The reduced can workspaces are kept for the optimizations of later reductions in this worker
+        if not use_optimizations or attribute not in REDUCED_CAN_WORKSPACE_ATTRIBUTES:
+            delete_alg.setProperty("Workspace", workspace_name)
+            delete_alg.execute()
+    return names, files
+
+
+def gather_reduced_workspaces(reduction_package, names, files):
+    """
+    Loads the reduced workspaces which were saved by a worker process into the ADS and sets them on the package.
+
+    :param reduction_package: the reduction package which was reduced by the worker process
+    :param names: a dict with the output names which were set on the package in the worker process
+    :param files: a dict with the workspace name and the file name for each reduced workspace
+    """
+    for attribute, name in list(names.items()):
+        setattr(reduction_package, attribute, name)
+
+    load_name = "LoadNexusProcessed"
+    for attribute, (workspace_name, file_name) in list(files.items()):
+        load_options = {"Filename": file_name,
+                        "OutputWorkspace": workspace_name}
+        load_alg = create_unmanaged_algorithm(load_name, **load_options)
+        load_alg.setChild(False)
+        load_alg.execute()
+        setattr(reduction_package, attribute, AnalysisDataService.retrieve(workspace_name))
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Functions for Data Loading
 # ----------------------------------------------------------------------------------------------------------------------
@@ -253,7 +569,7 @@ def set_output_workspaces_on_load_algorithm(load_options, state):
                                                                       file_info_factory=file_information_factory)
 
 
-def provide_loaded_data(state, use_optimizations, workspace_to_name, workspace_to_monitor):
+def provide_loaded_data(state, use_optimizations, workspace_to_name, workspace_to_monitor, use_load_cache=False):
     """
     Provide the data for reduction.
 
@@ -263,14 +579,16 @@ def provide_loaded_data(state, use_optimizations, workspace_to_name, workspace_t
                               ADS.
     :param workspace_to_name: a map of SANSDataType vs output-property name of SANSLoad for workspaces
     :param workspace_to_monitor: a map of SANSDataType vs output-property name of SANSLoad for monitor workspaces
+    :param use_load_cache: if true then the load cache of the batch is used.
     :return: a list fo workspaces and a list of monitor workspaces
     """
     # Load the data
-    state_serialized = state.property_manager
+    state_serialized = convert_state_to_compact_dict(state)
     load_name = "SANSLoad"
     load_options = {"SANSState": state_serialized,
                     "PublishToCache": use_optimizations,
                     "UseCached": use_optimizations,
+                    "UseLoadCache": use_load_cache,
                     "MoveWorkspace": False}
 
     # Set the output workspaces
@@ -579,7 +897,7 @@ def set_properties_for_reduction_algorithm(reduction_alg, reduction_package, wor
     # Go through the elements of the reduction package and set them on the reduction algorithm
     # Set the SANSState
     state = reduction_package.state
-    state_dict = state.property_manager
+    state_dict = convert_state_to_compact_dict(state)
     reduction_alg.setProperty("SANSState", state_dict)
 
     # Set the input workspaces
@@ -899,6 +1217,7 @@ class ReductionPackage(object):
     5. A flag which indicates if the reduction is part of a sliced reduction
     6. The reduced workspaces (not all need to exist)
     7. The reduced can and the reduced partial can workspaces (non have to exist, this is only for optimizations)
+    8. The keys of the load cache which were reserved for the state (shared by all packages of a state)
     """
     def __init__(self, state, workspaces, monitors, is_part_of_multi_period_reduction=False,
                  is_part_of_event_slice_reduction=False):
@@ -955,3 +1274,8 @@ class ReductionPackage(object):
         self.reduced_hab_can_count_base_name = None
         self.reduced_hab_can_norm_name = None
         self.reduced_hab_can_norm_base_name = None
+
+        # -------------------------------------------------------
+        # Keys of the load cache which were reserved for the state of the reduction
+        # -------------------------------------------------------
+        self.load_cache_keys = None
@@ -0,0 +1,272 @@
+""" A cache for the data loaded by SANSLoad which is shared by the reductions of a batch.
+
+The cache holds the loaded (and calibrated) workspaces and monitor workspaces of each file. An entry is identified by
+the hash of the file, the selected period, the calibration file and the data type (sample scatter, can transmission,
+etc.), since these settings determine the output of SANSLoad for a file.
+
+The batch planner reserves an entry for each state which requires it and releases it once the reductions of the
+state have been published. An entry is removed as soon as it is no longer reserved, such that a file which is used
+by several rows of a batch is only loaded once. If a memory budget is set, then the least recently used entries are
+removed when the budget is exceeded. Entries which are still reserved are saved to NeXus files in a scratch directory
+instead, if a spill directory has been specified, and are read back when they are required again.
+"""
+from __future__ import (absolute_import, division, print_function)
+from collections import OrderedDict
+import os
+import shutil
+import tempfile
+
+from mantid.kernel import cachefile
+from sans.common.constants import EMPTY_NAME
+from sans.common.general_functions import create_unmanaged_algorithm
+from sans.common.file_information import find_sans_file
+from sans.common.enums import SANSDataType
+
+# The load cache which is used by SANSLoad when UseLoadCache is set
+_load_cache = None
+
+
+def get_load_cache():
+    return _load_cache
+
+
+def set_load_cache(load_cache):
+    """
+    Sets the load cache which is used by SANSLoad when UseLoadCache is set.
+
+    :param load_cache: a SANSLoadCache or None
+    """
+    global _load_cache
+    if load_cache is not None and not isinstance(load_cache, SANSLoadCache):
+        raise ValueError("SANSLoadCache: Expected a SANSLoadCache object but got {0}".format(type(load_cache)))
+    _load_cache = load_cache
+
+
+def get_load_cache_key(full_file_name, period, calibration_file_name, data_type):
+    """
+    Gets the key of the load cache for the data of a file.
+
+    :param full_file_name: the full path to the file
+    :param period: the selected period
+    :param calibration_file_name: the calibration file which is applied to the data or an empty string
+    :param data_type: the SANSDataType of the data
+    :return: a key for the load cache
+    """
+    calibration_file_name = calibration_file_name if calibration_file_name else ""
+    return cachefile.file_hash(full_file_name), period, calibration_file_name, data_type
+
+
+def get_load_cache_keys_for_state(state):
+    """
+    Gets the keys of the load cache for all files of a state.
+
+    :param state: a SANSState object
+    :return: a list of keys for the load cache
+    """
+    data = state.data
+    files = [(SANSDataType.SampleScatter, data.sample_scatter, data.sample_scatter_period),
+             (SANSDataType.SampleTransmission, data.sample_transmission, data.sample_transmission_period),
+             (SANSDataType.SampleDirect, data.sample_direct, data.sample_direct_period),
+             (SANSDataType.CanScatter, data.can_scatter, data.can_scatter_period),
+             (SANSDataType.CanTransmission, data.can_transmission, data.can_transmission_period),
+             (SANSDataType.CanDirect, data.can_direct, data.can_direct_period)]
+    keys = []
+    for data_type, file_name, period in files:
+        if file_name is not None:
+            keys.append(get_load_cache_key(find_sans_file(file_name), period, data.calibration, data_type))
+    return keys
+
+
+class LoadCacheEntry(object):
+    def __init__(self):
+        super(LoadCacheEntry, self).__init__()
+        # The workspaces and monitor workspaces of a file. They are None if the entry is not held in memory.
+        self.workspaces = None
+        self.monitors = None
+        self.memory = 0
+        # The files to which the workspaces and monitor workspaces have been saved
+        self.workspace_files = None
+        self.monitor_files = None
+        # The number of reservations of the entry
+        self.references = 0
+
+    def is_in_memory(self):
+        return self.workspaces is not None
+
+    def is_spilled(self):
+        return self.workspace_files is not None
+
+
+class SANSLoadCache(object):
+    def __init__(self, memory_budget_mb=None, spill_directory=None):
+        """
+        :param memory_budget_mb: the maximal memory (in MB) of the workspaces which are held by the cache or None if
+                                 there is no limit
+        :param spill_directory: the directory in which a scratch directory for the workspaces which have to be removed
+                                from memory is created or None if the workspaces are not saved
+        """
+        super(SANSLoadCache, self).__init__()
+        if memory_budget_mb is not None and not memory_budget_mb > 0:
+            raise ValueError("SANSLoadCache: The memory budget has to be positive but was {0}".format(memory_budget_mb))
+        if spill_directory is not None and not os.path.isdir(spill_directory):
+            raise ValueError("SANSLoadCache: The spill directory {0} does not exist.".format(spill_directory))
+        self._memory_budget = None if memory_budget_mb is None else memory_budget_mb * 1024 * 1024
+        self._spill_directory = spill_directory
+        self._scratch_directory = None
+        # The entries are ordered from the least to the most recently used entry
+        self._entries = OrderedDict()
+
+    @property
+    def memory(self):
+        """ The memory of the workspaces which are held by the cache in bytes."""
+        return sum(entry.memory for entry in self._entries.values())
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and (entry.is_in_memory() or entry.is_spilled())
+
+    def reserve(self, key):
+        """
+        Reserves an entry, such that it is kept until it is released.
+
+        :param key: a key of the load cache
+        """
+        if key not in self._entries:
+            self._entries[key] = LoadCacheEntry()
+        self._entries[key].references += 1
+
+    def release(self, key):
+        """
+        Releases a reservation of an entry. The entry is removed when it is no longer reserved.
+
+        :param key: a key of the load cache
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.references -= 1
+        if entry.references <= 0:
+            self._remove(key)
+
+    def get(self, key):
+        """
+        Gets the workspaces and monitor workspaces of an entry. Entries which have been saved to file are read back.
+
+        :param key: a key of the load cache
+        :return: a list of workspaces and a list of monitor workspaces or None if the entry is not available
+        """
+        if key not in self:
+            return None
+        entry = self._entries[key]
+        self._mark_as_used(key)
+        if not entry.is_in_memory():
+            workspaces = [self._load(file_name) for file_name in entry.workspace_files]
+            monitors = [self._load(file_name) for file_name in entry.monitor_files]
+            self._set_workspaces(entry, workspaces, monitors)
+            self._apply_memory_budget(key)
+        return entry.workspaces, entry.monitors
+
+    def add(self, key, workspaces, monitors):
+        """
+        Adds the workspaces and monitor workspaces of a file to the cache.
+
+        :param key: a key of the load cache
+        :param workspaces: a list of workspaces
+        :param monitors: a list of monitor workspaces (which can be empty)
+        """
+        if key not in self._entries:
+            self._entries[key] = LoadCacheEntry()
+        entry = self._entries[key]
+        self._delete_files(entry)
+        self._set_workspaces(entry, list(workspaces), list(monitors))
+        self._mark_as_used(key)
+        self._apply_memory_budget(key)
+
+    def clear(self):
+        """
+        Removes all entries and the scratch directory.
+        """
+        self._entries.clear()
+        if self._scratch_directory is not None:
+            shutil.rmtree(self._scratch_directory, ignore_errors=True)
+            self._scratch_directory = None
+
+    def _mark_as_used(self, key):
+        entry = self._entries.pop(key)
+        self._entries[key] = entry
+
+    @staticmethod
+    def _set_workspaces(entry, workspaces, monitors):
+        entry.workspaces = workspaces
+        entry.monitors = monitors
+        entry.memory = sum(workspace.getMemorySize() for workspace in workspaces + monitors)
+
+    def _apply_memory_budget(self, key_to_keep):
+        """
+        Removes the least recently used workspaces from memory until the memory budget is met. Entries which are
+        still reserved are saved to file if a spill directory has been specified.
+
+        :param key_to_keep: the key of the entry which has just been used.
+        """
+        if self._memory_budget is None:
+            return
+        for key in list(self._entries.keys()):
+            if self.memory <= self._memory_budget:
+                break
+            entry = self._entries[key]
+            if key == key_to_keep or not entry.is_in_memory():
+                continue
+            if entry.references > 0 and self._spill_directory is not None:
+                self._spill(key, entry)
+            elif entry.references > 0:
+                # The entry stays reserved, but the data will have to be loaded again
+                entry.workspaces = None
+                entry.monitors = None
+                entry.memory = 0
+            else:
+                self._remove(key)
+
+    def _spill(self, key, entry):
+        if not entry.is_spilled():
+            if self._scratch_directory is None:
+                self._scratch_directory = tempfile.mkdtemp(prefix="sans_load_cache_", dir=self._spill_directory)
+            base_name = "{0}_{1}_{2}".format(key[0], key[1], SANSDataType.to_string(key[3]))
+            entry.workspace_files = [self._save(workspace, "{0}_{1}".format(base_name, index))
+                                     for index, workspace in enumerate(entry.workspaces)]
+            entry.monitor_files = [self._save(monitor, "{0}_monitor_{1}".format(base_name, index))
+                                   for index, monitor in enumerate(entry.monitors)]
+        entry.workspaces = None
+        entry.monitors = None
+        entry.memory = 0
+
+    def _save(self, workspace, name):
+        file_name = os.path.join(self._scratch_directory, name + ".nxs")
+        save_name = "SaveNexusProcessed"
+        save_options = {"InputWorkspace": workspace,
+                        "Filename": file_name}
+        save_alg = create_unmanaged_algorithm(save_name, **save_options)
+        save_alg.execute()
+        return file_name
+
+    @staticmethod
+    def _load(file_name):
+        load_name = "LoadNexusProcessed"
+        load_options = {"Filename": file_name,
+                        "OutputWorkspace": EMPTY_NAME}
+        load_alg = create_unmanaged_algorithm(load_name, **load_options)
+        load_alg.execute()
+        return load_alg.getProperty("OutputWorkspace").value
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._delete_files(entry)
+
+    @staticmethod
+    def _delete_files(entry):
+        if entry.is_spilled():
+            for file_name in entry.workspace_files + entry.monitor_files:
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+        entry.workspace_files = None
+        entry.monitor_files = None
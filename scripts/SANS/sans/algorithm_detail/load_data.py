@@ -41,6 +41,7 @@ CACHING:
 Adding to the cache(ADS) is supported for the TubeCalibration file.
 Reading from the cache is supported for all files. This avoids data reloads if the correct file is already in the
 cache.
+In addition the loaded data can be shared via the load cache of a batch reduction, see load_cache.py.
 """
 from __future__ import (absolute_import, division, print_function)
 from abc import (ABCMeta, abstractmethod)
@@ -58,6 +59,7 @@ from sans.common.general_functions import (create_child_algorithm)
 from sans.common.log_tagger import (set_tag, has_tag, get_tag)
 from sans.state.data import (StateData)
 from sans.algorithm_detail.calibration import apply_calibration
+from sans.algorithm_detail.load_cache import (get_load_cache, get_load_cache_key)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -686,12 +688,12 @@ def load_isis(data_type, file_information, period, use_cached, calibration_file_
 class SANSLoadData(with_metaclass(ABCMeta, object)):
     """ Base class for all SANSLoad implementations."""
     @abstractmethod
-    def do_execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg):
+    def do_execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg, use_load_cache=False):
         pass
 
-    def execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg):
+    def execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg, use_load_cache=False):
         SANSLoadData._validate(data_info)
-        return self.do_execute(data_info, use_cached, publish_to_ads, progress, parent_alg)
+        return self.do_execute(data_info, use_cached, publish_to_ads, progress, parent_alg, use_load_cache)
 
     @staticmethod
     def _validate(data_info):
@@ -703,7 +705,7 @@ class SANSLoadData(with_metaclass(ABCMeta, object)):
 
 class SANSLoadDataISIS(SANSLoadData):
     """Load implementation of SANSLoad for ISIS data"""
-    def do_execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg):
+    def do_execute(self, data_info, use_cached, publish_to_ads, progress, parent_alg, use_load_cache=False):
         # Get all entries from the state file
         file_infos, period_infos = get_file_and_period_information_from_data(data_info)
 
@@ -720,7 +722,23 @@ class SANSLoadDataISIS(SANSLoadData):
         else:
             calibration_file = ""
 
+        # Data in the load cache has already been calibrated and corrected. Only newly loaded data is added to it.
+        load_cache = get_load_cache() if use_load_cache else None
+        load_cache_keys = {}
+
         for key, value in list(file_infos.items()):
+            if load_cache is not None:
+                load_cache_key = get_load_cache_key(value.get_file_name(), period_infos[key], calibration_file, key)
+                cached = load_cache.get(load_cache_key)
+                if cached is not None:
+                    progress.report("Using cached {0}".format(SANSDataType.to_string(key)))
+                    cached_workspaces, cached_monitors = cached
+                    workspaces.update({key: cached_workspaces})
+                    if cached_monitors:
+                        workspace_monitors.update({key: cached_monitors})
+                    continue
+                load_cache_keys.update({key: load_cache_key})
+
             # Loading
             report_message = "Loading {0}".format(SANSDataType.to_string(key))
             progress.report(report_message)
@@ -734,15 +752,25 @@ class SANSLoadDataISIS(SANSLoadData):
             if workspace_monitors_pack is not None:
                 workspace_monitors.update(workspace_monitors_pack)
 
+        loaded_workspaces = {key: workspace for key, workspace in list(workspaces.items())
+                             if load_cache is None or key in load_cache_keys}
+        loaded_workspace_monitors = {key: workspace for key, workspace in list(workspace_monitors.items())
+                                     if key in loaded_workspaces}
+
         # Apply the calibration if any exists.
         if data_info.calibration:
             report_message = "Applying calibration."
             progress.report(report_message)
-            apply_calibration(calibration_file, workspaces, workspace_monitors, use_cached, publish_to_ads, parent_alg)
+            apply_calibration(calibration_file, loaded_workspaces, loaded_workspace_monitors, use_cached,
+                              publish_to_ads, parent_alg)
 
         # Apply corrections for transmission workspaces
         transmission_correction = get_transmission_correction(data_info)
-        transmission_correction.correct(workspaces, parent_alg)
+        transmission_correction.correct(loaded_workspaces, parent_alg)
+
+        # Add the loaded data to the load cache
+        for key, load_cache_key in list(load_cache_keys.items()):
+            load_cache.add(load_cache_key, workspaces[key], workspace_monitors.get(key, []))
 
         return workspaces, workspace_monitors
 
@@ -7,6 +7,7 @@ from sans.common.enums import (ISISReductionMode, DetectorType, DataType, Output
 from sans.algorithm_detail.strip_end_nans_and_infs import strip_end_nans
 from sans.algorithm_detail.merge_reductions import (MergeFactory, is_sample, is_can)
 from sans.algorithm_detail.bundles import (OutputBundle, OutputPartsBundle)
+from sans.state.state_base import convert_state_to_compact_dict
 
 
 def run_core_reduction(reduction_alg, reduction_setting_bundle):
@@ -21,7 +22,7 @@ def run_core_reduction(reduction_alg, reduction_setting_bundle):
     # Get component to reduce
     component = get_component_to_reduce(reduction_setting_bundle)
     # Set the properties on the reduction algorithms
-    serialized_state = reduction_setting_bundle.state.property_manager
+    serialized_state = convert_state_to_compact_dict(reduction_setting_bundle.state)
     reduction_alg.setProperty("SANSState", serialized_state)
     reduction_alg.setProperty("Component", component)
     reduction_alg.setProperty("ScatterWorkspace", reduction_setting_bundle.scatter_workspace)
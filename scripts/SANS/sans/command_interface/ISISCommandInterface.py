@@ -12,7 +12,7 @@ from sans.command_interface.command_interface_state_director import (CommandInte
                                                                      FitData)
 from sans.command_interface.batch_csv_file_parser import BatchCsvParser
 from sans.common.constants import ALL_PERIODS
-from sans.common.file_information import (find_sans_file, find_full_file_path)
+from sans.common.file_information import (find_sans_file, find_full_file_path, get_file_information_index)
 from sans.common.enums import (DetectorType, FitType, RangeStepType, ReductionDimensionality,
                                ISISReductionMode, SANSFacility, SaveType, BatchReductionEntry, OutputMode)
 from sans.common.general_functions import (convert_bank_name_to_detector_type_isis, get_output_name,
@@ -848,91 +848,93 @@ def BatchReduce(filename, format, plotresults=False, saveAlgs=None, verbose=Fals
     batch_csv_parser = BatchCsvParser(filename)
     parsed_batch_entries = batch_csv_parser.parse_batch_file()
 
-    # Get a state with all existing settings
-    for parsed_batch_entry in parsed_batch_entries:
-        # A new user file. If a new user file is provided then this will overwrite all other settings from,
-        # otherwise we might have cross-talk between user files.
-        if BatchReductionEntry.UserFile in list(parsed_batch_entry.keys()):
-            user_file = parsed_batch_entry[BatchReductionEntry.UserFile]
-            MaskFile(user_file)
-
-        # Sample scatter
-        sample_scatter = parsed_batch_entry[BatchReductionEntry.SampleScatter]
-        sample_scatter_period = parsed_batch_entry[BatchReductionEntry.SampleScatterPeriod]
-        AssignSample(sample_run=sample_scatter, period=sample_scatter_period)
-
-        # Sample transmission
-        if (BatchReductionEntry.SampleTransmission in list(parsed_batch_entry.keys()) and
-           BatchReductionEntry.SampleDirect in list(parsed_batch_entry.keys())):
-            sample_transmission = parsed_batch_entry[BatchReductionEntry.SampleTransmission]
-            sample_transmission_period = parsed_batch_entry[BatchReductionEntry.SampleTransmissionPeriod]
-            sample_direct = parsed_batch_entry[BatchReductionEntry.SampleDirect]
-            sample_direct_period = parsed_batch_entry[BatchReductionEntry.SampleDirectPeriod]
-            TransmissionSample(sample=sample_transmission, direct=sample_direct,
-                               period_t=sample_transmission_period, period_d=sample_direct_period)
-
-        # Can scatter
-        if BatchReductionEntry.CanScatter in list(parsed_batch_entry.keys()):
-            can_scatter = parsed_batch_entry[BatchReductionEntry.CanScatter]
-            can_scatter_period = parsed_batch_entry[BatchReductionEntry.CanScatterPeriod]
-            AssignCan(can_run=can_scatter, period=can_scatter_period)
-
-        # Can transmission
-        if (BatchReductionEntry.CanTransmission in list(parsed_batch_entry.keys()) and
-           BatchReductionEntry.CanDirect in list(parsed_batch_entry.keys())):
-            can_transmission = parsed_batch_entry[BatchReductionEntry.CanTransmission]
-            can_transmission_period = parsed_batch_entry[BatchReductionEntry.CanTransmissionPeriod]
-            can_direct = parsed_batch_entry[BatchReductionEntry.CanDirect]
-            can_direct_period = parsed_batch_entry[BatchReductionEntry.CanDirectPeriod]
-            TransmissionCan(can=can_transmission, direct=can_direct,
-                            period_t=can_transmission_period, period_d=can_direct_period)
-
-        # Name of the output. We need to modify the name according to the setup of the old reduction mechanism
-        output_name = parsed_batch_entry[BatchReductionEntry.Output]
-
-        # In addition to the output name the user can specify with combineDet an additional suffix (in addtion to the
-        # suffix that the user can set already -- was there previously, so we have to provide that)
-        use_reduction_mode_as_suffix = combineDet is not None
-
-        # Apply save options
-        if save_algs:
-            set_save(save_algorithms=save_algs, save_as_zero_error_free=save_as_zero_error_free)
-
-        # Run the reduction for a single
-        reduced_workspace_name = WavRangeReduction(combineDet=combineDet, output_name=output_name,
-                                                   output_mode=output_mode,
-                                                   use_reduction_mode_as_suffix=use_reduction_mode_as_suffix)
-
-        # Remove the settings which were very specific for this single reduction which are:
-        # 1. The last user file (if any was set)
-        # 2. The last scatter entry
-        # 3. The last scatter transmission and direct entry (if any were set)
-        # 4. The last can scatter ( if any was set)
-        # 5. The last can transmission and direct entry (if any were set)
-        if BatchReductionEntry.UserFile in list(parsed_batch_entry.keys()):
-            director.remove_last_user_file()
-        director.remove_last_scatter_sample()
-
-        if (BatchReductionEntry.SampleTransmission in list(parsed_batch_entry.keys()) and
-            BatchReductionEntry.SampleDirect in list(parsed_batch_entry.keys())):  # noqa
-            director.remove_last_sample_transmission_and_direct()
-
-        if BatchReductionEntry.CanScatter in list(parsed_batch_entry.keys()):
-            director.remove_last_scatter_can()
-
-        if (BatchReductionEntry.CanTransmission in list(parsed_batch_entry.keys()) and
-           BatchReductionEntry.CanDirect in list(parsed_batch_entry.keys())):
-            director.remove_last_can_transmission_and_direct()
-
-        # Plot the results if that was requested, the flag 1 is from the old version.
-        if plotresults == 1:
-            if AnalysisDataService.doesExist(reduced_workspace_name):
-                workspace = AnalysisDataService.retrieve(reduced_workspace_name)
-                if isinstance(workspace, WorkspaceGroup):
-                    for ws in workspace:
-                        PlotResult(ws.getName())
-                else:
-                    PlotResult(workspace.getName())
+    # The files of the batch are added to the file information index in one go
+    with get_file_information_index().deferred_saving():
+        # Get a state with all existing settings
+        for parsed_batch_entry in parsed_batch_entries:
+            # A new user file. If a new user file is provided then this will overwrite all other settings from,
+            # otherwise we might have cross-talk between user files.
+            if BatchReductionEntry.UserFile in list(parsed_batch_entry.keys()):
+                user_file = parsed_batch_entry[BatchReductionEntry.UserFile]
+                MaskFile(user_file)
+
+            # Sample scatter
+            sample_scatter = parsed_batch_entry[BatchReductionEntry.SampleScatter]
+            sample_scatter_period = parsed_batch_entry[BatchReductionEntry.SampleScatterPeriod]
+            AssignSample(sample_run=sample_scatter, period=sample_scatter_period)
+
+            # Sample transmission
+            if (BatchReductionEntry.SampleTransmission in list(parsed_batch_entry.keys()) and
+               BatchReductionEntry.SampleDirect in list(parsed_batch_entry.keys())):
+                sample_transmission = parsed_batch_entry[BatchReductionEntry.SampleTransmission]
+                sample_transmission_period = parsed_batch_entry[BatchReductionEntry.SampleTransmissionPeriod]
+                sample_direct = parsed_batch_entry[BatchReductionEntry.SampleDirect]
+                sample_direct_period = parsed_batch_entry[BatchReductionEntry.SampleDirectPeriod]
+                TransmissionSample(sample=sample_transmission, direct=sample_direct,
+                                   period_t=sample_transmission_period, period_d=sample_direct_period)
+
+            # Can scatter
+            if BatchReductionEntry.CanScatter in list(parsed_batch_entry.keys()):
+                can_scatter = parsed_batch_entry[BatchReductionEntry.CanScatter]
+                can_scatter_period = parsed_batch_entry[BatchReductionEntry.CanScatterPeriod]
+                AssignCan(can_run=can_scatter, period=can_scatter_period)
+
+            # Can transmission
+            if (BatchReductionEntry.CanTransmission in list(parsed_batch_entry.keys()) and
+               BatchReductionEntry.CanDirect in list(parsed_batch_entry.keys())):
+                can_transmission = parsed_batch_entry[BatchReductionEntry.CanTransmission]
+                can_transmission_period = parsed_batch_entry[BatchReductionEntry.CanTransmissionPeriod]
+                can_direct = parsed_batch_entry[BatchReductionEntry.CanDirect]
+                can_direct_period = parsed_batch_entry[BatchReductionEntry.CanDirectPeriod]
+                TransmissionCan(can=can_transmission, direct=can_direct,
+                                period_t=can_transmission_period, period_d=can_direct_period)
+
+            # Name of the output. We need to modify the name according to the setup of the old reduction mechanism
+            output_name = parsed_batch_entry[BatchReductionEntry.Output]
+
+            # In addition to the output name the user can specify with combineDet an additional suffix (in addtion to
+            # the suffix that the user can set already -- was there previously, so we have to provide that)
+            use_reduction_mode_as_suffix = combineDet is not None
+
+            # Apply save options
+            if save_algs:
+                set_save(save_algorithms=save_algs, save_as_zero_error_free=save_as_zero_error_free)
+
+            # Run the reduction for a single
+            reduced_workspace_name = WavRangeReduction(combineDet=combineDet, output_name=output_name,
+                                                       output_mode=output_mode,
+                                                       use_reduction_mode_as_suffix=use_reduction_mode_as_suffix)
+
+            # Remove the settings which were very specific for this single reduction which are:
+            # 1. The last user file (if any was set)
+            # 2. The last scatter entry
+            # 3. The last scatter transmission and direct entry (if any were set)
+            # 4. The last can scatter ( if any was set)
+            # 5. The last can transmission and direct entry (if any were set)
+            if BatchReductionEntry.UserFile in list(parsed_batch_entry.keys()):
+                director.remove_last_user_file()
+            director.remove_last_scatter_sample()
+
+            if (BatchReductionEntry.SampleTransmission in list(parsed_batch_entry.keys()) and
+                BatchReductionEntry.SampleDirect in list(parsed_batch_entry.keys())):  # noqa
+                director.remove_last_sample_transmission_and_direct()
+
+            if BatchReductionEntry.CanScatter in list(parsed_batch_entry.keys()):
+                director.remove_last_scatter_can()
+
+            if (BatchReductionEntry.CanTransmission in list(parsed_batch_entry.keys()) and
+               BatchReductionEntry.CanDirect in list(parsed_batch_entry.keys())):
+                director.remove_last_can_transmission_and_direct()
+
+            # Plot the results if that was requested, the flag 1 is from the old version.
+            if plotresults == 1:
+                if AnalysisDataService.doesExist(reduced_workspace_name):
+                    workspace = AnalysisDataService.retrieve(reduced_workspace_name)
+                    if isinstance(workspace, WorkspaceGroup):
+                        for ws in workspace:
+                            PlotResult(ws.getName())
+                    else:
+                        PlotResult(workspace.getName())
 
 
 def CompWavRanges(wavelens, plot=True, combineDet=None, resetSetup=True):
@@ -4,10 +4,11 @@
 
 from __future__ import (absolute_import, division, print_function)
 import os
+from contextlib import contextmanager
 import h5py as h5
 from abc import (ABCMeta, abstractmethod)
 from mantid.api import FileFinder
-from mantid.kernel import (DateAndTime, ConfigService)
+from mantid.kernel import (DateAndTime, ConfigService, cachefile, version_str)
 from mantid.api import (AlgorithmManager, ExperimentInfo)
 from sans.common.enums import (SANSInstrument, FileType, SampleShape)
 from sans.common.constants import (SANS2D, LARMOR, LOQ)
@@ -275,21 +276,26 @@ def get_isis_nexus_info(file_name):
     """
     try:
         with h5.File(file_name) as h5_file:
-            keys = list(h5_file.keys())
-            is_isis_nexus = RAW_DATA_1 in keys
-            if is_isis_nexus:
-                first_entry = h5_file[RAW_DATA_1]
-                period_group = first_entry[PERIODS]
-                proton_charge_data_set = period_group[PROTON_CHARGE]
-                number_of_periods = len(proton_charge_data_set)
-            else:
-                number_of_periods = -1
+            is_isis_nexus, number_of_periods = get_isis_nexus_info_from_h5_file(h5_file)
     except IOError:
         is_isis_nexus = False
         number_of_periods = -1
     return is_isis_nexus, number_of_periods
 
 
+def get_isis_nexus_info_from_h5_file(h5_file):
+    keys = list(h5_file.keys())
+    is_isis_nexus = RAW_DATA_1 in keys
+    if is_isis_nexus:
+        first_entry = h5_file[RAW_DATA_1]
+        period_group = first_entry[PERIODS]
+        proton_charge_data_set = period_group[PROTON_CHARGE]
+        number_of_periods = len(proton_charge_data_set)
+    else:
+        number_of_periods = -1
+    return is_isis_nexus, number_of_periods
+
+
 def is_isis_nexus_single_period(file_name):
     return is_single_period(get_isis_nexus_info, file_name)
 
@@ -311,18 +317,22 @@ def get_instrument_name_for_isis_nexus(file_name):
                                                      |--name
     """
     with h5.File(file_name) as h5_file:
-        # Open first entry
-        keys = list(h5_file.keys())
-        first_entry = h5_file[keys[0]]
-        # Open instrument group
-        instrument_group = first_entry[INSTRUMENT]
-        # Open name data set
-        name_data_set = instrument_group[NAME]
-        # Read value
-        instrument_name = name_data_set[0].decode("utf-8")
+        instrument_name = get_instrument_name_from_h5_file(h5_file)
     return instrument_name
 
 
+def get_instrument_name_from_h5_file(h5_file):
+    # Open first entry
+    keys = list(h5_file.keys())
+    first_entry = h5_file[keys[0]]
+    # Open instrument group
+    instrument_group = first_entry[INSTRUMENT]
+    # Open name data set
+    name_data_set = instrument_group[NAME]
+    # Read value
+    return name_data_set[0].decode("utf-8")
+
+
 def get_top_level_nexus_entry(file_name, entry_name):
     """
     Gets the first entry in a Nexus file.
@@ -332,14 +342,18 @@ def get_top_level_nexus_entry(file_name, entry_name):
     :return:
     """
     with h5.File(file_name) as h5_file:
-        # Open first entry
-        keys = list(h5_file.keys())
-        top_level = h5_file[keys[0]]
-        entry = top_level[entry_name]
-        value = entry[0]
+        value = get_top_level_nexus_entry_from_h5_file(h5_file, entry_name)
     return value
 
 
+def get_top_level_nexus_entry_from_h5_file(h5_file, entry_name):
+    # Open first entry
+    keys = list(h5_file.keys())
+    top_level = h5_file[keys[0]]
+    entry = top_level[entry_name]
+    return entry[0]
+
+
 def get_date_for_isis_nexus(file_name):
     value = get_top_level_nexus_entry(file_name, START_TIME)
     return DateAndTime(value)
@@ -358,15 +372,20 @@ def get_event_mode_information(file_name):
                                                  |--Attribute: NX_class = NXevent_data
     """
     with h5.File(file_name) as h5_file:
-        # Open first entry
-        keys = list(h5_file.keys())
-        first_entry = h5_file[keys[0]]
-        # Open instrument group
-        is_event_mode = False
-        for value in list(first_entry.values()):
-            if NX_CLASS in value.attrs and NX_EVENT_DATA == value.attrs[NX_CLASS].decode("utf-8"):
-                is_event_mode = True
-                break
+        is_event_mode = get_event_mode_information_from_h5_file(h5_file)
+    return is_event_mode
+
+
+def get_event_mode_information_from_h5_file(h5_file):
+    # Open first entry
+    keys = list(h5_file.keys())
+    first_entry = h5_file[keys[0]]
+    # Open instrument group
+    is_event_mode = False
+    for value in list(first_entry.values()):
+        if NX_CLASS in value.attrs and NX_EVENT_DATA == value.attrs[NX_CLASS].decode("utf-8"):
+            is_event_mode = True
+            break
     return is_event_mode
 
 
@@ -378,22 +397,27 @@ def get_geometry_information_isis_nexus(file_name):
     :return: height, width, thickness, shape
     """
     with h5.File(file_name) as h5_file:
-        # Open first entry
-        keys = list(h5_file.keys())
-        top_level = h5_file[keys[0]]
-        sample = top_level[SAMPLE]
-        height = float(sample[HEIGHT][0])
-        width = float(sample[WIDTH][0])
-        thickness = float(sample[THICKNESS][0])
-        shape_as_string = sample[SHAPE][0].upper().decode("utf-8")
-        if shape_as_string == CYLINDER:
-            shape = SampleShape.CylinderAxisUp
-        elif shape_as_string == FLAT_PLATE:
-            shape = SampleShape.Cuboid
-        elif shape_as_string == DISC:
-            shape = SampleShape.CylinderAxisAlong
-        else:
-            shape = None
+        geometry = get_geometry_information_isis_nexus_from_h5_file(h5_file)
+    return geometry
+
+
+def get_geometry_information_isis_nexus_from_h5_file(h5_file):
+    # Open first entry
+    keys = list(h5_file.keys())
+    top_level = h5_file[keys[0]]
+    sample = top_level[SAMPLE]
+    height = float(sample[HEIGHT][0])
+    width = float(sample[WIDTH][0])
+    thickness = float(sample[THICKNESS][0])
+    shape_as_string = sample[SHAPE][0].upper().decode("utf-8")
+    if shape_as_string == CYLINDER:
+        shape = SampleShape.CylinderAxisUp
+    elif shape_as_string == FLAT_PLATE:
+        shape = SampleShape.Cuboid
+    elif shape_as_string == DISC:
+        shape = SampleShape.CylinderAxisAlong
+    else:
+        shape = None
     return height, width, thickness, shape
 
 
@@ -411,25 +435,52 @@ def get_geometry_information_isis_nexus(file_name):
 
 def get_date_and_run_number_added_nexus(file_name):
     with h5.File(file_name) as h5_file:
-        keys = list(h5_file.keys())
-        first_entry = h5_file[keys[0]]
-        logs = first_entry["logs"]
-        # Start time
-        start_time = logs["start_time"]
-        start_time_value = DateAndTime(start_time["value"][0])
-        # Run number
-        run_number = logs["run_number"]
-        run_number_value = int(run_number["value"][0])
+        start_time_value, run_number_value = get_date_and_run_number_added_nexus_from_h5_file(h5_file)
+    return DateAndTime(start_time_value), run_number_value
+
+
+def get_date_and_run_number_added_nexus_from_h5_file(h5_file):
+    keys = list(h5_file.keys())
+    first_entry = h5_file[keys[0]]
+    logs = first_entry["logs"]
+    # Start time
+    start_time = logs["start_time"]
+    start_time_value = start_time["value"][0]
+    # Run number
+    run_number = logs["run_number"]
+    run_number_value = int(run_number["value"][0])
     return start_time_value, run_number_value
 
 
-def get_added_nexus_information(file_name):  # noqa
+def get_added_nexus_information(file_name):
     """
     Get information if is added data and the number of periods.
 
     :param file_name: the full file path.
     :return: if the file was a Nexus file and the number of periods.
     """
+    if has_added_suffix(file_name):
+        try:
+            with h5.File(file_name) as h5_file:
+                is_added, number_of_periods, is_event = get_added_nexus_information_from_h5_file(h5_file)
+        except IOError:
+            is_added = False
+            is_event = False
+            number_of_periods = 1
+    else:
+        is_added = False
+        is_event = False
+        number_of_periods = 1
+    return is_added, number_of_periods, is_event
+
+
+def get_added_nexus_information_from_h5_file(h5_file):  # noqa
+    """
+    Get information if is added data and the number of periods from an open file which has the added suffix.
+
+    :param h5_file: an open h5 file.
+    :return: if the file was added data, the number of periods and if the file contains event data.
+    """
     ADDED_SUFFIX = "-add_added_event_data"
     ADDED_MONITOR_SUFFIX = "-add_monitors_added_event_data"
 
@@ -504,36 +555,25 @@ def get_added_nexus_information(file_name):  # noqa
                 break
         return is_added_file_histogram, num_periods
 
-    if has_added_suffix(file_name):
-        try:
-            with h5.File(file_name) as h5_file:
-                # Get all mantid_workspace_X keys
-                keys = list(h5_file.keys())
-                top_level_keys = get_all_keys_for_top_level(keys)
-
-                # Check if entries are added event data, if we don't have a hit, then it can always be
-                # added histogram data
-                is_added_event_file, number_of_periods_event = get_added_event_info(h5_file, top_level_keys)
-                is_added_histogram_file, number_of_periods_histogram = get_added_histogram_info(h5_file, top_level_keys)
-
-                if is_added_event_file:
-                    is_added = True
-                    is_event = True
-                    number_of_periods = number_of_periods_event
-                elif is_added_histogram_file:
-                    is_added = True
-                    is_event = False
-                    number_of_periods = number_of_periods_histogram
-                else:
-                    is_added = True
-                    is_event = False
-                    number_of_periods = 1
-        except IOError:
-            is_added = False
-            is_event = False
-            number_of_periods = 1
+    # Get all mantid_workspace_X keys
+    keys = list(h5_file.keys())
+    top_level_keys = get_all_keys_for_top_level(keys)
+
+    # Check if entries are added event data, if we don't have a hit, then it can always be
+    # added histogram data
+    is_added_event_file, number_of_periods_event = get_added_event_info(h5_file, top_level_keys)
+    is_added_histogram_file, number_of_periods_histogram = get_added_histogram_info(h5_file, top_level_keys)
+
+    if is_added_event_file:
+        is_added = True
+        is_event = True
+        number_of_periods = number_of_periods_event
+    elif is_added_histogram_file:
+        is_added = True
+        is_event = False
+        number_of_periods = number_of_periods_histogram
     else:
-        is_added = False
+        is_added = True
         is_event = False
         number_of_periods = 1
     return is_added, number_of_periods, is_event
@@ -567,15 +607,20 @@ def get_geometry_information_isis_added_nexus(file_name):
     :return: height, width, thickness, shape
     """
     with h5.File(file_name) as h5_file:
-        # Open first entry
-        keys = list(h5_file.keys())
-        top_level = h5_file[keys[0]]
-        sample = top_level[SAMPLE]
-        height = float(sample[GEOM_HEIGHT][0])
-        width = float(sample[GEOM_WIDTH][0])
-        thickness = float(sample[GEOM_THICKNESS][0])
-        shape_id = int(sample[GEOM_ID][0])
-        shape = convert_to_shape(shape_id)
+        geometry = get_geometry_information_isis_added_nexus_from_h5_file(h5_file)
+    return geometry
+
+
+def get_geometry_information_isis_added_nexus_from_h5_file(h5_file):
+    # Open first entry
+    keys = list(h5_file.keys())
+    top_level = h5_file[keys[0]]
+    sample = top_level[SAMPLE]
+    height = float(sample[GEOM_HEIGHT][0])
+    width = float(sample[GEOM_WIDTH][0])
+    thickness = float(sample[GEOM_THICKNESS][0])
+    shape_id = int(sample[GEOM_ID][0])
+    shape = convert_to_shape(shape_id)
     return height, width, thickness, shape
 
 
@@ -646,6 +691,18 @@ def get_number_of_periods_for_raw(file_name):
 
 
 def get_date_for_raw(file_name):
+    alg_info = AlgorithmManager.createUnmanaged("RawFileInfo")
+    alg_info.initialize()
+    alg_info.setChild(True)
+    alg_info.setProperty("Filename", file_name)
+    alg_info.setProperty("GetRunParameters", True)
+    alg_info.execute()
+
+    run_parameters = alg_info.getProperty("RunParameterTable").value
+    return DateAndTime(get_date_string_from_raw_run_parameters(run_parameters))
+
+
+def get_date_string_from_raw_run_parameters(run_parameters):
     def get_month(month_string):
         month_conversion = {"JAN": "01", "FEB": "02", "MAR": "03", "APR": "04",
                             "MAY": "05", "JUN": "06", "JUL": "07", "AUG": "08",
@@ -662,17 +719,7 @@ def get_date_for_raw(file_name):
         month_string = date_input[3:6]
         month = get_month(month_string)
 
-        date_and_time_string = year + "-" + month + "-" + day + "T" + time_input
-        return DateAndTime(date_and_time_string)
-
-    alg_info = AlgorithmManager.createUnmanaged("RawFileInfo")
-    alg_info.initialize()
-    alg_info.setChild(True)
-    alg_info.setProperty("Filename", file_name)
-    alg_info.setProperty("GetRunParameters", True)
-    alg_info.execute()
-
-    run_parameters = alg_info.getProperty("RunParameterTable").value
+        return year + "-" + month + "-" + day + "T" + time_input
 
     keys = run_parameters.getColumnNames()
 
@@ -715,6 +762,10 @@ def get_geometry_information_raw(file_name):
     alg_info.execute()
 
     sample_parameters = alg_info.getProperty("SampleParameterTable").value
+    return get_geometry_information_from_raw_sample_parameters(sample_parameters)
+
+
+def get_geometry_information_from_raw_sample_parameters(sample_parameters):
     keys = sample_parameters.getColumnNames()
 
     height_id = E_HEIGHT
@@ -730,6 +781,351 @@ def get_geometry_information_raw(file_name):
     return height, width, thickness, shape
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# File metadata
+# ----------------------------------------------------------------------------------------------------------------------
+# The metadata of a file is a dictionary which can be stored as JSON. It is read in a single pass over the file and
+# stored by the SANSFileInformationIndex, such that a file is only opened again when it changes.
+FILE_TYPE_KEY = "file_type"
+INSTRUMENT_KEY = "instrument"
+DATE_KEY = "date"
+RUN_NUMBER_KEY = "run_number"
+NUMBER_OF_PERIODS_KEY = "number_of_periods"
+IS_EVENT_MODE_KEY = "is_event_mode"
+HEIGHT_KEY = "height"
+WIDTH_KEY = "width"
+THICKNESS_KEY = "thickness"
+SHAPE_KEY = "shape"
+IDF_PATH_KEY = "idf_path"
+IPF_PATH_KEY = "ipf_path"
+INSTRUMENT_SETTINGS_KEY = "instrument_settings"
+
+
+def to_metadata_string(value):
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return str(value)
+
+
+def create_file_metadata(file_type, instrument_name=None, date=None, run_number=None, number_of_periods=None,
+                         is_event_mode=False, geometry=None):
+    """
+    Creates the metadata of a file.
+
+    :param file_type: the FileType of the file.
+    :param instrument_name: the instrument name as stored in the file.
+    :param date: the measurement date as an ISO8601 string.
+    :param run_number: the run number.
+    :param number_of_periods: the number of periods.
+    :param is_event_mode: true if the file contains event data.
+    :param geometry: the height, width, thickness and shape of the sample.
+    :return: a dictionary with the metadata.
+    """
+    height, width, thickness, shape = geometry if geometry is not None else (None, None, None, None)
+    return {FILE_TYPE_KEY: file_type.__name__,
+            INSTRUMENT_KEY: instrument_name,
+            DATE_KEY: date,
+            RUN_NUMBER_KEY: run_number,
+            NUMBER_OF_PERIODS_KEY: number_of_periods,
+            IS_EVENT_MODE_KEY: is_event_mode,
+            HEIGHT_KEY: height,
+            WIDTH_KEY: width,
+            THICKNESS_KEY: thickness,
+            SHAPE_KEY: shape.__name__ if shape is not None else None,
+            IDF_PATH_KEY: None,
+            IPF_PATH_KEY: None,
+            INSTRUMENT_SETTINGS_KEY: None}
+
+
+def get_file_type_from_metadata(metadata):
+    return getattr(FileType, metadata[FILE_TYPE_KEY])
+
+
+def get_shape_from_metadata(metadata):
+    shape = metadata[SHAPE_KEY]
+    return getattr(SampleShape, shape) if shape is not None else None
+
+
+def read_isis_nexus_metadata(h5_file):
+    _, number_of_periods = get_isis_nexus_info_from_h5_file(h5_file)
+    return create_file_metadata(FileType.ISISNexus,
+                                instrument_name=get_instrument_name_from_h5_file(h5_file),
+                                date=to_metadata_string(get_top_level_nexus_entry_from_h5_file(h5_file, START_TIME)),
+                                run_number=int(get_top_level_nexus_entry_from_h5_file(h5_file, RUN_NUMBER)),
+                                number_of_periods=number_of_periods,
+                                is_event_mode=get_event_mode_information_from_h5_file(h5_file),
+                                geometry=get_geometry_information_isis_nexus_from_h5_file(h5_file))
+
+
+def read_isis_added_metadata(h5_file):
+    _, number_of_periods, is_event = get_added_nexus_information_from_h5_file(h5_file)
+    date, run_number = get_date_and_run_number_added_nexus_from_h5_file(h5_file)
+    return create_file_metadata(FileType.ISISNexusAdded,
+                                instrument_name=get_instrument_name_from_h5_file(h5_file),
+                                date=to_metadata_string(date),
+                                run_number=run_number,
+                                number_of_periods=number_of_periods,
+                                is_event_mode=is_event,
+                                geometry=get_geometry_information_isis_added_nexus_from_h5_file(h5_file))
+
+
+def read_raw_metadata(file_name):
+    # The run header, the run parameters and the sample parameters are all provided by a single call to RawFileInfo
+    alg_info = AlgorithmManager.createUnmanaged("RawFileInfo")
+    alg_info.initialize()
+    alg_info.setChild(True)
+    alg_info.setProperty("Filename", file_name)
+    alg_info.setProperty("GetRunParameters", True)
+    alg_info.setProperty("GetSampleParameters", True)
+    alg_info.execute()
+
+    header = alg_info.getProperty("RunHeader").value.split()
+    run_parameters = alg_info.getProperty("RunParameterTable").value
+    sample_parameters = alg_info.getProperty("SampleParameterTable").value
+    return create_file_metadata(FileType.ISISRaw,
+                                instrument_name=instrument_name_correction(header[0]),
+                                date=get_date_string_from_raw_run_parameters(run_parameters),
+                                run_number=int(header[1]),
+                                number_of_periods=alg_info.getProperty("PeriodCount").value,
+                                geometry=get_geometry_information_from_raw_sample_parameters(sample_parameters))
+
+
+def read_sans_file_metadata(file_name):
+    """
+    Reads the metadata of a SANS file. A Nexus file is opened only once.
+
+    :param file_name: the full file path.
+    :return: a dictionary with the metadata. The file type is NoFileType if the file is not a known SANS file.
+    """
+    _, file_extension = os.path.splitext(file_name)
+    if file_extension.upper() == RAW_EXTENSION_WITH_DOT:
+        try:
+            return read_raw_metadata(file_name)
+        except IOError:
+            return create_file_metadata(FileType.NoFileType)
+
+    try:
+        with h5.File(file_name, "r") as h5_file:
+            if RAW_DATA_1 in list(h5_file.keys()):
+                metadata = read_isis_nexus_metadata(h5_file)
+            elif has_added_suffix(file_name):
+                metadata = read_isis_added_metadata(h5_file)
+            else:
+                metadata = create_file_metadata(FileType.NoFileType)
+    except IOError:
+        metadata = create_file_metadata(FileType.NoFileType)
+    return metadata
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# File information index
+# ----------------------------------------------------------------------------------------------------------------------
+FILE_INFORMATION_INDEX_FILE = "sans_file_information_index.json"
+FILE_INFORMATION_INDEX_VERSION = 2
+# The key of the user property which keeps the index in memory for the session only if it is set to 0
+FILE_INFORMATION_INDEX_PROPERTY = "sans.file_information_index"
+
+
+def get_file_stamp(full_file_name):
+    file_stat = os.stat(full_file_name)
+    return [file_stat.st_mtime, file_stat.st_size]
+
+
+def get_file_search_settings():
+    # The file which is found for a run number depends on the search directories and the default instrument
+    return "|".join([ConfigService.getString("datasearch.directories"),
+                     ConfigService.getString("default.facility"),
+                     ConfigService.getString("default.instrument")])
+
+
+def get_instrument_search_settings():
+    # The IDF which is found for a file depends on the instrument directories and on the IDFs of the Mantid version
+    return "|".join([version_str()] + list(ConfigService.getInstrumentDirectories()))
+
+
+class SANSFileInformationIndex(object):
+    """
+    Stores the full path of the SANS files which have been searched for and the metadata of each file. The metadata is
+    keyed by the full path and is only valid as long as the modification time and the size of the file do not change.
+
+    The index is saved to a JSON file such that it is shared by all processes and sessions. Entries which have been
+    added by other processes are merged when the index is saved.
+    """
+    def __init__(self, index_file=None):
+        """
+        :param index_file: the JSON file in which the index is stored or None if the index is held in memory only.
+        """
+        super(SANSFileInformationIndex, self).__init__()
+        self._index_file = index_file
+        self._search_settings = None
+        self._paths = {}
+        self._files = {}
+        self._deferred_saving = 0
+        self._has_changed = False
+        self._read_index_file()
+
+    def find_sans_file(self, file_name):
+        """
+        Finds a SANS file. See find_sans_file.
+
+        :param file_name: a file name or a run number.
+        :return: the full path.
+        """
+        search_settings = get_file_search_settings()
+        if search_settings != self._search_settings:
+            self._search_settings = search_settings
+            self._paths = {}
+
+        full_file_name = self._paths.get(file_name)
+        if full_file_name is None or not os.path.isfile(full_file_name):
+            full_file_name = find_sans_file(file_name)
+            self._paths[file_name] = full_file_name
+            self._changed()
+        return full_file_name
+
+    def get_metadata(self, full_file_name):
+        """
+        Gets the metadata of a file. The file is only read if it is not in the index or if it has changed.
+
+        :param full_file_name: the full file path.
+        :return: a dictionary with the metadata.
+        """
+        full_file_name = os.path.normpath(full_file_name)
+        stamp = get_file_stamp(full_file_name)
+        metadata = self._get_valid_metadata(full_file_name, stamp)
+        if metadata is None:
+            # Another process might have read the file in the meantime
+            self._read_index_file()
+            metadata = self._get_valid_metadata(full_file_name, stamp)
+        if metadata is None:
+            metadata = read_sans_file_metadata(full_file_name)
+            self._files[full_file_name] = {"stamp": stamp, "metadata": metadata}
+            self._changed()
+        return metadata
+
+    def get_instrument_paths(self, full_file_name):
+        """
+        Gets the IDF and IPF paths which are stored for a file. They are only valid for the Mantid version and the
+        instrument directories with which they were found.
+
+        :param full_file_name: the full file path.
+        :return: the IDF path and the IPF path or None if they are not known.
+        """
+        metadata = self.get_metadata(full_file_name)
+        if metadata.get(INSTRUMENT_SETTINGS_KEY) != get_instrument_search_settings():
+            return None
+        idf_path = metadata[IDF_PATH_KEY]
+        ipf_path = metadata[IPF_PATH_KEY]
+        if idf_path is None or ipf_path is None or not os.path.exists(idf_path) or not os.path.exists(ipf_path):
+            return None
+        return idf_path, ipf_path
+
+    def set_instrument_paths(self, full_file_name, idf_path, ipf_path):
+        metadata = self.get_metadata(full_file_name)
+        metadata[IDF_PATH_KEY] = idf_path
+        metadata[IPF_PATH_KEY] = ipf_path
+        metadata[INSTRUMENT_SETTINGS_KEY] = get_instrument_search_settings()
+        self._changed()
+
+    @contextmanager
+    def deferred_saving(self):
+        """
+        Saves the index file once when the context is left rather than for every new entry, e.g. for the files of
+        a batch.
+        """
+        self._deferred_saving += 1
+        try:
+            yield self
+        finally:
+            self._deferred_saving -= 1
+            if self._deferred_saving == 0 and self._has_changed:
+                self._save()
+
+    def clear(self):
+        """
+        Removes all entries from the index, including the index file.
+        """
+        self._paths = {}
+        self._files = {}
+        self._has_changed = False
+        if self._index_file is not None and os.path.exists(self._index_file):
+            os.remove(self._index_file)
+
+    def _get_valid_metadata(self, full_file_name, stamp):
+        entry = self._files.get(full_file_name)
+        if entry is not None and entry["stamp"] == stamp:
+            return entry["metadata"]
+        return None
+
+    def _load_index_file(self):
+        if self._index_file is None:
+            return None
+        content = cachefile.load_json(self._index_file)
+        if not isinstance(content, dict) or content.get("version") != FILE_INFORMATION_INDEX_VERSION:
+            return None
+        return content
+
+    def _read_index_file(self):
+        content = self._load_index_file()
+        if content is None:
+            return
+        for full_file_name, entry in content["files"].items():
+            self._files.setdefault(str(full_file_name), entry)
+        if self._search_settings is None or content["search_settings"] == self._search_settings:
+            self._search_settings = content["search_settings"]
+            for file_name, full_file_name in content["paths"].items():
+                self._paths.setdefault(str(file_name), str(full_file_name))
+
+    def _changed(self):
+        self._has_changed = True
+        if self._deferred_saving == 0:
+            self._save()
+
+    def _save(self):
+        self._has_changed = False
+        if self._index_file is None:
+            return
+        # Merge with the entries which have been added by other processes. The entries of this process are newer.
+        content = self._load_index_file()
+        if content is not None:
+            files = content["files"]
+            files.update(self._files)
+            self._files = files
+            if content["search_settings"] == self._search_settings:
+                paths = content["paths"]
+                paths.update(self._paths)
+                self._paths = paths
+        cachefile.save_json(self._index_file, {"version": FILE_INFORMATION_INDEX_VERSION,
+                                               "search_settings": self._search_settings,
+                                               "paths": self._paths,
+                                               "files": self._files})
+
+
+# The index which is shared by all SANSFileInformation objects of a process
+_file_information_index = None
+
+
+def get_file_information_index():
+    global _file_information_index
+    if _file_information_index is None:
+        if ConfigService.getString(FILE_INFORMATION_INDEX_PROPERTY).strip() == "0":
+            _file_information_index = SANSFileInformationIndex()
+        else:
+            index_file = cachefile.user_cache_path(FILE_INFORMATION_INDEX_FILE)
+            _file_information_index = SANSFileInformationIndex(index_file)
+    return _file_information_index
+
+
+def set_file_information_index(file_information_index):
+    """
+    Sets the index which is shared by all SANSFileInformation objects of the process.
+
+    :param file_information_index: a SANSFileInformationIndex or None to create the default index on the next use.
+    """
+    global _file_information_index
+    _file_information_index = file_information_index
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # SANS file Information
 # ----------------------------------------------------------------------------------------------------------------------
@@ -792,48 +1188,65 @@ class SANSFileInformation(with_metaclass(ABCMeta, object)):
 
     def get_idf_file_path(self):
         if self._idf_file_path is None:
-            idf_path, ipf_path = get_instrument_paths_for_sans_file(self._full_file_name)
-            self._idf_file_path = idf_path
-            self._ipf_file_path = ipf_path
+            self._set_instrument_paths()
         return self._idf_file_path
 
     def get_ipf_file_path(self):
         if self._ipf_file_path is None:
-            idf_path, ipf_path = get_instrument_paths_for_sans_file(self._full_file_name)
-            self._idf_file_path = idf_path
-            self._ipf_file_path = ipf_path
+            self._set_instrument_paths()
         return self._ipf_file_path
 
+    def _set_instrument_paths(self):
+        file_information_index = get_file_information_index()
+        instrument_paths = file_information_index.get_instrument_paths(self._full_file_name)
+        if instrument_paths is None:
+            instrument_paths = get_instrument_paths_for_sans_file(self._full_file_name)
+            file_information_index.set_instrument_paths(self._full_file_name, *instrument_paths)
+        self._idf_file_path, self._ipf_file_path = instrument_paths
+
+    def _set_geometry(self, metadata):
+        height = metadata[HEIGHT_KEY]
+        width = metadata[WIDTH_KEY]
+        thickness = metadata[THICKNESS_KEY]
+        shape = get_shape_from_metadata(metadata)
+        self._height = height if height is not None else 1.
+        self._width = width if width is not None else 1.
+        self._thickness = thickness if thickness is not None else 1.
+        self._shape = shape if shape is not None else SampleShape.CylinderAxisAlong
+
     @staticmethod
     def get_full_file_name(file_name):
-        return find_sans_file(file_name)
+        return get_file_information_index().find_sans_file(file_name)
 
 
 class SANSFileInformationISISNexus(SANSFileInformation):
-    def __init__(self, file_name):
+    def __init__(self, file_name, metadata=None):
+        """
+        :param file_name: the file name or run number.
+        :param metadata: the metadata of the file. It is read from the file if it is not provided.
+        """
         super(SANSFileInformationISISNexus, self).__init__(file_name)
+        if metadata is None:
+            with h5.File(self._full_file_name, "r") as h5_file:
+                metadata = read_isis_nexus_metadata(h5_file)
+
         # Setup instrument name
-        instrument_name = get_instrument_name_for_isis_nexus(self._full_file_name)
-        self._instrument = SANSInstrument.from_string(instrument_name)
+        self._instrument = SANSInstrument.from_string(metadata[INSTRUMENT_KEY])
 
         # Setup date
-        self._date = get_date_for_isis_nexus(self._full_file_name)
+        self._date = DateAndTime(str(metadata[DATE_KEY]))
 
         # Setup number of periods
-        self._number_of_periods = get_number_of_periods_for_isis_nexus(self._full_file_name)
+        self._number_of_periods = metadata[NUMBER_OF_PERIODS_KEY]
 
         # Setup run number
-        self._run_number = get_run_number_for_isis_nexus(self._full_file_name)
+        self._run_number = metadata[RUN_NUMBER_KEY]
 
         # Setup event mode check
-        self._is_event_mode = get_event_mode_information(self._full_file_name)
+        self._is_event_mode = metadata[IS_EVENT_MODE_KEY]
 
         # Get geometry details
-        height, width, thickness, shape = get_geometry_information_isis_nexus(self._full_file_name)
-        self._height = height if height is not None else 1.
-        self._width = width if width is not None else 1.
-        self._thickness = thickness if thickness is not None else 1.
-        self._shape = shape if shape is not None else SampleShape.CylinderAxisAlong
+        self._set_geometry(metadata)
 
     def get_file_name(self):
         return self._full_file_name
@@ -873,26 +1286,27 @@ class SANSFileInformationISISNexus(SANSFileInformation):
 
 
 class SANSFileInformationISISAdded(SANSFileInformation):
-    def __init__(self, file_name):
+    def __init__(self, file_name, metadata=None):
+        """
+        :param file_name: the file name or run number.
+        :param metadata: the metadata of the file. It is read from the file if it is not provided.
+        """
         super(SANSFileInformationISISAdded, self).__init__(file_name)
+        if metadata is None:
+            with h5.File(self._full_file_name, "r") as h5_file:
+                metadata = read_isis_added_metadata(h5_file)
+
         # Setup instrument name
-        instrument_name = get_instrument_name_for_isis_nexus(self._full_file_name)
-        self._instrument_name = get_instrument(instrument_name)
+        self._instrument_name = get_instrument(metadata[INSTRUMENT_KEY])
 
-        date, run_number = get_date_and_run_number_added_nexus(self._full_file_name)
-        self._date = date
-        self._run_number = run_number
+        self._date = DateAndTime(str(metadata[DATE_KEY]))
+        self._run_number = metadata[RUN_NUMBER_KEY]
 
-        _,  number_of_periods, is_event = get_added_nexus_information(self._full_file_name)
-        self._number_of_periods = number_of_periods
-        self._is_event_mode = is_event
+        self._number_of_periods = metadata[NUMBER_OF_PERIODS_KEY]
+        self._is_event_mode = metadata[IS_EVENT_MODE_KEY]
 
         # Get geometry details
-        height, width, thickness, shape = get_geometry_information_isis_added_nexus(self._full_file_name)
-        self._height = height if height is not None else 1.
-        self._width = width if width is not None else 1.
-        self._thickness = thickness if thickness is not None else 1.
-        self._shape = shape if shape is not None else SampleShape.CylinderAxisAlong
+        self._set_geometry(metadata)
 
     def get_file_name(self):
         return self._full_file_name
@@ -932,28 +1346,29 @@ class SANSFileInformationISISAdded(SANSFileInformation):
 
 
 class SANSFileInformationRaw(SANSFileInformation):
-    def __init__(self, file_name):
+    def __init__(self, file_name, metadata=None):
+        """
+        :param file_name: the file name or run number.
+        :param metadata: the metadata of the file. It is read from the file if it is not provided.
+        """
         super(SANSFileInformationRaw, self).__init__(file_name)
+        if metadata is None:
+            metadata = read_raw_metadata(self._full_file_name)
+
         # Setup instrument name
-        instrument_name = get_instrument_name_for_raw(self._full_file_name)
-        self._instrument = SANSInstrument.from_string(instrument_name)
+        self._instrument = SANSInstrument.from_string(metadata[INSTRUMENT_KEY])
 
         # Setup date
-        self._date = get_date_for_raw(self._full_file_name)
+        self._date = DateAndTime(str(metadata[DATE_KEY]))
 
         # Setup number of periods
-        self._number_of_periods = get_number_of_periods_for_raw(self._full_file_name)
+        self._number_of_periods = metadata[NUMBER_OF_PERIODS_KEY]
 
         # Setup run number
-        self._run_number = get_run_number_for_raw(self._full_file_name)
+        self._run_number = metadata[RUN_NUMBER_KEY]
 
         # Set geometry
-        # Raw files don't have the sample information, so set to default
-        height, width, thickness, shape = get_geometry_information_raw(self._full_file_name)
-        self._height = height if height is not None else 1.
-        self._width = width if width is not None else 1.
-        self._thickness = thickness if thickness is not None else 1.
-        self._shape = shape if shape is not None else SampleShape.CylinderAxisAlong
+        self._set_geometry(metadata)
 
     def get_file_name(self):
         return self._full_file_name
@@ -997,13 +1412,18 @@ class SANSFileInformationFactory(object):
         super(SANSFileInformationFactory, self).__init__()
 
     def create_sans_file_information(self, file_name):
-        full_file_name = find_sans_file(file_name)
-        if is_isis_nexus_single_period(full_file_name) or is_isis_nexus_multi_period(full_file_name):
-            file_information = SANSFileInformationISISNexus(full_file_name)
-        elif is_raw_single_period(full_file_name) or is_raw_multi_period(full_file_name):
-            file_information = SANSFileInformationRaw(full_file_name)
-        elif is_added_histogram(full_file_name) or is_added_event(full_file_name):
-            file_information = SANSFileInformationISISAdded(full_file_name)
+        # The file path and the metadata are looked up in the index which is shared across the session and
+        # across processes. The file is only searched for and read if it is not known or if it has changed.
+        file_information_index = get_file_information_index()
+        full_file_name = file_information_index.find_sans_file(file_name)
+        metadata = file_information_index.get_metadata(full_file_name)
+        file_type = get_file_type_from_metadata(metadata)
+        if file_type is FileType.ISISNexus:
+            file_information = SANSFileInformationISISNexus(full_file_name, metadata)
+        elif file_type is FileType.ISISRaw:
+            file_information = SANSFileInformationRaw(full_file_name, metadata)
+        elif file_type is FileType.ISISNexusAdded:
+            file_information = SANSFileInformationISISAdded(full_file_name, metadata)
         else:
             raise NotImplementedError("The file type you have provided is not implemented yet.")
         return file_information
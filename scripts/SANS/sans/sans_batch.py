@@ -2,7 +2,11 @@
 """ SANBatchReduction algorithm is the starting point for any new type reduction, event single reduction"""
 from __future__ import (absolute_import, division, print_function)
 from sans.state.state import State
-from sans.algorithm_detail.batch_execution import (single_reduction_for_batch)
+from six import integer_types
+from sans.algorithm_detail.batch_execution import (single_reduction_for_batch, reduction_for_batch_in_worker_pool,
+                                                   plan_load_cache)
+from sans.algorithm_detail.load_cache import (SANSLoadCache, get_load_cache, set_load_cache)
+from sans.common.file_information import get_file_information_index
 from sans.common.enums import (OutputMode)
 
 
@@ -10,7 +14,8 @@ class SANSBatchReduction(object):
     def __init__(self):
         super(SANSBatchReduction, self).__init__()
 
-    def __call__(self, states, use_optimizations=True, output_mode=OutputMode.PublishToADS):
+    def __call__(self, states, use_optimizations=True, output_mode=OutputMode.PublishToADS, number_of_processes=1,
+                 load_cache=None):
         """
         This is the start of any reduction.
 
@@ -20,22 +25,47 @@ class SANSBatchReduction(object):
                             1. PublishToADS
                             2. SaveToFile
                             3. Both
+        :param number_of_processes: The number of worker processes which reduce the states, and the periods and time
+                                    slices of each state, at the same time. Each worker process has its own ADS. The
+                                    reduced workspaces are published to the ADS of the calling process.
+        :param load_cache: The SANSLoadCache which holds the loaded data of the batch, such that each file is loaded
+                           only once. If it is not specified, then a load cache without a memory budget is used for
+                           this batch.
         """
-        self.validate_inputs(states, use_optimizations, output_mode)
+        self.validate_inputs(states, use_optimizations, output_mode, number_of_processes, load_cache)
 
-        self._execute(states, use_optimizations, output_mode)
+        self._execute(states, use_optimizations, output_mode, number_of_processes, load_cache)
 
     @staticmethod
-    def _execute(states, use_optimizations, output_mode):
-        # Iterate over each state, load the data and perform the reduction
-        for state in states:
-            single_reduction_for_batch(state, use_optimizations, output_mode)
+    def _execute(states, use_optimizations, output_mode, number_of_processes=1, load_cache=None):
+        is_load_cache_of_batch = load_cache is None
+        if is_load_cache_of_batch:
+            load_cache = SANSLoadCache()
+        previous_load_cache = get_load_cache()
+        set_load_cache(load_cache)
+        try:
+            # The files of the batch are added to the file information index in one go
+            with get_file_information_index().deferred_saving():
+                load_cache_keys_for_states = plan_load_cache(states)
+                if number_of_processes > 1:
+                    reduction_for_batch_in_worker_pool(states, use_optimizations, output_mode, number_of_processes,
+                                                       load_cache_keys_for_states)
+                else:
+                    # Iterate over each state, load the data and perform the reduction
+                    for state, load_cache_keys in zip(states, load_cache_keys_for_states):
+                        single_reduction_for_batch(state, use_optimizations, output_mode, load_cache_keys)
+        finally:
+            set_load_cache(previous_load_cache)
+            if is_load_cache_of_batch:
+                load_cache.clear()
 
-    def validate_inputs(self, states, use_optimizations, output_mode):
+    def validate_inputs(self, states, use_optimizations, output_mode, number_of_processes=1, load_cache=None):
         # We are strict about the types here.
         # 1. states has to be a list of sans state objects
         # 2. use_optimizations has to be bool
         # 3. output_mode has to be an OutputMode enum
+        # 4. number_of_processes has to be a positive integer
+        # 5. load_cache has to be a SANSLoadCache or None
         if not isinstance(states, list):
             raise RuntimeError("The provided states are not in a list. They have to be in a list.")
 
@@ -53,6 +83,15 @@ class SANSBatchReduction(object):
             raise RuntimeError("The output mode has to be an enum of type OutputMode. The provided type is"
                                " {0}".format(type(output_mode)))
 
+        if isinstance(number_of_processes, bool) or not isinstance(number_of_processes, integer_types) or\
+                number_of_processes < 1:
+            raise RuntimeError("The number of processes has to be a positive integer. The provided value is"
+                               " {0}".format(number_of_processes))
+
+        if load_cache is not None and not isinstance(load_cache, SANSLoadCache):
+            raise RuntimeError("The load cache has to be a SANSLoadCache object. The provided type is"
+                               " {0}".format(type(load_cache)))
+
         errors = self._validate_inputs(states)
         if errors:
             raise RuntimeError("The provided states are not valid: {}".format(errors))
@@ -3,9 +3,13 @@
 """ Fundamental classes and Descriptors for the State mechanism."""
 from __future__ import (absolute_import, division, print_function)
 from abc import (ABCMeta, abstractmethod)
+from collections import OrderedDict
 import copy
+import hashlib
 import inspect
+import json
 from functools import (partial)
+import six
 from six import string_types, with_metaclass
 
 from mantid.kernel import (PropertyManager, std_vector_dbl, std_vector_str, std_vector_int, std_vector_long)
@@ -497,6 +501,10 @@ def set_state_from_property_manager(instance, property_manager):
         if k_element != STATE_NAME and k_element != STATE_MODULE:
             setattr(inst, k_element, v_element)
 
+    if is_compact_state(property_manager):
+        set_state_from_dict(instance, load_compact_state(property_manager.getProperty(COMPACT_STATE).value))
+        return
+
     keys = list(property_manager.keys())
     for key in keys:
         value = property_manager.getProperty(key).value
@@ -573,5 +581,127 @@ def get_deserialized_class_type_parameter(value):
     return getattr(outer_class_type_parameter, class_name)
 
 
+# ------------------------------------------------
+# Compact serialization of the State
+# ------------------------------------------------
+# Converting a state to a property manager and back goes through Mantid's PropertyManager one property at a time. A
+# state which is passed between algorithms can instead be held as a single JSON string on the property manager. The
+# deserialized states are cached in each process, keyed by a hash of the string, such that a state which is passed
+# unchanged to many child algorithms is only rebuilt once.
+COMPACT_STATE = "compact_state"
+COMPACT_STATE_VERSION = 1
+VERSION = "version"
+STATE = "state"
+
+# The most recently deserialized compact states, ordered from the least to the most recently used state
+_compact_state_cache = OrderedDict()
+COMPACT_STATE_CACHE_SIZE = 32
+
+
+def is_compact_state(property_manager):
+    return property_manager.existsProperty(COMPACT_STATE)
+
+
+def is_state_dict(value):
+    return isinstance(value, dict) and STATE_NAME in value and STATE_MODULE in value
+
+
+def convert_state_to_compact_dict(instance):
+    """
+    Converts the state object to a dictionary which holds the serialized state in a single string.
+
+    :param instance: the instance which is to be converted
+    :return: a serialized state object in the form of a dict which can be set on a PropertyManagerProperty
+    """
+    state_dict = convert_state_to_dict(instance)
+    compact_state = json.dumps({VERSION: COMPACT_STATE_VERSION, STATE: state_dict}, sort_keys=True,
+                               separators=(",", ":"))
+    return {STATE_MODULE: state_dict[STATE_MODULE],
+            STATE_NAME: state_dict[STATE_NAME],
+            COMPACT_STATE: compact_state}
+
+
+def convert_json_strings(value):
+    # The json module provides unicode strings on Python 2, but the StringParameters expect str
+    if isinstance(value, dict):
+        return {convert_json_strings(key): convert_json_strings(val) for key, val in value.items()}
+    elif isinstance(value, list):
+        return [convert_json_strings(element) for element in value]
+    elif six.PY2 and isinstance(value, six.text_type):
+        return value.encode("utf-8")
+    return value
+
+
+def load_compact_state(compact_state):
+    """
+    Loads the state dictionary from a compact state string.
+
+    :param compact_state: the string created by convert_state_to_compact_dict
+    :return: the state dictionary
+    """
+    try:
+        content = json.loads(compact_state)
+    except ValueError:
+        raise ValueError("The compact SANSState could not be read.")
+    if not isinstance(content, dict) or content.get(VERSION) != COMPACT_STATE_VERSION:
+        raise ValueError("The compact SANSState has an unsupported version. Expected version {0}."
+                         "".format(COMPACT_STATE_VERSION))
+    return convert_json_strings(content[STATE])
+
+
+def set_state_from_dict(instance, state_dict):
+    """
+    Set the State object from a state dictionary, e.g. as created by convert_state_to_dict.
+
+    :param instance: the instance which is to be set with the values of the dictionary
+    :param state_dict: the dictionary with the stored settings
+    """
+    for key, value in list(state_dict.items()):
+        if key == STATE_NAME or key == STATE_MODULE:
+            continue
+        # The scenarios are the same as for set_state_from_property_manager, but the lists are already lists
+        if is_state_dict(value):
+            value = create_state_from_dict(value)
+        elif isinstance(value, dict):
+            value = {sub_key: create_state_from_dict(sub_value) if is_state_dict(sub_value) else sub_value
+                     for sub_key, sub_value in value.items()}
+        elif is_class_type_parameter(value):
+            value = get_deserialized_class_type_parameter(value)
+        elif isinstance(value, list) and value and all(is_class_type_parameter(element) for element in value):
+            value = [get_deserialized_class_type_parameter(element) for element in value]
+        setattr(instance, key, value)
+
+
+def create_state_from_dict(state_dict):
+    state_class = provide_class_from_module_and_class_name(state_dict[STATE_MODULE], state_dict[STATE_NAME])
+    state = state_class()
+    set_state_from_dict(state, state_dict)
+    return state
+
+
+def create_state_from_compact_state(compact_state):
+    """
+    Creates the state from a compact state string. The state is shared with all other users of the same string
+    in this process, hence it must not be altered. Use a copy of the state if it needs to be changed.
+
+    :param compact_state: the string created by convert_state_to_compact_dict
+    :return: the state object
+    """
+    key = hashlib.sha1(compact_state.encode("utf-8")).hexdigest()
+    state = _compact_state_cache.pop(key, None)
+    if state is None:
+        state = create_state_from_dict(load_compact_state(compact_state))
+    _compact_state_cache[key] = state
+    while len(_compact_state_cache) > COMPACT_STATE_CACHE_SIZE:
+        _compact_state_cache.popitem(last=False)
+    return state
+
+
+def clear_compact_state_cache():
+    _compact_state_cache.clear()
+
+
 def create_deserialized_sans_state_from_property_manager(property_manager):
+    if is_compact_state(property_manager):
+        return create_state_from_compact_state(property_manager.getProperty(COMPACT_STATE).value)
     return create_sub_state(property_manager)
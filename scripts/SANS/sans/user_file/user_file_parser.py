@@ -2152,18 +2152,15 @@ class IgnoredParser(object):
         self._back_mon_pattern = re.compile("\\s*BACK\\s*/\\s*M\\s*" + integer_number +
                                             "\." + integer_number + "\\s*/\\s*TIMES\\s*")
 
-    def is_ignored(self, line):
-        ignore = False
+        # All of the above in a single pattern, such that a line is only matched once
+        ignored_patterns = [self._spy_on_off_pattern, self._read_pattern, self._centre_pattern, self._mid_pattern,
+                            self._mid_hab_pattern, self._sp_pattern, self._notab_pattern, self._yc_pattern,
+                            self._mask_pattern, self._habeff_pattern, self._habpath_pattern, self._back_mon_pattern]
+        self._ignored_pattern = re.compile("|".join(["(?:" + pattern.pattern + ")" for pattern in ignored_patterns]))
 
+    def is_ignored(self, line):
         line = line.upper()
-        if (does_pattern_match(self._spy_on_off_pattern, line) or does_pattern_match(self._read_pattern, line) or
-            does_pattern_match(self._centre_pattern, line) or does_pattern_match(self._mid_pattern, line) or
-            does_pattern_match(self._mid_hab_pattern, line) or does_pattern_match(self._sp_pattern, line) or
-            does_pattern_match(self._notab_pattern, line) or does_pattern_match(self._yc_pattern, line) or
-            does_pattern_match(self._mask_pattern, line) or does_pattern_match(self._habeff_pattern, line) or
-            does_pattern_match(self._habpath_pattern, line) or does_pattern_match(self._back_mon_pattern, line)):  # noqa
-            ignore = True
-        return ignore
+        return does_pattern_match(self._ignored_pattern, line)
 
 
 class UserFileParser(object):
@@ -2188,15 +2185,24 @@ class UserFileParser(object):
                          LARMORParser.get_type(): LARMORParser()}
         self._ignored_parser = IgnoredParser()
 
+        # The command keyword at the start of a line selects the parser, e.g. L/Q ... is handled by the LimitParser.
+        # The type pattern of the selected parser is then checked, such that only valid commands are accepted.
+        self._type_patterns = {key: re.compile(parser.get_type_pattern(), re.IGNORECASE)
+                               for key, parser in self._parsers.items()}
+        self._keyword_pattern = re.compile("\\s*([A-Z][A-Z0-9]*)")
+
     def _get_correct_parser(self, line):
         line = line.strip()
         line = line.upper()
+        keyword_match = self._keyword_pattern.match(line)
+        keyword = keyword_match.group(1) if keyword_match is not None else None
+        if keyword in self._parsers and does_pattern_match(self._type_patterns[keyword], line):
+            return self._parsers[keyword]
+
+        # The keyword is not conclusive, hence we check the type pattern of each parser
         for key in self._parsers:
-            parser = self._parsers[key]
-            if re.match(parser.get_type_pattern(), line, re.IGNORECASE) is not None:
-                return parser
-            else:
-                continue
+            if does_pattern_match(self._type_patterns[key], line):
+                return self._parsers[key]
 
         # We have encountered an unknown file specifier.
         raise ValueError("UserFileParser: Unknown user "
@@ -1,7 +1,18 @@
 from __future__ import (absolute_import, division, print_function)
+from collections import OrderedDict
+from copy import deepcopy
 from sans.common.file_information import find_full_file_path
 from sans.user_file.user_file_parser import UserFileParser
 
+# The parsed user files, keyed by the full path. An entry is only used if the content of the file has not changed since
+# it was parsed. The entries are ordered from the least to the most recently used entry.
+_user_file_cache = OrderedDict()
+USER_FILE_CACHE_SIZE = 16
+
+
+def clear_user_file_cache():
+    _user_file_cache.clear()
+
 
 class UserFileReader(object):
     def __init__(self, user_file):
@@ -30,14 +41,30 @@ class UserFileReader(object):
                 output[key] = [value]
 
     def read_user_file(self):
+        # A user file is typically shared by all rows of a batch, hence it is only parsed again if it has changed. The
+        # file is small, so we compare its content rather than the modification time, which can have a resolution of
+        # a second. The callers receive a copy, since they are free to alter the parsed elements.
+        with open(self._user_file) as f:
+            lines = f.readlines()
+        cached = _user_file_cache.pop(self._user_file, None)
+        if cached is not None and cached[0] == lines:
+            output = cached[1]
+        else:
+            output = self._parse_user_file(lines)
+        _user_file_cache[self._user_file] = (lines, output)
+        while len(_user_file_cache) > USER_FILE_CACHE_SIZE:
+            _user_file_cache.popitem(last=False)
+
+        # Provide the read elements
+        return deepcopy(output)
+
+    @staticmethod
+    def _parse_user_file(lines):
         # Read in all elements
         parser = UserFileParser()
 
         output = {}
-        with open(self._user_file) as f:
-            for line in f:
-                parsed = parser.parse_line(line)
-                UserFileReader._add_to_output(output, parsed)
-
-        # Provide the read elements
+        for line in lines:
+            parsed = parser.parse_line(line)
+            UserFileReader._add_to_output(output, parsed)
         return output
@@ -95,6 +95,15 @@ class AbinsCalculateSPowderTest(unittest.TestCase):
                                     sample_form=self._sample_form, abins_data=good_data.extract(),
                                     instrument=self._instrument, quantum_order_num=self._order_event)
 
+        # wrong choice of binned overtones
+        with self.assertRaises(ValueError):
+
+            # noinspection PyUnusedLocal
+            AbinsModules.CalculateS(filename=full_path_filename, temperature=self._temperature,
+                                    sample_form=self._sample_form, abins_data=good_data,
+                                    instrument=self._instrument, quantum_order_num=self._order_event,
+                                    binned_overtones="True")
+
     #  main test
     def test_good_case(self):
         self._good_case(name=self._si2)
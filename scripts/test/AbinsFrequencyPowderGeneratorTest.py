@@ -148,6 +148,52 @@ class AbinsFrequencyPowderGeneratorTest(unittest.TestCase):
         self.assertEqual(True, np.allclose(correct_array_1, generated_array_1))
         self.assertEqual(True, np.allclose(correct_coefficients_1, generated_coefficients_1))
 
+    def test_merge_freq_in_bins(self):
+
+        bins = np.arange(1.0, 21.0, 1.0)
+        array = np.asarray([1.2, 1.8, 3.5, 25.0, 19.5])
+        weights = np.asarray([1.0, 3.0, 2.0, 1.0, 4.0])
+
+        # wrong weights
+        with self.assertRaises(ValueError):
+            self.simple_freq_generator.merge_freq_in_bins(array=array, weights=weights[:2], bins=bins)
+
+        merged_array, merged_weights = self.simple_freq_generator.merge_freq_in_bins(array=array, weights=weights,
+                                                                                     bins=bins)
+
+        # transitions in the first bin are merged and the one outside the bins is discarded
+        self.assertEqual(True, np.allclose([1.65, 3.5, 19.5], merged_array))
+        self.assertEqual(True, np.allclose([4.0, 2.0, 4.0], merged_weights))
+
+    def test_construct_binned_freq_combinations(self):
+
+        bins = np.arange(1.0, 21.0, 1.0)
+        fundamentals = np.asarray([1.1, 2.05, 4.2])
+        fundamentals_weights = np.asarray([1.0, 2.0, 0.5])
+
+        # wrong fundamentals
+        with self.assertRaises(ValueError):
+            self.simple_freq_generator.construct_binned_freq_combinations(
+                previous_array=fundamentals, previous_weights=fundamentals_weights,
+                fundamentals_array=[1.1, 2.05, 4.2], fundamentals_weights=fundamentals_weights, bins=bins)
+
+        # the binned combinations are the merged individual combinations (no combination of fundamentals falls into
+        # another bin than the combination of the mean of its bin with a fundamental)
+        previous_array = fundamentals
+        previous_weights = fundamentals_weights
+        for order in range(AbinsConstants.QUANTUM_ORDER_TWO, AbinsConstants.QUANTUM_ORDER_FOUR + 1):
+            previous_array, previous_weights = self.simple_freq_generator.construct_binned_freq_combinations(
+                previous_array=previous_array, previous_weights=previous_weights, fundamentals_array=fundamentals,
+                fundamentals_weights=fundamentals_weights, bins=bins)
+
+            combinations = np.asarray(list(product(range(fundamentals.size), repeat=order)))
+            correct_array, correct_weights = self.simple_freq_generator.merge_freq_in_bins(
+                array=np.sum(np.take(fundamentals, combinations), axis=1),
+                weights=np.prod(np.take(fundamentals_weights, combinations), axis=1), bins=bins)
+
+            self.assertEqual(True, np.allclose(correct_weights, previous_weights))
+            self.assertEqual(True, np.allclose(correct_array, previous_array))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import (absolute_import, division, print_function)
+import unittest
+from mantid.simpleapi import logger
+
+import numpy as np
+from AbinsModules import ParallelExecutor, AbinsTestHelpers
+
+
+def old_python():
+    """" Check if Python has proper version."""
+    is_python_old = AbinsTestHelpers.old_python()
+    if is_python_old:
+        logger.warning("Skipping AbinsParallelExecutorTest because Python is too old.")
+    return is_python_old
+
+
+def skip_if(skipping_criteria):
+    """
+    Skip all tests if the supplied function returns true.
+    Python unittest.skipIf is not available in 2.6 (RHEL6) so we'll roll our own.
+    """
+    def decorate(cls):
+        if skipping_criteria():
+            for attr in cls.__dict__.keys():
+                if callable(getattr(cls, attr)) and 'test' in attr:
+                    delattr(cls, attr)
+        return cls
+    return decorate
+
+
+def _scaled_row(context=None, arrays=None, task=None):
+    return context["factor"] * np.asarray(arrays["matrix"][task])
+
+
+@skip_if(old_python)
+class AbinsParallelExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self._context = {"factor": 2.0}
+        self._arrays = {"matrix": np.arange(20.0).reshape(5, 4)}
+
+    def test_wrong_input(self):
+        with self.assertRaises(ValueError):
+            ParallelExecutor(processes=0, context=self._context, arrays=self._arrays)
+
+        with self.assertRaises(ValueError):
+            ParallelExecutor(processes=1, context=self._context, arrays=self._arrays["matrix"])
+
+    def test_serial(self):
+        executor = ParallelExecutor(processes=1, context=self._context, arrays=self._arrays)
+        result = executor.map(function=_scaled_row, tasks=[4, 0, 2])
+        self._check_result(result=result, tasks=[4, 0, 2])
+
+    def test_processes(self):
+        executor = ParallelExecutor(processes=2, context=self._context, arrays=self._arrays)
+        result = executor.map(function=_scaled_row, tasks=range(5))
+        self._check_result(result=result, tasks=range(5))
+
+    def _check_result(self, result=None, tasks=None):
+        self.assertEqual(len(tasks), len(result))
+        for row, task in zip(result, tasks):
+            self.assertEqual(True, np.allclose(2.0 * self._arrays["matrix"][task], row))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 from __future__ import (absolute_import, division, print_function)
 
 import mantid.simpleapi as mantid  # Have to import Mantid to setup paths
+import numpy
 import unittest
 
 from six_shim import assertRaisesRegex
@@ -287,6 +288,71 @@ class ISISPowderCommonTest(unittest.TestCase):
         self.assertAlmostEqual(summed_ws[0].readY(0)[bin_index], (first_run_bin_value + second_run_bin_value))
         mantid.DeleteWorkspace(summed_ws[0])
 
+    def test_load_current_normalised_workspace_with_load_workers(self):
+        run_number_range = "100-101"
+
+        bin_index = 8
+        first_run_bin_value = 0.59706224
+        second_run_bin_value = 1.48682782
+
+        # Check the runs are loaded in order
+        multiple_ws = common.load_current_normalised_ws_list(
+            run_number_string=run_number_range, instrument=ISISPowderMockInst(load_workers=2),
+            input_batching=common_enums.INPUT_BATCHING.Individual)
+
+        self.assertEqual(len(multiple_ws), 2)
+        self.assertAlmostEqual(multiple_ws[0].readY(0)[bin_index], first_run_bin_value)
+        self.assertAlmostEqual(multiple_ws[1].readY(0)[bin_index], second_run_bin_value)
+        for ws in multiple_ws:
+            mantid.DeleteWorkspace(ws)
+
+        # Check the workspaces are summed when instructed
+        summed_ws = common.load_current_normalised_ws_list(
+            run_number_string=run_number_range, instrument=ISISPowderMockInst(load_workers=2, sum_workers=2),
+            input_batching=common_enums.INPUT_BATCHING.Summed)
+
+        self.assertEqual(len(summed_ws), 1)
+        self.assertAlmostEqual(summed_ws[0].readY(0)[bin_index], (first_run_bin_value + second_run_bin_value))
+        mantid.DeleteWorkspace(summed_ws[0])
+
+    def test_load_current_normalised_ws_generator(self):
+        run_number_range = "100-101"
+
+        bin_index = 8
+        first_run_bin_value = 0.59706224
+        second_run_bin_value = 1.48682782
+
+        for load_workers in [1, 2]:
+            runs = list(common.load_current_normalised_ws_generator(
+                run_number_string=run_number_range, instrument=ISISPowderMockInst(load_workers=load_workers)))
+
+            self.assertEqual([run for run, _ in runs], [100, 101])
+            self.assertAlmostEqual(runs[0][1].readY(0)[bin_index], first_run_bin_value)
+            self.assertAlmostEqual(runs[1][1].readY(0)[bin_index], second_run_bin_value)
+            for _, ws in runs:
+                mantid.DeleteWorkspace(ws)
+
+    def test_load_nexus_runs_with_load_workers(self):
+        run_number_range = "100-101"
+
+        expected_ws = common.load_current_normalised_ws_list(
+            run_number_string=run_number_range, instrument=ISISPowderMockInst(file_ext=".nxs"),
+            input_batching=common_enums.INPUT_BATCHING.Individual)
+        expected_y = [ws.extractY() for ws in expected_ws]
+        for ws in expected_ws:
+            mantid.DeleteWorkspace(ws)
+
+        # The worker threads read the NeXus files one at a time whilst the runs are taken from the generator
+        runs = list(common.load_current_normalised_ws_generator(
+            run_number_string=run_number_range, instrument=ISISPowderMockInst(file_ext=".nxs", load_workers=2)))
+
+        self.assertFalse(common.nexus_file_lock.locked())
+        self.assertEqual([run for run, _ in runs], [100, 101])
+        for (run, ws), y in zip(runs, expected_y):
+            self.assertEqual(ws.name(), "POL" + str(run) + ".nxs")
+            self.assertTrue(numpy.array_equal(ws.extractY(), y))
+            mantid.DeleteWorkspace(ws)
+
     def test_load_current_normalised_ws_respects_ext(self):
         run_number = "102"
         file_ext_one = ".s1"
@@ -316,6 +382,26 @@ class ISISPowderCommonTest(unittest.TestCase):
         self.assertAlmostEqual(result_ws_two, result_ext_two)
         self.assertNotAlmostEqual(result_ext_one, result_ext_two)
 
+    def test_sum_ws_range_with_workers(self):
+        ws_list = []
+        for i in range(5):
+            out_name = "test_sum_ws_range_" + str(i)
+            mantid.CreateSampleWorkspace(OutputWorkspace=out_name, Function="Flat background", NumBanks=1,
+                                         BankPixelWidth=1, XMax=10, BinWidth=1)
+            ws_list.append(mantid.Scale(InputWorkspace=out_name, Factor=i + 1, OutputWorkspace=out_name))
+
+        summed_ws = common._sum_ws_range(ws_list=ws_list, number_of_workers=2)
+
+        self.assertEqual(summed_ws.name(), "summed_test_sum_ws_range_0_test_sum_ws_range_4")
+        # The flat background is 1 so the sum is 1 + 2 + 3 + 4 + 5
+        self.assertAlmostEqual(summed_ws.readY(0)[0], 15.)
+        # The partial sums have been removed
+        self.assertFalse(any("_partial_" in name for name in mantid.mtd.getObjectNames()))
+
+        mantid.DeleteWorkspace(summed_ws)
+        for ws in ws_list:
+            mantid.DeleteWorkspace(ws)
+
     def test_rebin_bin_boundary_defaults(self):
         ws = mantid.CreateSampleWorkspace(OutputWorkspace='test_rebin_bin_boundary_default',
                                           Function='Flat background', NumBanks=1, BankPixelWidth=1, XMax=10, BinWidth=1)
@@ -509,14 +595,22 @@ class ISISPowderCommonTest(unittest.TestCase):
 
 
 class ISISPowderMockInst(object):
-    def __init__(self, file_ext=None):
+    def __init__(self, file_ext=None, load_workers=1, sum_workers=1):
         self._file_ext = file_ext
+        self._load_workers = load_workers
+        self._sum_workers = sum_workers
 
     @staticmethod
     def _get_input_batching_mode(**_):
         # By default return multiple files as it makes something going wrong easier to spot
         return common_enums.INPUT_BATCHING.Individual
 
+    def _get_number_of_load_workers(self):
+        return self._load_workers
+
+    def _get_number_of_sum_workers(self):
+        return self._sum_workers
+
     def _get_run_details(self, **_):
         return ISISPowderMockRunDetails(file_ext=self._file_ext)
 
@@ -0,0 +1,112 @@
+from __future__ import (absolute_import, division, print_function)
+
+import mantid.simpleapi as mantid
+import os
+import shutil
+import tempfile
+import unittest
+
+from isis_powder.routines import vanadium_spline_cache
+
+
+class ISISPowderVanadiumSplineCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._spline_file_path = os.path.join(self._temp_dir, "spline_test.nxs")
+        self._write_spline_file(spline_value=2.)
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+        mantid.mtd.clear()
+
+    def _write_spline_file(self, spline_value):
+        append = False
+        for i in range(2):
+            ws = mantid.CreateSampleWorkspace(OutputWorkspace="spline_bank_" + str(i), Function="Flat background",
+                                              NumBanks=1, BankPixelWidth=1, XMax=20, BinWidth=2)
+            ws = mantid.Scale(InputWorkspace=ws, Factor=spline_value, OutputWorkspace=ws)
+            mantid.SaveNexus(Filename=self._spline_file_path, InputWorkspace=ws, Append=append)
+            append = True
+            mantid.DeleteWorkspace(ws)
+
+    @staticmethod
+    def _create_spectra(bin_width=1):
+        return [mantid.CreateSampleWorkspace(OutputWorkspace="data_bank_" + str(i), Function="Flat background",
+                                             NumBanks=1, BankPixelWidth=1, XMax=20, BinWidth=bin_width)
+                for i in range(2)]
+
+    def test_splines_are_loaded_and_rebinned_once(self):
+        cache = vanadium_spline_cache.VanadiumSplineCache()
+        spectra = self._create_spectra()
+
+        first_splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+        self.assertEqual(len(first_splines), 2)
+        for spline_name, data_ws in zip(first_splines, spectra):
+            spline_ws = mantid.mtd[spline_name]
+            self.assertEqual(spline_ws.blocksize(), data_ws.blocksize())
+            self.assertAlmostEqual(spline_ws.readY(0)[0], 1.)
+
+        # The same workspaces are returned for other runs with the same binning
+        for _ in range(10):
+            splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+            self.assertEqual(splines, first_splines)
+        # The loaded spline file and the two rebinned banks
+        self.assertEqual(len(cache), 3)
+
+        # Spectra with another binning are rebinned again
+        other_splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path,
+                                                   spectra_list=self._create_spectra(bin_width=4))
+        self.assertNotEqual(other_splines, first_splines)
+        self.assertEqual(len(cache), 5)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertFalse(any(mantid.mtd.doesExist(name) for name in first_splines + other_splines))
+
+    def test_rewritten_spline_file_is_loaded_again(self):
+        cache = vanadium_spline_cache.VanadiumSplineCache()
+        spectra = self._create_spectra()
+        first_splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+
+        os.remove(self._spline_file_path)
+        self._write_spline_file(spline_value=4.)
+        # Make sure the modification time differs on file systems with a coarse resolution
+        modification_time = os.path.getmtime(self._spline_file_path) + 10
+        os.utime(self._spline_file_path, (modification_time, modification_time))
+
+        splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+        self.assertNotEqual(splines, first_splines)
+        self.assertAlmostEqual(mantid.mtd[splines[0]].readY(0)[0], 2.)
+        # The outdated splines have been removed
+        self.assertFalse(any(mantid.mtd.doesExist(name) for name in first_splines))
+        self.assertEqual(len(cache), 3)
+
+    def test_memory_bound_removes_least_recently_used(self):
+        cache = vanadium_spline_cache.VanadiumSplineCache(max_memory_mb=0)
+        spectra = self._create_spectra()
+
+        splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+        # Only the rebinned banks which are about to be used are kept
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(all(mantid.mtd.doesExist(name) for name in splines))
+
+        other_splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path,
+                                                   spectra_list=self._create_spectra(bin_width=4))
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(any(mantid.mtd.doesExist(name) for name in splines))
+        self.assertTrue(all(mantid.mtd.doesExist(name) for name in other_splines))
+
+    def test_splines_removed_from_ads_are_recreated(self):
+        cache = vanadium_spline_cache.VanadiumSplineCache()
+        spectra = self._create_spectra()
+        cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+
+        mantid.mtd.clear()
+        spectra = self._create_spectra()
+        splines = cache.get_rebinned_splines(spline_file_path=self._spline_file_path, spectra_list=spectra)
+        self.assertTrue(all(mantid.mtd.doesExist(name) for name in splines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 from __future__ import (absolute_import, division, print_function)
 import os,sys,inspect
+import shutil
+import tempfile
 from mantid.simpleapi import *
 from mantid import api
 import unittest
@@ -468,6 +470,49 @@ class RunDescriptorTest(unittest.TestCase):
         self.assertTrue(ws is None)
         self.assertEqual(n_sums,0)
 
+    def test_sum_runs_cache_dir(self):
+        propman  = self.prop_man
+        propman.sample_run = 11001
+        ws = PropertyManager.sample_run.get_workspace()
+        test_val1 = ws.dataY(3)[0]
+        test_val2 = ws.dataY(50)[200]
+
+        norm_method = propman.normalise_method
+        cache_dir = tempfile.mkdtemp()
+        try:
+            propman.sum_runs_cache_dir = cache_dir
+            propman.sum_runs = True
+            propman.sample_run = [11001,11001]
+            ws = PropertyManager.sample_run.get_workspace()
+            self.assertEqual(2*test_val1, ws.dataY(3)[0])
+            self.assertEqual(PropertyManager.sample_run.get_reused_sum_runs(),[])
+            cache_files = os.listdir(cache_dir)
+            self.assertEqual(len(cache_files),3)
+
+            # more runs have arrived. The stored sum is used even if ADS has been cleared
+            api.AnalysisDataService.clear()
+            propman.sample_run = [11001,11001,11001]
+            ws = PropertyManager.sample_run.get_workspace()
+            self.assertEqual(ws.name(),'SR_MAR011001SumOf3')
+            self.assertEqual(PropertyManager.sample_run.get_reused_sum_runs(),[11001,11001])
+            self.assertEqual(3*test_val1, ws.dataY(3)[0])
+            self.assertEqual(3*test_val2, ws.dataY(50)[200])
+            # the stored sum has been replaced by the sum of all runs
+            self.assertEqual(sorted(os.listdir(cache_dir)),sorted(cache_files))
+
+            # the sum made with other normalisation can not be reused
+            api.AnalysisDataService.clear()
+            propman.normalise_method = 'current' if norm_method != 'current' else 'monitor-1'
+            ws = PropertyManager.sample_run.get_workspace()
+            self.assertEqual(PropertyManager.sample_run.get_reused_sum_runs(),[])
+            self.assertEqual(3*test_val1, ws.dataY(3)[0])
+            self.assertEqual(len(os.listdir(cache_dir)),6)
+        finally:
+            propman.normalise_method = norm_method
+            propman.sum_runs = False
+            propman.sum_runs_cache_dir = None
+            shutil.rmtree(cache_dir)
+
     def test_find_runfiles(self):
         propman = self.prop_man
         propman.sample_run = [11001,11111]
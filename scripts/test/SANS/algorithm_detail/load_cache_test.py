@@ -0,0 +1,108 @@
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
+import unittest
+import mantid
+from mantid.api import AlgorithmManager
+from sans.algorithm_detail.load_cache import (SANSLoadCache, get_load_cache_key)
+from sans.common.enums import SANSDataType
+
+
+class LoadCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._file_name = os.path.join(self._directory, "SANS2D00022024.nxs")
+        with open(self._file_name, "w") as data_file:
+            data_file.write("data")
+
+    def tearDown(self):
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    @staticmethod
+    def _create_workspace(data_y):
+        alg_ws = AlgorithmManager.createUnmanaged("CreateWorkspace")
+        alg_ws.setChild(True)
+        alg_ws.initialize()
+        alg_ws.setProperty("OutputWorkspace", "test")
+        alg_ws.setProperty("DataX", list(range(len(data_y) + 1)))
+        alg_ws.setProperty("DataY", data_y)
+        alg_ws.execute()
+        return alg_ws.getProperty("OutputWorkspace").value
+
+    def _get_key(self, data_type, period=0):
+        return get_load_cache_key(self._file_name, period, "", data_type)
+
+    def test_that_key_depends_on_period_calibration_and_data_type(self):
+        key = self._get_key(SANSDataType.SampleScatter)
+        self.assertEqual(key, self._get_key(SANSDataType.SampleScatter))
+        self.assertNotEqual(key, self._get_key(SANSDataType.SampleScatter, period=2))
+        self.assertNotEqual(key, self._get_key(SANSDataType.CanScatter))
+        self.assertNotEqual(key, get_load_cache_key(self._file_name, 0, "TUBE_SANS2D.nxs", SANSDataType.SampleScatter))
+
+    def test_that_key_changes_when_file_changes(self):
+        key = self._get_key(SANSDataType.SampleScatter)
+        with open(self._file_name, "w") as data_file:
+            data_file.write("new data")
+        self.assertNotEqual(key, self._get_key(SANSDataType.SampleScatter))
+
+    def test_that_entry_is_removed_when_all_reservations_are_released(self):
+        # Arrange
+        load_cache = SANSLoadCache()
+        key = self._get_key(SANSDataType.SampleScatter)
+        workspace = self._create_workspace([1., 2., 3.])
+        load_cache.reserve(key)
+        load_cache.reserve(key)
+        # Act + Assert
+        self.assertTrue(load_cache.get(key) is None)
+        load_cache.add(key, [workspace], [])
+        workspaces, monitors = load_cache.get(key)
+        self.assertTrue(workspaces[0] is workspace)
+        self.assertEqual(len(monitors), 0)
+        load_cache.release(key)
+        self.assertTrue(key in load_cache)
+        load_cache.release(key)
+        self.assertFalse(key in load_cache)
+        self.assertEqual(load_cache.memory, 0)
+
+    def test_that_least_recently_used_entry_is_removed_when_memory_budget_is_exceeded(self):
+        # Arrange
+        workspace = self._create_workspace([1.] * 50000)
+        memory_budget_mb = 1.5 * workspace.getMemorySize() / (1024. * 1024.)
+        load_cache = SANSLoadCache(memory_budget_mb=memory_budget_mb)
+        sample_key = self._get_key(SANSDataType.SampleScatter)
+        can_key = self._get_key(SANSDataType.CanScatter)
+        # Act
+        load_cache.add(sample_key, [workspace], [])
+        load_cache.add(can_key, [self._create_workspace([1.] * 50000)], [])
+        # Assert
+        self.assertFalse(sample_key in load_cache)
+        self.assertTrue(can_key in load_cache)
+
+    def test_that_reserved_entry_is_spilled_and_read_back_when_memory_budget_is_exceeded(self):
+        # Arrange
+        workspace = self._create_workspace([float(index) for index in range(50000)])
+        memory_budget_mb = 1.5 * workspace.getMemorySize() / (1024. * 1024.)
+        load_cache = SANSLoadCache(memory_budget_mb=memory_budget_mb, spill_directory=self._directory)
+        sample_key = self._get_key(SANSDataType.SampleScatter)
+        can_key = self._get_key(SANSDataType.CanScatter)
+        load_cache.reserve(sample_key)
+        # Act
+        load_cache.add(sample_key, [workspace], [])
+        load_cache.add(can_key, [self._create_workspace([1.] * 50000)], [])
+        # Assert
+        self.assertTrue(sample_key in load_cache)
+        self.assertTrue(load_cache.memory <= memory_budget_mb * 1024 * 1024)
+        workspaces, _ = load_cache.get(sample_key)
+        self.assertFalse(workspaces[0] is workspace)
+        self.assertEqual(list(workspaces[0].readY(0)), list(workspace.readY(0)))
+        load_cache.clear()
+        self.assertFalse(sample_key in load_cache)
+
+    def test_that_invalid_memory_budget_raises(self):
+        self.assertRaises(ValueError, SANSLoadCache, memory_budget_mb=0)
+        self.assertRaises(ValueError, SANSLoadCache, spill_directory=os.path.join(self._directory, "missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,32 @@
 from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
 import unittest
 import mantid
 
 from sans.common.file_information import (SANSFileInformationFactory, SANSFileInformation, FileType,
-                                          SANSInstrument, get_instrument_paths_for_sans_file)
+                                          SANSInstrument, get_instrument_paths_for_sans_file,
+                                          SANSFileInformationIndex, find_sans_file, get_file_stamp,
+                                          set_file_information_index, FILE_INFORMATION_INDEX_FILE,
+                                          FILE_INFORMATION_INDEX_VERSION, INSTRUMENT_SETTINGS_KEY)
 from sans.common.enums import SampleShape
-from mantid.kernel import DateAndTime
+from mantid.kernel import (DateAndTime, cachefile)
 
 
-class SANSFileInformationTest(unittest.TestCase):
+class TemporaryFileInformationIndexTest(unittest.TestCase):
+    # The file information index is written to a temporary directory rather than to the user properties directory
+    def setUp(self):
+        self._index_directory = tempfile.mkdtemp()
+        set_file_information_index(SANSFileInformationIndex(os.path.join(self._index_directory,
+                                                                         FILE_INFORMATION_INDEX_FILE)))
+
+    def tearDown(self):
+        set_file_information_index(None)
+        shutil.rmtree(self._index_directory, ignore_errors=True)
+
+
+class SANSFileInformationTest(TemporaryFileInformationIndexTest):
     def test_that_can_extract_information_from_file_for_SANS2D_single_period_and_ISISNexus(self):
         # Arrange
         # The file is a single period
@@ -119,7 +137,7 @@ class SANSFileInformationTest(unittest.TestCase):
         self.assertTrue(file_information.get_shape() is SampleShape.Cuboid)
 
 
-class SANSFileInformationGeneralFunctionsTest(unittest.TestCase):
+class SANSFileInformationGeneralFunctionsTest(TemporaryFileInformationIndexTest):
     def test_that_finds_idf_and_ipf_paths(self):
         # Arrange
         file_name = "SANS2D00022024"
@@ -132,5 +150,83 @@ class SANSFileInformationGeneralFunctionsTest(unittest.TestCase):
         self.assertTrue("Parameters" in ipf_path)
 
 
+class SANSFileInformationIndexTest(TemporaryFileInformationIndexTest):
+    def setUp(self):
+        super(SANSFileInformationIndexTest, self).setUp()
+        self._directory = tempfile.mkdtemp()
+        self._index_file = os.path.join(self._directory, "index.json")
+
+    def tearDown(self):
+        super(SANSFileInformationIndexTest, self).tearDown()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def test_that_metadata_is_read_once_and_shared_through_the_index_file(self):
+        # Arrange
+        full_file_name = find_sans_file("SANS2D00022024")
+        file_information_index = SANSFileInformationIndex(self._index_file)
+
+        # Act
+        metadata = file_information_index.get_metadata(full_file_name)
+        other_file_information_index = SANSFileInformationIndex(self._index_file)
+
+        # Assert
+        self.assertEqual(metadata["file_type"], "ISISNexus")
+        self.assertEqual(metadata["run_number"], 22024)
+        self.assertEqual(metadata["number_of_periods"], 1)
+        self.assertEqual(metadata["shape"], "CylinderAxisAlong")
+        content = cachefile.load_json(self._index_file)
+        self.assertTrue(os.path.normpath(full_file_name) in content["files"])
+        self.assertEqual(other_file_information_index.get_metadata(full_file_name), metadata)
+
+    def test_that_metadata_is_read_again_when_the_file_has_changed(self):
+        # Arrange
+        full_file_name = os.path.normpath(find_sans_file("SANS2D00022024"))
+        mtime, size = get_file_stamp(full_file_name)
+        outdated_metadata = {"file_type": "ISISNexus", "run_number": 1}
+        cachefile.save_json(self._index_file, {"version": FILE_INFORMATION_INDEX_VERSION, "search_settings": "",
+                                               "paths": {},
+                                               "files": {full_file_name: {"stamp": [mtime - 10., size],
+                                                                          "metadata": outdated_metadata}}})
+        file_information_index = SANSFileInformationIndex(self._index_file)
+
+        # Act
+        metadata = file_information_index.get_metadata(full_file_name)
+
+        # Assert
+        self.assertEqual(metadata["run_number"], 22024)
+
+    def test_that_instrument_paths_are_only_used_with_the_same_mantid_version_and_instrument_directories(self):
+        # Arrange
+        full_file_name = find_sans_file("SANS2D00022024")
+        idf_path, ipf_path = get_instrument_paths_for_sans_file(full_file_name)
+        file_information_index = SANSFileInformationIndex(self._index_file)
+        file_information_index.set_instrument_paths(full_file_name, idf_path, ipf_path)
+
+        # Act
+        instrument_paths = file_information_index.get_instrument_paths(full_file_name)
+        file_information_index.get_metadata(full_file_name)[INSTRUMENT_SETTINGS_KEY] = "other version|other directory"
+        outdated_instrument_paths = file_information_index.get_instrument_paths(full_file_name)
+
+        # Assert
+        self.assertEqual(instrument_paths, (idf_path, ipf_path))
+        self.assertTrue(outdated_instrument_paths is None)
+
+    def test_that_deferred_saving_writes_the_index_file_when_the_context_is_left(self):
+        # Arrange
+        full_file_name = find_sans_file("SANS2D00022024")
+        file_information_index = SANSFileInformationIndex(self._index_file)
+
+        # Act
+        with file_information_index.deferred_saving():
+            file_information_index.get_metadata(full_file_name)
+            file_information_index.find_sans_file("SANS2D00022024")
+            is_saved_in_context = os.path.exists(self._index_file)
+
+        # Assert
+        self.assertFalse(is_saved_in_context)
+        content = cachefile.load_json(self._index_file)
+        self.assertTrue(os.path.normpath(full_file_name) in content["files"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -11,7 +11,8 @@ from sans.state.state_base import (StringParameter, BoolParameter, FloatParamete
                                    FloatWithNoneParameter, PositiveFloatWithNoneParameter, FloatListParameter,
                                    StringListParameter, PositiveIntegerListParameter, ClassTypeListParameter,
                                    StateBase, rename_descriptor_names, TypedParameter, validator_sub_state,
-                                   create_deserialized_sans_state_from_property_manager)
+                                   create_deserialized_sans_state_from_property_manager,
+                                   convert_state_to_compact_dict, convert_state_to_dict)
 from sans.common.enums import serializable_enum
 
 
@@ -285,6 +286,59 @@ class TestStateBase(unittest.TestCase):
         self.assertTrue(state_2.float_parameter == 23.)
         self.assertTrue(state_2.positive_float_with_none_parameter == 234.)
 
+    def test_that_compact_sans_state_can_be_serialized_and_deserialized_when_going_through_an_algorithm(self):
+        class FakeAlgorithm(Algorithm):
+            def PyInit(self):
+                self.declareProperty(PropertyManagerProperty("Args"))
+
+            def PyExec(self):
+                pass
+
+        # Arrange
+        state = ComplexState()
+
+        # Act
+        serialized = convert_state_to_compact_dict(state)
+        fake = FakeAlgorithm()
+        fake.initialize()
+        fake.setProperty("Args", serialized)
+        property_manager = fake.getProperty("Args").value
+
+        # Assert
+        self.assertTrue(len(serialized) == 3)
+        state_2 = create_deserialized_sans_state_from_property_manager(property_manager)
+        self._assert_simple_state(state_2.sub_state_1)
+        self._assert_simple_state(state_2.dict_parameter["A"])
+        self._assert_simple_state(state_2.dict_parameter["B"])
+        self.assertTrue(state_2.float_parameter == 23.)
+        self.assertTrue(state_2.positive_float_with_none_parameter == 234.)
+        self.assertTrue(convert_state_to_dict(state_2) == convert_state_to_dict(state))
+
+    @staticmethod
+    def _create_property_manager(serialized):
+        property_manager = PropertyManager()
+        for key, value in serialized.items():
+            property_manager[key] = value
+        return property_manager
+
+    def test_that_unchanged_compact_sans_state_is_only_deserialized_once(self):
+        # Arrange
+        state = ComplexState()
+        property_manager = self._create_property_manager(convert_state_to_compact_dict(state))
+        changed_state = ComplexState()
+        changed_state.float_parameter = 12.
+        changed_property_manager = self._create_property_manager(convert_state_to_compact_dict(changed_state))
+
+        # Act
+        state_2 = create_deserialized_sans_state_from_property_manager(property_manager)
+        state_3 = create_deserialized_sans_state_from_property_manager(property_manager)
+        changed_state_2 = create_deserialized_sans_state_from_property_manager(changed_property_manager)
+
+        # Assert
+        self.assertTrue(state_2 is state_3)
+        self.assertFalse(changed_state_2 is state_2)
+        self.assertTrue(changed_state_2.float_parameter == 12.)
+
 
 if __name__ == '__main__':
     unittest.main()
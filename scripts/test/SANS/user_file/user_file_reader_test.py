@@ -99,6 +99,26 @@ class UserFileReaderTest(unittest.TestCase):
         if os.path.exists(user_file_path):
             os.remove(user_file_path)
 
+    def test_that_user_file_is_parsed_again_only_when_it_has_changed(self):
+        # Arrange
+        user_file_path = create_user_file(sample_user_file)
+        reader = UserFileReader(user_file_path)
+
+        # Act
+        output = reader.read_user_file()
+        output[SampleId.offset].append(12.)
+        cached_output = reader.read_user_file()
+        create_user_file(sample_user_file.replace("SAMPLE/OFFSET +53.0", "SAMPLE/OFFSET +54.0"))
+        changed_output = reader.read_user_file()
+
+        # Assert
+        self.assertTrue(cached_output[SampleId.offset] == [53.0])
+        self.assertTrue(changed_output[SampleId.offset] == [54.0])
+
+        # clean up
+        if os.path.exists(user_file_path):
+            os.remove(user_file_path)
+
     @staticmethod
     def _sort_list(elements):
         if len(elements) == 1:
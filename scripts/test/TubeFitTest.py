@@ -0,0 +1,60 @@
+from __future__ import (absolute_import, division, print_function)
+
+import unittest
+import numpy as np
+
+import tube_fit
+
+
+class TubeFitTest(unittest.TestCase):
+
+    def _check_jacobian(self, model, p):
+        x = np.tile(np.linspace(0., 30., 31), (len(p), 1))
+        _, jacobian = model(x, p)
+        for k in range(p.shape[1]):
+            step = np.zeros_like(p)
+            step[:, k] = 1e-6 * np.maximum(np.abs(p[:, k]), 1.)
+            numerical = (model(x, p + step)[0] - model(x, p - step)[0]) / (2 * step[:, k:k + 1])
+            np.testing.assert_allclose(jacobian[:, :, k], numerical, rtol=1e-5, atol=1e-6)
+
+    def test_jacobians_match_finite_differences(self):
+        self._check_jacobian(tube_fit.linearBackground, np.array([[10., 0.5], [-3., 2.]]))
+        self._check_jacobian(tube_fit.gaussian, np.array([[100., 14.2, 3.], [-50., 20., 5.]]))
+        self._check_jacobian(tube_fit.gaussianWithBackground, np.array([[10., 0.1, 100., 14.2, 3.]]))
+        self._check_jacobian(tube_fit.endErfc, np.array([[2000., 15.5, 6., 20.], [1500., 12., -6., 0.]]))
+
+    def test_windows_of_different_lengths_are_fitted_together(self):
+        true_parameters = np.array([[100., 0.5, 800., 20.3, 2.5],
+                                    [50., -0.2, -300., 40.7, 3.1],
+                                    [10., 0., 1200., 7.9, 1.8]])
+        windows = []
+        for p, (start, end) in zip(true_parameters, [(5, 35), (30, 51), (0, 15)]):
+            x = np.arange(start, end + 1, dtype=float)
+            windows.append((x, tube_fit.gaussianWithBackground(x[np.newaxis, :], p[np.newaxis, :])[0][0]))
+        x, y, mask = tube_fit.stackWindows(windows)
+        self.assertEqual(x.shape, (3, 31))
+        self.assertEqual(mask.sum(), 31 + 22 + 16)
+
+        initial = true_parameters * [0.9, 0., 0.8, 1., 1.3] + [0., 0., 0., 1., 0.]
+        fitted = tube_fit.fitWindows(tube_fit.gaussianWithBackground, x, y, mask, initial)
+        np.testing.assert_allclose(fitted, true_parameters, rtol=1e-5, atol=1e-5)
+
+    def test_end_erfc_keeps_minimum_non_negative(self):
+        x = np.arange(0., 41.)[np.newaxis, :]
+        y = tube_fit.endErfc(x, np.array([[1000., 20.4, 5., 0.]]))[0]
+        fitted = tube_fit.fitWindows(tube_fit.endErfc, x, y, np.ones_like(x, dtype=bool),
+                                     np.array([[2000., 20., 6., 0.]]))
+        self.assertAlmostEqual(fitted[0, 1], 20.4, places=5)
+        self.assertTrue(fitted[0, 3] >= 0.)
+
+    def test_get_window_includes_both_ends(self):
+        counts = np.arange(10.)
+        pixels, values = tube_fit.getWindow(counts, 2.5, 7.)
+        np.testing.assert_array_equal(pixels, [3., 4., 5., 6., 7.])
+        np.testing.assert_array_equal(values, [3., 4., 5., 6., 7.])
+        pixels, _ = tube_fit.getWindow(counts, -5, 20)
+        self.assertEqual(len(pixels), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()